@@ -21,13 +21,16 @@ import threading
 import time
 import uuid
 from builtins import object, str
+from collections import Counter
 
 import avid.common.artefact as artefactHelper
 import avid.common.artefact.defaultProps as artefactProps
 import avid.common.artefact.generator as artefactGenerator
 import avid.common.workflow as workflow
+from avid.common.artefact.fingerprint import compute_fingerprint
+from avid.common.artefact.validity import resolve_deferred_validity
 
-from ..selectors import ActionTagSelector
+from ..selectors import ActionTagSelector, CaseSelector
 from .actionBatchGenerator import ActionBatchGenerator
 from .simpleScheduler import SimpleScheduler
 
@@ -77,6 +80,15 @@ class ActionBase(object):
         # pair tuples of detail strings and exception instances (if provided; if not provided the 2nd
         # value is None).
         self._last_warnings = list()
+        # resources needed to process the action (see avid.actions.resourceScheduler.ResourceHints). None
+        # indicates the default (one core, no relevant memory and no licenses).
+        self._resourceHints = None
+        # indicates if the batch action and the session keep the action after its processing even if it was
+        # successful without warnings or skipped (see parameter streaming of BatchActionBase).
+        self._retainAfterProcessing = True
+        # callable that is called with the action after it was finalized (used by batch actions that do not
+        # retain their actions).
+        self._finalizedCallback = None
 
     @property
     def actionTag(self):
@@ -86,6 +98,23 @@ class ActionBase(object):
     def action_tag_selector(self):
         return ActionTagSelector(self._actionTag)
 
+    @property
+    def resourceHints(self):
+        """Resources needed to process the action (see avid.actions.resourceScheduler). None indicates the
+        default hints."""
+        return self._resourceHints
+
+    @resourceHints.setter
+    def resourceHints(self, value):
+        self._resourceHints = value
+
+    @property
+    def retainAfterProcessing(self):
+        """Indicates if the action is kept by its batch action and the session after its processing. If False, it
+        is only kept if it failed or has warnings; otherwise only its result is counted.
+        """
+        return self._retainAfterProcessing
+
     @property
     def actionInstanceUID(self):
         return str(self._instanceUID)
@@ -255,7 +284,9 @@ class ActionBase(object):
         After the call of the method the outputs of action instance are collected and verified.
         It is advised to use do(), which will use do_finalize() appropriately."""
         try:
-            self._last_stop_time = time.time()
+            if self._last_stop_time is None:
+                # the stop time may already be set, if the processing was done elsewhere (e.g. in another process)
+                self._last_stop_time = time.time()
             logger.info(
                 f"Finished action: {self.instanceName} (UID: {self.actionInstanceUID}) -> {self._last_exec_state}"
             )
@@ -272,6 +303,9 @@ class ActionBase(object):
             # notify session about the finished action instance
             self._session.addProcessedActionInstance(self)
 
+        if self._finalizedCallback is not None:
+            self._finalizedCallback(self)
+
     def _do_setup(self):
         """Internal function that triggers the setup/preparation of the processing of an action.
         It also checks of an action needs to run at all.
@@ -355,6 +389,10 @@ class SingleActionBase(ActionBase):
         if self._propInheritanceDict is None:
             self._propInheritanceDict = dict()
 
+        # Input fingerprint of the current execution (see _generateInputFingerprint). None if input fingerprinting
+        # is not active for the session.
+        self._inputFingerprint = None
+
     def _ensureSingleArtefact(self, artefacts, name):
         """Helper method that can be used by actions that only handle one artefact as a specific input."""
         if artefacts is None:
@@ -590,8 +628,32 @@ class SingleActionBase(ActionBase):
         # so that they exist after returning from this function.
         pass
 
+    def _getFingerprintConfig(self):
+        """Returns the configuration of the action instance that is part of the input fingerprint (see
+        avid.common.artefact.fingerprint). Derived classes should extend the returned dict by all parameters that
+        influence the outputs of the action (e.g. callables, tool ids or arguments)."""
+        return {
+            "action_class": "{}.{}".format(
+                self.__class__.__module__, self.__class__.__qualname__
+            ),
+            "additional_action_props": self._additionalActionProps,
+            "prop_inheritance": self._propInheritanceDict,
+        }
+
+    def _generateInputFingerprint(self):
+        """Returns the input fingerprint of the action instance or None if input fingerprinting is not active for
+        the session (see Session.inputFingerprinting)."""
+        mode = getattr(self._session, "inputFingerprinting", None)
+        if mode is None:
+            return None
+        return compute_fingerprint(
+            self._getFingerprintConfig(), self._inputArtefacts, mode
+        )
+
     def _checkNecessity(self, outputs):
         """Checks if the workflow already contains the outputs of type 'result' in a valid state.
+        If input fingerprinting is active, alternatives are only regarded as valid if they were generated with
+        the same input fingerprint (so with the same action configuration and unchanged input files).
         @param outputs: Entries that would be generated by the action.
         @return Tupple: 1. indicating if action should run. 2. list of all entries
         that are valid and already available. If 1st is True the list has alternatives
@@ -600,26 +662,44 @@ class SingleActionBase(ActionBase):
         needed = False
         alternatives = list()
 
-        for output in outputs:
+        candidates = [
+            (output, self._session.artefacts.find_similar(output))
+            for output in outputs
+            if artefactHelper.getArtefactProperty(output, artefactProps.TYPE)
+            == artefactProps.TYPE_VALUE_RESULT
+        ]
+        # ensure that deferred validity checks of the alternatives are done (as one batch).
+        resolve_deferred_validity(
+            [alternative for _, alternative in candidates if alternative is not None]
+        )
+
+        for output, alternative in candidates:
             if (
-                artefactHelper.getArtefactProperty(output, artefactProps.TYPE)
-                == artefactProps.TYPE_VALUE_RESULT
+                alternative is None
+                or alternative[artefactProps.INVALID]
+                or alternative[artefactProps.URL] is None
+                or not os.path.isfile(alternative[artefactProps.URL])
             ):
-                alternative = self._session.artefacts.find_similar(output)
-                if (
-                    alternative is None
-                    or alternative[artefactProps.INVALID]
-                    or alternative[artefactProps.URL] is None
-                    or not os.path.isfile(alternative[artefactProps.URL])
-                ):
-                    needed = True
-                else:
-                    alternatives += (alternative,)
-                    logger.debug(
-                        "Valid alternative already exists. Indicated output: %s; alternative: %s",
-                        str(output),
-                        str(alternative),
-                    )
+                needed = True
+            elif self._inputFingerprint is not None and self._inputFingerprint != (
+                artefactHelper.getArtefactProperty(
+                    alternative, artefactProps.INPUT_FINGERPRINT
+                )
+            ):
+                needed = True
+                logger.info(
+                    "Existing alternative is outdated (inputs or action configuration have changed)."
+                    " Indicated output: %s; alternative: %s",
+                    str(output),
+                    str(alternative),
+                )
+            else:
+                alternatives += (alternative,)
+                logger.debug(
+                    "Valid alternative already exists. Indicated output: %s; alternative: %s",
+                    str(output),
+                    str(alternative),
+                )
 
         return (needed, alternatives)
 
@@ -683,6 +763,7 @@ class SingleActionBase(ActionBase):
         outputs = (
             self.indicateOutputs()
         )  # outputs are also stored in self._outputArtefacts
+        self._inputFingerprint = self._generateInputFingerprint()
         (isNeeded, alternatives) = self._checkNecessity(outputs)
 
         if not (self._alwaysDo or isNeeded):
@@ -774,6 +855,8 @@ class SingleActionBase(ActionBase):
                     )
                 except:
                     pass
+                if self._inputFingerprint is not None:
+                    artefact[artefactProps.INPUT_FINGERPRINT] = self._inputFingerprint
 
                 self._session.add_artefact(artefact)
 
@@ -808,6 +891,8 @@ class BatchActionBase(ActionBase):
         relevanceSelector=None,
         additionalActionProps=None,
         scheduler=SimpleScheduler(),
+        streaming=False,
+        resourceHints=None,
         **actionParameters,
     ):
         """init the action and setting the workflow session, the action is working
@@ -856,10 +941,29 @@ class BatchActionBase(ActionBase):
         it is assumed that only artefact of type TYPE_VALUE_RESULT are relevant.
         :param session: Session object of the workflow the action is working in
         :param scheduler Strategy how to execute the single actions.
+        :param streaming: If True, the single actions are generated lazily while the scheduler processes them, instead
+        of generating all actions before the processing starts. So the processing starts directly and pending actions
+        do not accumulate in memory, even for batches with a huge number of input combinations. Until all actions are
+        generated, number_of_actions is only an estimate. Processed actions are not retained (see
+        ActionBase.retainAfterProcessing): the batch action and the session only keep the actions that failed or
+        have warnings; of the other actions only the outputs and the number per result are kept. So getSkippedActions
+        and getSuccessfulActions only return the actions with warnings; use getNumberOfSkippedActions and
+        getNumberOfSuccessfulActions to get the counts.
+        :param resourceHints: Resources each single action of the batch needs (see
+        avid.actions.resourceScheduler.ResourceHints). They are assigned to all generated actions that have no own
+        hints and are used by resource aware schedulers.
         """
         ActionBase.__init__(self, actionTag, session, additionalActionProps)
         self._actions = None
+        self._streaming = streaming
+        self._actionStream = None
+        # number of actions generated in streaming mode
+        self._numberOfGeneratedActions = 0
+        # results and outputs of the processed actions that are not retained
+        self._releasedActionCounts = Counter()
+        self._releasedOutputs = list()
         self._scheduler = scheduler  # scheduler that should be used to execute the jobs
+        self._resourceHints = resourceHints
         self._session.registerBatchAction(self)
 
         self.lock = threading.RLock()
@@ -891,6 +995,12 @@ class BatchActionBase(ActionBase):
         return complete entries. Therefore the enties should already contain the
         url where they *will* be stored if the action is executed."""
         self.generateActions()
+        if self._actionStream is not None:
+            # outputs of all actions are needed, so the stream is generated completely
+            with self.lock:
+                for _ in self._registerActions(self._actionStream):
+                    pass
+                self._actionStream = None
 
         outputs = list()
 
@@ -901,7 +1011,13 @@ class BatchActionBase(ActionBase):
 
     @property
     def number_of_actions(self):
-        """Returns the number of actions in the batch."""
+        """Returns the number of actions in the batch. If the actions are generated in streaming mode and not all
+        actions are generated yet, the number is estimated (see ActionBatchGenerator.estimatedNumberOfActions).
+        """
+        if self._actionStream is not None:
+            return self._generator.estimatedNumberOfActions()
+        if self._streaming:
+            return self._numberOfGeneratedActions
         if self._actions:
             return len(self._actions)
         else:
@@ -909,10 +1025,20 @@ class BatchActionBase(ActionBase):
 
     def generateActions(self):
         """Function that (pre)generates the actions of the batch action.
-        If actions are already generated, nothing will happen."""
+        If actions are already generated, nothing will happen.
+        In streaming mode only the inputs are prepared; the actions are generated while they are processed.
+        """
         if self._actions is None:
             with self.lock:
-                self._actions = self._generateActions()
+                if self._streaming:
+                    self._actionStream = self._generator.iterateActions(
+                        self._generator.prepareInputs()
+                    )
+                    self._actions = list()
+                else:
+                    self._actions = self._generateActions()
+                    for action in self._actions:
+                        self._applyResourceHints(action)
 
     def _generateActions(self):
         """Internal method that should generate all single actions that should be
@@ -923,12 +1049,112 @@ class BatchActionBase(ActionBase):
         read to be executed."""
         return self._generator.generateActions()
 
+    def _iterateStreamedActions(self):
+        """Passes the actions of the action stream on, while they are generated. The actions are not retained
+        (see _releaseAction)."""
+        yield from self._registerActions(self._actionStream, retain=False)
+        self._actionStream = None
+
+    def _registerActions(self, actions, retain=True):
+        """Passes the actions on. If retain is True, they are registered in self._actions; otherwise they are
+        released after their processing (see _releaseAction)."""
+        for action in actions:
+            self._applyResourceHints(action)
+            with self.lock:
+                if self._streaming:
+                    self._numberOfGeneratedActions += 1
+                if retain:
+                    self._actions.append(action)
+                else:
+                    action._retainAfterProcessing = False
+                    action._finalizedCallback = self._releaseAction
+            yield action
+
+    def _releaseAction(self, action):
+        """Called after a not retained action was finalized. Failed actions and actions with warnings are
+        registered in self._actions; of the other actions only the result and the outputs are kept.
+        """
+        action._finalizedCallback = None
+        with self.lock:
+            if action.isFailure or action.has_warnings:
+                self._actions.append(action)
+            else:
+                self._releasedActionCounts[action.last_exec_state] += 1
+                outputs = action.outputArtefacts
+                if outputs is not None:
+                    self._releasedOutputs.extend(outputs)
+
+    def _applyResourceHints(self, action):
+        if self._resourceHints is not None and action.resourceHints is None:
+            action.resourceHints = self._resourceHints
+
+    def _hasDefaultGeneration(self):
+        """Indicates if the actions are generated by the ActionBatchGenerator of the batch action."""
+        return (
+            type(self)._generateActions is BatchActionBase._generateActions
+            and type(self).generateActions is BatchActionBase.generateActions
+        )
+
+    def getInputActionTags(self):
+        """Returns the set of action tags the input artefacts of the batch action can have or None if it is unknown
+        (see ActionBatchGenerator.getInputActionTags)."""
+        if not self._hasDefaultGeneration():
+            return None
+        return self._generator.getInputActionTags()
+
+    def isCaseSeparable(self):
+        """Indicates if the batch action can be processed case by case (see ActionBatchGenerator.isCaseSeparable
+        and do_case_setup())."""
+        return self._hasDefaultGeneration() and self._generator.isCaseSeparable()
+
+    def isStreaming(self):
+        """Indicates if the actions are generated while they are processed (see parameter streaming). Until all
+        actions are generated, number_of_actions is an estimate."""
+        return self._streaming
+
+    def iterateActions(self):
+        """Returns an iterator over the actions of the batch action after do_setup() was called. It can be used to
+        process the actions of several batch actions with one scheduler (see avid.common.workflow.dataflow). In
+        streaming mode the actions are generated while iterating."""
+        if self._actionStream is not None:
+            return self._iterateStreamedActions()
+        return iter(list(self._actions))
+
+    def do_case_setup(self):
+        """Alternative to do_setup() for batch actions that are processed case by case (see isCaseSeparable()). No
+        actions are generated by the setup; the actions of each case are generated by generateCaseActions().
+        The batch action is finalized by do_finalize() after all cases are processed."""
+        with self.lock:
+            if self._actions is None:
+                self._actions = list()
+        return self.do_setup()
+
+    def generateCaseActions(self, case):
+        """Prepares the inputs of the passed case from the current state of the session and returns an iterator
+        that generates the actions of the case. Generated actions are registered in the batch action.
+        Only valid for case separable batch actions after do_case_setup() was called.
+        :param case: Case whose actions should be generated. None stands for artefacts without case.
+        """
+        artefacts = CaseSelector(case).getSelection(self._session.artefacts)
+        preparedInputs = self._generator.prepareInputs(artefacts)
+        return self._registerActions(
+            self._generator.iterateActions(preparedInputs), retain=not self._streaming
+        )
+
     def _do_setup(self):
         self.generateActions()
         return True
 
     def _do_processing(self):
-        if len(self._actions) > 0:
+        if self._actionStream is not None:
+            self._scheduler.execute(self._iterateStreamedActions())
+            # the stream is only consumed partially by some schedulers (e.g. TestingScheduler)
+            self._actionStream = None
+            if self._numberOfGeneratedActions == 0:
+                logger.info(
+                    f"Batch action contains no actions. Empty batch action: {self.instanceName} (UID: {self.actionInstanceUID})"
+                )
+        elif len(self._actions) > 0:
             self._scheduler.execute(self._actions)
         else:
             logger.info(
@@ -940,6 +1166,12 @@ class BatchActionBase(ActionBase):
         generatedArtefacts = list()
 
         with self.lock:
+            if self._releasedActionCounts[ActionBase.ACTION_SKIPPED] > 0:
+                state = ActionBase.ACTION_SKIPPED
+            if self._releasedActionCounts[ActionBase.ACTION_SUCCESS] > 0:
+                state = ActionBase.ACTION_SUCCESS
+            generatedArtefacts.extend(self._releasedOutputs)
+
             for action in self._actions:
                 if action.isSuccess and not state == ActionBase.ACTION_FAILURE:
                     state = ActionBase.ACTION_SUCCESS
@@ -967,7 +1199,8 @@ class BatchActionBase(ActionBase):
         return failedActions
 
     def getSkippedActions(self):
-        """Returns all actions of the session that have been skipped."""
+        """Returns all actions of the session that have been skipped. Actions that are not retained are not
+        returned (see parameter streaming)."""
         skippedActions = []
 
         with self.lock:
@@ -977,8 +1210,17 @@ class BatchActionBase(ActionBase):
 
         return skippedActions
 
+    def getNumberOfSkippedActions(self):
+        """Returns the number of skipped actions, including the actions that are not retained."""
+        with self.lock:
+            return (
+                len(self.getSkippedActions())
+                + self._releasedActionCounts[ActionBase.ACTION_SKIPPED]
+            )
+
     def getSuccessfulActions(self, no_warnings=False):
-        """Returns all actions of the session that have been successful."""
+        """Returns all actions of the session that have been successful. Actions that are not retained are not
+        returned (see parameter streaming)."""
         succActions = []
 
         with self.lock:
@@ -988,6 +1230,14 @@ class BatchActionBase(ActionBase):
 
         return succActions
 
+    def getNumberOfSuccessfulActions(self, no_warnings=False):
+        """Returns the number of successful actions, including the actions that are not retained."""
+        with self.lock:
+            return (
+                len(self.getSuccessfulActions(no_warnings=no_warnings))
+                + self._releasedActionCounts[ActionBase.ACTION_SUCCESS]
+            )
+
     def getSuccessfulActionsWithWarnings(self):
         """Returns all actions of the session that have been successful but with warnings."""
         succActions = []
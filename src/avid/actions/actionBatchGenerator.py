@@ -221,16 +221,18 @@ class ActionBatchGenerator(object):
 
         return result
 
-    def _prepareInputArtifacts(self, inputName):
-        """Gets, for one input all artefact form the session, sorts and splits them."""
+    def _prepareInputArtifacts(self, inputName, workflowData=None):
+        """Gets, for one input all artefact form the session (or the passed workflow data), sorts and splits them."""
         artefacts = None
+        if workflowData is None:
+            workflowData = self._session.artefacts
 
         selector = self._primaryInputSelector
         if not inputName == self.PRIMARY_INPUT_KEY:
             selector = self._additionalInputSelectors[inputName]
 
         if selector is not None:
-            artefacts = selector.getSelection(self._session.artefacts)
+            artefacts = selector.getSelection(workflowData)
             artefacts = self._ensureRelevantArtefacts(artefacts, inputName)
 
             splitter = self._splitter[inputName]
@@ -244,6 +246,48 @@ class ActionBatchGenerator(object):
 
         return artefacts
 
+    def getInputActionTags(self):
+        """Returns the set of action tags the input artefacts of the generated actions can have or None if the
+        selectors do not restrict the action tags (or it is unknown)."""
+        relevantTags = self._relevanceSelector.getPropertyValues(
+            artefactProps.ACTIONTAG
+        )
+
+        result = set()
+        selectors = [self._primaryInputSelector] + list(
+            self._additionalInputSelectors.values()
+        )
+        for selector in selectors:
+            if selector is None:
+                continue
+            tags = selector.getPropertyValues(artefactProps.ACTIONTAG)
+            if tags is None:
+                tags = relevantTags
+            elif relevantTags is not None:
+                tags = tags & relevantTags
+            if tags is None:
+                return None
+            result.update(tags)
+        return result
+
+    def isCaseSeparable(self):
+        """Indicates if every generated action only gets artefacts of one case, because all splits are separated by
+        case and all additional inputs are only linked within a case. Then the actions of a case can be generated
+        by passing only the artefacts of the case to prepareInputs(), which results in the same actions as the
+        generation on all artefacts."""
+        inputs = {self.PRIMARY_INPUT_KEY: self._primaryInputSelector}
+        inputs.update(self._additionalInputSelectors)
+        for key, selector in inputs.items():
+            if selector is not None and not self._splitter[key].splitsByCase():
+                return False
+            if (
+                key != self.PRIMARY_INPUT_KEY
+                and selector is not None
+                and not self._linker[key].linksOnlySameCase()
+            ):
+                return False
+        return True
+
     def _generateDependencySequence(self):
         names = self._additionalInputSelectors.keys()
         # Get all inputs that do not depend on others and put it directly in the list
@@ -272,15 +316,42 @@ class ActionBatchGenerator(object):
         """Method that generates all actions based on the given state of the session and configuration of self.
         For the strategy how the actions are generated see the explination in the class documentation.
         """
+        return list(self.iterateActions())
 
-        primaryInput = self._prepareInputArtifacts(inputName=self.PRIMARY_INPUT_KEY)
+    def prepareInputs(self, workflowData=None):
+        """Gets, sorts and splits the artefacts of all inputs from the current state of the session.
+        :param workflowData: Optional artefact collection the inputs are selected from instead of the artefacts of
+        the session (e.g. only the artefacts of one case, see isCaseSeparable()).
+        :return: Prepared inputs that can be passed to iterateActions()."""
+        primaryInput = self._prepareInputArtifacts(
+            inputName=self.PRIMARY_INPUT_KEY, workflowData=workflowData
+        )
 
         additionalInputs = dict()
         for key in self._additionalInputSelectors:
-            additionalInputs[key] = self._prepareInputArtifacts(inputName=key)
+            additionalInputs[key] = self._prepareInputArtifacts(
+                inputName=key, workflowData=workflowData
+            )
+
+        self._primarySplitCount = len(primaryInput) if primaryInput is not None else 0
+        self._processedPrimarySplits = 0
+        self._generatedActionCount = 0
+        return primaryInput, additionalInputs
+
+    def iterateActions(self, preparedInputs=None):
+        """Generator version of generateActions(). The actions are generated lazily one after another, so only
+        the actions that are consumed are created. Thus the first action is available directly and the memory
+        consumption does not depend on the number of combinations. estimatedNumberOfActions() reports the progress.
+        :param preparedInputs: Inputs returned by prepareInputs(). If None, the inputs are prepared when the first
+        action is requested.
+        """
+        if preparedInputs is None:
+            preparedInputs = self.prepareInputs()
+        primaryInput, additionalInputs = preparedInputs
 
-        actions = list()
         depSequence = self._generateDependencySequence()
+        # data the linkers derive from the inputs (e.g. hash indices); only valid for this run
+        linkContext = dict()
 
         for pos, primarySplit in enumerate(primaryInput):
             linkedAdditionals = dict()
@@ -290,17 +361,33 @@ class ActionBatchGenerator(object):
                 if secondSelections is not None:
                     linkedAdditionals[additionalKey] = self._linker[
                         additionalKey
-                    ].getLinkedSelection(pos, primaryInput, secondSelections)
-            actions.extend(
-                self._generateActions_recursive(
-                    {self._primaryAlias: primarySplit.copy()},
-                    None,
-                    linkedAdditionals.copy(),
-                    depSequence,
-                )
-            )
-
-        return actions
+                    ].getLinkedSelection(
+                        pos, primaryInput, secondSelections, linkContext
+                    )
+            for action in self._iterateActions_recursive(
+                {self._primaryAlias: primarySplit.copy()},
+                None,
+                linkedAdditionals,
+                depSequence,
+                linkContext,
+            ):
+                self._generatedActionCount += 1
+                yield action
+            self._processedPrimarySplits += 1
+
+    def estimatedNumberOfActions(self):
+        """Returns the (estimated) number of actions of the last iterateActions() call. While actions are generated,
+        the number is extrapolated from the actions generated per primary split so far (at least one action per
+        primary split is assumed). After the generation it is the number of generated actions.
+        """
+        generated = getattr(self, "_generatedActionCount", 0)
+        processed = getattr(self, "_processedPrimarySplits", 0)
+        total = getattr(self, "_primarySplitCount", 0)
+        if processed >= total:
+            return generated
+        if processed == 0:
+            return max(generated, total)
+        return max(generated, round(generated / processed * total))
 
     def _generateActions_recursive(
         self,
@@ -308,39 +395,48 @@ class ActionBatchGenerator(object):
         relevantAdditionalInputPos,
         additionalInputs,
         leftInputNames,
+        linkContext=None,
+    ):
+        return list(
+            self._iterateActions_recursive(
+                relevantAdditionalInputs,
+                relevantAdditionalInputPos,
+                additionalInputs,
+                leftInputNames,
+                linkContext,
+            )
+        )
+
+    def _iterateActions_recursive(
+        self,
+        relevantAdditionalInputs,
+        relevantAdditionalInputPos,
+        additionalInputs,
+        leftInputNames,
+        linkContext=None,
     ):
-        actions = list()
         if relevantAdditionalInputPos is None:
             relevantAdditionalInputPos = dict()
 
         if leftInputNames is None or len(leftInputNames) == 0:
-            # check if all relevant inputs are valid
-            # emptyInputs = '' # [inputName for inputName in relevantAdditionalInputs if relevantAdditionalInputs[inputName] is None]
-
-            # if len(emptyInputs)>0:
             singleActionParameters = {
                 **self._singleActionParameters,
                 **relevantAdditionalInputs,
             }
             if self._actionClass is not None:
-                action = self._actionClass(**singleActionParameters)
-                actions.append(action)
+                yield self._actionClass(**singleActionParameters)
             else:
-                newActions = self._actionCreationDelegate(**singleActionParameters)
-                actions.extend(newActions)
-            # else:
-            #    logger.debug('Action candidate was skipped because at least one of the additional inputs is undefined '
-            #                 '(empty selection) and therefore no valid action instance can be generated. HINT: If you'
-            #                 'want to allow combinations where "There is no valid artefact" (==[None] a as additional input is a '
-            #                 'valid option, yempty ')
+                yield from self._actionCreationDelegate(**singleActionParameters)
         else:
             currentName = leftInputNames[0]
             currentInputs = additionalInputs[currentName]
 
             newLeftNames = leftInputNames[1:]
+            # The dicts are altered per split below and are only read by the deeper levels before the next split,
+            # so one copy per level is sufficient.
             newRelInputs = relevantAdditionalInputs.copy()
             newRelPos = relevantAdditionalInputPos.copy()
-            newAdditionalInputs = additionalInputs.copy()
+            newAdditionalInputs = additionalInputs
 
             if currentName in self._dependentLinker:
                 sourceName = self._dependentLinker[currentName][0]
@@ -364,17 +460,21 @@ class ActionBatchGenerator(object):
                         relevantAdditionalInputPos[sourceName],
                         additionalInputs[sourceName],
                         currentInputs,
+                        linkContext,
                     )
 
+                newAdditionalInputs = additionalInputs.copy()
                 newAdditionalInputs[currentName] = currentInputs
 
             if currentInputs is None:
                 newRelPos[currentName] = None
                 newRelInputs[currentName] = None
-                actions.extend(
-                    self._generateActions_recursive(
-                        newRelInputs, newRelPos, newAdditionalInputs, newLeftNames
-                    )
+                yield from self._iterateActions_recursive(
+                    newRelInputs,
+                    newRelPos,
+                    newAdditionalInputs,
+                    newLeftNames,
+                    linkContext,
                 )
             elif len(currentInputs) == 0:
                 logger.debug(
@@ -390,10 +490,10 @@ class ActionBatchGenerator(object):
                 for pos, aSplit in enumerate(currentInputs):
                     newRelPos[currentName] = pos
                     newRelInputs[currentName] = aSplit
-                    actions.extend(
-                        self._generateActions_recursive(
-                            newRelInputs, newRelPos, newAdditionalInputs, newLeftNames
-                        )
+                    yield from self._iterateActions_recursive(
+                        newRelInputs,
+                        newRelPos,
+                        newAdditionalInputs,
+                        newLeftNames,
+                        linkContext,
                     )
-
-        return actions
@@ -104,6 +104,11 @@ class CLIActionBase(SingleActionBase):
     def last_cli_call_file_path(self):
         return self._last_cli_call
 
+    def _getFingerprintConfig(self):
+        config = SingleActionBase._getFingerprintConfig(self)
+        config.update({"tool_id": self._actionID, "action_config": self._actionConfig})
+        return config
+
     def _prepareCLIExecution(self):
         """Internal function that should prepare/generate everything that is needed
         for the CLI call to run properly (e.g. the batch/bash file that should be
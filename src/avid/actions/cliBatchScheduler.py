@@ -15,11 +15,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import heapq
 import logging
 import os
 import uuid
 from builtins import object
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
 
 from avid.actions.cliActionBase import CLIActionBase
@@ -114,13 +116,89 @@ class CLIBatchScheduler(object):
     """Scheduler class that can be used with action based on CLIActionBase. Purpose of the scheduler to allow processing
     the processing step of a batch of actions in one batch file instead of calling each action on its own.
     This can e.g. be used in conjunction with external scheduling systems (e.g. LSF cliConnectors) to submit not
-    each action as a lsf job, but a batch of actions as one LSF job."""
-
-    def __init__(self, batch_size, thread_count=1):
+    each action as a lsf job, but a batch of actions as one LSF job.
+    By default the actions are split into batches of batch_size actions. If an estimator (e.g.
+    avid.actions.durationEstimator.DurationEstimator) is passed, the actions are distributed on the same number of
+    batches, but balanced by their estimated duration (longest actions first, each to the batch with the shortest
+    estimated total duration that has less than batch_size actions), and the longest batches are processed first.
+    Actions without estimate are assumed to take the mean of the estimated durations. In this case all actions of an
+    iterable are consumed before the processing starts."""
+
+    def __init__(self, batch_size, thread_count=1, estimator=None):
         self.batch_size = batch_size
         self.thread_count = thread_count
+        self.estimator = estimator
 
     def execute(self, action_list):
+        if self.estimator is not None and not hasattr(action_list, "__len__"):
+            action_list = list(action_list)
+
+        if hasattr(action_list, "__len__"):
+            # check all actions before the processing starts
+            self._check_actions(action_list)
+
+        batch_uid = uuid.uuid4()
+
+        if self.estimator is not None:
+            batches = self._balance_batches(action_list)
+        else:
+            # split action in batches; iterables (e.g. generators) are consumed batch by batch
+            action_iterator = iter(action_list)
+            batches = iter(lambda: list(islice(action_iterator, self.batch_size)), [])
+        action_batches = (
+            (batch_uid, batch_nr, batch) for batch_nr, batch in enumerate(batches)
+        )
+
+        with ThreadPoolExecutor(max_workers=max(1, self.thread_count)) as executor:
+            # only a bounded number of batches is submitted at any time
+            in_flight = set()
+            for action_batch in action_batches:
+                self._check_actions(action_batch[2])
+                if len(in_flight) >= 2 * self.thread_count:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight.add(executor.submit(process_batch, action_batch))
+
+    def _balance_batches(self, action_list):
+        """Distributes the actions on batches balanced by their estimated duration (see class documentation)."""
+        if len(action_list) == 0:
+            return list()
+
+        estimates = [self.estimator.estimate(action) for action in action_list]
+        known = [estimate for estimate in estimates if estimate is not None]
+        default = sum(known) / len(known) if known else 1.0
+        estimates = [
+            default if estimate is None else estimate for estimate in estimates
+        ]
+
+        batch_size = max(1, self.batch_size)
+        batch_count = -(-len(action_list) // batch_size)
+        # heap of (estimated total duration, batch nr, actions) of the batches that can take further actions.
+        # batch_size stays the upper limit of actions per batch (e.g. the job size of a LSF cliConnector).
+        open_batches = [(0.0, batch_nr, list()) for batch_nr in range(batch_count)]
+        batches = list()
+        for index in sorted(
+            range(len(action_list)), key=lambda index: estimates[index], reverse=True
+        ):
+            total, batch_nr, batch = heapq.heappop(open_batches)
+            batch.append(action_list[index])
+            entry = (total + estimates[index], batch_nr, batch)
+            if len(batch) < batch_size:
+                heapq.heappush(open_batches, entry)
+            else:
+                batches.append(entry)
+        batches.extend(open_batches)
+
+        batches.sort(key=lambda entry: (-entry[0], entry[1]))
+        logger.debug(
+            "Balanced %s actions on %s batches. Estimated batch durations: %s",
+            len(action_list),
+            batch_count,
+            [total for total, _, _ in batches],
+        )
+        return [batch for _, _, batch in batches if batch]
+
+    @staticmethod
+    def _check_actions(action_list):
         # check if all actions derive from CLIActionBase
         wrong_action = next(
             (action for action in action_list if not isinstance(action, CLIActionBase)),
@@ -132,20 +210,3 @@ class CLIBatchScheduler(object):
                 "classes derived from CLIActionBase. Please check your workflow code. First wrong action"
                 f"instance: {wrong_action}"
             )
-
-        batch_uid = uuid.uuid4()
-
-        # split action in batches
-        action_batches = [
-            action_list[i : i + self.batch_size]
-            for i in range(0, len(action_list), self.batch_size)
-        ]
-        action_batches = [
-            (batch_uid, i[0], i[1]) for i in enumerate(action_batches)
-        ]  # populate the list with additional
-        # information
-
-        thread_count = min(self.thread_count, len(action_batches))
-
-        with ThreadPoolExecutor(max_workers=thread_count) as executor:
-            executor.map(process_batch, action_batches)
@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import threading
+from builtins import object
+
+import avid.common.artefact.defaultProps as artefactProps
+from avid.common.artefact import getArtefactProperty
+
+logger = logging.getLogger(__name__)
+
+
+def getHistoricDuration(action):
+    """Returns the execution duration (in seconds) the outputs of the passed action had when they were generated the
+    last time (the maximum, if the action has several outputs), or None if no duration is known (e.g. because the
+    session has no outputs of the action yet)."""
+    session = getattr(action, "_session", None)
+    if session is None:
+        return None
+    try:
+        outputs = action.indicateOutputs()
+    except Exception:
+        return None
+    if not outputs:
+        return None
+
+    durations = list()
+    with session.lock:
+        artefacts = session.artefacts
+        for output in outputs:
+            existing = artefacts.find_similar(output)
+            if existing is not None:
+                duration = existing[artefactProps.EXECUTION_DURATION]
+                if duration is not None:
+                    durations.append(duration)
+    if not durations:
+        return None
+    return max(durations)
+
+
+class _DurationModel(object):
+    """Linear model duration = intercept + slope * input size, fitted by least squares. If the samples do not
+    indicate a positive dependency on the input size, the mean duration is used."""
+
+    def __init__(self, samples):
+        count = len(samples)
+        meanSize = sum(size for size, _ in samples) / count
+        meanDuration = sum(duration for _, duration in samples) / count
+        variance = sum((size - meanSize) ** 2 for size, _ in samples)
+        covariance = sum(
+            (size - meanSize) * (duration - meanDuration) for size, duration in samples
+        )
+
+        self.slope = 0.0
+        if variance > 0 and covariance > 0:
+            self.slope = covariance / variance
+        self.intercept = meanDuration - self.slope * meanSize
+        self.sampleCount = count
+
+    def estimate(self, size):
+        return max(0.0, self.intercept + self.slope * size)
+
+
+class DurationEstimator(object):
+    """Estimates the execution duration of pending actions from the EXECUTION_DURATION of artefacts generated by
+    prior runs (e.g. of a previous session run or of already processed actions of the same batch):
+    1. If the outputs of the action itself already exist in the session (re-run), their duration is used (see
+       getHistoricDuration).
+    2. Otherwise the duration is estimated from the outputs of all actions with the same action tag and action class.
+       The summed file size of the inputs of the actions is used as covariate (see _DurationModel).
+    The models are built on first use and cached; call reset() to consider artefacts added afterwards.
+    An instance can be passed as priority to the ThreadingScheduler to process the longest actions first (LPT) or
+    as estimator to the CLIBatchScheduler to balance the batches by their estimated duration.
+
+    :param unknownDuration: Value that is returned by __call__ for actions without any history. The default (inf)
+        processes them first, as they might be long running.
+    """
+
+    def __init__(self, unknownDuration=float("inf")):
+        self.unknownDuration = unknownDuration
+        self._lock = threading.RLock()
+        self._models = dict()
+        self._fileSizes = dict()
+        # dict artefact ID -> artefact for each session (needed to resolve the input IDs of artefacts)
+        self._artefactsByID = dict()
+
+    def __call__(self, action):
+        duration = self.estimate(action)
+        if duration is None:
+            return self.unknownDuration
+        return duration
+
+    def reset(self):
+        with self._lock:
+            self._models.clear()
+            self._fileSizes.clear()
+            self._artefactsByID.clear()
+
+    def estimate(self, action):
+        """Returns the estimated duration (in seconds) of the passed action or None if it cannot be estimated.
+        Errors while estimating are logged and treated as unknown duration, so a single action cannot stop the
+        scheduling of the others."""
+        try:
+            return self._estimate(action)
+        except Exception as e:
+            logger.warning(
+                "Cannot estimate the duration of action %s. Duration is treated as unknown. Error details: %s",
+                action,
+                e,
+            )
+            return None
+
+    def _estimate(self, action):
+        duration = getHistoricDuration(action)
+        if duration is not None:
+            return duration
+
+        session = getattr(action, "_session", None)
+        if session is None:
+            return None
+        model = self._getModel(session, action.actionTag, action.__class__.__name__)
+        if model is None:
+            return None
+        inputs = getattr(action, "_inputArtefacts", dict())
+        return model.estimate(
+            self._getInputSize(
+                artefact for artefacts in inputs.values() for artefact in artefacts
+            )
+        )
+
+    def _getModel(self, session, actionTag, actionClass):
+        key = (id(session), actionTag, actionClass)
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+
+            with session.lock:
+                artefacts = session.artefacts
+                candidates = artefacts.select_by_property(
+                    artefactProps.ACTIONTAG, [actionTag]
+                )
+                if candidates is None:
+                    candidates = [
+                        artefact
+                        for artefact in artefacts
+                        if artefact[artefactProps.ACTIONTAG] == actionTag
+                    ]
+
+                # one sample per action instance
+                samples = dict()
+                for artefact in candidates:
+                    duration = artefact[artefactProps.EXECUTION_DURATION]
+                    if (
+                        duration is None
+                        or artefact[artefactProps.INVALID]
+                        or artefact[artefactProps.ACTION_CLASS] != actionClass
+                    ):
+                        continue
+                    uid = artefact[artefactProps.ACTION_INSTANCE_UID]
+                    if uid is None:
+                        uid = artefact[artefactProps.ID]
+                    if uid not in samples:
+                        samples[uid] = (
+                            self._getInputSize(self._getInputs(session, artefact)),
+                            duration,
+                        )
+
+            model = None
+            if samples:
+                model = _DurationModel(list(samples.values()))
+            self._models[key] = model
+            return model
+
+    def _getInputs(self, session, artefact):
+        inputIDs = artefact[artefactProps.INPUT_IDS]
+        if not inputIDs:
+            return list()
+        artefactsByID = self._artefactsByID.get(id(session))
+        if artefactsByID is None:
+            artefactsByID = {
+                other[artefactProps.ID]: other for other in session.artefacts
+            }
+            self._artefactsByID[id(session)] = artefactsByID
+        return [
+            artefactsByID[inputID]
+            for ids in inputIDs.values()
+            for inputID in ids
+            if inputID in artefactsByID
+        ]
+
+    def _getInputSize(self, artefacts):
+        size = 0
+        for artefact in artefacts:
+            # inputs may contain None entries (e.g. if linkers perform an internal linkage)
+            url = getArtefactProperty(artefact, artefactProps.URL)
+            if url is None:
+                continue
+            with self._lock:
+                fileSize = self._fileSizes.get(url)
+                if fileSize is None:
+                    try:
+                        fileSize = os.path.getsize(url) if os.path.isfile(url) else 0
+                    except OSError:
+                        fileSize = 0
+                    self._fileSizes[url] = fileSize
+            size += fileSize
+        return size
@@ -328,6 +328,22 @@ class GenericCLIAction(CLIActionBase):
                         )
                     )
 
+    def _getFingerprintConfig(self):
+        config = CLIActionBase._getFingerprintConfig(self)
+        config.update(
+            {
+                "additional_args": self._additionalArgs,
+                "additional_args_as_url": self._additionalArgsAsURL,
+                "arg_positions": self._argPositions,
+                "output_flags": self._outputFlags,
+                "no_output_args": self._noOutputArgs,
+                "output_extension": self._outputextension,
+                "indicate_callable": self._indicateCallable,
+                "generate_name_callable": self._generateNameCallable,
+            }
+        )
+        return config
+
     def _generateName(self):
         if self._generateNameCallable is not None:
             allargs = self._inputs.copy()
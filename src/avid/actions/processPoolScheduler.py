@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import multiprocessing
+import pickle
+import time
+import traceback
+import warnings
+from builtins import object
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from avid.actions import ActionBase
+from avid.actions.pythonAction import PythonAction
+
+logger = logging.getLogger(__name__)
+
+
+def execute_callable(generateCallable, arguments):
+    """Executes the callable of a PythonAction in a worker process.
+    :return: Tuple of start time, stop time, the exception raised by the callable (or None) and the list of the
+        messages of the warnings emitted by the callable.
+    """
+    error = None
+    with warnings.catch_warnings(record=True) as caughtWarnings:
+        # warnings that are not filtered (e.g. ignored ResourceWarnings) are reported by every action
+        warnings.simplefilter("always", append=True)
+        start = time.time()
+        try:
+            generateCallable(**arguments)
+        except BaseException as e:
+            error = e
+            details = traceback.format_exc()
+        stop = time.time()
+
+    if error is not None:
+        try:
+            pickle.dumps(error)
+        except Exception:
+            # the exception has to be sent back to the parent process
+            error = RuntimeError(
+                "{}: {}\n{}".format(type(error).__name__, error, details)
+            )
+
+    messages = [
+        "Warning emitted by python callable ({}): {}".format(
+            warning.category.__name__, warning.message
+        )
+        for warning in caughtWarnings
+    ]
+    return start, stop, error, messages
+
+
+class ProcessPoolScheduler(object):
+    """Scheduler that processes PythonActions with a pool of worker processes. In contrast to the ThreadingScheduler,
+    CPU bound python callables are not serialized by the GIL.
+    Setup and finalization of the actions (e.g. checking the inputs, collecting the outputs and notifying the session)
+    are done in the calling process. Only the generateCallable of each action and its arguments (e.g. input and output
+    URLs) are sent to the worker processes. Therefore the callable and its arguments must be picklable; so the callable
+    must be defined on module level (no lambda or local function). The execution state, the warnings emitted by the
+    callable and the execution times are passed back to the actions.
+    The actions may also be passed as iterable (e.g. generator); they are then consumed while the pool processes
+    them, and at most a few actions per process are pending at any time.
+
+    :param processcount: Number of worker processes.
+    :param start_method: Start method of the worker processes ("fork", "spawn" or "forkserver"; see
+        multiprocessing). If None, the default of the platform is used. With "spawn" and "forkserver" the modules of
+        the callables must be importable by the worker processes.
+    """
+
+    def __init__(self, processcount, start_method=None):
+        if start_method is not None:
+            if start_method not in multiprocessing.get_all_start_methods():
+                raise ValueError(
+                    "Start method is not supported on this platform: {}. Supported methods: {}".format(
+                        start_method, multiprocessing.get_all_start_methods()
+                    )
+                )
+        self.processcount = processcount
+        self.start_method = start_method
+
+    def execute(self, actionList):
+        processcount = self.processcount
+        checked = hasattr(actionList, "__len__")
+        if checked:
+            # check all actions before the processing starts
+            for action in actionList:
+                self._check_action(action)
+            processcount = min(processcount, len(actionList))
+        if processcount < 1:
+            return
+
+        context = None
+        if self.start_method is not None:
+            context = multiprocessing.get_context(self.start_method)
+
+        with ProcessPoolExecutor(
+            max_workers=processcount, mp_context=context
+        ) as executor:
+            in_flight = dict()
+            try:
+                for action in actionList:
+                    if not checked:
+                        self._check_action(action)
+                    if len(in_flight) >= 2 * processcount:
+                        self._finalize_done(in_flight)
+
+                    if not action.do_setup():
+                        action.do_finalize()
+                        continue
+
+                    action._last_exec_state = ActionBase.ACTION_RUNNING
+                    try:
+                        future = executor.submit(
+                            execute_callable,
+                            action._generateCallable,
+                            action._getCallArguments(),
+                        )
+                    except BaseException as e:
+                        action._reportCallableError(e)
+                        action._last_exec_state = ActionBase.ACTION_FAILURE
+                        action.do_finalize()
+                        continue
+                    in_flight[future] = action
+            finally:
+                while in_flight:
+                    self._finalize_done(in_flight)
+
+    @staticmethod
+    def _finalize_done(in_flight):
+        """Waits for processed actions, passes their results on and finalizes them."""
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            action = in_flight.pop(future)
+            try:
+                start, stop, error, messages = future.result()
+            except BaseException as e:
+                # e.g. the worker process died or the arguments could not be sent
+                start, stop, error, messages = None, None, e, list()
+
+            if start is not None:
+                action._last_start_time = start
+                action._last_stop_time = stop
+            for message in messages:
+                action._reportWarning(message)
+            if error is not None:
+                action._reportCallableError(error)
+                action._last_exec_state = ActionBase.ACTION_FAILURE
+            action.do_finalize()
+
+    @staticmethod
+    def _check_action(action):
+        if not isinstance(action, PythonAction) or (
+            type(action)._generateOutputs is not PythonAction._generateOutputs
+        ):
+            raise RuntimeError(
+                "Wrong usage of ProcessPoolScheduler. ProcessPoolScheduler can only be used together with"
+                " PythonAction instances that use the default output generation. Please check your workflow"
+                " code. Wrong action instance: {}".format(action)
+            )
+        try:
+            pickle.dumps(action._generateCallable)
+            pickle.dumps(action._args)
+        except Exception as e:
+            raise RuntimeError(
+                "ProcessPoolScheduler cannot send the python callable of action {} to the worker processes,"
+                " because the callable or its additional arguments are not picklable. Define the callable on"
+                " module level (lambdas, local functions and methods of unpicklable objects are not supported)"
+                " or use another scheduler (e.g. ThreadingScheduler). Callable: {}. Error details: {}".format(
+                    action.instanceName, action._generateCallable, e
+                )
+            ) from e
@@ -141,6 +141,19 @@ class PythonAction(SingleActionBase):
                     )
                 )
 
+    def _getFingerprintConfig(self):
+        config = SingleActionBase._getFingerprintConfig(self)
+        config.update(
+            {
+                "generate_callable": self._generateCallable,
+                "indicate_callable": self._indicateCallable,
+                "args": self._args,
+                "pass_only_urls": self._passOnlyURLs,
+                "output_extension": self._outputextension,
+            }
+        )
+        return config
+
     def _generateName(self):
         name = "script"
         try:
@@ -197,7 +210,9 @@ class PythonAction(SingleActionBase):
             ]
         return self._resultArtefacts
 
-    def _generateOutputs(self):
+    def _getCallArguments(self):
+        """Returns the keyword arguments generateCallable is called with and ensures that the output directory
+        exists."""
         allargs = self._args.copy()
 
         if self._resultArtefacts is not None:
@@ -236,16 +251,24 @@ class PythonAction(SingleActionBase):
             )
             checkAndCreateDir(os.path.dirname(destPath))
 
+        return allargs
+
+    def _reportCallableError(self, exception):
+        self._reportWarning(
+            "Error occurred while trying to execute custom python callable to generated outputs for"
+            f' action tag "{self.actionTag}".'
+            " Check the implementation of the generateCallable passed to action class"
+            f' "{self.__class__}" to.',
+            exception=exception,
+        )
+
+    def _generateOutputs(self):
+        allargs = self._getCallArguments()
+
         try:
             self._generateCallable(**allargs)
         except BaseException as e:
-            self._reportWarning(
-                "Error occurred while trying to execute custom python callable to generated outputs for"
-                f' action tag "{self.actionTag}".'
-                " Check the implementation of the generateCallable passed to action class"
-                f' "{self.__class__}" to.',
-                exception=e,
-            )
+            self._reportCallableError(e)
             raise
 
 
@@ -0,0 +1,244 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import threading
+from builtins import object
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceHints(object):
+    """Resources an action needs while it is processed. They can be set per action (ActionBase.resourceHints) or
+    for all actions of a batch action (parameter resourceHints of BatchActionBase) and are used by the
+    ResourceScheduler.
+
+    :param cores: Number of cores the action uses.
+    :param memory_mb: Memory (in MB) the action needs at peak.
+    :param licenses: Dictionary with the number of seats the action needs per license (e.g. {"MITK": 1}).
+    """
+
+    def __init__(self, cores=1, memory_mb=0, licenses=None):
+        if licenses is None:
+            licenses = dict()
+        if cores < 0 or memory_mb < 0 or any(seats < 0 for seats in licenses.values()):
+            raise ValueError(
+                "Resource hints must not be negative. Cores: {}; memory: {}; licenses: {}".format(
+                    cores, memory_mb, licenses
+                )
+            )
+        self.cores = cores
+        self.memory_mb = memory_mb
+        self.licenses = dict(licenses)
+
+    def __eq__(self, other):
+        if not isinstance(other, ResourceHints):
+            return NotImplemented
+        return (
+            self.cores == other.cores
+            and self.memory_mb == other.memory_mb
+            and self.licenses == other.licenses
+        )
+
+    def __repr__(self):
+        return "ResourceHints(cores={}, memory_mb={}, licenses={})".format(
+            self.cores, self.memory_mb, self.licenses
+        )
+
+
+DEFAULT_RESOURCE_HINTS = ResourceHints()
+
+
+class ResourceScheduler(object):
+    """Scheduler that packs the actions against a resource budget of the machine. An action is started as soon as
+    the resources it needs (see ActionBase.resourceHints; actions without hints need DEFAULT_RESOURCE_HINTS) are
+    available. If the next action does not fit, later actions that fit are started instead (backfilling) until the
+    action was bypassed maxBypass times; then the scheduler waits until enough resources are released for it, so
+    actions with high demands are not starved.
+    Actions whose demands exceed the budget are clamped to the budget (and therefore run alone), so they are not
+    blocked forever. Licenses without configured seats are unlimited.
+    The actions may also be passed as iterable (e.g. generator); they are then consumed while the actions are
+    processed, and at most lookahead actions are pending at any time.
+
+    :param cores: Number of cores of the budget. If None, the number of cores of the machine is used.
+    :param memory_mb: Memory (in MB) of the budget. If None, memory is not limited.
+    :param licenses: Dictionary with the available seats per license (e.g. {"MITK": 2}).
+    :param threadcount: Maximum number of actions that are processed at the same time. If None, the number of cores
+        of the budget is used (at least 1).
+    :param lookahead: Number of pending actions that are considered for backfilling. If None, four times the
+        threadcount is used.
+    :param maxBypass: Number of times the next action may be bypassed by later actions.
+    """
+
+    def __init__(
+        self,
+        cores=None,
+        memory_mb=None,
+        licenses=None,
+        threadcount=None,
+        lookahead=None,
+        maxBypass=10,
+    ):
+        if cores is None:
+            cores = os.cpu_count() or 1
+        if threadcount is None:
+            threadcount = max(1, int(cores))
+        if lookahead is None:
+            lookahead = 4 * threadcount
+        if threadcount < 1 or lookahead < 1:
+            raise ValueError(
+                "Thread count and lookahead must be at least 1. Thread count: {}; lookahead: {}".format(
+                    threadcount, lookahead
+                )
+            )
+
+        self.budget = ResourceHints(
+            cores, 0 if memory_mb is None else memory_mb, licenses
+        )
+        self._limitMemory = memory_mb is not None
+        self.threadcount = threadcount
+        self.lookahead = lookahead
+        self.maxBypass = maxBypass
+
+        self._usageLock = threading.Lock()
+        self._usedCores = 0
+        self._usedMemory = 0
+        self._usedLicenses = dict()
+
+    @property
+    def usage(self):
+        """Snapshot (ResourceHints) of the resources the currently processed actions need."""
+        with self._usageLock:
+            return ResourceHints(
+                self._usedCores,
+                self._usedMemory,
+                {
+                    name: seats
+                    for name, seats in self._usedLicenses.items()
+                    if seats > 0
+                },
+            )
+
+    def getDemand(self, action):
+        """Returns the resources the scheduler reserves for the passed action. Demands that exceed the budget are
+        clamped to the budget."""
+        hints = getattr(action, "resourceHints", None)
+        if hints is None:
+            hints = DEFAULT_RESOURCE_HINTS
+
+        cores = min(hints.cores, self.budget.cores)
+        memory = hints.memory_mb
+        if self._limitMemory:
+            memory = min(memory, self.budget.memory_mb)
+        licenses = dict()
+        for name, seats in hints.licenses.items():
+            if name in self.budget.licenses:
+                seats = min(seats, self.budget.licenses[name])
+            licenses[name] = seats
+
+        demand = ResourceHints(cores, memory, licenses)
+        if demand != hints:
+            logger.warning(
+                "Resource hints of action %s exceed the budget of the scheduler and are clamped. Hints: %s;"
+                " budget: %s",
+                getattr(action, "instanceName", action),
+                hints,
+                self.budget,
+            )
+        return demand
+
+    def _fits(self, demand):
+        if self._usedCores + demand.cores > self.budget.cores:
+            return False
+        if (
+            self._limitMemory
+            and self._usedMemory + demand.memory_mb > self.budget.memory_mb
+        ):
+            return False
+        for name, seats in demand.licenses.items():
+            if (
+                name in self.budget.licenses
+                and self._usedLicenses.get(name, 0) + seats > self.budget.licenses[name]
+            ):
+                return False
+        return True
+
+    def _reserve(self, demand, factor=1):
+        with self._usageLock:
+            self._usedCores += factor * demand.cores
+            self._usedMemory += factor * demand.memory_mb
+            for name, seats in demand.licenses.items():
+                self._usedLicenses[name] = (
+                    self._usedLicenses.get(name, 0) + factor * seats
+                )
+
+    def execute(self, actionList):
+        actions = iter(actionList)
+        exhausted = False
+        pending = list()
+        running = dict()
+        bypassed = 0
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.threadcount) as executor:
+            try:
+                while True:
+                    while not exhausted and len(pending) < self.lookahead:
+                        action = next(actions, None)
+                        if action is None:
+                            exhausted = True
+                        else:
+                            pending.append((action, self.getDemand(action)))
+
+                    index = 0
+                    while index < len(pending) and len(running) < self.threadcount:
+                        action, demand = pending[index]
+                        if self._fits(demand):
+                            del pending[index]
+                            if index > 0:
+                                bypassed += 1
+                            else:
+                                bypassed = 0
+                            self._reserve(demand)
+                            running[executor.submit(action.do)] = demand
+                            continue
+                        if index == 0 and bypassed >= self.maxBypass:
+                            # keep the released resources for the next action
+                            break
+                        index += 1
+
+                    if not running:
+                        # clamped demands always fit if nothing is running
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._reserve(running.pop(future), -1)
+                        # errors of the actions are handled by the actions; others are passed on
+                        if error is None:
+                            error = future.exception()
+                    if error is not None:
+                        break
+            finally:
+                for future in wait(running).done:
+                    self._reserve(running.pop(future), -1)
+
+        if error is not None:
+            raise error
@@ -16,6 +16,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from itertools import islice
+
 from avid.actions.simpleScheduler import SimpleScheduler
 
 
@@ -32,4 +34,8 @@ class TestingScheduler:
         self.action_limit = action_limit
 
     def execute(self, actionList):
-        self.scheduler.execute(actionList[: self.action_limit])
+        if isinstance(actionList, list):
+            self.scheduler.execute(actionList[: self.action_limit])
+        else:
+            # only the passed actions are consumed from iterables
+            self.scheduler.execute(list(islice(actionList, self.action_limit)))
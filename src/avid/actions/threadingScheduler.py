@@ -16,46 +16,136 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import queue
-from builtins import object, range
-from threading import Thread
+import heapq
+import logging
+from builtins import object
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import chain, count
 
+from avid.actions import ActionBase
+from avid.actions.durationEstimator import getHistoricDuration
+from avid.common.workflow.workerPool import WorkerPool
 
-class Worker(Thread):
-    def __init__(self, actions):
-        Thread.__init__(self)
-        self.actions = actions
-        self.daemon = True
-        self.start()
+logger = logging.getLogger(__name__)
 
-    def run(self):
-        try:
-            while True:
-                action = self.actions.get()
-                action.do()
-                self.actions.task_done()
-        except queue.Empty:
-            pass
+
+def longestExpectedFirst(action):
+    """Priority function for the ThreadingScheduler that processes the actions with the longest historic execution
+    duration (see getHistoricDuration) first. Actions without known duration are processed before all others, as
+    they might be long running. Only re-runs of actions are considered; use a DurationEstimator
+    (avid.actions.durationEstimator) as priority to also estimate the duration of new actions.
+    """
+    duration = getHistoricDuration(action)
+    if duration is None:
+        return float("inf")
+    return duration
+
+
+def _processAction(action):
+    """Processes the action in a worker. Exceptions that escape the action are captured, so they neither stop the
+    worker nor the processing of the other actions."""
+    try:
+        action.do()
+    except BaseException as e:
+        logger.error(
+            "Unhandled error while processing action %s. Error details: %s",
+            action,
+            e,
+            exc_info=True,
+        )
+        if isinstance(action, ActionBase):
+            action._reportWarning(
+                "Unhandled error while the action was processed by the ThreadingScheduler. Error details: {}".format(
+                    e
+                ),
+                exception=e,
+            )
+            action._last_exec_state = ActionBase.ACTION_FAILURE
 
 
 class ThreadingScheduler(object):
-    """Simple threaded scheduler that processes the actions via a thread pool."""
+    """Threaded scheduler that processes the actions with a pool of worker threads.
+    By default the worker pool of the session of the actions is used (see Session.getWorkerPool), so the threads are
+    reused for all batch actions and are stopped when the session is exited. Without session a pool is created for
+    each execution.
+    The actions may also be passed as iterable (e.g. generator); they are then consumed while the pool processes
+    them, and at most lookahead actions are pending at any time.
+    Errors that escape an action are captured; the action is marked as failed and the other actions are processed.
+    If the processing is interrupted (KeyboardInterrupt, e.g. Ctrl-C), no further actions are started, the running
+    actions are completed and the interrupt is passed on.
 
-    def __init__(self, threadcount):
+    :param threadcount: Maximum number of actions that are processed at the same time.
+    :param priority: Optional callable that returns the priority of an action (e.g. longestExpectedFirst). Pending
+        actions with higher priority are processed first.
+    :param lookahead: Maximum number of pending actions the priority ordering considers. If None, all actions of
+        action lists and four times threadcount actions of other iterables are considered.
+    :param pool: Optional WorkerPool that should be used instead of the pool of the session.
+    """
+
+    def __init__(self, threadcount, priority=None, lookahead=None, pool=None):
         self.threadcount = threadcount
+        self.priority = priority
+        self.lookahead = lookahead
+        self.pool = pool
 
     def execute(self, actionList):
+        threadcount = self.threadcount
+        lookahead = self.lookahead
+        if hasattr(actionList, "__len__"):
+            threadcount = min(threadcount, len(actionList))
+            if lookahead is None:
+                lookahead = len(actionList)
+        if threadcount < 1:
+            return
+        if lookahead is None:
+            lookahead = 4 * threadcount
 
-        actionqueue = queue.Queue()
+        actions = iter(actionList)
+        first = next(actions, None)
+        if first is None:
+            return
+        actions = chain([first], actions)
 
-        threadcount = self.threadcount
-        if threadcount > len(actionList):
-            threadcount = len(actionList)
+        pool = self.pool
+        ownPool = False
+        if pool is None:
+            session = getattr(first, "_session", None)
+            if session is not None:
+                pool = session.getWorkerPool(threadcount)
+            else:
+                pool = WorkerPool(threadcount)
+                ownPool = True
 
-        for action in actionList:
-            actionqueue.put(action)
+        pending = list()
+        order = count()
+        running = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max(1, lookahead):
+                    action = next(actions, None)
+                    if action is None:
+                        exhausted = True
+                    else:
+                        key = 0 if self.priority is None else -self.priority(action)
+                        heapq.heappush(pending, (key, next(order), action))
 
-        for i in range(threadcount):
-            w = Worker(actionqueue)
+                while pending and len(running) < threadcount:
+                    _, _, action = heapq.heappop(pending)
+                    running.add(pool.submit(_processAction, action))
 
-        actionqueue.join()
+                if not running:
+                    break
+                _, running = wait(running, return_when=FIRST_COMPLETED)
+        except KeyboardInterrupt:
+            logger.warning(
+                "Processing interrupted. Pending actions are not started; waiting for %s running actions.",
+                len(running),
+            )
+            for future in running:
+                future.cancel()
+            wait(running)
+            raise
+        finally:
+            if ownPool:
+                pool.shutdown()
@@ -20,7 +20,7 @@
 import argparse
 
 from avid.common.artefact import defaultProps
-from avid.common.artefact.fileHelper import load_artefact_collection_from_xml
+from avid.common.artefact.fileHelper import load_artefact_collection
 from avid.selectors import AndSelector, SelectorBase, ValiditySelector
 from avid.selectors.diagnosticSelector import (
     IsInputSelector,
@@ -68,9 +68,7 @@ def main():
     print("AVID diagnostics tool")
     print("")
 
-    artefacts = load_artefact_collection_from_xml(
-        args_dict["artefactfile"], expandPaths=True
-    )
+    artefacts = load_artefact_collection(args_dict["artefactfile"], expandPaths=True)
     print("Artefacts loaded from: {}".format(args_dict["artefactfile"]))
 
     selector = SelectorBase()
@@ -23,8 +23,8 @@ from random import shuffle
 
 import avid.common.demultiplexer as demux
 from avid.common.artefact.fileHelper import (
-    load_artefact_collection_from_xml,
-    save_artefacts_to_xml,
+    get_artefact_storage,
+    load_artefact_collection,
 )
 from avid.selectors import KeyValueSelector, OrSelector
 
@@ -69,10 +69,10 @@ def main():
     print("AVID diagnostics tool")
     print("")
 
-    artefacts = load_artefact_collection_from_xml(
-        args_dict["artefactfile"], expandPaths=True
-    )
+    artefacts = load_artefact_collection(args_dict["artefactfile"], expandPaths=True)
     print("Artefacts loaded from: {}".format(args_dict["artefactfile"]))
+    # Subsets are stored in the same format as the split artefact file.
+    storage = get_artefact_storage(args_dict["artefactfile"])
 
     fileNameBase, fileExt = os.path.splitext(args_dict["artefactfile"])
     filePath, fileNameBase = os.path.split(fileNameBase)
@@ -134,7 +134,7 @@ def main():
         subFilePath = os.path.join(
             filePath, fileNameBase + os.path.extsep + "sub" + str(pos + 1) + fileExt
         )
-        save_artefacts_to_xml(subFilePath, subArtefacts)
+        storage.save(subFilePath, subArtefacts)
 
     if len(splitInstances) > 0:
         print(
@@ -149,7 +149,7 @@ def main():
         subFilePath = os.path.join(
             filePath, fileNameBase + os.path.extsep + "resudial" + fileExt
         )
-        save_artefacts_to_xml(subFilePath, subArtefacts)
+        storage.save(subFilePath, subArtefacts)
 
 
 if __name__ == "__main__":
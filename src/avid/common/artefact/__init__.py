@@ -21,12 +21,15 @@ This module offers methods for correct generation ore adding of artefact entries
 tis responsible to add new dict entries in the flat file data container
 """
 
+import itertools
 import logging
 import os
 import platform
 import threading
 import time
 import uuid
+import weakref
+from abc import ABCMeta
 from builtins import object, str
 from collections.abc import Mapping
 from copy import deepcopy
@@ -54,16 +57,205 @@ similarityRelevantProperties = [
     defaultProps.ACC_ELEMENT,
 ]
 
+"""Version counter of similarityRelevantProperties. It is increased every time ensureSimilarityRelevantProperty
+extends the list and is used by artefacts to detect that their cached similarity key is outdated."""
+similarityPropertiesVersion = 0
+
 
 def ensureSimilarityRelevantProperty(propertyName):
     """Helper that ensures that the passed propertyName is contained in similarityRelevantProperties and therefore will
     be used to discriminate artifacts."""
     global similarityRelevantProperties
+    global similarityPropertiesVersion
     if propertyName not in similarityRelevantProperties:
         similarityRelevantProperties.append(propertyName)
+        similarityPropertiesVersion += 1
+
+
+def _getSimilarityVersion():
+    """Returns the token that identifies the current state of similarityRelevantProperties. The length is part of the
+    token to also cover code that extends the list directly instead of using ensureSimilarityRelevantProperty.
+    """
+    return (similarityPropertiesVersion, len(similarityRelevantProperties))
+
+
+def _make_hashable(value):
+    """Converts a property value into a hashable representation (used for the similarity key of artefacts)."""
+    # If the value is a dictionary, convert it to a sorted tuple of key-value pairs
+    if isinstance(value, dict):
+        return tuple(sorted((k, _make_hashable(v)) for k, v in value.items()))
+    # If the value is a list or other iterable, convert to tuple recursively
+    elif isinstance(value, (list, set, tuple)):
+        return tuple(_make_hashable(item) for item in value)
+    # Otherwise, return the value as-is (should be hashable)
+    return value
+
+
+"""Change counters for indexed properties that are not similarity relevant (e.g. INVALID). Such properties may change
+while an artefact is part of an ArtefactCollection, so collections use the counters to detect that their property
+index may be outdated (see ArtefactCollection.get_property_index)."""
+_volatilePropertyVersions = dict()
+
+"""Lock for the change counters and the registrations of collections at their artefacts (see
+ArtefactCollection.property_version)."""
+_propertyChangeLock = threading.Lock()
+
+
+def _propertyChanged(artefact, key):
+    """Is called by artefacts after the value of a property was set. Invalidates the similarity cache and increases
+    the change counters if the artefact is registered at collections that track property changes.
+    """
+    if key in similarityRelevantProperties:
+        artefact._similarityCache = None
+    if artefact._collections is not None:
+        with _propertyChangeLock:
+            if key in _volatilePropertyVersions:
+                _volatilePropertyVersions[key] += 1
+            for collectionRef in artefact._collections:
+                collection = collectionRef()
+                if collection is not None:
+                    collection._property_version += 1
+
+
+def _registerCollection(artefact, collectionRef):
+    """Registers the (weak reference of the) collection at the artefact, so property changes of the artefact increase
+    the property version of the collection. Must be called with _propertyChangeLock."""
+    collections = artefact._collections
+    if collections is None:
+        artefact._collections = (collectionRef,)
+    elif not any(ref is collectionRef for ref in collections):
+        # Identity is checked, because equality of weak references compares the collections.
+        # Drop the references of collections that do not exist anymore.
+        artefact._collections = tuple(
+            ref for ref in collections if ref() is not None
+        ) + (collectionRef,)
+
+
+def _unregisterCollection(artefact, collectionRef):
+    """Removes the registration of the collection at the artefact. Must be called with _propertyChangeLock."""
+    collections = artefact._collections
+    if collections is not None:
+        collections = tuple(
+            ref for ref in collections if ref is not collectionRef and ref() is not None
+        )
+        artefact._collections = collections if collections else None
+
+
+def normalizePropertyValue(key, value):
+    """Converts a value into the representation that is stored for the property key in an artefact.
+    Values are stored as strings, except of TIMEPOINT (int if possible), EXECUTION_DURATION (float if possible),
+    INVALID (bool) and INPUT_IDS (dict)."""
+    if value is not None and not key == defaultProps.INPUT_IDS:
+        value = str(value)
+
+    if key == defaultProps.TIMEPOINT:
+        try:
+            # If timepoint can be converted into a number, do so
+            value = int(value)
+        except:
+            pass
+    elif key == defaultProps.EXECUTION_DURATION:
+        try:
+            value = float(value)
+        except:
+            pass
+    elif key == defaultProps.INVALID:
+        if value in ["True", "true", "TRUE"]:
+            value = True
+        else:
+            value = False
+    elif key == defaultProps.INPUT_IDS:
+        if isinstance(value, Mapping):
+            value = dict(value)
+        elif value is not None:
+            raise ValueError(
+                "Cannot set INPUT_IDS property of artefact. Value is no dict. Value: {}".format(
+                    value
+                )
+            )
+
+    return value
+
+
+class ArtefactBase(object, metaclass=ABCMeta):
+    """Base of all artefact representations. It implements the similarity logic (similarity_key, __eq__, __hash__)
+    based on the item access of the derived classes. Derived classes only add the slots of their storage.
+    Remark: Alternative representations (e.g. CompactArtefact) are registered as virtual subclasses of Artefact, so
+    isinstance checks against Artefact hold for all representations."""
+
+    # __weakref__ allows registries (e.g. of deferred validity checks) to track artefacts without keeping them alive.
+    # _collections holds weak references of the collections that track property changes of the artefact (see
+    # ArtefactCollection.property_version) or None.
+    __slots__ = ("_similarityCache", "_collections", "__weakref__")
+
+    def _getSimilarityCache(self):
+        """Returns the (version, key, hash) tuple of the similarity key. The key is only computed if no cache exists
+        or the similarity relevant properties have changed since it was computed."""
+        version = _getSimilarityVersion()
+        cache = self._similarityCache
+        if cache is None or cache[0] != version:
+            key = tuple(
+                (propKey, _make_hashable(self[propKey]))
+                for propKey in similarityRelevantProperties
+                if propKey in self
+            )
+            cache = (version, key, hash(key))
+            self._similarityCache = cache
+        return cache
+
+    @property
+    def similarity_key(self):
+        """Hashable representation of all similarity relevant properties (pairs of key and value) of the artefact.
+        Two artefacts are similar if their similarity keys are equal.
+        Remark: The key is cached. If a mutable value of a similarity relevant property (e.g. the dict of
+        INPUT_IDS) is altered in place, the value has to be set again to reset the cache.
+        """
+        return self._getSimilarityCache()[1]
+
+    def is_similar(self, other):
+        """Function that indicates if one artefact can be assumed as equal/similar to self as they share the
+        same similarity relevant properties. It is also used for __eq__()."""
+        myCache = self._getSimilarityCache()
+        otherCache = other._getSimilarityCache()
+        return myCache[2] == otherCache[2] and myCache[1] == otherCache[1]
+
+    def is_identical(self, other):
+        """Function that indicates if one artefact can be assumed as truly identical to self as they
+        have the same properties."""
+        if isinstance(other, ArtefactBase):
+            return (
+                self._defaultProps == other._defaultProps
+                and self._additionalProps == other._additionalProps
+            )
+        else:
+            return False
+
+    def __missing__(self, key):
+        logger.warning(
+            "Unkown artefact property was requested. Unknown key: %s", str(key)
+        )
+        return None
+
+    def __eq__(self, other):
+        if isinstance(other, ArtefactBase):
+            # raise RuntimeError
+            return self.is_similar(other)
+        else:
+            return False
+
+    def __hash__(self):
+        """Define hash based on similarity-relevant properties. The hash is cached (see similarity_key)."""
+        return self._getSimilarityCache()[2]
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class Artefact(ArtefactBase):
+    """Artefact that stores its properties in dicts (default and additional properties)."""
 
+    __slots__ = ("lock", "_defaultProps", "_additionalProps")
 
-class Artefact(object):
     def __init__(self, defaultP=None, additionalP=None):
 
         self.lock = threading.RLock()
@@ -100,33 +292,11 @@ class Artefact(object):
             for key in additionalP:
                 self._additionalProps[key] = additionalP[key]
 
-    def is_similar(self, other):
-        """Function that indicates if one artefact can be assumed as equal/similar to self as they share the
-        same similarity relevant properties. It is also used for __eq__()."""
-        mykeys = list(self.keys())
-        okeys = list(other.keys())
-
-        for key in similarityRelevantProperties:
-            if key in mykeys and key in okeys:
-                if not (self[key] == other[key]):
-                    # Both have defined the property but values differ -> false
-                    return False
-            elif key in mykeys or key in okeys:
-                # Only one has defined the property -> false
-                return False
-
-        return True
-
-    def is_identical(self, other):
-        """Function that indicates if one artefact can be assumed as truly identical to self as they
-        have the same properties."""
-        if isinstance(other, self.__class__):
-            return (
-                self._defaultProps == other._defaultProps
-                and self._additionalProps == other._additionalProps
-            )
-        else:
-            return False
+        # Cache of the similarity key. It is a tuple (version, key, hash) or None if it has to be (re)computed.
+        # It is reset by __setitem__ for similarity relevant properties and is outdated if the version differs from
+        # _getSimilarityVersion().
+        self._similarityCache = None
+        self._collections = None
 
     def keys(self):
         return list(self._defaultProps.keys()) + list(self._additionalProps.keys())
@@ -147,45 +317,14 @@ class Artefact(object):
 
     def __setitem__(self, key, value):
         with self.lock:
-            if value is not None and not key == defaultProps.INPUT_IDS:
-                value = str(value)
-
-            if key == defaultProps.TIMEPOINT:
-                try:
-                    # If timepoint can be converted into a number, do so
-                    value = int(value)
-                except:
-                    pass
-            elif key == defaultProps.EXECUTION_DURATION:
-                try:
-                    value = float(value)
-                except:
-                    pass
-            elif key == defaultProps.INVALID:
-                if value in ["True", "true", "TRUE"]:
-                    value = True
-                else:
-                    value = False
-            elif key == defaultProps.INPUT_IDS:
-                if isinstance(value, Mapping):
-                    value = dict(value)
-                elif value is not None:
-                    raise ValueError(
-                        "Cannot set INPUT_IDS property of artefact. Value is no dict. Value: {}".format(
-                            value
-                        )
-                    )
+            value = normalizePropertyValue(key, value)
 
             if key in self._defaultProps:
                 self._defaultProps[key] = value
             else:
                 self._additionalProps[key] = value
 
-    def __missing__(self, key):
-        logger.warning(
-            "Unkown artefact property was requested. Unknown key: %s", str(key)
-        )
-        return None
+            _propertyChanged(self, key)
 
     def __len__(self):
         return len(self._defaultProps) + len(self._additionalProps)
@@ -196,37 +335,6 @@ class Artefact(object):
 
         return False
 
-    def __eq__(self, other):
-        if isinstance(other, self.__class__):
-            # raise RuntimeError
-            return self.is_similar(other)
-        else:
-            return False
-
-    def __hash__(self):
-        """Define hash based on similarity-relevant properties."""
-
-        def __make_hashable(value):
-            # If the value is a dictionary, convert it to a sorted tuple of key-value pairs
-            if isinstance(value, dict):
-                return tuple(sorted((k, __make_hashable(v)) for k, v in value.items()))
-            # If the value is a list or other iterable, convert to tuple recursively
-            elif isinstance(value, (list, set, tuple)):
-                return tuple(__make_hashable(item) for item in value)
-            # Otherwise, return the value as-is (should be hashable)
-            return value
-
-        # Generate a hashable representation of the similarity-relevant properties
-        hashable_properties = tuple(
-            __make_hashable(self[key])
-            for key in similarityRelevantProperties
-            if key in self.keys()
-        )
-        return hash(hashable_properties)
-
-    def __ne__(self, other):
-        return not self.__eq__(other)
-
     def __repr__(self):
         return "Artefact(%s, %s)" % (self._defaultProps, self._additionalProps)
 
@@ -238,7 +346,19 @@ class Artefact(object):
         return new_artefact
 
     def __getstate__(self):
-        return {key: value for key, value in self.__dict__.items() if key != "lock"}
+        # The lock cannot be pickled and the similarity cache is dropped as string hashes are not stable across
+        # processes.
+        return {
+            "_defaultProps": self._defaultProps,
+            "_additionalProps": self._additionalProps,
+        }
+
+    def __setstate__(self, state):
+        self.lock = threading.RLock()
+        self._defaultProps = state["_defaultProps"]
+        self._additionalProps = state["_additionalProps"]
+        self._similarityCache = None
+        self._collections = None
 
     def clone(self):
         """Create a copy of the artefact with its own uid"""
@@ -307,6 +427,11 @@ def get_all_values_of_a_property(workflow_data, property_key):
     :param property_key: the key of the property that should be evaluated.
     :return Returns the list of values. Each value is only present once in the list, even if multiple artefacts
     have this value."""
+    if isinstance(workflow_data, ArtefactCollection):
+        index = workflow_data.get_property_index(property_key)
+        if index is not None:
+            return sorted(value for value in index if value is not MISSING_PROPERTY)
+
     values = [a[property_key] for a in workflow_data if property_key in a]
     return sorted(list(set(values)))
 
@@ -430,13 +555,62 @@ def getArtefactShortName(workflowArtefact):
     return ensureValidPath(name)
 
 
+from .compact import ArtefactSchema, CompactArtefact
 from .generator import generateArtefactEntry
 
+"""Properties that are indexed by ArtefactCollection by default."""
+DEFAULT_INDEXED_PROPERTIES = (
+    defaultProps.CASE,
+    defaultProps.TIMEPOINT,
+    defaultProps.ACTIONTAG,
+    defaultProps.TYPE,
+    defaultProps.OBJECTIVE,
+    defaultProps.INVALID,
+)
+
+
+class _MissingProperty(object):
+    def __repr__(self):
+        return "MISSING_PROPERTY"
+
+
+"""Value under which property indexes list the artefacts that do not have the indexed property."""
+MISSING_PROPERTY = _MissingProperty()
+
+_collectionIds = itertools.count()
+
 
 class ArtefactCollection:
-    def __init__(self, initial_artefacts=None):
+    """Collection of artefacts. Artefacts are stored by their hash, so similar artefacts (see Artefact.is_similar)
+    are only stored once.
+    Additionally, the collection can maintain inverted indexes (property value -> hashes of the artefacts with this
+    value) for the properties specified by indexed_properties. They are used by selectors and splitters to avoid full
+    scans. An index is only built when it is requested the first time and is then updated incrementally.
+
+    :param initial_artefacts: Optional iterable of artefacts the collection should be filled with.
+    :param indexed_properties: Keys of the properties that may be indexed. If None, DEFAULT_INDEXED_PROPERTIES is
+        used. Pass an empty tuple to deactivate indexing.
+    """
+
+    def __init__(self, initial_artefacts=None, indexed_properties=None):
         # Dictionary for storing artefacts with a hash-based key for efficient lookup
         self.artefact_dict = {}
+        if indexed_properties is None:
+            indexed_properties = DEFAULT_INDEXED_PROPERTIES
+        self.indexed_properties = tuple(indexed_properties)
+        # Built property indexes (key -> value -> dict with artefact hashes as keys). Dicts are used instead of sets
+        # to keep the order of the collection.
+        self._property_indexes = dict()
+        # Change counters of volatile properties at the time their index was built (see _volatilePropertyVersions)
+        self._property_index_versions = dict()
+        # Unique id of the collection and counter of its modifications (see version)
+        self.collection_id = next(_collectionIds)
+        self._version = 0
+        # Counter of property changes of the contained artefacts and the weak reference the collection is registered
+        # with at its artefacts (None until property changes are tracked; see property_version)
+        self._property_version = 0
+        self._collection_ref = None
+
         if not initial_artefacts is None:
             self.extend(initial_artefacts, replace_if_exists=True)
 
@@ -464,16 +638,162 @@ class ArtefactCollection:
             replace_artefact = self.artefact_dict[artefact_hash]
 
         self.artefact_dict[artefact_hash] = artefact
+        self._version += 1
+        if self._collection_ref is not None:
+            with _propertyChangeLock:
+                if replace_artefact is not None and replace_artefact is not artefact:
+                    _unregisterCollection(replace_artefact, self._collection_ref)
+                _registerCollection(artefact, self._collection_ref)
+
+        if self._property_indexes:
+            self._update_property_indexes(artefact_hash, artefact, replace_artefact)
         return replace_artefact
 
     def remove_artefact(self, artefact):
         """Removes the artefact from the collection if it exists."""
         artefact_hash = hash(artefact)
         if artefact_hash in self.artefact_dict:
-            del self.artefact_dict[artefact_hash]
+            removed_artefact = self.artefact_dict.pop(artefact_hash)
+            self._version += 1
+            if self._collection_ref is not None:
+                with _propertyChangeLock:
+                    _unregisterCollection(removed_artefact, self._collection_ref)
+            if self._property_indexes:
+                self._update_property_indexes(artefact_hash, None, removed_artefact)
             return True
         return False
 
+    @property
+    def version(self):
+        """Monotonically increasing modification version of the collection. It is increased every time an artefact
+        is added, replaced or removed. Changes of properties of contained artefacts do not change the version
+        (see property_version)."""
+        return self._version
+
+    @property
+    def property_version(self):
+        """Monotonically increasing counter of the changes of properties of the contained artefacts that are not
+        similarity relevant (e.g. INVALID is set). Together with version it indicates if results derived from the
+        collection (e.g. selections) may be outdated.
+        Changes are tracked from the first call on: the collection then registers itself (by a weak reference) at its
+        artefacts, so only collections whose derived results are cached pay for the tracking.
+        """
+        self._track_property_changes()
+        return self._property_version
+
+    def _track_property_changes(self):
+        """Registers the collection at its artefacts (if not done yet), so property changes of the artefacts are
+        tracked (see property_version and _volatilePropertyVersions)."""
+        if self._collection_ref is None:
+            with _propertyChangeLock:
+                if self._collection_ref is None:
+                    collectionRef = weakref.ref(self)
+                    for artefact in self.artefact_dict.values():
+                        _registerCollection(artefact, collectionRef)
+                    self._collection_ref = collectionRef
+
+    @staticmethod
+    def _get_index_value(artefact, property_key):
+        if property_key not in artefact:
+            return MISSING_PROPERTY
+        return _make_hashable(artefact[property_key])
+
+    def _index_is_outdated(self, property_key):
+        version = self._property_index_versions.get(property_key)
+        return (
+            version is not None
+            and version != _volatilePropertyVersions[property_key]
+            and property_key not in similarityRelevantProperties
+        )
+
+    def _build_property_index(self, property_key):
+        if property_key not in similarityRelevantProperties:
+            self._track_property_changes()
+            # Get the version before reading the values, so that changes during the build are detected later on.
+            version = _volatilePropertyVersions.setdefault(property_key, 0)
+            self._property_index_versions[property_key] = version
+        else:
+            self._property_index_versions.pop(property_key, None)
+
+        index = dict()
+        for artefact_hash, artefact in self.artefact_dict.items():
+            value = self._get_index_value(artefact, property_key)
+            index.setdefault(value, dict())[artefact_hash] = None
+        self._property_indexes[property_key] = index
+        return index
+
+    def _update_property_indexes(self, artefact_hash, new_artefact, old_artefact):
+        """Updates all built indexes after an artefact was added (new_artefact), replaced (new_artefact and
+        old_artefact) or removed (old_artefact)."""
+        for property_key in list(self._property_indexes):
+            if self._index_is_outdated(property_key):
+                # will be rebuilt when it is needed the next time
+                del self._property_indexes[property_key]
+                continue
+
+            index = self._property_indexes[property_key]
+            if old_artefact is not None:
+                old_value = self._get_index_value(old_artefact, property_key)
+                if new_artefact is not None:
+                    if old_value == self._get_index_value(new_artefact, property_key):
+                        continue
+                    # The replacement would change the order of the index compared to the collection, so it is
+                    # rather rebuilt when it is needed the next time.
+                    del self._property_indexes[property_key]
+                    continue
+                hashes = index.get(old_value)
+                if hashes is not None:
+                    hashes.pop(artefact_hash, None)
+                    if not hashes:
+                        del index[old_value]
+            else:
+                value = self._get_index_value(new_artefact, property_key)
+                index.setdefault(value, dict())[artefact_hash] = None
+
+    def get_property_index(self, property_key):
+        """Returns the index of the passed property. The index is a dict that maps each value of the property to a
+        dict whose keys are the hashes of the artefacts with this value (in the order of the collection). Artefacts
+        that do not have the property are listed under MISSING_PROPERTY. Unhashable values are indexed by their
+        hashable representation (see _make_hashable).
+        The index is built if it does not exist yet. It must not be altered.
+        :return: The index or None if the property is not in indexed_properties."""
+        if property_key not in self.indexed_properties:
+            return None
+
+        index = self._property_indexes.get(property_key)
+        if index is None or self._index_is_outdated(property_key):
+            index = self._build_property_index(property_key)
+        return index
+
+    def select_by_property(self, property_key, values, exclude=False):
+        """Selects artefacts by the values of a property using the property index.
+        :param property_key: Key of the property.
+        :param values: Iterable of property values that should be selected. Use MISSING_PROPERTY to select artefacts
+            that do not have the property.
+        :param exclude: If True, all artefacts that do NOT have one of the values are selected.
+        :return: ArtefactCollection with the selected artefacts (in the order of self) or None if the property is not
+            indexed."""
+        index = self.get_property_index(property_key)
+        if index is None:
+            return None
+
+        buckets = [index[value] for value in values if value in index]
+
+        result = ArtefactCollection(indexed_properties=self.indexed_properties)
+        if not exclude and len(buckets) == 1:
+            for artefact_hash in buckets[0]:
+                result.artefact_dict[artefact_hash] = self.artefact_dict[artefact_hash]
+        elif not exclude and len(buckets) == 0:
+            pass
+        else:
+            selected_hashes = set()
+            for bucket in buckets:
+                selected_hashes.update(bucket)
+            for artefact_hash, artefact in self.artefact_dict.items():
+                if (artefact_hash in selected_hashes) != exclude:
+                    result.artefact_dict[artefact_hash] = artefact
+        return result
+
     def find_similar(self, artefact):
         """
         Finds an artefact in the collection that is similar to the given artefact.
@@ -528,7 +848,10 @@ class ArtefactCollection:
         return True
 
     def copy(self):
-        return ArtefactCollection(self.artefact_dict.copy().values())
+        result = ArtefactCollection(indexed_properties=self.indexed_properties)
+        # the artefacts are already hashed, so the dict can be copied directly
+        result.artefact_dict = self.artefact_dict.copy()
+        return result
 
     def first(self):
         """Return the first artefact in the collection or None if empty."""
@@ -0,0 +1,342 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module offers a memory efficient (opt-in) representation of artefacts. It is intended for sessions with a very
+large number of artefacts (e.g. 1M+). CompactArtefact behaves like Artefact, but stores its property values in one
+list. The position of a property in this list is defined by an ArtefactSchema that is shared by all artefacts of a
+session.
+"""
+
+import sys
+import threading
+import time
+import uuid
+from copy import deepcopy
+
+from avid.common.artefact import (
+    Artefact,
+    ArtefactBase,
+    _propertyChanged,
+    normalizePropertyValue,
+)
+
+from . import defaultProps
+
+"""Properties (and their initial values) every artefact has, even if they are not explicitly set.
+They resemble the default properties of Artefact."""
+DEFAULT_PROPERTY_VALUES = (
+    (defaultProps.CASE, None),
+    (defaultProps.CASEINSTANCE, None),
+    (defaultProps.TIMEPOINT, 0),
+    (defaultProps.ACTIONTAG, "unknown_tag"),
+    (defaultProps.TYPE, None),
+    (defaultProps.FORMAT, None),
+    (defaultProps.URL, None),
+    (defaultProps.OBJECTIVE, None),
+    (defaultProps.RESULT_SUB_TAG, None),
+    (defaultProps.RESULT_SUB_COUNT, None),
+    (defaultProps.INVALID, None),
+    (defaultProps.INPUT_IDS, None),
+    (defaultProps.ACTION_CLASS, None),
+    (defaultProps.ACTION_INSTANCE_UID, None),
+    (defaultProps.ID, None),
+    (defaultProps.TIMESTAMP, None),
+    (defaultProps.EXECUTION_DURATION, None),
+)
+
+"""Properties whose (string) values are interned by default, because they typically have only a few distinct values
+that are shared by many artefacts."""
+DEFAULT_INTERNED_PROPERTIES = (
+    defaultProps.CASE,
+    defaultProps.CASEINSTANCE,
+    defaultProps.ACTIONTAG,
+    defaultProps.TYPE,
+    defaultProps.FORMAT,
+    defaultProps.OBJECTIVE,
+    defaultProps.RESULT_SUB_TAG,
+    defaultProps.ACTION_CLASS,
+)
+
+
+class _MissingValue(object):
+    """Marker for positions in the value list of a CompactArtefact where the property is not defined."""
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __reduce__(self):
+        return "_MISSING"
+
+
+_MISSING = _MissingValue()
+
+"""Lock used to lazily create the locks of compact artefacts."""
+_lock_creation_lock = threading.Lock()
+
+
+class ArtefactSchema(object):
+    """Maps property keys onto positions in the value list of CompactArtefact instances. A schema only grows (new keys
+    are appended when they are set the first time) and should be shared by all compact artefacts of a session, so that
+    the keys are only stored once.
+
+    :param interned_properties: Keys of the properties whose string values should be interned. If None,
+        DEFAULT_INTERNED_PROPERTIES is used.
+    """
+
+    def __init__(self, interned_properties=None):
+        self._lock = threading.Lock()
+        self._keys = [key for key, _ in DEFAULT_PROPERTY_VALUES]
+        self._indices = {key: pos for pos, key in enumerate(self._keys)}
+        self._default_values = [value for _, value in DEFAULT_PROPERTY_VALUES]
+
+        if interned_properties is None:
+            interned_properties = DEFAULT_INTERNED_PROPERTIES
+        self.interned_properties = frozenset(interned_properties)
+
+    @property
+    def keys(self):
+        """Returns all property keys known by the schema (in the order of their positions)."""
+        return list(self._keys)
+
+    @property
+    def number_of_default_properties(self):
+        """Number of default properties. They are always the first positions of the schema."""
+        return len(DEFAULT_PROPERTY_VALUES)
+
+    def get_index(self, key, create=False):
+        """Returns the position of the passed property key. If the key is unknown, it is added if create is True,
+        otherwise None is returned."""
+        index = self._indices.get(key)
+        if index is None and create:
+            with self._lock:
+                index = self._indices.get(key)
+                if index is None:
+                    index = len(self._keys)
+                    self._keys.append(key)
+                    self._indices[key] = index
+        return index
+
+    def get_key(self, index):
+        return self._keys[index]
+
+    def new_values(self):
+        """Returns a new value list with all default properties set to their initial values."""
+        return list(self._default_values)
+
+    def __getstate__(self):
+        return {
+            "_keys": self._keys,
+            "_default_values": self._default_values,
+            "interned_properties": self.interned_properties,
+        }
+
+    def __setstate__(self, state):
+        self._lock = threading.Lock()
+        # keys are interned to keep them identical to the key constants (e.g. of defaultProps)
+        self._keys = [sys.intern(key) for key in state["_keys"]]
+        self._indices = {key: pos for pos, key in enumerate(self._keys)}
+        self._default_values = state["_default_values"]
+        self.interned_properties = state["interned_properties"]
+
+    def __repr__(self):
+        return "ArtefactSchema(%s)" % self._keys
+
+
+class CompactArtefact(ArtefactBase):
+    """Memory efficient variant of Artefact. It offers the same interface, but stores the property values in a list
+    that is indexed via a shared ArtefactSchema, interns the string values of high repetition properties (see
+    ArtefactSchema.interned_properties) and creates its lock only when it is needed.
+    Like Artefact, an artefact created with explicit default properties only has the passed ones (plus ID, TIMESTAMP
+    and EXECUTION_DURATION).
+    Remark: _defaultProps and _additionalProps are only offered as (read only) dict snapshots for compatibility.
+    Remark: CompactArtefact does not derive from Artefact (so it does not carry the storage slots of Artefact), but is
+    registered as virtual subclass of Artefact, so isinstance(artefact, Artefact) holds.
+
+    :param schema: The schema the artefact should use. It should be shared by all compact artefacts of a session.
+    :param defaultP: Optional mapping with default property values (like for Artefact).
+    :param additionalP: Optional mapping with additional property values (like for Artefact).
+    """
+
+    __slots__ = ("_schema", "_values", "_lock")
+
+    def __init__(self, schema, defaultP=None, additionalP=None):
+        self._schema = schema
+        self._lock = None
+        self._similarityCache = None
+        self._collections = None
+
+        if defaultP is None:
+            self._values = schema.new_values()
+            # the initial values of ID and TIMESTAMP are placeholders
+            self._values[schema.get_index(defaultProps.ID)] = _MISSING
+            self._values[schema.get_index(defaultProps.TIMESTAMP)] = _MISSING
+        else:
+            self._values = [_MISSING] * schema.number_of_default_properties
+            for key in defaultP:
+                self._set_value(key, defaultP[key])
+        if additionalP is not None:
+            for key in additionalP:
+                self._set_value(key, additionalP[key])
+
+        if self._get_value(defaultProps.ID) is _MISSING:
+            self._set_value(defaultProps.ID, str(uuid.uuid1()))
+        if self._get_value(defaultProps.TIMESTAMP) is _MISSING:
+            self._set_value(defaultProps.TIMESTAMP, str(time.time()))
+        if self._get_value(defaultProps.EXECUTION_DURATION) is _MISSING:
+            self._set_value(defaultProps.EXECUTION_DURATION, None)
+
+    @classmethod
+    def from_artefact(cls, artefact, schema):
+        """Creates a compact artefact with the same properties as the passed artefact."""
+        return cls(
+            schema=schema,
+            defaultP=artefact._defaultProps,
+            additionalP=artefact._additionalProps,
+        )
+
+    @property
+    def schema(self):
+        return self._schema
+
+    @property
+    def lock(self):
+        """Lock of the artefact. It is only created when it is requested the first time."""
+        if self._lock is None:
+            with _lock_creation_lock:
+                if self._lock is None:
+                    self._lock = threading.RLock()
+        return self._lock
+
+    def _get_value(self, key, default=_MISSING):
+        index = self._schema.get_index(key)
+        if index is None or index >= len(self._values):
+            return default
+        return self._values[index]
+
+    def _set_value(self, key, value):
+        """Stores the passed value (as it is) for the key. String values of interned properties are interned."""
+        if isinstance(value, str) and key in self._schema.interned_properties:
+            value = sys.intern(value)
+
+        index = self._schema.get_index(key, create=True)
+        values = self._values
+        if index < len(values):
+            values[index] = value
+        else:
+            # growing the list is not atomic, so it is the only operation that needs the lock.
+            with self.lock:
+                if index >= len(values):
+                    values.extend([_MISSING] * (index + 1 - len(values)))
+                values[index] = value
+
+    def _items(self, start, stop=None):
+        schema = self._schema
+        values = self._values
+        if stop is None:
+            stop = len(values)
+        return {
+            schema.get_key(pos): values[pos]
+            for pos in range(start, min(stop, len(values)))
+            if values[pos] is not _MISSING
+        }
+
+    @property
+    def _defaultProps(self):
+        return self._items(0, self._schema.number_of_default_properties)
+
+    @property
+    def _additionalProps(self):
+        return self._items(self._schema.number_of_default_properties)
+
+    def keys(self):
+        schema = self._schema
+        return [
+            schema.get_key(pos)
+            for pos, value in enumerate(self._values)
+            if value is not _MISSING
+        ]
+
+    def is_invalid(self):
+        value = self._get_value(defaultProps.INVALID)
+        if value is _MISSING:
+            return None
+        return value
+
+    def __getitem__(self, key):
+        value = self._get_value(key)
+        if value is _MISSING:
+            raise KeyError(
+                "Unkown artefact key was requested. Key: {}; Artefact: {}".format(
+                    key, self
+                )
+            )
+        return value
+
+    def __setitem__(self, key, value):
+        self._set_value(key, normalizePropertyValue(key, value))
+        _propertyChanged(self, key)
+
+    def __len__(self):
+        return len([value for value in self._values if value is not _MISSING])
+
+    def __contains__(self, key):
+        return self._get_value(key) is not _MISSING
+
+    def __repr__(self):
+        return "CompactArtefact(%s, %s)" % (self._defaultProps, self._additionalProps)
+
+    def __copy__(self):
+        return CompactArtefact(
+            schema=self._schema,
+            defaultP=deepcopy(self._defaultProps),
+            additionalP=deepcopy(self._additionalProps),
+        )
+
+    def __getstate__(self):
+        return {"_schema": self._schema, "_values": self._values}
+
+    def __setstate__(self, state):
+        self._schema = state["_schema"]
+        self._values = state["_values"]
+        self._lock = None
+        self._similarityCache = None
+        self._collections = None
+
+    def clone(self):
+        """Create a copy of the artefact with its own uid"""
+        new_artefact = self.__copy__()
+        new_artefact[defaultProps.ID] = str(uuid.uuid1())
+        return new_artefact
+
+
+Artefact.register(CompactArtefact)
+
+
+def compact_artefacts(artefacts, schema):
+    """Helper that converts all artefacts of the passed collection into compact artefacts using the passed schema.
+    Artefacts that already are compact artefacts of the schema are kept as they are.
+    :return: ArtefactCollection with the compact artefacts."""
+    from avid.common.artefact import ArtefactCollection
+
+    result = ArtefactCollection()
+    for artefact in artefacts:
+        if not (isinstance(artefact, CompactArtefact) and artefact.schema is schema):
+            artefact = CompactArtefact.from_artefact(artefact, schema)
+        result.add_artefact(artefact)
+    return result
@@ -18,17 +18,39 @@
 
 import argparse
 import concurrent.futures
+import hashlib
+import json
 import logging
 import os
 import re
+import sqlite3
 import sys
+import threading
 from builtins import object
+from collections import deque
 from functools import wraps
-from typing import Any, Callable, Dict, Generator, List, Optional, Pattern, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Tuple,
+    Union,
+)
 
 import avid.common.artefact.defaultProps as ArtefactProps
-from avid.common.artefact import Artefact, ArtefactCollection
+from avid.common.artefact import (
+    Artefact,
+    ArtefactCollection,
+    similarityRelevantProperties,
+)
+from avid.common.artefact.fileHelper import save_artefacts
 from avid.common.artefact.fileHelper import save_artefacts_to_xml as saveArtefactList
+from avid.common.artefact.fingerprint import normalize_config_value
 from avid.common.workflow import Console, Progress
 
 log_stdout = logging.StreamHandler(sys.stdout)
@@ -233,6 +255,159 @@ def _get_artefacts_from_folder(
     return artefacts
 
 
+def _scan_directory(
+    directory: str,
+    break_checker_delegate: Optional[Callable[[os.DirEntry], bool]] = None,
+) -> Tuple[int, List[str]]:
+    """Scans a single directory.
+
+    :param directory: Path of the directory
+    :param break_checker_delegate: Optional function to control directory scanning.
+        Called for each directory entry. If it returns True, scanning stops for that directory.
+    :return: Tuple of the number of (seen) files and the list of subdirectories (in scandir order)
+    """
+    n_files = 0
+    subdirectories = []
+
+    try:
+        it = os.scandir(directory)  # returns an iterator/ScandirIterator
+    except (OSError, PermissionError) as e:
+        crawl_logger.warning(f"Cannot access directory {directory}: {e}")
+        return n_files, subdirectories
+
+    try:
+        for entry in it:
+            if break_checker_delegate and break_checker_delegate(entry):
+                n_files += 1
+                break
+
+            if entry.is_dir():
+                # only build child path for directories (fewer string creations)
+                subdirectories.append(entry.path)
+            else:
+                n_files += 1
+    finally:
+        # ensure scandir iterator is closed promptly
+        try:
+            it.close()
+        except Exception:
+            pass
+
+    return n_files, subdirectories
+
+
+def _scan_directories_with_file_count(
+    dir_path: str,
+    break_checker_delegate: Optional[Callable[[os.DirEntry], bool]] = None,
+) -> Generator[Tuple[str, int], None, None]:
+    """Generator that recursively scans directories using DirEntry for optimal performance.
+
+    Like _scan_directories, but yields (directory path, number of files) tuples. The number of files
+    is counted while the directory is scanned for subdirectories; so if the break_checker_delegate stops
+    the scanning of a directory, it is only the number of files seen until then (a lower bound).
+
+    :param dir_path: Path to start scanning from
+    :param break_checker_delegate: Optional function to control directory scanning.
+        Called for each directory entry. If it returns True, scanning stops for that directory.
+    :yields: Tuples of directory path and number of (seen) files
+    """
+    # also put the starting directory on the stack
+    stack = [dir_path]
+
+    while stack:
+        current = stack.pop()
+        n_files, subdirectories = _scan_directory(current, break_checker_delegate)
+        stack.extend(subdirectories)
+        yield current, n_files
+
+
+"""Default number of threads that scan directories concurrently (see _scan_directories_parallel). Parallel
+scanning is opt-in, because it requires a thread safe break delegate."""
+DEFAULT_SCAN_THREADS = 1
+
+
+def _scan_directories_parallel(
+    dir_path: str,
+    break_checker_delegate: Optional[Callable[[os.DirEntry], bool]] = None,
+    n_threads: int = DEFAULT_SCAN_THREADS,
+    max_in_flight: Optional[int] = None,
+) -> Generator[Tuple[str, int], None, None]:
+    """Generator like _scan_directories_with_file_count, but the directories are scanned concurrently
+    by a pool of threads. This hides the latency of os.scandir calls (e.g. on network file systems).
+
+    The directories that will be yielded next (top of the depth-first stack) are scanned ahead by the
+    threads. The results are yielded in exactly the same order as _scan_directories_with_file_count
+    does, so crawls stay deterministic. The break_checker_delegate is called from the scanning threads,
+    so it must be thread safe.
+
+    :param dir_path: Path to start scanning from
+    :param break_checker_delegate: Optional function to control directory scanning.
+        Called for each directory entry. If it returns True, scanning stops for that directory.
+    :param n_threads: Number of scanning threads. If smaller than 2, the tree is scanned serially.
+    :param max_in_flight: Maximum number of scandir calls that are in progress at the same time.
+        Default is 2 * n_threads.
+    :yields: Tuples of directory path and number of (seen) files
+    """
+    if n_threads < 2:
+        yield from _scan_directories_with_file_count(
+            dir_path=dir_path, break_checker_delegate=break_checker_delegate
+        )
+        return
+
+    max_in_flight = max(1, max_in_flight or 2 * n_threads)
+    # Only the top of the stack is considered for scanning ahead, so looking for directories that
+    # are not submitted yet is bounded, even if many scanned directories wait for being yielded.
+    look_ahead = 4 * max_in_flight
+
+    in_flight = 0
+    in_flight_lock = threading.Lock()
+
+    def scan_done(_):
+        nonlocal in_flight
+        with in_flight_lock:
+            in_flight -= 1
+
+    # stack entries are [directory, future of the scan or None if not submitted yet]
+    stack = [[dir_path, None]]
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=n_threads, thread_name_prefix="avid_scan"
+    ) as executor:
+
+        def submit(entry):
+            nonlocal in_flight
+            with in_flight_lock:
+                in_flight += 1
+            entry[1] = executor.submit(
+                _scan_directory, entry[0], break_checker_delegate
+            )
+            entry[1].add_done_callback(scan_done)
+
+        try:
+            while stack:
+                for entry in stack[: -look_ahead - 1 : -1]:
+                    if in_flight >= max_in_flight:
+                        break
+                    if entry[1] is None:
+                        submit(entry)
+
+                current, future = stack.pop()
+                if future is None:
+                    # the scan of the next directory has to be started in any case
+                    submit_entry = [current, None]
+                    submit(submit_entry)
+                    future = submit_entry[1]
+
+                n_files, subdirectories = future.result()
+                stack.extend([directory, None] for directory in subdirectories)
+                yield current, n_files
+        finally:
+            # e.g. the consumer stopped iterating; do not scan ahead any longer
+            for _, future in stack:
+                if future is not None:
+                    future.cancel()
+
+
 def _scan_directories(
     dir_path: str,
     break_checker_delegate: Optional[Callable[[os.DirEntry], bool]] = None,
@@ -247,37 +422,362 @@ def _scan_directories(
         Called for each directory entry. If it returns True, scanning stops for that directory.
     :yields: Directory paths as strings
     """
-    # also put the starting directory on the stack
-    stack = [dir_path]
+    for directory, _ in _scan_directories_with_file_count(
+        dir_path=dir_path, break_checker_delegate=break_checker_delegate
+    ):
+        yield directory
 
-    # Localize frequently-used names to speed up inner loop
-    _os_scandir = os.scandir
-    _break_checker_delegate = break_checker_delegate
 
-    while stack:
-        current = stack.pop()
-        yield current
+def _chunk_directories(
+    directories: Iterable[Tuple[str, int]], chunk_size: int
+) -> Generator[List[str], None, None]:
+    """Groups the scanned directories into chunks of roughly the same size.
+
+    Each directory is weighted by its number of files (at least 1, as every directory has to be scanned).
+    A chunk is completed as soon as its weight reaches chunk_size; so many tiny directories end up in
+    one chunk, while a directory with many files forms its own chunk.
+
+    :param directories: Iterable of (directory path, number of files) tuples (see
+        _scan_directories_with_file_count)
+    :param chunk_size: Targeted number of files per chunk
+    :yields: Lists of directory paths
+    """
+    chunk = []
+    weight = 0
+    for directory, n_files in directories:
+        chunk.append(directory)
+        weight += max(n_files, 1)
+        if weight >= chunk_size:
+            yield chunk
+            chunk = []
+            weight = 0
+    if chunk:
+        yield chunk
+
+
+# Functor (or functor factory) and root path of the crawl a worker process is initialized with
+# (see _init_crawl_worker). They are only transferred once per worker and not for every work unit.
+_worker_file_functor = None
+_worker_functor_is_factory = False
+_worker_root_path = None
+_worker_collect_file_names = False
+
+
+def _init_crawl_worker(
+    file_functor, functor_is_factory, root_path, collect_file_names=False
+):
+    global _worker_file_functor, _worker_functor_is_factory, _worker_root_path
+    global _worker_collect_file_names
+    _worker_file_functor = file_functor
+    _worker_functor_is_factory = functor_is_factory
+    _worker_root_path = root_path
+    _worker_collect_file_names = collect_file_names
+
+
+def _crawl_directory_chunk(
+    directories: List[str],
+) -> List[Tuple[str, List[Tuple[tuple, tuple]], int, Optional[List[str]]]]:
+    """Crawls a chunk of directories in a worker process (initialized by _init_crawl_worker).
+
+    The found artefacts are not returned as Artefact instances but as plain (default properties,
+    additional properties) tuples of (key, value) pairs, which are much cheaper to pickle. They are
+    converted back into artefacts by the calling process.
+
+    :param directories: Paths of the directories to crawl
+    :return: List with a (directory, artefact records, number of irrelevant files, file names) tuple
+        per directory. File names are only collected if the worker was initialized with
+        collect_file_names (otherwise None).
+    """
+    results = []
+    for directory in directories:
+        if _worker_functor_is_factory:
+            functor = _worker_file_functor()
+        else:
+            functor = _worker_file_functor
+
+        records = []
+        n_irrelevant = 0
+        folder_artefacts = _get_artefacts_from_folder(
+            directory, functor, _worker_root_path
+        )
+        for artefact in folder_artefacts.values():
+            if artefact is None:
+                n_irrelevant += 1
+            else:
+                records.append(
+                    (
+                        tuple(artefact._defaultProps.items()),
+                        tuple(artefact._additionalProps.items()),
+                    )
+                )
+
+        file_names = None
+        if _worker_collect_file_names:
+            file_names = [os.path.basename(path) for path in folder_artefacts]
+        results.append((directory, records, n_irrelevant, file_names))
+    return results
+
+
+"""Extension that is appended to the output file path of a crawl to get the path of its manifest."""
+MANIFEST_EXTENSION = "crawlmanifest"
+
+
+def get_manifest_path(output_path: str) -> str:
+    """Returns the path of the crawl manifest that belongs to the passed output (artefact file) path."""
+    return output_path + os.extsep + MANIFEST_EXTENSION
+
 
+def _get_directory_state(directory: str) -> Optional[List[int]]:
+    """Returns the state (modification time in ns and inode) of a directory that is stored in the
+    crawl manifest, or None if the directory cannot be accessed."""
+    try:
+        stat = os.stat(directory)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_ino]
+
+
+class CrawlManifest(object):
+    """Persistent manifest of a crawl. It records for every crawled directory its state (modification
+    time and inode), its file listing and the artefacts (as records) it produced. It is used by the
+    DirectoryCrawler to only crawl the directories again that have changed since the last crawl.
+
+    A manifest is only reused if it was generated for the same root path and file functor (identified
+    by its qualified name). If the logic of a file functor is changed without renaming it, the manifest
+    has to be deleted to enforce a complete crawl.
+
+    :param path: Path of the manifest file (see get_manifest_path).
+    :param root_path: Root path of the crawl.
+    :param functor_id: Identifier of the file functor used for the crawl.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, root_path: str, functor_id: Any):
+        self.path = path
+        self.root_path = root_path
+        self.functor_id = functor_id
+        # Key is the directory path, value a dict with the keys "state", "files", "irrelevant" and
+        # "artefacts" (list of [default properties, additional properties] records).
+        self.directories: Dict[str, Dict[str, Any]] = dict()
+
+    def load(self) -> bool:
+        """Loads the manifest file (if it exists and fits to the crawl).
+
+        :return: True if the manifest was loaded.
+        """
+        if not os.path.isfile(self.path):
+            return False
         try:
-            it = _os_scandir(current)  # returns an iterator/ScandirIterator
-        except (OSError, PermissionError) as e:
-            crawl_logger.warning(f"Cannot access directory {current}: {e}")
-            continue
+            with open(self.path, "r", encoding="utf-8") as manifestFile:
+                content = json.load(manifestFile)
+        except (OSError, ValueError) as e:
+            crawl_logger.warning(
+                f"Crawl manifest cannot be read and is ignored. Manifest: {self.path}. Error: {e}"
+            )
+            return False
+
+        if (
+            content.get("version") != self.VERSION
+            or content.get("root_path") != self.root_path
+            or content.get("functor") != self.functor_id
+        ):
+            crawl_logger.info(
+                f"Crawl manifest was generated for another crawl configuration and is ignored."
+                f" Manifest: {self.path}"
+            )
+            return False
+
+        self.directories = content["directories"]
+        return True
+
+    def save(self):
+        """Stores the manifest. The manifest is written to a temporary file that replaces the manifest file
+        by a rename, so an interrupted write does not corrupt an existing manifest."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmpPath = self.path + os.extsep + "tmp"
+        with open(tmpPath, "w", encoding="utf-8") as manifestFile:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "root_path": self.root_path,
+                    "functor": self.functor_id,
+                    "directories": self.directories,
+                },
+                manifestFile,
+            )
+        os.replace(tmpPath, self.path)
+
+
+"""Extension that is appended to the output file path of a streamed crawl to get the path of its stream store."""
+STREAM_STORE_EXTENSION = "crawlstream"
+
+
+def get_stream_store_path(output_path: str) -> str:
+    """Returns the path of the stream store (see CrawlStreamStore) that belongs to the passed output path."""
+    return output_path + os.extsep + STREAM_STORE_EXTENSION
+
+
+class CrawlStreamStore(object):
+    """Append-only on-disk store (SQLite database) for the results of a streamed crawl
+    (see DirectoryCrawler.crawl_to_file).
+
+    The results of every crawled directory are committed in one transaction together with the
+    information that the directory is completed. So if a crawl is interrupted, it can be resumed
+    with the next crawl and only the directories that were not completed are crawled again.
+    Duplicates are detected by an index of the similarity keys of the stored artefacts, so the
+    artefacts never have to be held in memory.
 
+    :param path: Path of the store file (see get_stream_store_path).
+    :param crawl_config: JSON serializable configuration of the crawl. A store is only resumed if
+        it was generated with the same configuration; otherwise it is discarded.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, crawl_config: Any):
+        self.path = path
+        self.crawl_config = json.loads(json.dumps(crawl_config))
+        self._connection = None
+
+    def open(self) -> bool:
+        """Opens the store.
+
+        :return: True if an existing store (of an interrupted crawl) is resumed.
+        """
+        resumed = False
+        if os.path.isfile(self.path):
+            resumed = self._open_existing()
+            if not resumed:
+                crawl_logger.info(
+                    f"Stream store was generated for another crawl configuration or cannot be read"
+                    f" and is discarded. Store: {self.path}"
+                )
+                self.remove()
+
+        if not resumed:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            with self._connection:
+                self._connection.executescript(
+                    """
+                    CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                    CREATE TABLE artefacts (
+                        pos INTEGER PRIMARY KEY,
+                        similarity TEXT NOT NULL UNIQUE,
+                        record TEXT NOT NULL
+                    );
+                    CREATE TABLE directories (path TEXT PRIMARY KEY, irrelevant INTEGER);
+                    """
+                )
+                self._connection.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [
+                        ("version", json.dumps(self.VERSION)),
+                        ("config", json.dumps(self.crawl_config)),
+                    ],
+                )
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        return resumed
+
+    def _open_existing(self) -> bool:
         try:
-            for entry in it:
-                if _break_checker_delegate and _break_checker_delegate(entry):
-                    break
+            self._connection = sqlite3.connect(self.path)
+            meta = dict(self._connection.execute("SELECT key, value FROM meta"))
+            if json.loads(meta.get("version", "null")) == self.VERSION and (
+                json.loads(meta.get("config", "null")) == self.crawl_config
+            ):
+                return True
+        except (sqlite3.DatabaseError, ValueError):
+            pass
+        self.close()
+        return False
+
+    def is_completed(self, directory: str) -> bool:
+        """Indicates if the results of the directory are already stored."""
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM directories WHERE path = ?", (directory,)
+            ).fetchone()
+            is not None
+        )
 
-                if entry.is_dir():
-                    # only build child path for directories (fewer string creations)
-                    stack.append(entry.path)
-        finally:
-            # ensure scandir iterator is closed promptly
-            try:
-                it.close()
-            except Exception:
-                pass
+    def add_directory_results(
+        self,
+        directory: str,
+        records: List[Tuple[tuple, tuple]],
+        n_irrelevant: int,
+        replace_existing_artefacts: bool,
+    ) -> Tuple[int, int, int]:
+        """Stores the artefact records of a crawled directory and marks the directory as completed.
+
+        :param replace_existing_artefacts: If True, stored similar artefacts are replaced (they keep
+            their position). If False, the records of similar artefacts are dropped.
+        :return: Tuple with the number of added, overwritten and dropped artefacts.
+        """
+        added = overwritten = dropped = 0
+        with self._connection:
+            for default_props, additional_props in records:
+                default_props = dict(default_props)
+                additional_props = dict(additional_props)
+                similarity = hashlib.sha1(
+                    repr(
+                        Artefact(
+                            defaultP=default_props, additionalP=additional_props
+                        ).similarity_key
+                    ).encode("utf-8")
+                ).hexdigest()
+                record = json.dumps([default_props, additional_props])
+
+                if replace_existing_artefacts and (
+                    self._connection.execute(
+                        "UPDATE artefacts SET record = ? WHERE similarity = ?",
+                        (record, similarity),
+                    ).rowcount
+                ):
+                    overwritten += 1
+                elif self._connection.execute(
+                    "INSERT OR IGNORE INTO artefacts (similarity, record) VALUES (?, ?)",
+                    (similarity, record),
+                ).rowcount:
+                    added += 1
+                else:
+                    dropped += 1
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?)",
+                (directory, n_irrelevant),
+            )
+        return added, overwritten, dropped
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM artefacts").fetchone()[0]
+
+    def iter_artefacts(self) -> Generator[Artefact, None, None]:
+        """Generator that yields the stored artefacts in the order they were first stored."""
+        cursor = self._connection.cursor()
+        for (record,) in cursor.execute("SELECT record FROM artefacts ORDER BY pos"):
+            default_props, additional_props = json.loads(record)
+            yield Artefact(defaultP=default_props, additionalP=additional_props)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def remove(self):
+        """Closes and removes the store file."""
+        self.close()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+
+"""Default targeted number of files per work unit of the DirectoryCrawler."""
+DEFAULT_CHUNK_SIZE = 256
 
 
 class DirectoryCrawler(object):
@@ -287,6 +787,15 @@ class DirectoryCrawler(object):
     the provided file functor to interpret each file. If the functor returns an
     artefact, it is added to the result collection. Crawling is distributed to
     multiple parallel processes for improved performance on large directory trees.
+    The directories are grouped into chunks of roughly chunk_size files, which are the
+    work units of the processes. The file functor is transferred only once to each process.
+
+    If a manifest path is passed, the crawl is incremental: only directories whose state
+    (modification time or inode) changed since the last crawl are crawled again. The artefacts of
+    unchanged directories are taken from the manifest. Artefacts of files (or directories) that were
+    deleted since the last crawl are added to the result as invalid artefacts (if no similar artefact
+    was found in the current crawl). Remark: Modifying a file in place does not change the state of its
+    directory; such files are only crawled again if the directory is changed otherwise.
 
     :param root_path: Path to the root directory. All subdirectories will be recursively crawled.
     :param file_functor: A callable or factory for callables which processes each file.
@@ -297,6 +806,15 @@ class DirectoryCrawler(object):
     :param scan_directory_break_delegate: Optional delegate to control directory scanning.
         Called for each directory entry - if it returns True, scanning stops for that directory.
     :type scan_directory_break_delegate: Optional[Callable[[os.DirEntry], bool]]
+    :param chunk_size: Targeted number of files per work unit. Directories are never split, so
+        a directory with more files forms its own work unit.
+    :param manifest_path: Optional path of the crawl manifest (see CrawlManifest and
+        get_manifest_path). If set, the crawl is incremental and the manifest is updated after the crawl.
+    :param scan_threads: Number of threads that discover the directories concurrently (see
+        _scan_directories_parallel). The discovered directories are passed to the processes while
+        the scan is still running. Default is 1 (serial scan). If scan_threads > 1,
+        scan_directory_break_delegate is called concurrently by the scanning threads, so it must be
+        thread safe (e.g. it must not change shared state without a lock).
 
     Example break delegate for DICOM optimization::
 
@@ -312,6 +830,9 @@ class DirectoryCrawler(object):
         replace_existing_artefacts: bool = False,
         n_processes: int = 1,
         scan_directory_break_delegate: Optional[Callable[[os.DirEntry], bool]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        manifest_path: Optional[Union[str, os.PathLike]] = None,
+        scan_threads: int = DEFAULT_SCAN_THREADS,
     ):
 
         self._rootPath: str = os.fspath(root_path)
@@ -319,11 +840,19 @@ class DirectoryCrawler(object):
         self._replace_existing_artefacts = replace_existing_artefacts
         self._n_processes = n_processes
         self._scan_directory_break_delegate = scan_directory_break_delegate
+        self._chunk_size = max(1, chunk_size)
+        self._scan_threads = scan_threads
+        self._manifest_path = (
+            os.fspath(manifest_path) if manifest_path is not None else None
+        )
 
         self._last_irrelevant = 0
         self._last_dropped = 0
         self._last_overwrites = 0
         self._last_added = 0
+        self._last_reused_directories = 0
+        self._last_invalidated = 0
+        self._last_resumed_directories = 0
 
         # Determine if functor is a factory (callable that returns callable)
         self._functor_is_factory = False
@@ -358,76 +887,317 @@ class DirectoryCrawler(object):
         """Returns the number of artefacts that were overwritten by simelar artefact in the cause of crawling."""
         return self._last_overwrites
 
+    @property
+    def number_of_last_reused_directories(self):
+        """Returns the number of directories whose artefacts were taken from the manifest (as the directories
+        were unchanged) in the last crawl."""
+        return self._last_reused_directories
+
+    @property
+    def number_of_last_invalidated(self):
+        """Returns the number of artefacts of the manifest that were added as invalid artefacts in the last
+        crawl, because their files were deleted."""
+        return self._last_invalidated
+
+    @property
+    def number_of_last_resumed_directories(self):
+        """Returns the number of directories that were skipped in the last streamed crawl, because they were
+        already completed by an interrupted crawl (see crawl_to_file)."""
+        return self._last_resumed_directories
+
+    def _scan(self) -> Generator[Tuple[str, int], None, None]:
+        return _scan_directories_parallel(
+            dir_path=self._rootPath,
+            break_checker_delegate=self._scan_directory_break_delegate,
+            n_threads=self._scan_threads,
+        )
+
+    def _add_record(self, artefacts, default_props, additional_props):
+        artefact = Artefact(defaultP=default_props, additionalP=additional_props)
+        if not self._replace_existing_artefacts and artefacts.similar_artefact_exists(
+            artefact
+        ):
+            self._last_dropped += 1
+        else:
+            replaced_artefact = artefacts.add_artefact(artefact)
+            if replaced_artefact:
+                self._last_overwrites += 1
+            else:
+                self._last_added += 1
+
+    def _add_invalidated_records(self, artefacts, records):
+        """Adds the passed records of deleted files as invalid artefacts (if no similar artefact exists)."""
+        for default_props, additional_props in records:
+            artefact = Artefact(defaultP=default_props, additionalP=additional_props)
+            if not artefacts.similar_artefact_exists(artefact):
+                artefact[ArtefactProps.INVALID] = True
+                artefacts.add_artefact(artefact)
+                self._last_invalidated += 1
+
+    def _load_manifest(self) -> Optional[CrawlManifest]:
+        if self._manifest_path is None:
+            return None
+        manifest = CrawlManifest(
+            self._manifest_path,
+            root_path=os.path.abspath(self._rootPath),
+            functor_id=normalize_config_value(self._fileFunctor),
+        )
+        manifest.load()
+        return manifest
+
     def getArtefacts(self) -> ArtefactCollection:
         """Execute the crawling operation and return collected artefacts.
 
         This method orchestrates the entire crawling process:
-        1. Scans directories to find all folders to process
-        2. Distributes folder processing across multiple processes
-        3. Collects and merges results while handling duplicates
-        4. Updates internal statistics
+        1. Scans directories to find all folders to process and groups them into chunks
+           (directories that are unchanged according to the manifest are skipped)
+        2. Distributes the chunks across multiple processes
+        3. Converts the returned records into artefacts and merges them while handling duplicates
+        4. Updates internal statistics (and the manifest)
 
         :return: Collection of all discovered artefacts
         :raises OSError: If root directory cannot be accessed
         """
         artefacts = ArtefactCollection()
+        manifest = self._load_manifest()
+        # Directories that are unchanged according to the manifest and their manifest entries
+        reused_directories = list()
+        # States of the scanned directories (only determined if a manifest is used)
+        directory_states = dict()
+
+        def filter_unchanged_directories(scanned_directories):
+            for directory, n_files in scanned_directories:
+                state = _get_directory_state(directory)
+                directory_states[directory] = state
+                entry = manifest.directories.get(directory)
+                if state is not None and entry is not None and entry["state"] == state:
+                    reused_directories.append((directory, entry))
+                else:
+                    yield directory, n_files
+
         with concurrent.futures.ProcessPoolExecutor(
-            max_workers=self._n_processes
+            max_workers=self._n_processes,
+            initializer=_init_crawl_worker,
+            initargs=(
+                self._fileFunctor,
+                self._functor_is_factory,
+                self._rootPath,
+                manifest is not None,
+            ),
         ) as executor, Progress(transient=True, refresh_per_second=2) as progress:
             directory_scanning = progress.add_task("Found folders to scan")
-            futures = []
-            for target_dir in _scan_directories(
-                dir_path=self._rootPath,
-                break_checker_delegate=self._scan_directory_break_delegate,
-            ):
-                if self._functor_is_factory:
-                    functor = self._fileFunctor()
-                else:
-                    functor = self._fileFunctor
-                progress.update(directory_scanning, advance=1)
-                future = executor.submit(
-                    _get_artefacts_from_folder, target_dir, functor, self._rootPath
-                )
-                futures.append(future)
+            futures = dict()
+            n_directories = 0
+            scanned_directories = self._scan()
+            if manifest is not None:
+                scanned_directories = filter_unchanged_directories(scanned_directories)
+
+            for chunk in _chunk_directories(scanned_directories, self._chunk_size):
+                n_directories += len(chunk)
+                progress.update(directory_scanning, advance=len(chunk))
+                future = executor.submit(_crawl_directory_chunk, chunk)
+                futures[future] = len(chunk)
 
             progress.console.print(
-                f"\nDiscovered {len(futures)} directories to analyze. Starting file analysis..."
+                f"\nDiscovered {n_directories} directories to analyze"
+                f" ({len(reused_directories)} unchanged directories are taken from the manifest)."
+                f" Starting file analysis..."
             )
 
             directory_analysis = progress.add_task(
-                "Processing directories", total=len(futures)
+                "Processing directories", total=n_directories
             )
 
             self._last_irrelevant = 0
             self._last_dropped = 0
             self._last_added = 0
             self._last_overwrites = 0
+            self._last_reused_directories = len(reused_directories)
+            self._last_invalidated = 0
+            self._last_resumed_directories = 0
+
+            new_manifest_directories = dict()
+            # records of the manifest whose files were deleted
+            deleted_records = list()
+
+            for directory, entry in reused_directories:
+                self._last_irrelevant += entry["irrelevant"]
+                for default_props, additional_props in entry["artefacts"]:
+                    self._add_record(artefacts, default_props, additional_props)
+                new_manifest_directories[directory] = entry
 
             for future in concurrent.futures.as_completed(futures):
                 try:
-                    folder_artefacts = future.result()
-                    for fullpath, artefact in folder_artefacts.items():
-                        if artefact is None:
-                            self._last_irrelevant += 1
-                        elif (
-                            not self._replace_existing_artefacts
-                            and artefacts.similar_artefact_exists(artefact)
-                        ):
-                            self._last_dropped += 1
-                        else:
-                            replaced_artefact = artefacts.add_artefact(artefact)
-                            if replaced_artefact:
-                                self._last_overwrites += 1
-                            else:
-                                self._last_added += 1
+                    for directory, records, n_irrelevant, file_names in future.result():
+                        self._last_irrelevant += n_irrelevant
+                        for default_props, additional_props in records:
+                            self._add_record(
+                                artefacts, dict(default_props), dict(additional_props)
+                            )
+
+                        if manifest is None:
+                            continue
+
+                        old_entry = manifest.directories.get(directory)
+                        if old_entry is not None:
+                            deleted_paths = {
+                                os.path.join(directory, name)
+                                for name in set(old_entry["files"]).difference(
+                                    file_names
+                                )
+                            }
+                            deleted_records.extend(
+                                record
+                                for record in old_entry["artefacts"]
+                                if record[0].get(ArtefactProps.URL) in deleted_paths
+                            )
+                        new_manifest_directories[directory] = {
+                            "state": directory_states[directory],
+                            "files": file_names,
+                            "irrelevant": n_irrelevant,
+                            "artefacts": [
+                                [dict(default_props), dict(additional_props)]
+                                for default_props, additional_props in records
+                            ],
+                        }
 
                 except Exception as e:
                     crawl_logger.error(f"Error processing directory results: {e}")
 
-                progress.update(directory_analysis, advance=1)
+                progress.update(directory_analysis, advance=futures[future])
+
+        if manifest is not None:
+            for directory, entry in manifest.directories.items():
+                if directory not in directory_states and not os.path.isdir(directory):
+                    # the directory was deleted since the last crawl
+                    deleted_records.extend(entry["artefacts"])
+            self._add_invalidated_records(artefacts, deleted_records)
+
+            manifest.directories = new_manifest_directories
+            manifest.save()
 
         return artefacts
 
+    def _stream_store_config(self) -> dict:
+        """Configuration of the crawl that must match to resume a stream store."""
+        return {
+            "root_path": os.path.abspath(self._rootPath),
+            "functor": normalize_config_value(self._fileFunctor),
+            "replace_existing_artefacts": self._replace_existing_artefacts,
+            "similarity_properties": list(similarityRelevantProperties),
+        }
+
+    def crawl_to_file(
+        self,
+        output_path: Union[str, os.PathLike],
+        savePathsRelative: bool = False,
+    ) -> int:
+        """Execute the crawling operation in streaming mode and store the artefacts in the output file.
+
+        In contrast to getArtefacts(), the found artefacts are not collected in memory. The results of
+        the directories are written (in crawl order) to an append-only stream store next to the output
+        file (see CrawlStreamStore) as soon as they are completed. Duplicates are handled against the
+        on-disk similarity index of the store. When the crawl is finished, the output file is written
+        from the store (storage format is determined by the output path, see
+        fileHelper.get_artefact_storage) and the store is removed.
+        If a crawl is interrupted, calling crawl_to_file again with the same output path and
+        configuration resumes the crawl; directories that were already completed are skipped.
+        If the results of some directories could not be processed, the store is kept, so that
+        these directories are crawled again by the next call.
+
+        :param output_path: Path of the artefact file that should be written.
+        :param savePathsRelative: Store artefact paths relative to the output file location.
+        :return: Number of artefacts stored in the output file.
+        """
+        output_path = os.fspath(output_path)
+        if self._manifest_path is not None:
+            raise ValueError(
+                "Streaming crawls do not support crawl manifests. Use getArtefacts() for incremental crawls."
+            )
+
+        store = CrawlStreamStore(
+            get_stream_store_path(output_path), self._stream_store_config()
+        )
+        if store.open():
+            crawl_logger.info(f"Resume interrupted crawl. Stream store: {store.path}")
+
+        self._last_irrelevant = 0
+        self._last_dropped = 0
+        self._last_added = 0
+        self._last_overwrites = 0
+        self._last_reused_directories = 0
+        self._last_invalidated = 0
+        self._last_resumed_directories = 0
+        failed_chunks = 0
+
+        def filter_completed_directories(scanned_directories):
+            for directory, n_files in scanned_directories:
+                if store.is_completed(directory):
+                    self._last_resumed_directories += 1
+                else:
+                    yield directory, n_files
+
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._n_processes,
+                initializer=_init_crawl_worker,
+                initargs=(self._fileFunctor, self._functor_is_factory, self._rootPath),
+            ) as executor, Progress(transient=True, refresh_per_second=2) as progress:
+                directory_analysis = progress.add_task("Processing directories")
+                # Futures are consumed in the order they were submitted (so results are stored in crawl
+                # order) and their number is bounded (so results do not pile up in memory).
+                pending = deque()
+                max_pending = max(2, 4 * self._n_processes)
+
+                def consume_oldest():
+                    nonlocal failed_chunks
+                    future, chunk_length = pending.popleft()
+                    try:
+                        for directory, records, n_irrelevant, _ in future.result():
+                            added, overwritten, dropped = store.add_directory_results(
+                                directory,
+                                records,
+                                n_irrelevant,
+                                self._replace_existing_artefacts,
+                            )
+                            self._last_irrelevant += n_irrelevant
+                            self._last_added += added
+                            self._last_overwrites += overwritten
+                            self._last_dropped += dropped
+                    except Exception as e:
+                        failed_chunks += 1
+                        crawl_logger.error(f"Error processing directory results: {e}")
+                    progress.update(directory_analysis, advance=chunk_length)
+
+                for chunk in _chunk_directories(
+                    filter_completed_directories(self._scan()),
+                    self._chunk_size,
+                ):
+                    pending.append(
+                        (executor.submit(_crawl_directory_chunk, chunk), len(chunk))
+                    )
+                    while len(pending) >= max_pending:
+                        consume_oldest()
+                while pending:
+                    consume_oldest()
+
+            crawl_logger.info(f"Saving {len(store)} artefacts to {output_path}...")
+            save_artefacts(
+                output_path, store.iter_artefacts(), savePathsRelative=savePathsRelative
+            )
+            n_artefacts = len(store)
+        finally:
+            store.close()
+
+        if failed_chunks:
+            crawl_logger.warning(
+                f"Results of {failed_chunks} work units could not be processed. The stream store is kept,"
+                f" so the affected directories are crawled again by the next call. Store: {store.path}"
+            )
+        else:
+            store.remove()
+        return n_artefacts
+
 
 def runCrawlerScriptMain(
     file_function: Callable,
@@ -446,12 +1216,16 @@ def runCrawlerScriptMain(
 
     Command line arguments::
 
-        script.py <root_dir> <output_file> [--n_processes N] [--relative_paths] [--replace]
+        script.py <root_dir> <output_file> [--n_processes N] [--chunk_size N] [--scan_threads N] [--relative_paths] [--manifest] [--stream] [--replace]
 
         root_dir: Directory to start crawling from
         output_file: XML file to save discovered artefacts to
         --n_processes: Number of parallel processes (default: 1)
+        --chunk_size: Targeted number of files per work unit (default: 256)
+        --scan_threads: Number of threads that discover directories concurrently (default: 1)
         --relative_paths: Store paths relative to output file location
+        --manifest: Crawl incrementally using a crawl manifest stored next to the output file
+        --stream: Stream the results to disk while crawling (resumable, see DirectoryCrawler.crawl_to_file)
         --replace: Replace existing similar artefacts during crawling
     """
     parser = argparse.ArgumentParser(
@@ -474,11 +1248,35 @@ def runCrawlerScriptMain(
         default=1,
         type=int,
     )
+    parser.add_argument(
+        "--chunk_size",
+        help="Targeted number of files per work unit of the crawling processes",
+        default=DEFAULT_CHUNK_SIZE,
+        type=int,
+    )
+    parser.add_argument(
+        "--scan_threads",
+        help="Number of threads that discover the directories concurrently (1 scans serially)",
+        default=DEFAULT_SCAN_THREADS,
+        type=int,
+    )
     parser.add_argument(
         "--relative_paths",
         action="store_true",
         help="Store artefact file paths relative to the output file location",
     )
+    parser.add_argument(
+        "--manifest",
+        action="store_true",
+        help="Crawl incrementally. A crawl manifest is stored next to the output file and only directories "
+        "that changed since the last crawl are crawled again. Artefacts of deleted files are stored as invalid.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the crawl results to disk instead of collecting them in memory. An interrupted crawl is "
+        "resumed when the script is called again with the same output file.",
+    )
     parser.add_argument(
         "--replace",
         action="store_true",
@@ -502,6 +1300,10 @@ def runCrawlerScriptMain(
         crawl_logger.error("Number of processes must be at least 1")
         sys.exit(1)
 
+    if cliargs.stream and cliargs.manifest:
+        crawl_logger.error("Options --stream and --manifest cannot be combined")
+        sys.exit(1)
+
     # Create output directory if it doesn't exist
     output_dir = os.path.dirname(os.path.abspath(cliargs.output))
     if output_dir and not os.path.exists(output_dir):
@@ -518,26 +1320,41 @@ def runCrawlerScriptMain(
             root_path=cliargs.root,
             file_functor=file_function,
             n_processes=cliargs.n_processes,
+            chunk_size=cliargs.chunk_size,
+            scan_threads=cliargs.scan_threads,
+            manifest_path=(
+                get_manifest_path(cliargs.output) if cliargs.manifest else None
+            ),
             replace_existing_artefacts=cliargs.replace,
             scan_directory_break_delegate=scan_directory_break_delegate,
         )
-        artefacts = crawler.getArtefacts()
-
         console = Console()
+        if cliargs.stream:
+            n_artefacts = crawler.crawl_to_file(
+                cliargs.output, savePathsRelative=cliargs.relative_paths
+            )
+        else:
+            artefacts = crawler.getArtefacts()
+            n_artefacts = len(artefacts)
+
         console.print(
             f"\n[bold]Crawling Results Summary[/bold]\n"
-            f"Final artefacts collected: [green]{len(artefacts)}[/green]\n"
+            f"Final artefacts collected: [green]{n_artefacts}[/green]\n"
             f"Dropped duplicate artefacts: [yellow]{crawler.number_of_last_dropped}[/yellow]\n"
             f"Overwritten artefacts: [red]{crawler.number_of_last_overwites}[/red]\n"
             f"Irrelevant files skipped: [dim]{crawler.number_of_last_irrelevant}[/dim]\n"
+            f"Unchanged directories taken from manifest: [dim]{crawler.number_of_last_reused_directories}[/dim]\n"
+            f"Artefacts of deleted files (stored as invalid): [red]{crawler.number_of_last_invalidated}[/red]\n"
+            f"Directories resumed from interrupted crawl: [dim]{crawler.number_of_last_resumed_directories}[/dim]\n"
         )
 
-        crawl_logger.info(f"Saving {len(artefacts)} artefacts to {cliargs.output}...")
-        saveArtefactList(
-            filePath=cliargs.output,
-            artefacts=artefacts,
-            savePathsRelative=cliargs.relative_paths,
-        )
+        if not cliargs.stream:
+            crawl_logger.info(f"Saving {n_artefacts} artefacts to {cliargs.output}...")
+            saveArtefactList(
+                filePath=cliargs.output,
+                artefacts=artefacts,
+                savePathsRelative=cliargs.relative_paths,
+            )
 
         console.print(
             f"Successfully saved artefacts to: [green]{cliargs.output}[/green]\n"
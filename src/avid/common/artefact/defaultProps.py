@@ -55,6 +55,9 @@ TIMESTAMP = "timestamp"
 INPUT_IDS = "input_ids"
 """Duration of the action execution that generated the artefact (in [s])."""
 EXECUTION_DURATION = "execution_duration"
+"""Fingerprint of the action configuration and the input files used to generate the artefact
+(see avid.common.artefact.fingerprint)."""
+INPUT_FINGERPRINT = "input_fingerprint"
 """Name of the action class that used to do/represent the action."""
 ACTION_CLASS = "action_class"
 """UID of the action instance that generated the artefact"""
@@ -20,16 +20,21 @@ import logging
 import math
 import os
 import time
+import uuid
 import xml.etree.ElementTree as ElementTree
 from builtins import str
 
 from avid.common.artefact import (
-    ArtefactCollection,
-    generateArtefactEntry,
+    Artefact,
+    CompactArtefact,
+    normalizePropertyValue,
     update_artefacts,
 )
 
 from . import defaultProps
+from .sqliteStorage import SQLiteArtefactStorage
+from .storage import ArtefactStorageBase
+from .validity import VALIDITY_CHECK_DEFERRED, defer_validity_check
 
 logger = logging.getLogger(__name__)
 
@@ -64,23 +69,105 @@ XML_NAMESPACE_DICT = {"avid": XML_NAMESPACE}
 CURRENT_XML_VERSION = "1.0"
 
 
-def load_artefact_collection_from_xml(
+"""Property values of a freshly loaded artefact, before the properties stored in the XML are applied.
+ID and TIMESTAMP are generated if they are not stored in the XML."""
+_LOADED_ARTEFACT_DEFAULTS = (
+    (defaultProps.CASE, None),
+    (defaultProps.CASEINSTANCE, None),
+    (defaultProps.TIMEPOINT, 0),
+    (defaultProps.ACTIONTAG, "UnknownAction"),
+    (defaultProps.TYPE, None),
+    (defaultProps.FORMAT, None),
+    (defaultProps.URL, None),
+    (defaultProps.OBJECTIVE, None),
+    (defaultProps.RESULT_SUB_TAG, None),
+    (defaultProps.RESULT_SUB_COUNT, None),
+    (defaultProps.INVALID, False),
+    (defaultProps.INPUT_IDS, None),
+    (defaultProps.ACTION_CLASS, None),
+    (defaultProps.ACTION_INSTANCE_UID, None),
+    (defaultProps.ID, None),
+    (defaultProps.TIMESTAMP, None),
+    (defaultProps.EXECUTION_DURATION, None),
+)
+
+"""Properties whose stored text has to be converted (see normalizePropertyValue). All other properties are stored
+as text anyway."""
+_CONVERTED_PROPERTIES = (
+    defaultProps.TIMEPOINT,
+    defaultProps.EXECUTION_DURATION,
+    defaultProps.INVALID,
+)
+
+_XML_TAG_ARTEFACTS = "{" + XML_NAMESPACE + "}artefacts"
+_XML_TAG_ARTEFACT = "{" + XML_NAMESPACE + "}artefact"
+_XML_TAG_PROPERTY = "{" + XML_NAMESPACE + "}property"
+_XML_TAG_INPUT_ID = "{" + XML_NAMESPACE + "}input_id"
+
+
+def _read_input_ids(xmlProp):
+    value = dict()
+    for aSource in xmlProp.iterfind(_XML_TAG_INPUT_ID):
+        sourceName = aSource.get(XML_ATTR_KEY)
+        if sourceName is None:
+            raise ValueError(
+                "XML seems not to be valid. SourceID element has no key attribute"
+            )
+        sourceID = aSource.text if aSource.text else None
+        value.setdefault(sourceName, list()).append(sourceID)
+    return value
+
+
+def _read_artefact_properties(aElement):
+    """Reads the properties of an artefact element and returns them as (defaultP, additionalP) dicts that can
+    directly be used to construct an artefact."""
+    defaultP = dict(_LOADED_ARTEFACT_DEFAULTS)
+    additionalP = dict()
+
+    for aProp in aElement.iterfind(_XML_TAG_PROPERTY):
+        key = aProp.get(XML_ATTR_KEY)
+        if key is None:
+            raise ValueError(
+                "XML seems not to be valid. Property element has no key attribute"
+            )
+
+        if key == defaultProps.INPUT_IDS:
+            value = _read_input_ids(aProp)
+        elif key in _CONVERTED_PROPERTIES:
+            value = normalizePropertyValue(key, aProp.text)
+        else:
+            value = aProp.text
+
+        if key in defaultP:
+            defaultP[key] = value
+        else:
+            additionalP[key] = value
+
+    return defaultP, additionalP
+
+
+def iter_artefacts_from_xml(
     filePath,
     expandPaths=False,
     rootPath=None,
-    replace_if_exists=True,
     check_validity=True,
+    schema=None,
 ):
-    """Loads a artefact list from a XML file.
+    """Generator that lazily loads the artefacts stored in a XML file. The file is parsed incrementally and parsed
+    elements are discarded as soon as their artefact was yielded, so the memory footprint does not depend on the
+    size of the file.
+    Remark: In contrast to load_artefact_collection_from_xml similar artefacts are not merged, they are all yielded
+    in the order of the file.
     @param filePath Path where the artefact list is located or file like object that grants access to the list.
     @param expandPaths If true all relative url will be expanded by the rootPath
     If rootPath is not set, it will be the directory of filePath
     @param rootPath If defined any relative url in the list will expanded by the
     root path. If rootPath is set, expandPaths is implicitly true.
-    @param check_validity If true, the outputs of existing artefacts will be checked to confirm validity
+    @param check_validity If true, the outputs of existing artefacts will be checked to confirm validity.
+    If VALIDITY_CHECK_DEFERRED, the check is deferred (see validity.defer_validity_check).
+    @param schema If an ArtefactSchema is passed, the artefacts will be loaded as CompactArtefact instances
+    using this schema.
     """
-    artefacts = ArtefactCollection()
-
     if rootPath is None and expandPaths is True:
         rootPath = os.path.split(filePath)[0]
     if not os.path.isfile(filePath):
@@ -89,82 +176,131 @@ def load_artefact_collection_from_xml(
             + str(filePath)
         )
 
-    tree = ElementTree.parse(filePath)
-    root = tree.getroot()
-
-    if root.tag != "{" + XML_NAMESPACE + "}artefacts":
-        raise ValueError(
-            "XML has not the correct root element. Must be 'artefacts', but is: "
-            + root.tag
-        )
-
-    for aElement in root.findall(XML_ARTEFACT, XML_NAMESPACE_DICT):
-        artefact = generateArtefactEntry(None, None, 0, "UnknownAction", None, None)
-
-        for aProp in aElement.findall(XML_PROPERTY, XML_NAMESPACE_DICT):
-            if XML_ATTR_KEY in aProp.attrib:
-                if aProp.attrib[XML_ATTR_KEY] == defaultProps.INPUT_IDS:
-                    value = dict()
-                    for aSource in aProp.findall(XML_INPUT_ID, XML_NAMESPACE_DICT):
-                        if XML_ATTR_KEY in aSource.attrib:
-                            if aSource.attrib[XML_ATTR_KEY] in value:
-                                if aSource.text is None or len(aSource.text) == 0:
-                                    value[aSource.attrib[XML_ATTR_KEY]].append(None)
-                                else:
-                                    value[aSource.attrib[XML_ATTR_KEY]].append(
-                                        aSource.text
-                                    )
-                            else:
-                                if aSource.text is None or len(aSource.text) == 0:
-                                    value[aSource.attrib[XML_ATTR_KEY]] = [None]
-                                else:
-                                    value[aSource.attrib[XML_ATTR_KEY]] = [aSource.text]
-                        else:
-                            raise ValueError(
-                                "XML seems not to be valid. SourceID element has no key attribute"
-                            )
-                    artefact[aProp.attrib[XML_ATTR_KEY]] = value
-                else:
-                    artefact[aProp.attrib[XML_ATTR_KEY]] = aProp.text
-            else:
+    root = None
+    for event, element in ElementTree.iterparse(filePath, events=("start", "end")):
+        if root is None:
+            root = element
+            if root.tag != _XML_TAG_ARTEFACTS:
                 raise ValueError(
-                    "XML seems not to be valid. Property element has no key attribute"
+                    "XML has not the correct root element. Must be 'artefacts', but is: "
+                    + root.tag
                 )
-
-        if rootPath is not None and not os.path.isabs(artefact[defaultProps.URL]):
-            artefact[defaultProps.URL] = os.path.join(
-                rootPath, artefact[defaultProps.URL]
+            continue
+
+        if event != "end" or element.tag != _XML_TAG_ARTEFACT:
+            continue
+
+        defaultP, additionalP = _read_artefact_properties(element)
+        # The artefact is completely read, so all parsed elements can be discarded.
+        root.clear()
+
+        url = defaultP[defaultProps.URL]
+        if url is not None:
+            if rootPath is not None and not os.path.isabs(url):
+                url = os.path.join(rootPath, url)
+            url = os.path.normpath(url)
+            defaultP[defaultProps.URL] = url
+
+        if defaultP[defaultProps.ID] is None:
+            defaultP[defaultProps.ID] = str(uuid.uuid1())
+        if defaultP[defaultProps.TIMESTAMP] is None:
+            defaultP[defaultProps.TIMESTAMP] = str(time.time())
+
+        if schema is not None:
+            artefact = CompactArtefact(
+                schema, defaultP=defaultP, additionalP=additionalP
             )
-        artefact[defaultProps.URL] = os.path.normpath(artefact[defaultProps.URL])
+        else:
+            artefact = Artefact(defaultP=defaultP, additionalP=additionalP)
 
-        if check_validity and (
-            artefact[defaultProps.URL] is None
-            or not os.path.isfile(artefact[defaultProps.URL])
-        ):
+        if check_validity == VALIDITY_CHECK_DEFERRED:
+            defer_validity_check([artefact])
+        elif check_validity and (url is None or not os.path.isfile(url)):
             artefact[defaultProps.INVALID] = True
             logger.info(
                 "Artefact had no valid URL. Set invalid property to true. Artefact: %s",
                 artefact,
             )
 
-        replaced_artifact = artefacts.add_artefact(
-            artefact=artefact, replace_if_exists=replace_if_exists
-        )
+        yield artefact
 
-        if replaced_artifact is not None:
-            logger.warning(
-                "Artefacts file contained similar artefact which will be overwritten."
-                "\nOld artifact: %s"
-                "\nNew artifact: %s",
-                replaced_artifact,
-                artefact,
-            )
 
-    return artefacts
+def load_artefact_collection_from_xml(
+    filePath,
+    expandPaths=False,
+    rootPath=None,
+    replace_if_exists=True,
+    check_validity=True,
+    schema=None,
+    validity_check_workers=None,
+):
+    """Loads a artefact list from a XML file.
+    @param filePath Path where the artefact list is located or file like object that grants access to the list.
+    @param expandPaths If true all relative url will be expanded by the rootPath
+    If rootPath is not set, it will be the directory of filePath
+    @param rootPath If defined any relative url in the list will expanded by the
+    root path. If rootPath is set, expandPaths is implicitly true.
+    @param check_validity If true, the outputs of existing artefacts will be checked to confirm validity. The
+    check is done for all loaded artefacts at once (see validity.check_artefacts_validity). If
+    VALIDITY_CHECK_DEFERRED, the check is deferred until the validity is needed (see validity.defer_validity_check).
+    @param schema If an ArtefactSchema is passed, the artefacts will be loaded as CompactArtefact instances
+    using this schema.
+    @param validity_check_workers Number of threads used to check the validity. If None, the default of the
+    validity module is used.
+    """
+    return _xmlStorage.load(
+        filePath,
+        expandPaths=expandPaths,
+        rootPath=rootPath,
+        replace_if_exists=replace_if_exists,
+        check_validity=check_validity,
+        schema=schema,
+        validity_check_workers=validity_check_workers,
+    )
+
+
+def _artefact_to_xml_element(artefact, rootPath, savePathsRelative):
+    xmlArtefact = ElementTree.Element(XML_ARTEFACT)
+    for key in artefact._defaultProps:
+        if artefact[key] is not None:
+            xmlProp = ElementTree.SubElement(
+                xmlArtefact, XML_PROPERTY, {XML_ATTR_KEY: key}
+            )
+            value = artefact[key]
+            if key == defaultProps.INPUT_IDS:
+                for sourceName in value:
+                    if value[sourceName] is not None:
+                        for id in value[sourceName]:
+                            xmlInput = ElementTree.SubElement(
+                                xmlProp, XML_INPUT_ID, {XML_ATTR_KEY: sourceName}
+                            )
+                            if id is not None:
+                                xmlInput.text = id
+            else:
+                if key == defaultProps.URL:
+                    if savePathsRelative:
+                        try:
+                            value = os.path.relpath(artefact[key], rootPath)
+                        except:
+                            logger.warning(
+                                "Artefact URL cannot be converted to be relative. Path is kept absolute. Artefact URL: %s",
+                                value,
+                            )
+                    value = value.replace("\\", "/")
+                xmlProp.text = str(value)
+    for key in artefact._additionalProps:
+        if artefact[key] is not None:
+            xmlProp = ElementTree.SubElement(
+                xmlArtefact, XML_PROPERTY, {XML_ATTR_KEY: key}
+            )
+            xmlProp.text = str(artefact[key])
+    return xmlArtefact
 
 
 def save_artefacts_to_xml(filePath, artefacts, rootPath=None, savePathsRelative=True):
     """Saves any container with artefacts as a XML file.
+    The file is written artefact by artefact, so artefacts can also be passed as a generator
+    without holding all artefacts (or the complete XML tree) in memory.
     @param filePath Path where the artefacts file should be stored.
     @param savePathsRelative If true all pathes will be stored as relative path to the
     passed root path. If rootPath is not set, it will be the directory of filePath
@@ -174,49 +310,6 @@ def save_artefacts_to_xml(filePath, artefacts, rootPath=None, savePathsRelative=
     if rootPath is None:
         rootPath = os.path.split(filePath)[0]
 
-    root = ElementTree.Element(
-        XML_ARTEFACTS, {XML_ATTR_VERSION: "1.0", "xmlns:avid": XML_NAMESPACE}
-    )
-
-    for artefact in artefacts:
-        xmlArtefact = ElementTree.SubElement(root, XML_ARTEFACT)
-        for key in artefact._defaultProps:
-            if artefact[key] is not None:
-                xmlProp = ElementTree.SubElement(
-                    xmlArtefact, XML_PROPERTY, {XML_ATTR_KEY: key}
-                )
-                value = artefact[key]
-                if key is defaultProps.INPUT_IDS:
-                    for sourceName in value:
-                        if value[sourceName] is not None:
-                            for id in value[sourceName]:
-                                xmlInput = ElementTree.SubElement(
-                                    xmlProp, XML_INPUT_ID, {XML_ATTR_KEY: sourceName}
-                                )
-                                if id is not None:
-                                    xmlInput.text = id
-                else:
-                    if key is defaultProps.URL:
-                        if savePathsRelative:
-                            try:
-                                value = os.path.relpath(artefact[key], rootPath)
-                            except:
-                                logger.warning(
-                                    "Artefact URL cannot be converted to be relative. Path is kept absolute. Artefact URL: %s",
-                                    value,
-                                )
-                        value = value.replace("\\", "/")
-                    xmlProp.text = str(value)
-        for key in artefact._additionalProps:
-            if artefact[key] is not None:
-                xmlProp = ElementTree.SubElement(
-                    xmlArtefact, XML_PROPERTY, {XML_ATTR_KEY: key}
-                )
-                xmlProp.text = str(artefact[key])
-
-    tree = ElementTree.ElementTree(root)
-    indent(root)
-
     try:
         os.makedirs(os.path.split(filePath)[0])
     except:
@@ -225,7 +318,27 @@ def save_artefacts_to_xml(filePath, artefacts, rootPath=None, savePathsRelative=
     if os.path.isfile(filePath):
         os.remove(filePath)
 
-    tree.write(filePath, xml_declaration=True)
+    rootTag = '<{} {}="1.0" xmlns:avid="{}"'.format(
+        XML_ARTEFACTS, XML_ATTR_VERSION, XML_NAMESPACE
+    )
+    with open(filePath, "wb") as xmlFile:
+        xmlFile.write(b"<?xml version='1.0' encoding='us-ascii'?>\n")
+        xmlFile.write(rootTag.encode("us-ascii"))
+        isEmpty = True
+        for artefact in artefacts:
+            xmlArtefact = _artefact_to_xml_element(
+                artefact, rootPath, savePathsRelative
+            )
+            indent(xmlArtefact, 1)
+            xmlArtefact.tail = None
+            xmlFile.write(b">\n  " if isEmpty else b"\n  ")
+            xmlFile.write(ElementTree.tostring(xmlArtefact, encoding="us-ascii"))
+            isEmpty = False
+
+        if isEmpty:
+            xmlFile.write(b" />")
+        else:
+            xmlFile.write("\n</{}>\n".format(XML_ARTEFACTS).encode("us-ascii"))
 
 
 def update_artefactlist(
@@ -273,15 +386,14 @@ def update_artefactlist(
                 )
 
     try:
-        destination_artefacts = load_artefact_collection_from_xml(
-            destination_file, rootPath=rootPath
-        )
+        storage = get_artefact_storage(destination_file)
+        destination_artefacts = storage.load(destination_file, rootPath=rootPath)
         update_artefacts(
             destination_collection=destination_artefacts,
             source_collection=source_artefacts,
             update_existing=update_existing,
         )
-        save_artefacts_to_xml(
+        storage.save(
             filePath=destination_file,
             artefacts=destination_artefacts,
             rootPath=rootPath,
@@ -291,3 +403,97 @@ def update_artefactlist(
         if lf is not None:
             lf.close()
             os.remove(lf_path)
+
+
+class XMLArtefactStorage(ArtefactStorageBase):
+    """Storage backend for the XML artefact files. It is the fallback backend that is used for every file that is
+    not handled by another backend."""
+
+    def can_handle(self, filePath):
+        return True
+
+    def iter_artefacts(self, filePath, expandPaths=False, rootPath=None, schema=None):
+        return iter_artefacts_from_xml(
+            filePath,
+            expandPaths=expandPaths,
+            rootPath=rootPath,
+            check_validity=False,
+            schema=schema,
+        )
+
+    def save(self, filePath, artefacts, rootPath=None, savePathsRelative=True):
+        save_artefacts_to_xml(
+            filePath, artefacts, rootPath=rootPath, savePathsRelative=savePathsRelative
+        )
+
+
+_xmlStorage = XMLArtefactStorage()
+
+"""Registered storage backends. The first backend that can handle a file path is used for it."""
+_artefactStorages = [SQLiteArtefactStorage(), _xmlStorage]
+
+
+def register_artefact_storage(storage):
+    """Registers a storage backend (instance of a ArtefactStorageBase derivate). It takes precedence over all
+    backends registered before."""
+    _artefactStorages.insert(0, storage)
+
+
+def get_artefact_storage(filePath):
+    """Returns the storage backend that is used for the passed artefact file path. Files that are not handled by
+    any other backend (e.g. *.avid) are stored as XML."""
+    for storage in _artefactStorages:
+        if storage.can_handle(filePath):
+            return storage
+    return _xmlStorage
+
+
+def load_artefact_collection(
+    filePath,
+    expandPaths=False,
+    rootPath=None,
+    replace_if_exists=True,
+    check_validity=True,
+    schema=None,
+    validity_check_workers=None,
+):
+    """Loads a artefact list from a file using the storage backend that is responsible for the file (see
+    get_artefact_storage). For the parameters see load_artefact_collection_from_xml."""
+    return get_artefact_storage(filePath).load(
+        filePath,
+        expandPaths=expandPaths,
+        rootPath=rootPath,
+        replace_if_exists=replace_if_exists,
+        check_validity=check_validity,
+        schema=schema,
+        validity_check_workers=validity_check_workers,
+    )
+
+
+def iter_artefacts(filePath, expandPaths=False, rootPath=None, schema=None):
+    """Generator that yields all artefacts of an artefact file using the storage backend that is responsible for the
+    file. Similar artefacts are not merged and validity is not checked."""
+    return get_artefact_storage(filePath).iter_artefacts(
+        filePath, expandPaths=expandPaths, rootPath=rootPath, schema=schema
+    )
+
+
+def save_artefacts(filePath, artefacts, rootPath=None, savePathsRelative=True):
+    """Saves any container with artefacts using the storage backend that is responsible for the file (see
+    get_artefact_storage). For the parameters see save_artefacts_to_xml."""
+    get_artefact_storage(filePath).save(
+        filePath, artefacts, rootPath=rootPath, savePathsRelative=savePathsRelative
+    )
+
+
+def convert_artefact_file(sourcePath, destinationPath, savePathsRelative=True):
+    """Converts an artefact file into the format of the destination path (e.g. a XML session into a SQLite session
+    or vice versa). The conversion is lossless; all artefacts (including similar ones) are kept in their order and
+    relative URLs are adapted to the location of the destination.
+    :param savePathsRelative: indicates if paths should be stored as relative paths in the destination.
+    """
+    save_artefacts(
+        destinationPath,
+        iter_artefacts(sourcePath, expandPaths=True),
+        savePathsRelative=savePathsRelative,
+    )
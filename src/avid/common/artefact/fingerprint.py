@@ -0,0 +1,166 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module offers input fingerprints for actions. A fingerprint is a hash over the configuration of an action and the
+state of the files of its input artefacts. Actions store the fingerprint in the artefacts they produce
+(defaultProps.INPUT_FINGERPRINT). If input fingerprinting is activated for a session, an action only skips the
+processing if the fingerprint of the existing outputs matches the current one; so changed input files or action
+parameters lead to a reprocessing of the affected actions (make like incremental processing).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from . import Artefact, defaultProps, getArtefactProperty
+
+logger = logging.getLogger(__name__)
+
+"""Fingerprint mode that uses size and modification time of the input files. Cheap, but a file that is rewritten
+with the same content is regarded as changed."""
+FINGERPRINT_MODE_STAT = "stat"
+"""Fingerprint mode that uses a hash of the content of the input files. Files are only read again if their size or
+modification time have changed (see file_fingerprint)."""
+FINGERPRINT_MODE_CONTENT = "content"
+
+FINGERPRINT_MODES = (FINGERPRINT_MODE_STAT, FINGERPRINT_MODE_CONTENT)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+"""Maximum number of files whose content hashes are cached (least recently used hashes are dropped first)."""
+CONTENT_HASH_CACHE_SIZE = 10000
+
+# LRU cache of content hashes. Key is the path, value (size, mtime_ns, hex digest). Only the hash of the current
+# state of a file is kept.
+_contentHashCache = OrderedDict()
+_contentHashCacheLock = threading.Lock()
+
+
+def _content_hash(path, stat):
+    fileState = (stat.st_size, stat.st_mtime_ns)
+    with _contentHashCacheLock:
+        entry = _contentHashCache.get(path)
+        if entry is not None and entry[:2] == fileState:
+            _contentHashCache.move_to_end(path)
+            return entry[2]
+
+    fileHash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+            fileHash.update(chunk)
+    digest = fileHash.hexdigest()
+    with _contentHashCacheLock:
+        _contentHashCache[path] = fileState + (digest,)
+        _contentHashCache.move_to_end(path)
+        while len(_contentHashCache) > CONTENT_HASH_CACHE_SIZE:
+            _contentHashCache.popitem(last=False)
+    return digest
+
+
+def file_fingerprint(path, mode=FINGERPRINT_MODE_STAT):
+    """Returns a (JSON serializable) fingerprint of the file the path points to.
+    :param path: Path of the file. None is allowed.
+    :param mode: FINGERPRINT_MODE_STAT or FINGERPRINT_MODE_CONTENT. Directories are always fingerprinted by their
+        stat values."""
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+
+    if mode == FINGERPRINT_MODE_CONTENT and os.path.isfile(path):
+        return [stat.st_size, _content_hash(path, stat)]
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def normalize_config_value(value, mode=FINGERPRINT_MODE_STAT):
+    """Converts a configuration value into a JSON serializable representation that is stable between sessions
+    (e.g. callables are represented by their qualified name and not by their memory address). Artefacts are
+    represented by the fingerprint of their file.
+    :param mode: Mode used to fingerprint the files of artefacts (see FINGERPRINT_MODES).
+    """
+    if isinstance(value, Artefact):
+        return file_fingerprint(getArtefactProperty(value, defaultProps.URL), mode)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return sorted(
+            (
+                [str(key), normalize_config_value(item, mode)]
+                for key, item in value.items()
+            ),
+            key=lambda pair: pair[0],
+        )
+    if isinstance(value, (list, tuple)):
+        return [normalize_config_value(item, mode) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(
+            (normalize_config_value(item, mode) for item in value),
+            key=lambda item: json.dumps(item),
+        )
+    if callable(value) and hasattr(value, "__qualname__"):
+        return "{}.{}".format(getattr(value, "__module__", None), value.__qualname__)
+
+    valueType = type(value)
+    if valueType.__repr__ is object.__repr__ and valueType.__str__ is object.__str__:
+        # the default representation contains the memory address
+        return "{}.{}".format(valueType.__module__, valueType.__qualname__)
+    return str(value)
+
+
+def compute_fingerprint(config, inputArtefacts, mode=FINGERPRINT_MODE_STAT):
+    """Computes the input fingerprint of an action.
+    :param config: Configuration of the action (anything normalize_config_value can handle).
+    :param inputArtefacts: Dict with the input artefacts of the action. The keys are the input names, the values
+        lists of artefacts.
+    :param mode: Mode used to fingerprint the files of the input artefacts (see FINGERPRINT_MODES).
+    :return: Fingerprint as hex string."""
+    if mode not in FINGERPRINT_MODES:
+        raise ValueError(
+            "Unknown fingerprint mode: {}. Supported modes: {}".format(
+                mode, FINGERPRINT_MODES
+            )
+        )
+
+    inputs = list()
+    for inputName in sorted(inputArtefacts):
+        artefacts = inputArtefacts[inputName]
+        if artefacts is None:
+            continue
+        inputs.append(
+            [
+                inputName,
+                [
+                    file_fingerprint(
+                        getArtefactProperty(artefact, defaultProps.URL), mode
+                    )
+                    for artefact in artefacts
+                ],
+            ]
+        )
+
+    content = json.dumps(
+        {"config": normalize_config_value(config, mode), "inputs": inputs},
+        sort_keys=True,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
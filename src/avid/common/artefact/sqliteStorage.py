@@ -0,0 +1,459 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+SQLite based storage backend for artefact lists. It is meant for huge sessions where loading, saving and querying the
+XML file becomes the bottleneck. The layout of the database is:
+  - artefacts: one row per artefact (row order is the order of the list) with one column per default property
+    (except INPUT_IDS). The commonly selected properties are indexed.
+  - properties: key/value rows for all additional properties (and default properties without column).
+  - input_ids: edge table with the input ids of the artefacts (one row per input id).
+  - key_orders: the distinct orders of the default property keys of the artefacts, so that the order and the
+    presence of the default properties are restored exactly.
+Columns have no type affinity, so the types of the property values (e.g. int time points) are kept.
+"""
+
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+import uuid
+
+from avid.common.artefact import Artefact, CompactArtefact
+
+from . import defaultProps
+from .storage import ArtefactStorageBase
+
+logger = logging.getLogger(__name__)
+
+"""File extensions that are stored by the SQLite backend (see avid.common.artefact.fileHelper.get_artefact_storage)."""
+SQLITE_FILE_EXTENSIONS = (".avidb", ".sqlite", ".sqlite3", ".db")
+
+"""Version of the database layout."""
+CURRENT_SQLITE_VERSION = "1.0"
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+"""Number of artefacts whose rows are inserted at once by save. It bounds the memory needed for saving."""
+_INSERT_CHUNK_SIZE = 10000
+
+"""Default properties that are stored as columns of the artefacts table (in this order)."""
+_COLUMN_PROPERTIES = (
+    defaultProps.ID,
+    defaultProps.CASE,
+    defaultProps.CASEINSTANCE,
+    defaultProps.TIMEPOINT,
+    defaultProps.ACTIONTAG,
+    defaultProps.TYPE,
+    defaultProps.FORMAT,
+    defaultProps.URL,
+    defaultProps.OBJECTIVE,
+    defaultProps.RESULT_SUB_TAG,
+    defaultProps.RESULT_SUB_COUNT,
+    defaultProps.INVALID,
+    defaultProps.TIMESTAMP,
+    defaultProps.EXECUTION_DURATION,
+    defaultProps.ACTION_CLASS,
+    defaultProps.ACTION_INSTANCE_UID,
+)
+
+"""Columns of the artefacts table that get an index."""
+_INDEXED_COLUMNS = (
+    defaultProps.ID,
+    defaultProps.CASE,
+    defaultProps.TIMEPOINT,
+    defaultProps.ACTIONTAG,
+    defaultProps.TYPE,
+    defaultProps.OBJECTIVE,
+    defaultProps.INVALID,
+)
+
+_NATIVE_TYPES = (str, int, float)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_db_value(value):
+    """Converts a property value into a value that can be stored without loss of its type. Values that have no
+    native SQLite representation are stored as strings (like the XML storage does)."""
+    if value is None or isinstance(value, bool):
+        # bool is stored as integer, INVALID is converted back on loading.
+        return value
+    if isinstance(value, _NATIVE_TYPES):
+        return value
+    return str(value)
+
+
+class SQLiteArtefactStorage(ArtefactStorageBase):
+    """Storage backend that stores artefact lists in a SQLite database. Used for all files with an extension of
+    SQLITE_FILE_EXTENSIONS and all existing files that are SQLite databases."""
+
+    def __init__(self, file_extensions=SQLITE_FILE_EXTENSIONS):
+        ArtefactStorageBase.__init__(self, file_extensions=file_extensions)
+
+    def can_handle(self, filePath):
+        if ArtefactStorageBase.can_handle(self, filePath):
+            return True
+        try:
+            with open(filePath, "rb") as dbFile:
+                return dbFile.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+        except (OSError, TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _connect(filePath):
+        return sqlite3.connect(filePath)
+
+    def _create_tables(self, connection):
+        columns = ", ".join(_quote(key) for key in _COLUMN_PROPERTIES)
+        connection.execute("CREATE TABLE avid_meta (key TEXT PRIMARY KEY, value)")
+        connection.execute(
+            "CREATE TABLE artefacts (pos INTEGER PRIMARY KEY, {}, has_input_ids INTEGER NOT NULL,"
+            " key_order INTEGER NOT NULL)".format(columns)
+        )
+        connection.execute(
+            "CREATE TABLE properties (artefact INTEGER NOT NULL, key TEXT NOT NULL, value,"
+            " is_default INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE input_ids (artefact INTEGER NOT NULL, source TEXT NOT NULL, pos INTEGER, input_id)"
+        )
+        connection.execute(
+            "CREATE TABLE key_orders (id INTEGER PRIMARY KEY, keys TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO avid_meta (key, value) VALUES ('version', ?)",
+            (CURRENT_SQLITE_VERSION,),
+        )
+
+    @staticmethod
+    def _check_version(connection, filePath):
+        """Raises a ValueError if the database is no artefact database or has an unsupported layout version."""
+        try:
+            row = connection.execute(
+                "SELECT value FROM avid_meta WHERE key = 'version'"
+            ).fetchone()
+        except sqlite3.DatabaseError:
+            row = None
+        if row is None:
+            raise ValueError(
+                "Cannot load artefact list from file. File is no AVID artefact database. File path: "
+                + str(filePath)
+            )
+        if row[0] != CURRENT_SQLITE_VERSION:
+            raise ValueError(
+                "Cannot load artefact list from file. Version of the artefact database is not supported. Version:"
+                " {}; supported version: {}; file path: {}".format(
+                    row[0], CURRENT_SQLITE_VERSION, filePath
+                )
+            )
+
+    def _create_indexes(self, connection):
+        for key in _INDEXED_COLUMNS:
+            connection.execute(
+                "CREATE INDEX {} ON artefacts ({})".format(
+                    _quote("idx_artefacts_" + key), _quote(key)
+                )
+            )
+        connection.execute(
+            "CREATE INDEX idx_properties_artefact ON properties (artefact)"
+        )
+        connection.execute(
+            "CREATE INDEX idx_properties_key_value ON properties (key, value)"
+        )
+        connection.execute(
+            "CREATE INDEX idx_input_ids_artefact ON input_ids (artefact)"
+        )
+        connection.execute(
+            "CREATE INDEX idx_input_ids_input_id ON input_ids (input_id)"
+        )
+
+    def save(self, filePath, artefacts, rootPath=None, savePathsRelative=True):
+        if rootPath is None:
+            rootPath = os.path.split(filePath)[0]
+
+        try:
+            os.makedirs(os.path.split(filePath)[0])
+        except:
+            pass
+
+        if os.path.isfile(filePath):
+            os.remove(filePath)
+
+        connection = self._connect(filePath)
+        try:
+            # The file is written at once (and removed before), so no rollback journal is needed.
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+            with connection:
+                self._create_tables(connection)
+                keyOrders = dict()
+                rows = self._iter_rows(
+                    artefacts, rootPath, savePathsRelative, keyOrders
+                )
+                while True:
+                    chunk = list(itertools.islice(rows, _INSERT_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    connection.executemany(
+                        "INSERT INTO artefacts VALUES ({})".format(
+                            ", ".join("?" * (len(_COLUMN_PROPERTIES) + 3))
+                        ),
+                        (artefactRow for artefactRow, _, _ in chunk),
+                    )
+                    connection.executemany(
+                        "INSERT INTO properties (artefact, key, value, is_default) VALUES (?, ?, ?, ?)",
+                        (
+                            propertyRow
+                            for _, propertyRows, _ in chunk
+                            for propertyRow in propertyRows
+                        ),
+                    )
+                    connection.executemany(
+                        "INSERT INTO input_ids (artefact, source, pos, input_id) VALUES (?, ?, ?, ?)",
+                        (
+                            inputRow
+                            for _, _, inputRows in chunk
+                            for inputRow in inputRows
+                        ),
+                    )
+                connection.executemany(
+                    "INSERT INTO key_orders (id, keys) VALUES (?, ?)",
+                    (
+                        (orderID, json.dumps(keys))
+                        for keys, orderID in keyOrders.items()
+                    ),
+                )
+                # Creating the indexes after inserting is considerably faster than maintaining them.
+                self._create_indexes(connection)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _iter_rows(artefacts, rootPath, savePathsRelative, keyOrders):
+        """Generator that yields the rows of each artefact as tuple (artefact row, property rows, input id rows).
+        The distinct key orders of the default properties are collected in the dict keyOrders (keys -> id).
+        """
+        for pos, artefact in enumerate(artefacts):
+            props = artefact._defaultProps
+            row = [pos]
+            for key in _COLUMN_PROPERTIES:
+                value = props.get(key)
+                if key == defaultProps.URL and value is not None:
+                    if savePathsRelative:
+                        try:
+                            value = os.path.relpath(value, rootPath)
+                        except:
+                            logger.warning(
+                                "Artefact URL cannot be converted to be relative. Path is kept absolute. Artefact URL: %s",
+                                value,
+                            )
+                    value = value.replace("\\", "/")
+                row.append(_to_db_value(value))
+
+            inputIDs = props.get(defaultProps.INPUT_IDS)
+            row.append(inputIDs is not None)
+            row.append(keyOrders.setdefault(tuple(props), len(keyOrders)))
+
+            inputRows = list()
+            if inputIDs is not None:
+                for sourceName, ids in inputIDs.items():
+                    if ids is None:
+                        inputRows.append((pos, sourceName, None, None))
+                    else:
+                        for idPos, inputID in enumerate(ids):
+                            inputRows.append((pos, sourceName, idPos, inputID))
+
+            propertyRows = list()
+            for key, value in props.items():
+                if key not in _COLUMN_PROPERTIES and key != defaultProps.INPUT_IDS:
+                    propertyRows.append((pos, key, _to_db_value(value), True))
+            for key, value in artefact._additionalProps.items():
+                propertyRows.append((pos, key, _to_db_value(value), False))
+
+            yield row, propertyRows, inputRows
+
+    def iter_artefacts(self, filePath, expandPaths=False, rootPath=None, schema=None):
+        return self._iter_artefacts(
+            filePath, expandPaths=expandPaths, rootPath=rootPath, schema=schema
+        )
+
+    def query(
+        self, filePath, properties, expandPaths=False, rootPath=None, schema=None
+    ):
+        """Generator that yields only the artefacts of the file that match the passed property values. The selection
+        is done by the database (using its indexes), so only the matching artefacts are loaded.
+        Validity is not checked.
+        :param properties: Dict with the property keys and the values they must have. The value can also be a list
+            of values (any of them must match). None matches artefacts without (or with None) value.
+        For the other parameters see iter_artefacts.
+        """
+        return self._iter_artefacts(
+            filePath,
+            expandPaths=expandPaths,
+            rootPath=rootPath,
+            schema=schema,
+            properties=properties,
+        )
+
+    @staticmethod
+    def _build_conditions(properties):
+        conditions = list()
+        parameters = list()
+        for key, values in properties.items():
+            if isinstance(values, (list, tuple, set)):
+                values = list(values)
+            else:
+                values = [values]
+            dbValues = [_to_db_value(value) for value in values if value is not None]
+            matchNone = len(dbValues) < len(values)
+
+            if key in _COLUMN_PROPERTIES:
+                column = _quote(key)
+                keyConditions = list()
+                if dbValues:
+                    keyConditions.append(
+                        "{} IN ({})".format(column, ", ".join("?" * len(dbValues)))
+                    )
+                    parameters.extend(dbValues)
+                if matchNone:
+                    keyConditions.append("{} IS NULL".format(column))
+                conditions.append("(" + " OR ".join(keyConditions) + ")")
+            else:
+                keyConditions = list()
+                if dbValues:
+                    keyConditions.append(
+                        "pos IN (SELECT artefact FROM properties WHERE key = ? AND value IN ({}))".format(
+                            ", ".join("?" * len(dbValues))
+                        )
+                    )
+                    parameters.append(key)
+                    parameters.extend(dbValues)
+                if matchNone:
+                    keyConditions.append(
+                        "pos NOT IN (SELECT artefact FROM properties WHERE key = ? AND value IS NOT NULL)"
+                    )
+                    parameters.append(key)
+                conditions.append("(" + " OR ".join(keyConditions) + ")")
+        return conditions, parameters
+
+    def _iter_artefacts(
+        self, filePath, expandPaths=False, rootPath=None, schema=None, properties=None
+    ):
+        if rootPath is None and expandPaths is True:
+            rootPath = os.path.split(filePath)[0]
+        if not os.path.isfile(filePath):
+            raise ValueError(
+                "Cannot load artefact list from file. File does not exist. File path: "
+                + str(filePath)
+            )
+
+        connection = self._connect(filePath)
+        try:
+            self._check_version(connection, filePath)
+
+            query = "SELECT * FROM artefacts"
+            parameters = list()
+            selection = ""
+            if properties:
+                conditions, parameters = self._build_conditions(properties)
+                selection = " WHERE " + " AND ".join(conditions)
+                query += selection
+            query += " ORDER BY pos"
+
+            # Properties and input ids are stored in the order of the artefacts, so they can be merged with the
+            # artefact rows while iterating.
+            subSelection = ""
+            if selection:
+                subSelection = (
+                    " WHERE artefact IN (SELECT pos FROM artefacts{})".format(selection)
+                )
+            propertyRows = connection.execute(
+                "SELECT artefact, key, value, is_default FROM properties{} ORDER BY artefact, rowid".format(
+                    subSelection
+                ),
+                parameters,
+            )
+            inputRows = connection.execute(
+                "SELECT artefact, source, pos, input_id FROM input_ids{} ORDER BY artefact, rowid".format(
+                    subSelection
+                ),
+                parameters,
+            )
+            nextProperty = next(propertyRows, None)
+            nextInput = next(inputRows, None)
+            keyOrders = {
+                orderID: tuple(sys.intern(key) for key in json.loads(keys))
+                for orderID, keys in connection.execute(
+                    "SELECT id, keys FROM key_orders"
+                )
+            }
+
+            for row in connection.execute(query, parameters):
+                pos = row[0]
+                values = dict(zip(_COLUMN_PROPERTIES, row[1:-2]))
+                additionalP = dict()
+
+                inputIDs = dict() if row[-2] else None
+                while nextInput is not None and nextInput[0] == pos:
+                    sourceName, idPos, inputID = nextInput[1:]
+                    if idPos is None:
+                        inputIDs[sourceName] = None
+                    else:
+                        inputIDs.setdefault(sourceName, list()).append(inputID)
+                    nextInput = next(inputRows, None)
+                values[defaultProps.INPUT_IDS] = inputIDs
+
+                while nextProperty is not None and nextProperty[0] == pos:
+                    key, value, isDefault = nextProperty[1:]
+                    if isDefault:
+                        values[key] = value
+                    else:
+                        additionalP[key] = value
+                    nextProperty = next(propertyRows, None)
+
+                defaultP = {key: values.get(key) for key in keyOrders[row[-1]]}
+
+                invalid = defaultP.get(defaultProps.INVALID)
+                if invalid is not None:
+                    defaultP[defaultProps.INVALID] = bool(invalid)
+
+                url = defaultP.get(defaultProps.URL)
+                if url is not None:
+                    if rootPath is not None and not os.path.isabs(url):
+                        url = os.path.join(rootPath, url)
+                    defaultP[defaultProps.URL] = os.path.normpath(url)
+
+                if defaultP.get(defaultProps.ID) is None:
+                    defaultP[defaultProps.ID] = str(uuid.uuid1())
+                if defaultP.get(defaultProps.TIMESTAMP) is None:
+                    defaultP[defaultProps.TIMESTAMP] = str(time.time())
+
+                if schema is not None:
+                    yield CompactArtefact(
+                        schema, defaultP=defaultP, additionalP=additionalP
+                    )
+                else:
+                    yield Artefact(defaultP=defaultP, additionalP=additionalP)
+        finally:
+            connection.close()
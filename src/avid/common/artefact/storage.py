@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+
+from avid.common.artefact import ArtefactCollection
+
+from .validity import (
+    VALIDITY_CHECK_DEFERRED,
+    check_artefacts_validity,
+    defer_validity_check,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ArtefactStorageBase(object):
+    """Base class for storage backends of artefact lists (e.g. session files). A backend has to implement
+    iter_artefacts, save and can_handle. Backends are registered in avid.common.artefact.fileHelper
+    (see register_artefact_storage), which selects the backend for a file path.
+
+    :param file_extensions: File extensions (including the leading dot) the backend should be used for.
+    """
+
+    def __init__(self, file_extensions=None):
+        self.file_extensions = tuple(file_extensions) if file_extensions else tuple()
+
+    def can_handle(self, filePath):
+        """Indicates if the backend should be used for the passed file path. The default implementation checks the
+        file extension."""
+        return os.path.splitext(str(filePath))[1].lower() in self.file_extensions
+
+    def iter_artefacts(self, filePath, expandPaths=False, rootPath=None, schema=None):
+        """Generator that yields all artefacts stored in the file (in the stored order). Validity is not checked.
+        @param filePath Path where the artefact list is located.
+        @param expandPaths If true all relative url will be expanded by the rootPath
+        If rootPath is not set, it will be the directory of filePath
+        @param rootPath If defined any relative url in the list will expanded by the
+        root path. If rootPath is set, expandPaths is implicitly true.
+        @param schema If an ArtefactSchema is passed, the artefacts will be loaded as CompactArtefact instances
+        using this schema.
+        """
+        raise NotImplementedError("Reimplement in a derived class to function.")
+
+    def save(self, filePath, artefacts, rootPath=None, savePathsRelative=True):
+        """Saves any container with artefacts into the file.
+        @param filePath Path where the artefacts file should be stored.
+        @param savePathsRelative If true all pathes will be stored as relative path to the
+        passed root path. If rootPath is not set, it will be the directory of filePath
+        @param rootPath If defined any relative url in the list will expanded by the
+        root path.
+        """
+        raise NotImplementedError("Reimplement in a derived class to function.")
+
+    def load(
+        self,
+        filePath,
+        expandPaths=False,
+        rootPath=None,
+        replace_if_exists=True,
+        check_validity=True,
+        schema=None,
+        validity_check_workers=None,
+    ):
+        """Loads the artefacts stored in the file into an ArtefactCollection. Similar artefacts are merged (the
+        later one in the file wins). For the parameters see iter_artefacts and
+        avid.common.artefact.fileHelper.load_artefact_collection_from_xml."""
+        if not os.path.isfile(filePath):
+            raise ValueError(
+                "Cannot load artefact list from file. File does not exist. File path: "
+                + str(filePath)
+            )
+
+        artefacts = ArtefactCollection()
+
+        for artefact in self.iter_artefacts(
+            filePath, expandPaths=expandPaths, rootPath=rootPath, schema=schema
+        ):
+            replaced_artifact = artefacts.add_artefact(
+                artefact=artefact, replace_if_exists=replace_if_exists
+            )
+
+            if replaced_artifact is not None:
+                logger.warning(
+                    "Artefacts file contained similar artefact which will be overwritten."
+                    "\nOld artifact: %s"
+                    "\nNew artifact: %s",
+                    replaced_artifact,
+                    artefact,
+                )
+
+        if check_validity == VALIDITY_CHECK_DEFERRED:
+            defer_validity_check(artefacts, max_workers=validity_check_workers)
+        elif check_validity:
+            check_artefacts_validity(artefacts, max_workers=validity_check_workers)
+
+        return artefacts
@@ -0,0 +1,204 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+This module offers the checking of the validity (existence of the file an artefact URL points to) of many artefacts
+at once. Files are checked directory wise (one os.scandir per parent directory instead of one stat per file) and
+directories are processed by a thread pool, which pays off on network file systems with high latencies.
+Additionally, the check can be deferred: artefacts are registered as pending and are only checked when their
+validity is needed the first time (see resolve_deferred_validity).
+"""
+
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from . import defaultProps
+
+logger = logging.getLogger(__name__)
+
+"""Value for the check_validity arguments that indicates that validity should be checked deferred."""
+VALIDITY_CHECK_DEFERRED = "deferred"
+
+"""Default number of threads used to check the directories."""
+DEFAULT_VALIDITY_CHECK_WORKERS = 8
+
+"""If less files of one directory are checked, they are checked by os.path.isfile instead of scanning the directory.
+Scanning huge directories to check only a few files would be more expensive."""
+MIN_FILES_FOR_DIRECTORY_SCAN = 4
+
+
+def _check_directory(directory, file_names):
+    """Returns the set of the passed file names that are existing files in directory."""
+    if len(file_names) < MIN_FILES_FOR_DIRECTORY_SCAN:
+        return {
+            name for name in file_names if os.path.isfile(os.path.join(directory, name))
+        }
+
+    try:
+        with os.scandir(directory) as entries:
+            existing = {
+                entry.name
+                for entry in entries
+                if entry.name in file_names and entry.is_file()
+            }
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+    except OSError:
+        logger.debug(
+            "Cannot scan directory %s. Check files individually.",
+            directory,
+        )
+        existing = set()
+
+    # Names that were not found are checked individually. This covers e.g. case insensitive file systems or
+    # directories that cannot be listed.
+    for name in file_names:
+        if name not in existing and os.path.isfile(os.path.join(directory, name)):
+            existing.add(name)
+    return existing
+
+
+def check_files_exist(paths, max_workers=None):
+    """Checks for all passed paths if they point to an existing file.
+    :param paths: Iterable of file paths. None values are allowed and are never existing.
+    :param max_workers: Number of threads that are used to check the directories. If None
+        DEFAULT_VALIDITY_CHECK_WORKERS is used.
+    :return: Dict that maps each passed path onto a bool indicating its existence."""
+    if max_workers is None:
+        max_workers = DEFAULT_VALIDITY_CHECK_WORKERS
+
+    result = dict()
+    directories = dict()
+    for path in paths:
+        if path is None:
+            result[path] = False
+            continue
+        directory, name = os.path.split(os.path.abspath(path))
+        directories.setdefault(directory, dict()).setdefault(name, list()).append(path)
+
+    def check(item):
+        directory, names = item
+        return names, _check_directory(directory, names)
+
+    if max_workers > 1 and len(directories) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            checked = list(executor.map(check, directories.items()))
+    else:
+        checked = [check(item) for item in directories.items()]
+
+    for names, existing in checked:
+        for name, namePaths in names.items():
+            for path in namePaths:
+                result[path] = name in existing
+    return result
+
+
+def check_artefacts_validity(artefacts, max_workers=None):
+    """Checks for all passed artefacts if their URL points to an existing file. Artefacts where this is not the case
+    are marked as invalid (INVALID is set to True). Valid artefacts are not altered.
+    :param artefacts: Iterable of artefacts that should be checked.
+    :param max_workers: Number of threads that are used to check the directories (see check_files_exist).
+    :return: List of the artefacts that were marked as invalid."""
+    artefacts = list(artefacts)
+    existence = check_files_exist(
+        (artefact[defaultProps.URL] for artefact in artefacts), max_workers=max_workers
+    )
+
+    invalidated = list()
+    for artefact in artefacts:
+        if not existence[artefact[defaultProps.URL]]:
+            artefact[defaultProps.INVALID] = True
+            invalidated.append(artefact)
+            logger.info(
+                "Artefact had no valid URL. Set invalid property to true. Artefact: %s",
+                artefact,
+            )
+    return invalidated
+
+
+class _DeferredValidityRegistry(object):
+    """Keeps track of artefacts whose validity has not been checked yet. Artefacts are registered by identity,
+    because similar artefacts (same hash) of different collections have to be checked individually.
+    The registry only holds weak references, so artefacts that are removed or replaced (and not used anymore) are
+    dropped from the registry and not kept alive until the next resolve.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id -> artefact; entries vanish with their artefacts, so ids reused by new objects are not pending.
+        self._pending = weakref.WeakValueDictionary()
+        self.max_workers = None
+
+    def register(self, artefacts):
+        with self._lock:
+            for artefact in artefacts:
+                self._pending[id(artefact)] = artefact
+
+    def is_pending(self, artefact):
+        return artefact is not None and self._pending.get(id(artefact)) is artefact
+
+    def __len__(self):
+        return len(self._pending)
+
+    def resolve(self, artefacts=None):
+        if not len(self._pending):
+            return []
+
+        with self._lock:
+            if artefacts is None:
+                resolved = list(self._pending.values())
+                self._pending.clear()
+            else:
+                resolved = list()
+                for artefact in artefacts:
+                    if self.is_pending(artefact):
+                        del self._pending[id(artefact)]
+                        resolved.append(artefact)
+
+        if not resolved:
+            return []
+        return check_artefacts_validity(resolved, max_workers=self.max_workers)
+
+
+_deferredValidity = _DeferredValidityRegistry()
+
+
+def defer_validity_check(artefacts, max_workers=None):
+    """Registers the passed artefacts for a deferred validity check. Their validity is checked when
+    resolve_deferred_validity is called for them (e.g. by ValiditySelector or when an action checks if it has to
+    be executed).
+    :param max_workers: Number of threads that should be used when the check is resolved. If None, the last
+        passed value (or DEFAULT_VALIDITY_CHECK_WORKERS) is kept."""
+    if max_workers is not None:
+        _deferredValidity.max_workers = max_workers
+    _deferredValidity.register(artefacts)
+
+
+def has_deferred_validity(artefact):
+    """Indicates if the validity of the passed artefact was deferred and has not been checked yet."""
+    return _deferredValidity.is_pending(artefact)
+
+
+def resolve_deferred_validity(artefacts=None):
+    """Checks the validity of all passed artefacts that are still pending due to defer_validity_check. All other
+    artefacts are ignored. If artefacts is None, all pending artefacts are checked.
+    :return: List of the artefacts that were marked as invalid."""
+    return _deferredValidity.resolve(artefacts)
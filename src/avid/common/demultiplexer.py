@@ -19,7 +19,12 @@
 from builtins import object, str
 
 import avid.common.workflow as workflow
-from avid.common.artefact import get_all_values_of_a_property
+from avid.common.artefact import (
+    MISSING_PROPERTY,
+    ArtefactCollection,
+    _make_hashable,
+    get_all_values_of_a_property,
+)
 from avid.selectors import SelectorBase
 from avid.selectors.keyValueSelector import KeyValueSelector
 
@@ -67,27 +72,99 @@ def getSelectors(propKey, selector=SelectorBase(), workflowData=None):
     return demux.getSelectors()
 
 
+def _partitionGroups(groupKeys, level, nLevels):
+    """Recursively partitions the passed group keys (tuples with one value per split property) like the selectors of
+    getSelectors would do for each split property one after another.
+    :return: List of lists of group keys. Each list represents one split."""
+    if level == nLevels:
+        return [groupKeys]
+
+    groupsByValue = dict()
+    for groupKey in groupKeys:
+        groupsByValue.setdefault(groupKey[level], list()).append(groupKey)
+
+    missingGroups = groupsByValue.pop(MISSING_PROPERTY, list())
+    if not groupsByValue:
+        # split does not contain value so keep as is
+        return _partitionGroups(groupKeys, level + 1, nLevels)
+
+    result = list()
+    for value in sorted(groupsByValue):
+        valueGroups = groupsByValue[value]
+        if value is None:
+            # KeyValueSelector also selects artefacts without the property if the value is None
+            valueGroups = valueGroups + missingGroups
+        result.extend(_partitionGroups(valueGroups, level + 1, nLevels))
+    return result
+
+
 def splitArtefact(inputArtefacts, *splitArgs):
     """
     Convenience helper function. Takes a list of artefacts and will split them by the given list of split arguments
     /properties. The function will return a list of splitted artefact lists.
+    The artefacts are partitioned in one pass by the tuple of their values of all split properties. The result is
+    the same as splitting by one property after another with the selectors of getSelectors: The splits are ordered
+    by the (sorted) values of the properties and the artefacts of a split keep their order. If no artefact of a split
+    has a property, the split is kept as is for this property; artefacts without a property are only kept if the
+    property value None exists in the split.
     :param splitArgs: The function assumes that all unkown arguments passed to the function should be handled as split
     properties.
     """
-    splittedA = [inputArtefacts.copy()]
-
-    for splitProperty in splitArgs:
-        newSplits = list()
-        for oldSplits in splittedA:
-            splitDict = getSelectors(str(splitProperty), workflowData=oldSplits)
-            if len(splitDict) == 0:
-                # split does not contain value so keep as is
-                newSplits.append(oldSplits)
+    if len(splitArgs) == 0:
+        return [inputArtefacts.copy()]
+
+    splitKeys = [str(splitProperty) for splitProperty in splitArgs]
+
+    if isinstance(inputArtefacts, ArtefactCollection):
+        artefactDict = inputArtefacts.artefact_dict
+        indexedProperties = inputArtefacts.indexed_properties
+    else:
+        artefactDict = ArtefactCollection(inputArtefacts).artefact_dict
+        indexedProperties = None
+
+    # group key -> list of the hashes of the artefacts (in the order of the input)
+    groups = dict()
+    for artefactHash, artefact in artefactDict.items():
+        values = list()
+        for splitKey in splitKeys:
+            if splitKey in artefact:
+                value = artefact[splitKey]
+                if isinstance(value, (dict, list, set, tuple)):
+                    value = _make_hashable(value)
             else:
-                for splitID in splitDict:
-                    relevantSelector = splitDict[splitID]
-                    relevantInputs = relevantSelector.getSelection(oldSplits)
-                    newSplits.append(relevantInputs)
-        splittedA = newSplits
+                value = MISSING_PROPERTY
+            values.append(value)
+        groupKey = tuple(values)
+        group = groups.get(groupKey)
+        if group is None:
+            groups[groupKey] = [artefactHash]
+        else:
+            group.append(artefactHash)
 
-    return splittedA
+    positions = None
+    splits = list()
+    for splitGroupKeys in _partitionGroups(list(groups), 0, len(splitKeys)):
+        if len(splitGroupKeys) == 1:
+            members = groups[splitGroupKeys[0]]
+        else:
+            # only happens if artefacts without a property are added to the split of the value None
+            if positions is None:
+                positions = {
+                    artefactHash: position
+                    for position, artefactHash in enumerate(artefactDict)
+                }
+            members = sorted(
+                (
+                    artefactHash
+                    for groupKey in splitGroupKeys
+                    for artefactHash in groups[groupKey]
+                ),
+                key=positions.__getitem__,
+            )
+        split = ArtefactCollection(indexed_properties=indexedProperties)
+        split.artefact_dict = {
+            artefactHash: artefactDict[artefactHash] for artefactHash in members
+        }
+        splits.append(split)
+
+    return splits
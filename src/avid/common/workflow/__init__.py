@@ -22,15 +22,25 @@ import os
 import shutil
 import threading
 from builtins import object, str
+from collections import Counter, deque
 from pathlib import Path
 
 import avid.common.artefact.fileHelper as fileHelper
 import avid.common.patientNumber as patientNumber
-from avid.common.artefact import ArtefactCollection, update_artefacts
+from avid.common.artefact import ArtefactCollection, ArtefactSchema, update_artefacts
+from avid.common.artefact.fingerprint import FINGERPRINT_MODES
+from avid.common.artefact.validity import (
+    VALIDITY_CHECK_DEFERRED,
+    check_artefacts_validity,
+    defer_validity_check,
+)
 from avid.common.console_abstraction import Console, Progress, get_logging_handler
 from avid.common.workflow.structure_definitions import loadStructurDefinition_xml
 
+from .journal import SessionJournal, get_journal_path
 from .report import create_actions_report, print_action_diagnostics
+from .sessionWriter import DEFAULT_WRITE_INTERVAL, SessionWriter
+from .workerPool import WorkerPool
 
 """set when at least one session was initialized to ensure this stream is only
  generated once, even if multiple sessions are generated in one run (e.g. in tests)"""
@@ -45,23 +55,53 @@ def initSession(
     autoSave=False,
     interim_session_save=False,
     interim_save_interval=1,
+    async_session_save=False,
+    async_save_interval=DEFAULT_WRITE_INTERVAL,
+    session_snapshot_interval=None,
+    input_fingerprinting=None,
     debug=False,
     structDefinition=None,
     overwriteExistingSession=False,
     initLogging=True,
     updateBootstrap=False,
+    compactArtefacts=False,
+    checkValidity=True,
+    validityCheckWorkers=None,
 ):
     """Convenience method to init a session and load the artefact list of the
     if it is already present.
 
     :param sessionPath: Path of the stored artefact list the session should use
         and the rootpath for the new session. If no artefact list is present it will
-        just be the rootpath of the new session.
+        just be the rootpath of the new session. The storage format is determined by
+        the file (see fileHelper.get_artefact_storage); e.g. *.avidb files are stored
+        as SQLite databases, *.avid files as XML.
     :param name: name of the session. If not set it will be '<session file name>_content'
     :param structDefinition: Path to the structure definition file.
     :param autoSave: Indicates if the session should be saved when a session requested_scope is left and Session.__exit__()
         is called
     :param overwriteExistingSession: Indicates
+    :param interim_session_save: If True, every artefact added to the session is appended to the journal of the
+        session (see avid.common.workflow.journal). If the session is not left properly (e.g. due to a crash), the
+        journal is replayed the next time the session is initialized.
+    :param interim_save_interval: Number of artefacts appended to the journal before it is synchronized to disk.
+    :param async_session_save: If True, interim saves are done by a background writer thread (see
+        avid.common.workflow.sessionWriter). Adding an artefact then only enqueues it; the writer appends all
+        artefacts added within async_save_interval at once to the journal. Implies interim_session_save.
+    :param async_save_interval: Interval (in seconds) of the journal writes of the background writer.
+    :param session_snapshot_interval: Interval (in seconds) in which the background writer stores the complete
+        session in the session file. If None, the session file is only written when the session is left.
+    :param input_fingerprinting: If set, actions store a fingerprint of their configuration and input files in
+        their outputs and only skip the processing if the fingerprint of the existing outputs is unchanged (see
+        avid.common.artefact.fingerprint). Value is the fingerprint mode (FINGERPRINT_MODE_STAT or
+        FINGERPRINT_MODE_CONTENT). If None, actions are skipped if valid outputs exist (independent of changes).
+    :param compactArtefacts: If True, the artefacts of the session file and the bootstrap file are loaded as
+        CompactArtefact instances that share the schema of the session (Session.artefactSchema). This reduces the
+        memory footprint of sessions with a very large number of artefacts.
+    :param checkValidity: Indicates if the URLs of the loaded artefacts should be checked (artefacts without existing
+        file are marked as invalid). Set to avid.common.artefact.validity.VALIDITY_CHECK_DEFERRED to only check the
+        artefacts when their validity is needed (e.g. by ValiditySelector or to decide if an action must be executed).
+    :param validityCheckWorkers: Number of threads used to check the validity of the loaded artefacts.
     """
     sessionExists = False
 
@@ -81,11 +121,17 @@ def initSession(
     session = Session(
         name,
         rootPath,
-        auto_save=autoSave or interim_session_save,
-        interim_session_save=interim_session_save,
+        auto_save=autoSave or interim_session_save or async_session_save,
+        interim_session_save=interim_session_save or async_session_save,
         interim_save_interval=interim_save_interval,
+        async_session_save=async_session_save,
+        async_save_interval=async_save_interval,
+        session_snapshot_interval=session_snapshot_interval,
+        input_fingerprinting=input_fingerprinting,
         debug=debug,
     )
+    if compactArtefacts:
+        session.artefactSchema = ArtefactSchema()
 
     # logging setup
     logginglevel = logging.INFO
@@ -133,8 +179,12 @@ def initSession(
 
     if sessionExists:
         if not overwriteExistingSession:
-            artefacts = fileHelper.load_artefact_collection_from_xml(
-                sessionPath, expandPaths
+            artefacts = fileHelper.load_artefact_collection(
+                sessionPath,
+                expandPaths,
+                schema=session.artefactSchema,
+                check_validity=checkValidity,
+                validity_check_workers=validityCheckWorkers,
             )
             rootlogger.debug(
                 "Number of artefacts loaded from session: %s. Session path: %s",
@@ -148,8 +198,12 @@ def initSession(
 
     if bootstrapArtefacts is not None and (len(artefacts) == 0 or updateBootstrap):
         rootlogger.debug("Load artefacts from bootstrap file: %s", bootstrapArtefacts)
-        bootstrapped_artefacts = fileHelper.load_artefact_collection_from_xml(
-            bootstrapArtefacts, expandPaths
+        bootstrapped_artefacts = fileHelper.load_artefact_collection(
+            bootstrapArtefacts,
+            expandPaths,
+            schema=session.artefactSchema,
+            check_validity=checkValidity,
+            validity_check_workers=validityCheckWorkers,
         )
         rootlogger.debug(
             "Number of artefacts loaded from bootstrap file: %s.",
@@ -157,6 +211,30 @@ def initSession(
         )
         update_artefacts(artefacts, bootstrapped_artefacts)
 
+    journal = SessionJournal(get_journal_path(sessionPath))
+    if journal.exists():
+        if overwriteExistingSession:
+            journal.clear()
+        else:
+            # The session was not finished properly, so the artefacts stored in its journal are recovered.
+            replayed_artefacts = ArtefactCollection(
+                journal.replay(schema=session.artefactSchema)
+            )
+            if checkValidity == VALIDITY_CHECK_DEFERRED:
+                defer_validity_check(
+                    replayed_artefacts, max_workers=validityCheckWorkers
+                )
+            elif checkValidity:
+                check_artefacts_validity(
+                    replayed_artefacts, max_workers=validityCheckWorkers
+                )
+            rootlogger.info(
+                "Recovered %s artefacts from the journal of the session. Journal: %s",
+                len(replayed_artefacts),
+                journal.path,
+            )
+            update_artefacts(artefacts, replayed_artefacts, update_existing=True)
+
     session.artefacts.extend(artefacts)
 
     # other setup stuff
@@ -188,7 +266,8 @@ def getSessionParser(sessionPath=None):
             " should be stored. If the file exists, the content will be read in"
             " and reused. After the session is finished all artefacts (including"
             " newly generated once) are stored back. 2) It defines the root"
-            " location where all the data is stored.",
+            " location where all the data is stored. Sessions with the extension"
+            " .avidb are stored as SQLite database instead of xml.",
         )
     else:
         parser.add_argument(
@@ -198,7 +277,8 @@ def getSessionParser(sessionPath=None):
             " xml should be stored. If the file exists, the content will be"
             " read in and reused. After the session is finished all artefacts"
             " (including newly generated once) are stored back. 2) It defines"
-            " the root location where all the data is stored.",
+            " the root location where all the data is stored. Sessions with the"
+            " extension .avidb are stored as SQLite database instead of xml.",
         )
 
     parser.add_argument(
@@ -235,12 +315,25 @@ def getSessionParser(sessionPath=None):
         "--noInterimSave",
         action="store_true",
         help="Indicates that a session, should one store its new state after everything is processed. If not set, "
-        "the session file will be actualized with every new artefact stored in the session.",
+        "every new artefact stored in the session will be appended to the session journal.",
+    )
+    parser.add_argument(
+        "--asyncSessionSave",
+        action="store_true",
+        help="Indicates that interim saves of the session should be done by a background writer thread, so that "
+        "actions do not have to wait for disk I/O.",
+    )
+    parser.add_argument(
+        "--inputFingerprinting",
+        choices=FINGERPRINT_MODES,
+        help="Activates input fingerprinting. Actions then only skip the processing if their existing outputs were"
+        " generated with the same action configuration and unchanged input files. 'stat' compares size and"
+        " modification time of the input files, 'content' compares hashes of their content.",
     )
     parser.add_argument(
         "--interimSaveInterval",
         type=int,
-        help="The number of new artefacts that need to be added until another interim save is performed. Only relevant when interim saves are active.",
+        help="The number of new artefacts that need to be added to the session journal until it is synchronized to disk. Only relevant when interim saves are active.",
     )
     return parser
 
@@ -276,6 +369,10 @@ def initSession_byCLIargs(sessionPath=None, **args):
         args["structDefinition"] = cliargs.structDefinition
     if not "noInterimSave" in args and cliargs.noInterimSave is not None:
         args["interim_session_save"] = not cliargs.overwriteExistingSession
+    if not "async_session_save" in args and cliargs.asyncSessionSave:
+        args["async_session_save"] = True
+    if not "input_fingerprinting" in args and cliargs.inputFingerprinting is not None:
+        args["input_fingerprinting"] = cliargs.inputFingerprinting
     if not "interimSaveInterval" in args and cliargs.interimSaveInterval is not None:
         args["interim_save_interval"] = cliargs.interimSaveInterval
 
@@ -290,6 +387,10 @@ class Session(object):
         auto_save=False,
         interim_session_save=False,
         interim_save_interval=1,
+        async_session_save=False,
+        async_save_interval=DEFAULT_WRITE_INTERVAL,
+        session_snapshot_interval=None,
+        input_fingerprinting=None,
         debug=False,
         auto_error_report=False,
         auto_warning_report=False,
@@ -319,9 +420,17 @@ class Session(object):
         # be processed by the action if nothing is explicitly defined by the user.
         self.structureDefinitions = dict()
 
-        # List of all executed (SingleActionBase based) actions that where executed for that session
+        # List of all executed (SingleActionBase based) actions that where executed for that session. Actions that
+        # are not retained after their processing (see ActionBase.retainAfterProcessing) are only counted per result.
         self.executed_actions = list()
-        self.artefacts = ArtefactCollection()
+        self._released_action_counts = Counter()
+        self._artefacts = ArtefactCollection()
+        # Artefacts registered by add_artefact that are not merged into the collection yet (see Session.artefacts).
+        # deque.append and deque.popleft are thread safe, so registering needs no lock.
+        self._pending_artefacts = deque()
+
+        # Schema shared by all compact artefacts of the session. If None, artefacts are loaded as normal artefacts.
+        self.artefactSchema = None
 
         # That is a list of all batch actions assigned to this session.
         self._batch_actions = list()
@@ -332,8 +441,31 @@ class Session(object):
 
         self.autoSave = auto_save
         self.interimSessionSave = interim_session_save
+        # Number of artefacts added to the journal before it is synchronized to disk
         self.interim_save_interval = interim_save_interval
         self.unsaved_artefacts_counter = 0
+        # Journal of the interim session saves. It is created lazily (see Session.journal)
+        self._journal = None
+        # If set, interim saves are done by a background writer (see Session.writer)
+        self.asyncSessionSave = async_session_save
+        self.async_save_interval = async_save_interval
+        self.session_snapshot_interval = session_snapshot_interval
+        self._writer = None
+        # Pool of worker threads shared by the schedulers of the session. It is created lazily (see
+        # Session.getWorkerPool)
+        self._worker_pool = None
+        # Fingerprint mode used by actions to decide if existing outputs are up to date (see
+        # avid.common.artefact.fingerprint). If None, input fingerprinting is not active.
+        if (
+            input_fingerprinting is not None
+            and input_fingerprinting not in FINGERPRINT_MODES
+        ):
+            raise ValueError(
+                "Unknown input fingerprinting mode: {}. Supported modes: {}".format(
+                    input_fingerprinting, FINGERPRINT_MODES
+                )
+            )
+        self.inputFingerprinting = input_fingerprinting
 
         self.auto_error_report = auto_error_report
         self.auto_warning_report = auto_warning_report
@@ -352,6 +484,9 @@ class Session(object):
         # Lookup that is used to map an action tag to a task id for the progress indicator.
         # This lookup is only valid and set if a progress indicator is defined.
         self.__progress_task_lookup = dict()
+        # Lock for the progress indicator and console output. It is separate from the session lock, so reporting
+        # does not block threads that use the session.
+        self._report_lock = threading.Lock()
 
     def __del__(self):
         global currentGeneratedSession
@@ -362,20 +497,25 @@ class Session(object):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdownWorkerPool(cancelPending=exc_type is not None)
+
         if self.autoSave:
             logging.debug(
                 "Auto saving artefact of current session. File path: %s.",
                 self._lastStoredLocation,
             )
-            fileHelper.save_artefacts_to_xml(
-                self._lastStoredLocation, self.artefacts, self.rootPath
-            )
+            self.compact_journal()
+        else:
+            if self._writer is not None:
+                self._writer.close()
+            if self._journal is not None:
+                self._journal.close()
 
         logging.info(
-            f"Successful actions (with warnings): {len(self.getSuccessfulActions())} "
-            f"({len(self.getSuccessfulActions())})."
+            f"Successful actions (with warnings): {self.getNumberOfSuccessfulActions()} "
+            f"({self.getNumberOfSuccessfulActions()})."
         )
-        logging.info("Skipped actions: %s.", len(self.getSkippedActions()))
+        logging.info("Skipped actions: %s.", self.getNumberOfSkippedActions())
         if self.auto_warning_report:
             actions_with_warning = self.getSuccessfulActionsWithWarnings()
             if len(actions_with_warning) > 0:
@@ -414,6 +554,26 @@ class Session(object):
                 )
         logging.info("Session finished. Feed me more...")
 
+    def getWorkerPool(self, threadcount):
+        """Returns the pool of worker threads of the session. It is created with the first call and lives until the
+        session is exited (or shutdownWorkerPool is called), so schedulers (e.g. ThreadingScheduler) can reuse the
+        threads for all batch actions. The pool is extended if it has less than threadcount workers.
+        """
+        with self.lock:
+            if self._worker_pool is None or self._worker_pool.isShutdown:
+                self._worker_pool = WorkerPool(threadcount)
+            else:
+                self._worker_pool.ensureThreads(threadcount)
+            return self._worker_pool
+
+    def shutdownWorkerPool(self, cancelPending=False):
+        """Stops the worker threads of the session (if a worker pool exists)."""
+        with self.lock:
+            pool = self._worker_pool
+            self._worker_pool = None
+        if pool is not None:
+            pool.shutdown(cancelPending=cancelPending)
+
     @property
     def definedStructures(self):
         return list(self.structureDefinitions.keys())
@@ -463,29 +623,138 @@ class Session(object):
         with self.lock:
             self.actionTools[actionID] = entry
 
+    """Number of pending artefacts from which on the thread that registers an artefact tries to merge them into
+    the collection (only if the session lock is free)."""
+    pending_merge_threshold = 256
+
+    @property
+    def artefacts(self):
+        """Artefact collection of the session. Artefacts registered by add_artefact that are still pending are merged
+        before the collection is returned."""
+        if self._pending_artefacts:
+            self.merge_pending_artefacts()
+        return self._artefacts
+
+    @artefacts.setter
+    def artefacts(self, value):
+        with self.lock:
+            self._pending_artefacts.clear()
+            self._artefacts = value
+
+    def merge_pending_artefacts(self):
+        """Merges all artefacts registered by add_artefact into the artefact collection of the session (in the order
+        they were registered)."""
+        with self.lock:
+            merged = 0
+            while True:
+                try:
+                    artefact = self._pending_artefacts.popleft()
+                except IndexError:
+                    break
+                self._artefacts.add_artefact(artefact)
+                merged += 1
+            self.unsaved_artefacts_counter += merged
+
+    @property
+    def journal(self):
+        """Journal used for interim session saves (see avid.common.workflow.journal). It is located next to the
+        session file. Returns None if the session has no stored location."""
+        journal = self._journal
+        location = self._lastStoredLocation
+        if (
+            journal is not None
+            and location
+            and journal.path == get_journal_path(location)
+        ):
+            return journal
+        with self.lock:
+            if not self._lastStoredLocation:
+                return None
+            journalPath = get_journal_path(self._lastStoredLocation)
+            if self._journal is None or self._journal.path != journalPath:
+                if self._journal is not None:
+                    self._journal.close()
+                self._journal = SessionJournal(
+                    journalPath, sync_interval=self.interim_save_interval
+                )
+            return self._journal
+
+    @property
+    def writer(self):
+        """Background writer used for asynchronous interim session saves (see avid.common.workflow.sessionWriter).
+        It is created lazily and started when the first artefact is added. Returns None if asynchronous saves are not
+        active."""
+        if not self.asyncSessionSave:
+            return None
+        if self._writer is not None:
+            return self._writer
+        with self.lock:
+            if self._writer is None:
+                self._writer = SessionWriter(
+                    self,
+                    write_interval=self.async_save_interval,
+                    snapshot_interval=self.session_snapshot_interval,
+                )
+            return self._writer
+
     def add_artefact(self, artefact_entry):
         """
         This method adds an arbitrary artefact entry to the artefact collection.
+        The artefact is only registered without locking the session; registered artefacts are merged into the
+        collection in bulk as soon as the collection is accessed (see Session.artefacts).
+        If interim session saves are active, the artefact is also appended to the journal of the session (or
+        enqueued for the background writer if asynchronous saves are active).
         """
-        with self.lock:
-            self.artefacts.add_artefact(artefact_entry)
-            self.unsaved_artefacts_counter += 1
+        self._pending_artefacts.append(artefact_entry)
+
+        if self.asyncSessionSave:
+            writer = self.writer
+            writer.start()
+            writer.enqueue(artefact_entry)
+        elif self.interimSessionSave:
             try:
-                if (
-                    self.interimSessionSave
-                    and (self.unsaved_artefacts_counter % self.interim_save_interval)
-                    == 0
-                ):
-                    logging.debug(
-                        "Auto saving artefact of current session. File path: %s.",
-                        self._lastStoredLocation,
-                    )
-                    fileHelper.save_artefacts_to_xml(
-                        self._lastStoredLocation, self.artefacts, self.rootPath
-                    )
-                    self.unsaved_artefacts_counter = 0
-            except:
-                pass
+                journal = self.journal
+                if journal is not None:
+                    journal.append(artefact_entry)
+            except Exception as e:
+                logging.warning(
+                    "Cannot append artefact to session journal. Error: %s", e
+                )
+
+        if len(self._pending_artefacts) >= self.pending_merge_threshold:
+            # Only merge if no other thread holds the session, otherwise the merge is left to that thread or the
+            # next access of the collection.
+            if self.lock.acquire(blocking=False):
+                try:
+                    self.merge_pending_artefacts()
+                finally:
+                    self.lock.release()
+
+    def compact_journal(self):
+        """Stores all artefacts of the session in the session file and removes the journal afterwards. The session
+        file is replaced atomically, so it is never left in a partially written state.
+        """
+        # The writer has to be stopped before the session is locked, because a running snapshot needs the lock.
+        if self._writer is not None:
+            self._writer.close()
+        with self.lock:
+            if not self._lastStoredLocation:
+                return
+            self._write_session_file(self.artefacts)
+            self.journal.clear()
+            self.unsaved_artefacts_counter = 0
+
+    def _write_session_file(self, artefacts):
+        """Stores the passed artefacts in the session file. The file is written as temporary file that replaces
+        the session file afterwards."""
+        location = self._lastStoredLocation
+        logging.debug("Saving artefacts of current session. File path: %s.", location)
+        # The backend is determined by the final location, because the temporary file has no meaningful
+        # extension.
+        storage = fileHelper.get_artefact_storage(location)
+        tempPath = location + os.extsep + "tmp"
+        storage.save(tempPath, artefacts, self.rootPath)
+        os.replace(tempPath, location)
 
     def getFailedActions(self):
         """Returns all actions of the session that have failed."""
@@ -500,7 +769,8 @@ class Session(object):
         return failedActions
 
     def getSkippedActions(self):
-        """Returns all actions of the session that have been skipped."""
+        """Returns all actions of the session that have been skipped. Actions that are not retained after their
+        processing are not returned."""
         skippedActions = []
 
         with self.lock:
@@ -510,8 +780,17 @@ class Session(object):
 
         return skippedActions
 
+    def getNumberOfSkippedActions(self):
+        """Returns the number of skipped actions, including the actions that are not retained."""
+        from avid.actions import ActionBase
+
+        with self._report_lock:
+            released = self._released_action_counts[ActionBase.ACTION_SKIPPED]
+        return len(self.getSkippedActions()) + released
+
     def getSuccessfulActions(self):
-        """Returns all actions of the session that have been successful."""
+        """Returns all actions of the session that have been successful. Actions that are not retained after their
+        processing are not returned."""
         succActions = []
 
         with self.lock:
@@ -521,6 +800,14 @@ class Session(object):
 
         return succActions
 
+    def getNumberOfSuccessfulActions(self):
+        """Returns the number of successful actions, including the actions that are not retained."""
+        from avid.actions import ActionBase
+
+        with self._report_lock:
+            released = self._released_action_counts[ActionBase.ACTION_SUCCESS]
+        return len(self.getSuccessfulActions()) + released
+
     def getSuccessfulActionsWithWarnings(self):
         """Returns all actions of the session that have been successful but with warnings."""
         succActions = []
@@ -539,69 +826,75 @@ class Session(object):
         return len(failedActions) != 0
 
     def addProcessedActionInstance(self, action):
-        """Adds an action to the session instance as processed action"""
-        with self.lock:
-            from avid.actions import BatchActionBase, SingleActionBase
+        """Adds an action to the session instance as processed action.
+        The session is not locked; progress and console updates only lock the reporting of the session.
+        """
+        from avid.actions import BatchActionBase, SingleActionBase
 
-            if isinstance(action, SingleActionBase):
+        if isinstance(action, SingleActionBase):
+            if action.retainAfterProcessing or action.isFailure or action.has_warnings:
+                # list.append is thread safe
                 self.executed_actions.append(action)
-                logging.debug("stored action token: %s", action)
-
-                if self._progress_indicator:
-                    action_state_indicator = "."
-                    if action.isSuccess:
-                        if action.has_warnings:
-                            action_state_indicator = "W"
-                    elif action.isSkipped:
-                        action_state_indicator = "S"
-                    else:
-                        action_state_indicator = "E"
-
-                    if not action.actionTag in self.__progress_task_lookup:
-                        # action is not registered so for, do that on the fly
-                        self.__progress_task_lookup[action.actionTag] = (
-                            self._progress_indicator.add_task(
-                                action.actionTag, total=None
-                            )
-                        )
+            else:
+                with self._report_lock:
+                    self._released_action_counts[action.last_exec_state] += 1
+            logging.debug("stored action token: %s", action)
 
+            if self._progress_indicator:
+                action_state_indicator = "."
+                if action.isSuccess:
+                    if action.has_warnings:
+                        action_state_indicator = "W"
+                elif action.isSkipped:
+                    action_state_indicator = "S"
+                else:
+                    action_state_indicator = "E"
+
+                with self._report_lock:
                     self._progress_indicator.update(
-                        task_id=self.__progress_task_lookup[action.actionTag],
+                        task_id=self._get_progress_task(action.actionTag),
                         advance=1,
                         action_state_indicator=action_state_indicator,
                     )
 
-                if not self._console is None and action.isFailure:
+            if not self._console is None and action.isFailure:
+                with self._report_lock:
                     self._console.print(f"\n[red]Failed action diagnostics[/red]")
                     print_action_diagnostics(
                         action, console=self._console, debug=self.debug
                     )
                     self._console.print("\n")
-            elif isinstance(action, BatchActionBase):
-                if self._progress_indicator:
-                    if not action.actionTag in self.__progress_task_lookup:
-                        # action is not registered so for, do that on the fly
-                        self.__progress_task_lookup[action.actionTag] = (
-                            self._progress_indicator.add_task(
-                                action.actionTag, total=None
-                            )
-                        )
-
+        elif isinstance(action, BatchActionBase):
+            if self._progress_indicator:
+                with self._report_lock:
                     self._progress_indicator.update(
-                        task_id=self.__progress_task_lookup[action.actionTag],
+                        task_id=self._get_progress_task(action.actionTag),
                         completed=action.number_of_actions,
                     )
 
+    def _get_progress_task(self, actionTag):
+        """Returns the task id of the progress indicator for the action tag. Must be called with the report lock."""
+        if not actionTag in self.__progress_task_lookup:
+            # action is not registered so for, do that on the fly
+            self.__progress_task_lookup[actionTag] = self._progress_indicator.add_task(
+                actionTag, total=None
+            )
+        return self.__progress_task_lookup[actionTag]
+
     def registerBatchAction(self, batch_action):
         self._batch_actions.append(batch_action)
 
-    def run_batches(self, from_action=None, up_to_action=None):
+    def run_batches(self, from_action=None, up_to_action=None, dataflow_workers=None):
         """Method runs all registred batch actions of a session.
         :param from_action: Controls from which batch action on the processing is started. None always starts at the first
         action.
         :param up_to_action: Controls up to which batch action the processing is conducted. The defined action will not
         be processed. The processing will stop directly before the action. None will start a processing up to, including
-        the last batch action."""
+        the last batch action.
+        :param dataflow_workers: If set, the batch actions are not processed one after another, but in dataflow mode
+        (see avid.common.workflow.dataflow): the actions of a case are processed as soon as the outputs they depend on
+        are available, using the passed number of worker threads for all batch actions. The schedulers of the batch
+        actions are not used in this mode."""
         relevant_batches = self._batch_actions.copy()
 
         start_index = 0
@@ -624,6 +917,7 @@ class Session(object):
         relevant_batches = relevant_batches[start_index:stop_index]
 
         self.executed_actions = list()
+        self._released_action_counts = Counter()
 
         if self._console is None:
             self._console = Console()
@@ -646,6 +940,10 @@ class Session(object):
         self._console.rule()
         self.print_session_info()
 
+        if dataflow_workers is not None:
+            self._run_batches_dataflow(relevant_batches, dataflow_workers, task_batches)
+            return
+
         with self._progress_indicator:
             for batch_pos, batch_action in enumerate(relevant_batches):
                 self._console.rule(
@@ -660,14 +958,22 @@ class Session(object):
                 )
                 self.print("Prepare actions")
                 batch_action.generateActions()
-                self.print(
-                    "Generated action instances: {}".format(len(batch_action._actions))
-                )
+                number_of_actions = batch_action.number_of_actions
+                if batch_action.isStreaming():
+                    self.print(
+                        "Estimated action instances (generated while processing): {}".format(
+                            number_of_actions
+                        )
+                    )
+                else:
+                    self.print(
+                        "Generated action instances: {}".format(number_of_actions)
+                    )
                 self.print("Process actions")
                 self._progress_indicator.update(
                     task_id=self.__progress_task_lookup[batch_action.actionTag],
-                    total=len(batch_action._actions),
-                    indicator_cadence=min(len(batch_action._actions) / 20, 50),
+                    total=number_of_actions,
+                    indicator_cadence=min(number_of_actions / 20, 50),
                 )
 
                 batch_action.do()
@@ -675,13 +981,48 @@ class Session(object):
                 self._progress_indicator.update(task_batches, advance=1)
 
                 self.print("\n")
-                self.print(
-                    f"Batch summary:\n"
-                    f"Success: [green]{len(batch_action.getSuccessfulActions(no_warnings=True))}[/green]"
-                    f"   Skipped: {len(batch_action.getSkippedActions())}"
-                    f"   Warning: [yellow]{len(batch_action.getSuccessfulActionsWithWarnings())}[/yellow]"
-                    f"   Error: [red]{len(batch_action.getFailedActions())}[/red]\n"
+                self._print_batch_summary(batch_action)
+
+    def _run_batches_dataflow(self, relevant_batches, workers, task_batches):
+        """Processes the passed batch actions in dataflow mode (see run_batches)."""
+        from .dataflow import DataflowScheduler
+
+        def batch_finished(batch_action):
+            self._progress_indicator.update(task_batches, advance=1)
+            self._console.rule(
+                title='Batch action "{}" (batch {}/{})'.format(
+                    batch_action.actionTag,
+                    relevant_batches.index(batch_action) + 1,
+                    len(relevant_batches),
                 )
+            )
+            self.print(
+                "Processed action instances: {}".format(batch_action.number_of_actions)
+            )
+            self._print_batch_summary(batch_action)
+
+        scheduler = DataflowScheduler(
+            self, relevant_batches, workers, batchFinishedCallback=batch_finished
+        )
+        case_separable = [
+            node.batchAction.actionTag for node in scheduler.nodes if node.separable
+        ]
+        self.print(
+            "Process batch actions in dataflow mode (workers: {}; case separable batch actions: {})".format(
+                workers, case_separable
+            )
+        )
+        with self._progress_indicator:
+            scheduler.execute()
+
+    def _print_batch_summary(self, batch_action):
+        self.print(
+            f"Batch summary:\n"
+            f"Success: [green]{batch_action.getNumberOfSuccessfulActions(no_warnings=True)}[/green]"
+            f"   Skipped: {batch_action.getNumberOfSkippedActions()}"
+            f"   Warning: [yellow]{len(batch_action.getSuccessfulActionsWithWarnings())}[/yellow]"
+            f"   Error: [red]{len(batch_action.getFailedActions())}[/red]\n"
+        )
 
     def print(self, *args, **nargs):
         if not self._console is None:
@@ -0,0 +1,284 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Dataflow execution of the batch actions of a session (see Session.run_batches). By default a session processes one
+batch action after another; a batch action only generates its actions after the previous batch action is completely
+processed. In dataflow mode the batch actions are processed as a pipeline instead:
+- A dependency graph of the batch actions is derived from the action tags their input selectors select (see
+  BatchActionBase.getInputActionTags). A batch action depends on a preceding one, if it uses its outputs, if the
+  preceding one uses artefacts with the action tag of the batch action or if both have the same action tag. Batch
+  actions whose input action tags are unknown depend on all preceding batch actions and vice versa.
+- Batch actions whose actions only get artefacts of one case (see BatchActionBase.isCaseSeparable) are processed case
+  by case. The actions of a case are generated and processed as soon as all batch actions it depends on have processed
+  the case. Other batch actions are processed as a whole after all batch actions they depend on are done.
+- All actions are executed by one pool of worker threads. The schedulers of the batch actions are not used. Actions of
+  later batch actions are preferred, so cases pass through the pipeline instead of waiting for the completion of
+  each batch action.
+It is assumed that the outputs of the actions have the action tag and the case of their batch action and inputs.
+Remark: The artefacts are registered in the session in the order the actions finish. Batch actions that depend on the
+order of their inputs (e.g. actions over several cases that take the case of their first input) may therefore
+produce outputs with other properties than in the sequential processing.
+"""
+
+import heapq
+import logging
+from builtins import object
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import avid.common.artefact.defaultProps as artefactProps
+from avid.common.artefact import MISSING_PROPERTY, getArtefactProperty
+
+logger = logging.getLogger(__name__)
+
+
+def _getCases(artefacts):
+    """Returns the cases of the passed artefact collection (None for artefacts without case)."""
+    index = artefacts.get_property_index(artefactProps.CASE)
+    if index is None:
+        values = (
+            getArtefactProperty(artefact, artefactProps.CASE) for artefact in artefacts
+        )
+    else:
+        values = (value for value, hashes in index.items() if hashes)
+
+    cases = list()
+    for value in values:
+        if value is MISSING_PROPERTY:
+            value = None
+        if value not in cases:
+            cases.append(value)
+    return cases
+
+
+class _WorkUnit(object):
+    """Actions of a batch action for one case (or all actions of batch actions that are not case separable)."""
+
+    def __init__(self, node, case=None):
+        self.node = node
+        self.case = case
+        self.ready = False
+        self.actions = None
+        self.running = 0
+        self.exhausted = False
+        self.done = False
+
+
+class _BatchNode(object):
+    """Node of the dependency graph of the batch actions."""
+
+    def __init__(self, batchAction, position):
+        self.batchAction = batchAction
+        self.position = position
+        self.inputTags = batchAction.getInputActionTags()
+        self.separable = batchAction.isCaseSeparable()
+        self.upstream = list()
+        self.downstream = list()
+        # dict case -> _WorkUnit (key None for batch actions that are not case separable); None until started
+        self.units = None
+        self.openUnits = 0
+        self.finished = False
+
+    def dependsOn(self, other):
+        """Indicates if this node depends on the (preceding) other node."""
+        if self.inputTags is None or other.inputTags is None:
+            return True
+        tag = self.batchAction.actionTag
+        otherTag = other.batchAction.actionTag
+        return otherTag in self.inputTags or tag in other.inputTags or tag == otherTag
+
+    def isUnitDone(self, case):
+        if self.finished:
+            return True
+        if self.separable:
+            unit = self.units.get(case)
+            return unit is None or unit.done
+        return False
+
+
+class DataflowScheduler(object):
+    """Processes the passed batch actions of a session in dataflow mode (see module documentation).
+
+    :param session: Session of the batch actions.
+    :param batchActions: Batch actions in the order they would be processed by the session.
+    :param maxWorkers: Number of worker threads that execute the actions of all batch actions.
+    :param batchFinishedCallback: Optional callable that is called with each batch action after it is finalized.
+    """
+
+    def __init__(self, session, batchActions, maxWorkers, batchFinishedCallback=None):
+        if maxWorkers < 1:
+            raise ValueError(
+                "Number of workers must be at least 1. Passed value: {}".format(
+                    maxWorkers
+                )
+            )
+        self._session = session
+        self._maxWorkers = maxWorkers
+        self._batchFinishedCallback = batchFinishedCallback
+
+        self.nodes = list()
+        for position, batchAction in enumerate(batchActions):
+            node = _BatchNode(batchAction, position)
+            node.upstream = [other for other in self.nodes if node.dependsOn(other)]
+            for other in node.upstream:
+                other.downstream.append(node)
+            self.nodes.append(node)
+
+        self._readyUnits = list()
+        self._unitCounter = 0
+        # number of state changes of nodes and units; used to detect that the processing is stalled
+        self._changes = 0
+        # indicates that nodes may be started or finished (see _updateNodes)
+        self._nodesChanged = True
+
+    def execute(self):
+        """Processes all batch actions. Returns after all batch actions are finalized."""
+        running = dict()
+        with ThreadPoolExecutor(max_workers=self._maxWorkers) as executor:
+            while True:
+                changes = self._changes
+                if self._nodesChanged:
+                    self._nodesChanged = False
+                    self._updateNodes()
+
+                while len(running) < self._maxWorkers and self._readyUnits:
+                    _, _, unit = self._readyUnits[0]
+                    if unit.actions is None:
+                        # the inputs of a case are prepared when its actions are needed, so they reflect the outputs
+                        # of all upstream actions and do not accumulate for all ready cases
+                        with self._session.lock:
+                            unit.actions = unit.node.batchAction.generateCaseActions(
+                                unit.case
+                            )
+                    action = next(unit.actions, None)
+                    if action is None:
+                        heapq.heappop(self._readyUnits)
+                        unit.exhausted = True
+                        self._checkUnit(unit)
+                        continue
+                    unit.running += 1
+                    running[executor.submit(action.do)] = unit
+
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        unit = running.pop(future)
+                        unit.running -= 1
+                        # errors of the actions are handled by the actions; others are passed on
+                        future.result()
+                        self._checkUnit(unit)
+                elif all(node.finished for node in self.nodes):
+                    break
+                elif changes == self._changes:
+                    # units are only blocked by unfinished units, so this indicates an internal error
+                    raise RuntimeError(
+                        "Dataflow processing is stalled. Unfinished batch actions: {}".format(
+                            [
+                                node.batchAction.actionTag
+                                for node in self.nodes
+                                if not node.finished
+                            ]
+                        )
+                    )
+
+    def _updateNodes(self):
+        """Starts the nodes whose dependencies allow it, activates their ready units and finalizes the nodes
+        whose units are all done."""
+        for node in self.nodes:
+            if node.finished:
+                continue
+
+            if node.units is None:
+                if node.separable:
+                    startable = all(
+                        other.finished or (other.separable and other.units is not None)
+                        for other in node.upstream
+                    )
+                else:
+                    startable = all(other.finished for other in node.upstream)
+                if not startable:
+                    continue
+                self._startNode(node)
+
+            if node.separable:
+                for unit in node.units.values():
+                    self._activateUnit(unit)
+
+            if node.openUnits == 0:
+                self._finishNode(node)
+
+    def _activateUnit(self, unit):
+        """Queues the unit for processing if all units it depends on are done."""
+        if not unit.ready and all(
+            other.isUnitDone(unit.case) for other in unit.node.upstream
+        ):
+            self._pushUnit(unit)
+
+    def _startNode(self, node):
+        batchAction = node.batchAction
+        logger.info(
+            'Start batch action "%s" (case separable: %s; streaming: %s)',
+            batchAction.actionTag,
+            node.separable,
+            batchAction.isStreaming(),
+        )
+        if node.separable:
+            batchAction.do_case_setup()
+            with self._session.lock:
+                cases = _getCases(self._session.artefacts)
+            node.units = {case: _WorkUnit(node, case) for case in cases}
+        else:
+            unit = _WorkUnit(node)
+            with self._session.lock:
+                if batchAction.do_setup():
+                    unit.actions = batchAction.iterateActions()
+                else:
+                    unit.actions = iter([])
+            node.units = {None: unit}
+            self._pushUnit(unit)
+        node.openUnits = len(node.units)
+        self._changes += 1
+
+    def _pushUnit(self, unit):
+        # later batch actions first, then in the order of activation
+        unit.ready = True
+        self._changes += 1
+        self._unitCounter += 1
+        heapq.heappush(self._readyUnits, (-unit.node.position, self._unitCounter, unit))
+
+    def _checkUnit(self, unit):
+        if unit.exhausted and unit.running == 0 and not unit.done:
+            unit.done = True
+            node = unit.node
+            node.openUnits -= 1
+            self._changes += 1
+            if node.openUnits == 0:
+                self._nodesChanged = True
+            elif node.separable:
+                for other in node.downstream:
+                    if other.separable and other.units is not None:
+                        otherUnit = other.units.get(unit.case)
+                        if otherUnit is not None:
+                            self._activateUnit(otherUnit)
+
+    def _finishNode(self, node):
+        node.batchAction.do_finalize()
+        node.finished = True
+        self._changes += 1
+        if self._batchFinishedCallback is not None:
+            self._batchFinishedCallback(node.batchAction)
@@ -0,0 +1,167 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Append-only journal that is used for interim session saves. Instead of rewriting the complete session file every time
+an artefact is added, each added (or replaced) artefact is appended as one record (a JSON line) to a journal file next
+to the session file. The journal is compacted into the session file when the session is left (or on demand, see
+Session.compact_journal) and is replayed by initSession if a session was not finished properly (e.g. due to a crash).
+"""
+
+import json
+import logging
+import os
+import threading
+
+from avid.common.artefact import Artefact, CompactArtefact
+
+logger = logging.getLogger(__name__)
+
+"""Extension that is appended to the session file path to get the path of its journal."""
+JOURNAL_EXTENSION = "journal"
+
+
+def get_journal_path(session_path):
+    """Returns the path of the journal that belongs to the passed session file path."""
+    return session_path + os.extsep + JOURNAL_EXTENSION
+
+
+class SessionJournal(object):
+    """Append-only journal of artefacts.
+
+    :param path: Path of the journal file.
+    :param sync_interval: Number of appended records after which the journal is synchronized to disk (fsync). Every
+        record is flushed to the OS immediately, so only a crash of the machine (not of the process) may lose the
+        records since the last synchronization.
+    """
+
+    def __init__(self, path, sync_interval=1):
+        self.path = path
+        self.sync_interval = max(1, int(sync_interval))
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced_records = 0
+
+    def _open(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _record(artefact):
+        return json.dumps(
+            {"default": artefact._defaultProps, "additional": artefact._additionalProps}
+        )
+
+    def extend(self, artefacts):
+        """Appends records for all passed artefacts at once and synchronizes them to disk."""
+        records = "".join(self._record(artefact) + "\n" for artefact in artefacts)
+        if not records:
+            return
+        with self._lock:
+            self._open()
+            self._file.write(records)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced_records = 0
+
+    def append(self, artefact):
+        """Appends a record for the passed artefact to the journal."""
+        record = self._record(artefact)
+        with self._lock:
+            self._open()
+            self._file.write(record + "\n")
+            self._file.flush()
+            self._unsynced_records += 1
+            if self._unsynced_records >= self.sync_interval:
+                os.fsync(self._file.fileno())
+                self._unsynced_records = 0
+
+    def sync(self):
+        """Synchronizes all appended records to disk."""
+        with self._lock:
+            if self._file is not None and self._unsynced_records > 0:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._unsynced_records = 0
+
+    def close(self):
+        """Synchronizes and closes the journal file. The journal can still be appended afterwards (the file will be
+        reopened)."""
+        self.sync()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """Closes and removes the journal file (e.g. after its content was compacted into the session file)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._unsynced_records = 0
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def replay(self, schema=None):
+        """Generator that yields the artefacts of all records of the journal in the order they were appended.
+        An incomplete last record (e.g. due to a crash while writing) is skipped.
+        :param schema: If an ArtefactSchema is passed, CompactArtefact instances are yielded.
+        """
+        if not self.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as journalFile:
+            incompleteRecord = None
+            for pos, line in enumerate(journalFile):
+                if not line.strip():
+                    continue
+                if incompleteRecord is not None:
+                    raise ValueError(
+                        "Session journal is corrupted. Record in line {} cannot be read. Journal: {}".format(
+                            incompleteRecord + 1, self.path
+                        )
+                    )
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    incompleteRecord = pos
+                    continue
+
+                if schema is not None:
+                    yield CompactArtefact(
+                        schema,
+                        defaultP=record["default"],
+                        additionalP=record["additional"],
+                    )
+                else:
+                    yield Artefact(
+                        defaultP=record["default"], additionalP=record["additional"]
+                    )
+
+            if incompleteRecord is not None:
+                logger.warning(
+                    "Last record of session journal is incomplete and skipped. Journal: %s",
+                    self.path,
+                )
@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Background writer that owns the on-disk state of a running session. Threads that add artefacts to the session only
+enqueue them (no disk I/O and no waiting for other writes); the writer thread periodically appends all artefacts
+added since its last write to the session journal at once (see avid.common.workflow.journal). Optionally it also
+stores snapshots of the complete session in the session file. Snapshots are written into a temporary file that
+replaces the session file by a rename, so readers never see a partially written session file.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+"""Default interval (in seconds) in which the writer appends the added artefacts to the journal."""
+DEFAULT_WRITE_INTERVAL = 1.0
+
+
+class SessionWriter(object):
+    """Background writer of a session.
+
+    :param session: The session whose artefacts are written.
+    :param write_interval: Interval (in seconds) in which the artefacts added since the last write are appended to
+        the journal of the session. Artefacts added several times (or similar artefacts) within one interval are
+        coalesced; only the last one is written.
+    :param snapshot_interval: Interval (in seconds) in which the complete session is stored in the session file
+        (which also clears the journal). If None, the session file is only written when the session is compacted
+        (see Session.compact_journal).
+    """
+
+    def __init__(
+        self, session, write_interval=DEFAULT_WRITE_INTERVAL, snapshot_interval=None
+    ):
+        self._session = session
+        self.write_interval = write_interval
+        self.snapshot_interval = snapshot_interval
+
+        # deque.append and deque.popleft are thread safe, so enqueuing needs no additional lock.
+        self._queue = deque()
+        # Ensures that journal writes and snapshots are done one after another (writer thread, flush, close).
+        self._writeLock = threading.Lock()
+        # Ensures that concurrent calls of start() only start one thread.
+        self._startLock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._lastSnapshot = time.monotonic()
+
+    def start(self):
+        """Starts the writer thread (if it is not already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._startLock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="AVID session writer", daemon=True
+                )
+                self._thread.start()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self):
+        """Number of enqueued artefacts that are not written yet."""
+        return len(self._queue)
+
+    def enqueue(self, artefact):
+        """Enqueues an artefact that was added to the session. The call does not block on disk I/O."""
+        self._queue.append(artefact)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.write_interval)
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            try:
+                if (
+                    self.snapshot_interval is not None
+                    and time.monotonic() - self._lastSnapshot >= self.snapshot_interval
+                ):
+                    self.snapshot()
+                else:
+                    self.flush()
+            except Exception as e:
+                # The writer must survive errors (e.g. a temporarily unavailable network share), the artefacts
+                # are written with the next successful write or snapshot.
+                logger.warning("Background session writer failed. Error: %s", e)
+
+    def _drain(self):
+        """Removes all enqueued artefacts and returns them coalesced: of similar artefacts only the last enqueued one
+        is kept (at the position it was last enqueued)."""
+        coalesced = dict()
+        while True:
+            try:
+                artefact = self._queue.popleft()
+            except IndexError:
+                break
+            coalesced.pop(artefact, None)
+            coalesced[artefact] = artefact
+        return list(coalesced.values())
+
+    def _requeue(self, artefacts):
+        """Puts drained artefacts back in front of the queue (e.g. after a failed write), so they are written with
+        the next write."""
+        self._queue.extendleft(reversed(artefacts))
+
+    def flush(self):
+        """Appends all enqueued artefacts to the journal of the session. The caller is blocked until they are
+        synchronized to disk."""
+        with self._writeLock:
+            artefacts = self._drain()
+            if not artefacts:
+                return
+            journal = self._session.journal
+            if journal is None:
+                logger.warning(
+                    "Session has no stored location. %s artefacts are not written to a journal.",
+                    len(artefacts),
+                )
+                return
+            try:
+                journal.extend(artefacts)
+            except Exception:
+                self._requeue(artefacts)
+                raise
+
+    def snapshot(self):
+        """Stores the complete session in the session file and clears the journal afterwards. The session is only
+        locked to take the snapshot; the file is written while the session can be used further.
+        """
+        with self._writeLock:
+            with self._session.lock:
+                # Everything that is enqueued until now is part of the snapshot, because Session.add_artefact
+                # registers an artefact before it is enqueued and the registered artefacts are merged when the
+                # collection is accessed.
+                drained = self._drain()
+                artefacts = list(self._session.artefacts)
+            try:
+                self._session._write_session_file(artefacts)
+            except Exception:
+                self._requeue(drained)
+                raise
+            journal = self._session.journal
+            if journal is not None:
+                journal.clear()
+            self._lastSnapshot = time.monotonic()
+
+    def close(self):
+        """Stops the writer thread and writes all artefacts that are still enqueued."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from builtins import object
+from collections import deque
+from concurrent.futures import Future
+
+
+class WorkerPool(object):
+    """Pool of worker threads that can be reused by several schedulers (e.g. for all batch actions of a session; see
+    Session.getWorkerPool). Each worker has its own bounded queue of tasks; submitted tasks are queued at the worker
+    with the shortest queue. Idle workers take (steal) queued tasks of the other workers, so a long running task does
+    not delay the tasks queued behind it. Each worker processes its own queue in submission order, but there is no
+    global order: tasks queued at different workers may start in any order. Callers that need an order (e.g. the
+    ThreadingScheduler) should therefore keep their pending tasks themselves and only submit what can start.
+    submit() returns a concurrent.futures.Future; exceptions of the tasks are captured by their futures.
+
+    :param threadcount: Number of worker threads. It can be increased later (see ensureThreads).
+    :param queueSize: Maximum number of queued tasks per worker. submit() blocks while all queues are full.
+    """
+
+    def __init__(self, threadcount, queueSize=2):
+        if queueSize < 1:
+            raise ValueError(
+                "Queue size must be at least 1. Passed value: {}".format(queueSize)
+            )
+        self._queueSize = queueSize
+        self._condition = threading.Condition()
+        self._queues = list()
+        self._threads = list()
+        self._shutdown = False
+        self.ensureThreads(threadcount)
+
+    @property
+    def threadcount(self):
+        return len(self._threads)
+
+    @property
+    def isShutdown(self):
+        return self._shutdown
+
+    def ensureThreads(self, threadcount):
+        """Starts additional workers if the pool has less than threadcount workers."""
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot add workers to a shut down worker pool.")
+            while len(self._threads) < threadcount:
+                index = len(self._threads)
+                self._queues.append(deque())
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(index,),
+                    name="avid-worker-{}".format(index),
+                )
+                thread.daemon = True
+                self._threads.append(thread)
+                thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queues the call of fn with the passed arguments and returns its future."""
+        future = Future()
+        with self._condition:
+            while True:
+                if self._shutdown:
+                    raise RuntimeError(
+                        "Cannot submit tasks to a shut down worker pool."
+                    )
+                queue = min(self._queues, key=len)
+                if len(queue) < self._queueSize:
+                    break
+                self._condition.wait()
+            queue.append((future, fn, args, kwargs))
+            self._condition.notify_all()
+        return future
+
+    def shutdown(self, wait=True, cancelPending=False):
+        """Stops the workers after all queued tasks are processed.
+
+        :param wait: If True, the call returns after all workers are stopped.
+        :param cancelPending: If True, queued tasks that are not started yet are cancelled.
+        """
+        with self._condition:
+            self._shutdown = True
+            if cancelPending:
+                for queue in self._queues:
+                    while queue:
+                        queue.popleft()[0].cancel()
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(cancelPending=exc_type is not None)
+
+    def _takeTask(self, index):
+        """Returns the next task of the worker with the passed index (or a task of another worker). Must be called
+        with the condition held."""
+        queue = self._queues[index]
+        if not queue:
+            queue = max(self._queues, key=len)
+            if not queue:
+                return None
+        return queue.popleft()
+
+    def _work(self, index):
+        while True:
+            with self._condition:
+                task = self._takeTask(index)
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    task = self._takeTask(index)
+                # a queue has space again
+                self._condition.notify_all()
+
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
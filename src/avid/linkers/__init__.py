@@ -16,8 +16,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
 from builtins import object
 
+import avid.common.artefact as artefactHelper
+
+"""Link value of secondary artefacts that are linked to every primary artefact (see
+InnerLinkerBase._getSecondaryLinkValues)."""
+ANY_LINK_VALUE = object()
+
 
 class LinkerBase(object):
     """Linkers serve as delegate to generate secondary sub selections that have some semantic
@@ -55,7 +62,9 @@ class LinkerBase(object):
 
         return result
 
-    def getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         """Get the subset (splits) of secondary selections that has a meaningful semantic link
         to the primary selection/index. To change the behavior reimplement
         self._getLinkedSelection(). The default implementation just passes through
@@ -70,18 +79,25 @@ class LinkerBase(object):
         for the link.
         @param primarySelections the list of all selections that contain sets of primary artefacts
         @param secondarySelections the list that is used to generate/pick the linked selections from.
+        @param linkContext Optional dict in which linkers store data they derive from the secondary selections
+        (e.g. hash indices), so it is reused by all calls that pass the same context. The context must only be used
+        as long as the passed selections are not altered (e.g. one ActionBatchGenerator.iterateActions() run).
+        If None, nothing is reused.
         """
         linkedSelections = self._getLinkedSelection(
             primaryIndex=primaryIndex,
             primarySelections=primarySelections,
             secondarySelections=secondarySelections,
+            linkContext=linkContext,
         )
         primarySelection = primarySelections[primaryIndex]
         return self._sanityCheck(
             primarySelection=primarySelection, linkedSelections=linkedSelections
         )
 
-    def _getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def _getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         """Default implementation how to get the subset (splits) of secondary selections that has a meaningful
         semantic lin to the primary selection/index. To change the behavior reimplement
         this method.
@@ -95,9 +111,17 @@ class LinkerBase(object):
         for the link.
         @param primarySelections the list of all selections that contain sets of primary artefacts
         @param secondarySelections the list that is used to generate/pick the linked selections from.
+        @param linkContext see getLinkedSelection().
         """
         return secondarySelections
 
+    def linksOnlySameCase(self):
+        """Indicates if linked selections only contain artefacts of the case of the primary selection, given that
+        every primary and secondary selection only contains artefacts of one case. It is e.g. used to decide if a
+        batch action can be processed case by case (see avid.common.workflow.dataflow). Default is False.
+        """
+        return False
+
     def __add__(self, other):
         """Creates an AndLinker with both operands."""
         andLinker = AndLinker(
@@ -147,54 +171,299 @@ class InnerLinkerBase(LinkerBase):
     def _findLinkedArtefactOptions(self, primaryArtefact, secondarySelection):
         raise NotImplementedError("reimplement this function in derived classes.")
 
-    def _getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def _supportsLinkIndex(self):
+        """Indicates if the linker implements _getPrimaryLinkValue and _getSecondaryLinkValues. Then the secondary
+        selections are linked by a hash join instead of calling _findLinkedArtefactOptions for every combination
+        of primary artefact and secondary selection. Default is False."""
+        return False
+
+    def _getPrimaryLinkValue(self, primaryArtefact):
+        """Returns the (hashable) link value of a primary artefact (see _supportsLinkIndex)."""
+        raise NotImplementedError("reimplement this function in derived classes.")
+
+    def _getSecondaryLinkValues(self, secondaryArtefact):
+        """Returns the primary link values a secondary artefact is linked to (see _supportsLinkIndex). The values
+        must be consistent with _findLinkedArtefactOptions: the first artefact of a secondary selection with a
+        fitting link value has to be the first artefact _findLinkedArtefactOptions would find.
+        @result Tuple of link values. Use ANY_LINK_VALUE if the artefact is linked to every primary artefact.
+        """
+        raise NotImplementedError("reimplement this function in derived classes.")
+
+    def _getLinkIndex(self, secondarySelections, linkContext=None):
+        """Returns the _LinkIndex for the secondary selections or None if hash joins are not supported. The index is
+        stored in the link context, so it is built only once for all primary selections (e.g. of one
+        ActionBatchGenerator.iterateActions() run)."""
+        if not self._supportsLinkIndex():
+            return None
+
+        def buildIndex():
+            try:
+                return _LinkIndex(secondarySelections, self._getSecondaryLinkValues)
+            except TypeError:
+                # link values that are not hashable
+                return None
+
+        return _getContextValue(
+            linkContext, (self, "linkIndex"), secondarySelections, buildIndex
+        )
+
+    def _getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         """Filters the given list of entries and returns all selected entries"""
-        primarySelection = primarySelections[primaryIndex]
+        index = self._getLinkIndex(secondarySelections, linkContext)
+        if index is not None:
+            try:
+                linkValues = [
+                    self._getPrimaryLinkValue(primeArtefact)
+                    for primeArtefact in primarySelections[primaryIndex]
+                ]
+                return self._getLinkedSelectionByIndex(
+                    linkValues, secondarySelections, index
+                )
+            except TypeError:
+                # link values that are not hashable
+                pass
+        return self._getLinkedSelectionByScan(
+            primarySelections[primaryIndex], secondarySelections
+        )
+
+    def _getLinkedSelectionByIndex(self, linkValues, secondarySelections, index):
+        """Hash join version of _getLinkedSelectionByScan."""
+        distinctValues = list(dict.fromkeys(linkValues))
+
+        if not self._performeInternalLinkage:
+            if not self._allowOnlyFullLinkage:
+                positions = set()
+                for linkValue in distinctValues:
+                    positions.update(index.linkedPositions(linkValue))
+            elif distinctValues:
+                positions = set(index.linkedPositions(distinctValues[0]))
+                for linkValue in distinctValues[1:]:
+                    if not positions:
+                        break
+                    positions.intersection_update(index.linkedPositions(linkValue))
+            else:
+                # an empty primary selection is fully linked with every selection
+                return list(secondarySelections)
+            return [secondarySelections[position] for position in sorted(positions)]
+
+        positions = set()
+        for linkValue in distinctValues:
+            positions.update(index.linkedPositions(linkValue))
+
+        resultSelections = list()
+        for position in sorted(positions):
+            linkedSelection = [
+                index.lookup(position, linkValue) for linkValue in linkValues
+            ]
+            if not linkedSelection in resultSelections:
+                resultSelections.append(linkedSelection)
+        return resultSelections
+
+    def _getLinkedSelectionByScan(
+        self, primarySelection, secondarySelections, positions=None
+    ):
+        """Links by calling _findLinkedArtefactOptions for every primary artefact and secondary selection.
+        @param positions Optional sorted positions of the secondary selections that should be checked. All other
+        secondary selections must not be linked."""
+        if positions is not None:
+            secondarySelections = [
+                secondarySelections[position] for position in positions
+            ]
 
         resultSelections = list(
             list(),
         )
 
         for secondarySelection in secondarySelections:
-            addSelection = self._performeInternalLinkage or self._allowOnlyFullLinkage
-
-            linkedSelection = list()
-
-            if not self._performeInternalLinkage:
-                linkedSelection = secondarySelection
-
-            for primeArtefact in primarySelection:
-                try:
-                    foundArtefact = self._findLinkedArtefactOptions(
-                        primeArtefact, secondarySelection
-                    )
-                    foundArtefact = foundArtefact[0]
-                except:
-                    foundArtefact = None
-
-                if self._performeInternalLinkage:
-                    linkedSelection.append(foundArtefact)
-                else:
-                    if foundArtefact is not None and not self._allowOnlyFullLinkage:
-                        addSelection = True
-                        break
-                    elif foundArtefact is None and self._allowOnlyFullLinkage:
-                        addSelection = False
-                        break
+            linkedSelection = self._linkSelection(primarySelection, secondarySelection)
 
-            if self._performeInternalLinkage:
-                addSelection = (
-                    len([x for x in linkedSelection if x is not None]) > 0
-                    and not linkedSelection in resultSelections
-                )
-                # do not add if 1) all linked elements are none, then linkage has failed or 2) the selection is already in the
-                # result list. The rest will be checked and sanitized by LinkerBase.
-
-            if addSelection:
+            # do not add if the selection is already in the result list. The rest will be checked and sanitized by
+            # LinkerBase.
+            if linkedSelection is not None and not (
+                self._performeInternalLinkage and linkedSelection in resultSelections
+            ):
                 resultSelections.append(linkedSelection)
 
         return resultSelections
 
+    def _linkSelection(self, primarySelection, secondarySelection):
+        """Links the primary selection with one secondary selection by calling _findLinkedArtefactOptions.
+        @result The linked selection or None if the secondary selection is not linked.
+        """
+        addSelection = self._performeInternalLinkage or self._allowOnlyFullLinkage
+
+        linkedSelection = list()
+
+        if not self._performeInternalLinkage:
+            linkedSelection = secondarySelection
+
+        for primeArtefact in primarySelection:
+            try:
+                foundArtefact = self._findLinkedArtefactOptions(
+                    primeArtefact, secondarySelection
+                )
+                foundArtefact = foundArtefact[0]
+            except:
+                foundArtefact = None
+
+            if self._performeInternalLinkage:
+                linkedSelection.append(foundArtefact)
+            else:
+                if foundArtefact is not None and not self._allowOnlyFullLinkage:
+                    addSelection = True
+                    break
+                elif foundArtefact is None and self._allowOnlyFullLinkage:
+                    addSelection = False
+                    break
+
+        if self._performeInternalLinkage:
+            # do not add if all linked elements are none, then linkage has failed
+            addSelection = len([x for x in linkedSelection if x is not None]) > 0
+
+        if addSelection:
+            return linkedSelection
+        return None
+
+
+class _LinkIndex(object):
+    """Hash index of secondary selections. For every selection it stores the first artefact per link value, and for
+    every link value the positions of the selections that contain it.
+
+    :param secondarySelections: The selections to index.
+    :param getLinkValues: Callable that returns the link values of a secondary artefact.
+    """
+
+    def __init__(self, secondarySelections, getLinkValues):
+        # per selection: link value -> (position in selection, artefact)
+        self._firstArtefacts = list()
+        # per selection: (position in selection, artefact) of the first ANY_LINK_VALUE artefact or None
+        self._firstWildcards = list()
+        # link value -> positions of the selections that have an artefact with that value
+        self._positionsByValue = dict()
+        self._wildcardPositions = list()
+
+        for selectionPosition, selection in enumerate(secondarySelections):
+            firstArtefacts = dict()
+            firstWildcard = None
+            for artefactPosition, artefact in enumerate(selection):
+                for linkValue in getLinkValues(artefact):
+                    if linkValue is ANY_LINK_VALUE:
+                        if firstWildcard is None:
+                            firstWildcard = (artefactPosition, artefact)
+                            self._wildcardPositions.append(selectionPosition)
+                    elif linkValue not in firstArtefacts:
+                        firstArtefacts[linkValue] = (artefactPosition, artefact)
+                        self._positionsByValue.setdefault(linkValue, list()).append(
+                            selectionPosition
+                        )
+            self._firstArtefacts.append(firstArtefacts)
+            self._firstWildcards.append(firstWildcard)
+
+    def lookup(self, selectionPosition, linkValue):
+        """Returns the first artefact of the selection that is linked to the value or None."""
+        found = self._firstArtefacts[selectionPosition].get(linkValue)
+        wildcard = self._firstWildcards[selectionPosition]
+        if found is None or (wildcard is not None and wildcard[0] < found[0]):
+            found = wildcard
+        if found is None:
+            return None
+        return found[1]
+
+    def positions(self, linkValue):
+        """Returns the positions of all selections that have an artefact linked to the value."""
+        candidates = self._positionsByValue.get(linkValue, list())
+        if self._wildcardPositions:
+            candidates = set(candidates)
+            candidates.update(self._wildcardPositions)
+        return candidates
+
+    def linkedPositions(self, linkValue):
+        """Returns the positions of all selections whose first artefact linked to the value is not None."""
+        return [
+            position
+            for position in self.positions(linkValue)
+            if self.lookup(position, linkValue) is not None
+        ]
+
+
+class _SortedLinkCandidates(object):
+    """Positions of secondary selections sorted by the numeric value of a property of their first artefact. Used by
+    linkers that search the closest value (e.g. ProximityLinker) to find it by bisection.
+
+    :param secondarySelections: All secondary selections.
+    :param positions: Positions of the secondary selections that are candidates.
+    :param key: Property that is used as numeric value.
+    """
+
+    def __init__(self, secondarySelections, positions, key):
+        self.candidatePositions = sorted(positions)
+        entries = list()
+        # positions of selections with None as first artefact
+        self.nonePositions = list()
+        for position in positions:
+            try:
+                firstArtefact = secondarySelections[position][0]
+                if firstArtefact is None:
+                    self.nonePositions.append(position)
+                    continue
+                value = float(artefactHelper.getArtefactProperty(firstArtefact, key))
+            except:
+                # selections without valid value are never linked
+                continue
+            if not math.isnan(value):
+                entries.append((value, position))
+
+        entries.sort()
+        self.values = [value for value, _ in entries]
+        self.positions = [position for _, position in entries]
+        self.nonePositions.sort()
+
+
+def _getContextValue(linkContext, key, secondarySelections, factory):
+    """Returns the value factory() creates for the secondary selections. The value is stored in the link context
+    (see LinkerBase.getLinkedSelection) under the key and reused as long as it is requested for the same secondary
+    selections list. If linkContext is None, the value is created for each call."""
+    if linkContext is None:
+        return factory()
+    entry = linkContext.get(key)
+    if entry is None or entry[0] is not secondarySelections:
+        entry = (secondarySelections, factory())
+        linkContext[key] = entry
+    return entry[1]
+
+
+def _getSortedLinkCandidates(
+    linker, keyLinker, primarySelection, secondarySelections, key, linkContext=None
+):
+    """Returns the _SortedLinkCandidates of all secondary selections that might be linked to the primary selection by
+    keyLinker (e.g. CaseLinker). The candidates are stored in the link context for the secondary selections list.
+    @result The candidates or None if keyLinker does not support hash joins (see InnerLinkerBase._supportsLinkIndex).
+    """
+    index = keyLinker._getLinkIndex(secondarySelections, linkContext)
+    if index is None:
+        return None
+    try:
+        linkValues = frozenset(
+            keyLinker._getPrimaryLinkValue(primeArtefact)
+            for primeArtefact in primarySelection
+        )
+    except TypeError:
+        return None
+
+    cache = _getContextValue(
+        linkContext, (linker, "sortedCandidates"), secondarySelections, dict
+    )
+    candidates = cache.get(linkValues)
+    if candidates is None:
+        positions = set()
+        for linkValue in linkValues:
+            positions.update(index.positions(linkValue))
+        candidates = _SortedLinkCandidates(secondarySelections, positions, key)
+        cache[linkValues] = candidates
+    return candidates
+
 
 class AndLinker(LinkerBase):
     """
@@ -209,18 +478,40 @@ class AndLinker(LinkerBase):
         self._linker1 = linker1
         self._linker2 = linker2
 
-    def _getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def _getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         """Filters the given list of entries and returns all selected entries"""
         selections1 = self._linker1.getLinkedSelection(
             primaryIndex=primaryIndex,
             primarySelections=primarySelections,
             secondarySelections=secondarySelections,
+            linkContext=linkContext,
         )
         selections2 = self._linker2.getLinkedSelection(
             primaryIndex=primaryIndex,
             primarySelections=primarySelections,
             secondarySelections=secondarySelections,
+            linkContext=linkContext,
         )
+        memberIds = _getContextValue(
+            linkContext,
+            (self, "memberIds"),
+            secondarySelections,
+            lambda: self._getDistinctMemberIds(secondarySelections),
+        )
+        if memberIds is not None:
+            resultSelections = _intersectMemberSelections(
+                selections1, selections2, memberIds
+            )
+            if resultSelections is not None:
+                return resultSelections
+
+        try:
+            return _intersectSelections(selections1, selections2)
+        except TypeError:
+            pass
+
         resultSelections = list(
             list(),
         )
@@ -233,6 +524,79 @@ class AndLinker(LinkerBase):
 
         return resultSelections
 
+    def linksOnlySameCase(self):
+        # the linked selections are an intersection, so one restricted linker is enough
+        return type(self)._getLinkedSelection is AndLinker._getLinkedSelection and (
+            self._linker1.linksOnlySameCase() or self._linker2.linksOnlySameCase()
+        )
+
+    def _getDistinctMemberIds(self, secondarySelections):
+        """Returns the ids of the secondary selections, if no two of them are equal (then equality of the
+        selections is identity). Otherwise None.
+        """
+        memberIds = set(id(selection) for selection in secondarySelections)
+        if len(memberIds) != len(secondarySelections):
+            memberIds = None
+        else:
+            try:
+                buckets = dict()
+                for selection in secondarySelections:
+                    bucket = buckets.setdefault(_selectionKey(selection), list())
+                    if any(selection == other for other in bucket):
+                        memberIds = None
+                        break
+                    bucket.append(selection)
+            except TypeError:
+                memberIds = None
+        return memberIds
+
+
+def _intersectMemberSelections(selections1, selections2, memberIds):
+    """Intersects selections that are all distinct secondary selections (see AndLinker._getDistinctMemberIds) by
+    their identity.
+    @result The intersection or None if a selection is no secondary selection (e.g. altered by internal linkage).
+    """
+    ids2 = set()
+    for item2 in selections2:
+        if id(item2) not in memberIds:
+            return None
+        ids2.add(id(item2))
+
+    resultSelections = list()
+    for item1 in selections1:
+        if id(item1) not in memberIds:
+            return None
+        if id(item1) in ids2:
+            resultSelections.append(item1)
+            ids2.discard(id(item1))
+    return resultSelections
+
+
+def _selectionKey(selection):
+    """Key of a selection that is equal for all equal selections (independent of their type and order)."""
+    return tuple(sorted(hash(artefact) for artefact in selection))
+
+
+def _intersectSelections(selections1, selections2):
+    """Returns the selections of selections1 that are also in selections2. Every selection of selections2 is matched
+    at most once. Equal to comparing every pair of selections, but with the selections2 bucketed by _selectionKey.
+    """
+    buckets = dict()
+    for item2 in selections2:
+        buckets.setdefault(_selectionKey(item2), list()).append(item2)
+
+    resultSelections = list()
+    for item1 in selections1:
+        bucket = buckets.get(_selectionKey(item1))
+        if not bucket:
+            continue
+        for pos, item2 in enumerate(bucket):
+            if item1 == item2:
+                resultSelections.append(item1)
+                del bucket[pos]
+                break
+    return resultSelections
+
 
 from .caseInstanceLinker import CaseInstanceLinker
 from .fractionLinker import FractionLinker
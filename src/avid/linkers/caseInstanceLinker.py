@@ -17,7 +17,7 @@
 # limitations under the License.
 
 import avid.common.artefact.defaultProps as artefactProps
-from avid.linkers import InnerLinkerBase
+from avid.linkers import ANY_LINK_VALUE, InnerLinkerBase
 
 
 class CaseInstanceLinker(InnerLinkerBase):
@@ -70,3 +70,32 @@ class CaseInstanceLinker(InnerLinkerBase):
                     result.append(secondArtefact)
 
         return result
+
+    def _supportsLinkIndex(self):
+        return (
+            type(self)._findLinkedArtefactOptions
+            is CaseInstanceLinker._findLinkedArtefactOptions
+        )
+
+    def _getPrimaryLinkValue(self, primaryArtefact):
+        if (
+            primaryArtefact is not None
+            and artefactProps.CASEINSTANCE in primaryArtefact
+        ):
+            return primaryArtefact[artefactProps.CASEINSTANCE]
+        return None
+
+    def _getSecondaryLinkValues(self, secondaryArtefact):
+        if (
+            secondaryArtefact is None
+            or artefactProps.CASEINSTANCE not in secondaryArtefact
+        ):
+            return (None,)
+
+        itemValue = secondaryArtefact[artefactProps.CASEINSTANCE]
+        if self._useStrictLinkage:
+            return (itemValue,)
+        if itemValue is None:
+            # wildcard
+            return (ANY_LINK_VALUE,)
+        return itemValue, None
@@ -16,9 +16,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
+from bisect import bisect_right
+
 import avid.common.artefact as artefactHelper
 import avid.common.artefact.defaultProps as artefactProps
-from avid.linkers import InnerLinkerBase
+from avid.linkers import InnerLinkerBase, _getSortedLinkCandidates
 
 from .caseInstanceLinker import CaseInstanceLinker
 from .keyValueLinker import CaseLinker, TimePointLinker
@@ -99,21 +102,58 @@ class FractionLinker(InnerLinkerBase):
             )
         return result
 
-    def _getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def _getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         """Filters the given primary selections and returns the selection that is as
         close as possible in time to the primary selection.
         In the current implementation it is simplfied by just checking the timepoint of the first artefact of each
         selection."""
 
+        primarySelection = primarySelections[primaryIndex]
+        candidates = None
+        if (
+            type(self)._findLinkedArtefactOptions
+            is FractionLinker._findLinkedArtefactOptions
+            and len(primarySelection) > 0
+        ):
+            # only secondary selections with the same case can be linked
+            candidates = _getSortedLinkCandidates(
+                self,
+                self._caseLinker,
+                primarySelection,
+                secondarySelections,
+                artefactProps.TIMEPOINT,
+                linkContext,
+            )
+
+        if candidates is not None and not self._performeInternalLinkage:
+            masterTimePoint = float(
+                artefactHelper.getArtefactProperty(
+                    next(iter(primarySelection)), artefactProps.TIMEPOINT
+                )
+            )
+            if not math.isnan(masterTimePoint):
+                return self._getClosestPastSelections(
+                    masterTimePoint, primarySelection, secondarySelections, candidates
+                )
+
         # the following call finds all secondary collections that qualify as potantial fit.
         # this is done by implicitly calling FractionLinker._findLinkedArtefactOptions
-        preFilterdResult = InnerLinkerBase._getLinkedSelection(
-            self,
-            primaryIndex=primaryIndex,
-            primarySelections=primarySelections,
-            secondarySelections=secondarySelections,
-        )
-        primarySelection = primarySelections[primaryIndex]
+        if candidates is not None:
+            preFilterdResult = self._getLinkedSelectionByScan(
+                primarySelection,
+                secondarySelections,
+                candidates.candidatePositions,
+            )
+        else:
+            preFilterdResult = InnerLinkerBase._getLinkedSelection(
+                self,
+                primaryIndex=primaryIndex,
+                primarySelections=primarySelections,
+                secondarySelections=secondarySelections,
+                linkContext=linkContext,
+            )
         preFilterdResult = self._sanityCheck(
             primarySelection=primarySelection, linkedSelections=preFilterdResult
         )
@@ -148,3 +188,48 @@ class FractionLinker(InnerLinkerBase):
                 pass
 
         return result
+
+    def linksOnlySameCase(self):
+        # the linked artefacts are prefiltered by the case linker
+        return (
+            type(self)._findLinkedArtefactOptions
+            is FractionLinker._findLinkedArtefactOptions
+            and type(self)._getLinkedSelection is FractionLinker._getLinkedSelection
+        )
+
+    def _getClosestPastSelections(
+        self, masterTimePoint, primarySelection, secondarySelections, candidates
+    ):
+        """Equivalent of _getLinkedSelection without internal linkage. The candidates are sorted by the time point of
+        their first artefact, so the closest past selections are found by bisection and checked for linkage from
+        there on backwards."""
+
+        def link(positions):
+            result = list()
+            for position in sorted(positions):
+                selection = self._linkSelection(
+                    primarySelection, secondarySelections[position]
+                )
+                if selection is not None and self._sanityCheck(
+                    primarySelection, [selection]
+                ):
+                    result.append(selection)
+            return result
+
+        values = candidates.values
+        positions = candidates.positions
+        lower = bisect_right(values, masterTimePoint) - 1
+        while lower >= 0:
+            timePoint = values[lower]
+            closest = list()
+            while lower >= 0 and values[lower] == timePoint:
+                closest.append(positions[lower])
+                lower -= 1
+            if timePoint == -math.inf:
+                # selections with None as first artefact count as -inf
+                closest.extend(candidates.nonePositions)
+            result = link(closest)
+            if result or timePoint == -math.inf:
+                return result
+
+        return link(candidates.nonePositions)
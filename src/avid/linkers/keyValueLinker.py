@@ -55,6 +55,29 @@ class KeyValueLinker(InnerLinkerBase):
 
         return foundArtefacts
 
+    def _supportsLinkIndex(self):
+        # derived classes that change the link criterion are linked by scanning
+        return (
+            type(self)._findLinkedArtefactOptions
+            is KeyValueLinker._findLinkedArtefactOptions
+        )
+
+    def linksOnlySameCase(self):
+        return (
+            self._key == artefactProps.CASE
+            and self._supportsLinkIndex()
+            and type(self)._getLinkedSelection is InnerLinkerBase._getLinkedSelection
+        )
+
+    def _getPrimaryLinkValue(self, primaryArtefact):
+        if primaryArtefact is not None and self._key in primaryArtefact:
+            return primaryArtefact[self._key]
+        return None
+
+    def _getSecondaryLinkValues(self, secondaryArtefact):
+        # artefacts without the key are linked to primary artefacts without value
+        return (self._getPrimaryLinkValue(secondaryArtefact),)
+
 
 class CaseLinker(KeyValueLinker):
     """
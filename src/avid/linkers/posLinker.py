@@ -28,7 +28,9 @@ class PosLinker(LinkerBase):
     def __init__(self):
         LinkerBase.__init__(self, allowOnlyFullLinkage=False)
 
-    def _getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def _getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         index = primaryIndex
         if index > len(secondarySelections):
             index = len(secondarySelections) - 1
@@ -16,9 +16,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import math
+from bisect import bisect_right
+
 import avid.common.artefact as artefactHelper
 import avid.common.artefact.defaultProps as artefactProps
-from avid.linkers import LinkerBase
+from avid.linkers import LinkerBase, _getSortedLinkCandidates
 
 from .keyValueLinker import CaseLinker
 
@@ -45,7 +48,9 @@ class ProximityLinker(LinkerBase):
         self._key = key
         self._caseLinker = CaseLinker(allowOnlyFullLinkage=allow_only_full_linkage)
 
-    def _getLinkedSelection(self, primaryIndex, primarySelections, secondarySelections):
+    def _getLinkedSelection(
+        self, primaryIndex, primarySelections, secondarySelections, linkContext=None
+    ):
         """Filters the given secondary selections and returns the selections that have the best proximity
         score.
         In the current implementation it is simplfied by just checking the score of the first artefact of each
@@ -53,10 +58,38 @@ class ProximityLinker(LinkerBase):
 
         primary_selection = primarySelections[primaryIndex]
 
+        if (
+            self._proximity_delegate is TimePointProximityLinker.proximity_measure
+            and len(primary_selection) > 0
+        ):
+            try:
+                primary_value = float(
+                    artefactHelper.getArtefactProperty(primary_selection[0], self._key)
+                )
+            except:
+                primary_value = None
+            if primary_value is not None and math.isfinite(primary_value):
+                candidates = _getSortedLinkCandidates(
+                    self,
+                    self._caseLinker,
+                    primary_selection,
+                    secondarySelections,
+                    self._key,
+                    linkContext,
+                )
+                if candidates is not None:
+                    return self._getClosestSelections(
+                        primary_value,
+                        primary_selection,
+                        secondarySelections,
+                        candidates,
+                    )
+
         prefiltered_selection = self._caseLinker.getLinkedSelection(
             primaryIndex=primaryIndex,
             primarySelections=primarySelections,
             secondarySelections=secondarySelections,
+            linkContext=linkContext,
         )
         result = list()
 
@@ -93,6 +126,60 @@ class ProximityLinker(LinkerBase):
 
         return result
 
+    def linksOnlySameCase(self):
+        # the selections are prefiltered by the case linker
+        return type(self)._getLinkedSelection is ProximityLinker._getLinkedSelection
+
+    def _getClosestSelections(
+        self, primary_value, primary_selection, secondary_selections, candidates
+    ):
+        """Equivalent of _getLinkedSelection for proximity scores that are the absolute difference of the values
+        (see TimePointProximityLinker.proximity_measure). The candidates are sorted by their values, so the closest
+        ones are found by bisection and checked for the case linkage from there on outwards.
+        """
+
+        def link(positions):
+            result = list()
+            for position in sorted(positions):
+                selection = self._caseLinker._linkSelection(
+                    primary_selection, secondary_selections[position]
+                )
+                if selection is not None and self._caseLinker._sanityCheck(
+                    primary_selection, [selection]
+                ):
+                    result.append(selection)
+            return result
+
+        values = candidates.values
+        positions = candidates.positions
+        upper = bisect_right(values, primary_value)
+        lower = upper - 1
+        while True:
+            lower_score = primary_value - values[lower] if lower >= 0 else math.inf
+            upper_score = (
+                values[upper] - primary_value if upper < len(values) else math.inf
+            )
+            score = min(lower_score, upper_score)
+            if score == math.inf:
+                break
+
+            closest = list()
+            while lower >= 0 and primary_value - values[lower] == score:
+                closest.append(positions[lower])
+                lower -= 1
+            while upper < len(values) and values[upper] - primary_value == score:
+                closest.append(positions[upper])
+                upper += 1
+
+            result = link(closest)
+            if result:
+                return result
+
+        # all remaining selections have an infinite score
+        return link(
+            positions[: lower + 1] + positions[upper:] + candidates.nonePositions
+        )
+
 
 class TimePointProximityLinker(ProximityLinker):
     """
@@ -18,7 +18,10 @@
 
 from builtins import object
 
-from avid.common.artefact import ArtefactCollection
+from avid.common.artefact import _make_hashable
+
+from .queryPlan import AndNode, NotNode, OrNode, QueryPlan, SelectionNode
+from .selectionCache import selectionCache
 
 
 class SelectorBase(object):
@@ -36,6 +39,83 @@ class SelectorBase(object):
         """Filters the given collection of entries and returns all selected entries"""
         return workflowData  # default just returns everything.
 
+    def getPropertyValues(self, key):
+        """Returns the set of values the property key can have in the selection of the selector (None stands also for
+        artefacts without the property) or None if the selector does not restrict the property or the restriction is
+        unknown. It is e.g. used to determine the action tags a batch action depends on (see
+        avid.common.workflow.dataflow)."""
+        return None
+
+    def _createQueryNode(self):
+        """Returns the node that represents this selector in a query plan (see avid.selectors.queryPlan) or None if
+        the selector cannot be compiled. Derived selectors that can be evaluated per artefact or by property indexes
+        should override it."""
+        return None
+
+    def _isCompilable(self):
+        """Indicates if the selector provides a query node. This is not the case if a derived class overrides
+        getSelection() of the class that provides the query node."""
+        nodeClass = next(
+            cls for cls in type(self).__mro__ if "_createQueryNode" in cls.__dict__
+        )
+        return (
+            nodeClass is not SelectorBase
+            and type(self).getSelection is nodeClass.getSelection
+        )
+
+    def _getQueryNode(self):
+        """Returns the query node of the selector. If the selector cannot be compiled, a node that uses the selection
+        of getSelection() is returned."""
+        node = None
+        if self._isCompilable():
+            node = self._createQueryNode()
+        if node is None:
+            node = SelectionNode(self)
+        return node
+
+    def _getSelectionKey(self):
+        """Returns a hashable key of the selector and its parameters, which is used to cache its selections (see
+        avid.selectors.selectionCache). Only selections of compilable selectors are cached, because their selection
+        only depends on the artefacts. Returns None if the selection may not be cached.
+        """
+        if not self._isCompilable():
+            return None
+
+        parameters = list()
+        for name, value in vars(self).items():
+            if isinstance(value, SelectorBase):
+                value = value._getSelectionKey()
+                if value is None:
+                    return None
+            else:
+                value = _make_hashable(value)
+                try:
+                    hash(value)
+                except TypeError:
+                    return None
+            parameters.append((name, value))
+        return type(self), tuple(sorted(parameters, key=lambda item: item[0]))
+
+    def _selectWithPlan(self, workflowData):
+        """Makes the selection with the query plan of the selector. Selections of unchanged collections are
+        taken from the selection cache."""
+        plan = QueryPlan(self._createQueryNode())
+        selectionKey = self._getSelectionKey()
+        context = None
+        if selectionKey is not None:
+            # e.g. pending validity checks must be resolved before the state of the collection is determined
+            context = plan.prepare(workflowData)
+        return selectionCache.getSelection(
+            selectionKey,
+            workflowData,
+            lambda data: plan.getSelection(data, context),
+        )
+
+    def compile(self):
+        """Compiles the selector (tree) into a QueryPlan. The plan can be used like a selector and may be reused
+        for several selections."""
+        return QueryPlan(self._getQueryNode())
+
     def __add__(self, other):
         """Creates an AndSelector with self and other and returns it"""
         andSelector = AndSelector(self, other)
@@ -64,16 +144,25 @@ class AndSelector(SelectorBase):
         self._selector1 = selector1
         self._selector2 = selector2
 
+    def _createQueryNode(self):
+        return AndNode(
+            [self._selector1._getQueryNode(), self._selector2._getQueryNode()]
+        )
+
+    def getPropertyValues(self, key):
+        if not self._isCompilable():
+            return None
+        values1 = self._selector1.getPropertyValues(key)
+        values2 = self._selector2.getPropertyValues(key)
+        if values1 is None:
+            return values2
+        if values2 is None:
+            return values1
+        return values1 & values2
+
     def getSelection(self, workflowData):
         """Filters the given collection of entries and returns all selected entries"""
-        selection1 = self._selector1.getSelection(workflowData)
-        selection2 = self._selector2.getSelection(workflowData)
-        resultSelection = ArtefactCollection()
-        for item in selection1:
-            if item in selection2:
-                resultSelection.add_artefact(item)
-
-        return resultSelection
+        return self._selectWithPlan(workflowData)
 
 
 class OrSelector(SelectorBase):
@@ -89,17 +178,24 @@ class OrSelector(SelectorBase):
         self._selector1 = selector1
         self._selector2 = selector2
 
-    def getSelection(self, workflowData):
-        """Filters the given collection of entries and returns all selected entries"""
-        selection1 = self._selector1.getSelection(workflowData)
-        selection2 = self._selector2.getSelection(workflowData)
-        resultSelection = selection1
+    def _createQueryNode(self):
+        return OrNode(
+            [self._selector1._getQueryNode(), self._selector2._getQueryNode()]
+        )
 
-        for item2 in selection2:
-            if item2 not in resultSelection:
-                resultSelection.add_artefact(item2)
+    def getPropertyValues(self, key):
+        if not self._isCompilable():
+            return None
+        values1 = self._selector1.getPropertyValues(key)
+        values2 = self._selector2.getPropertyValues(key)
+        if values1 is None or values2 is None:
+            return None
+        return values1 | values2
 
-        return resultSelection
+    def getSelection(self, workflowData):
+        """Filters the given collection of entries and returns all selected entries (in the order of the given
+        collection)"""
+        return self._selectWithPlan(workflowData)
 
 
 class NotSelector(SelectorBase):
@@ -112,14 +208,11 @@ class NotSelector(SelectorBase):
         super().__init__()
         self._selector = selector
 
-    def getSelection(self, workflowData):
-        selection = self._selector.getSelection(workflowData)
-        non_selection = ArtefactCollection()
-        for item in workflowData:
-            if item not in selection:
-                non_selection.add_artefact(item)
+    def _createQueryNode(self):
+        return NotNode(self._selector._getQueryNode())
 
-        return non_selection
+    def getSelection(self, workflowData):
+        return self._selectWithPlan(workflowData)
 
 
 class LambdaSelector(SelectorBase):
@@ -19,8 +19,8 @@
 from builtins import str
 
 import avid.common.artefact.defaultProps as artefactProps
-from avid.common.artefact import ArtefactCollection
 from avid.selectors import SelectorBase
+from avid.selectors.queryPlan import PredicateNode, select_by_index
 
 
 class KeyMultiValueSelector(SelectorBase):
@@ -39,28 +39,55 @@ class KeyMultiValueSelector(SelectorBase):
         self.__allowStringCompare = allowStringCompare
         self.__negate = negate
 
+    def _selectByIndex(self, workflowData):
+        """Uses the property index of the passed collection to make the selection without a full scan.
+        Returns a HashSelection or None if no index can be used."""
+        if (
+            self.__negate
+            or self.__allowStringCompare
+            or not isinstance(self.__values, (list, tuple, set, frozenset))
+        ):
+            return None
+        for value in self.__values:
+            try:
+                hash(value)
+            except TypeError:
+                return None
+        return select_by_index(workflowData, self.__key, self.__values)
+
+    def _matches(self, entry):
+        """Indicates if the passed artefact is selected."""
+        if self.__key not in entry:
+            return False
+
+        value = entry[self.__key]
+        if (value in self.__values) != self.__negate:
+            return True
+        if self.__allowStringCompare:
+            validValue = value is not None and str(value) in self.__values
+            return validValue != self.__negate
+        return False
+
+    def getPropertyValues(self, key):
+        if (
+            key != self.__key
+            or self.__negate
+            or self.__allowStringCompare
+            or not isinstance(self.__values, (list, tuple, set, frozenset))
+            or not self._isCompilable()
+        ):
+            return None
+        try:
+            return set(self.__values)
+        except TypeError:
+            return None
+
+    def _createQueryNode(self):
+        return PredicateNode(self._matches, self._selectByIndex)
+
     def getSelection(self, workflowData):
         """Filters the given collection of entries and returns all selected entries"""
-        outCollection = ArtefactCollection()
-
-        for entry in workflowData:
-            if self.__key in entry:
-                if (not self.__negate and entry[self.__key] in self.__values) or (
-                    self.__negate and not entry[self.__key] in self.__values
-                ):
-                    outCollection.add_artefact(entry)
-                elif self.__allowStringCompare:
-                    validValue = (
-                        entry[self.__key] is not None
-                        and self.__value is not None
-                        and str(entry[self.__key]) in self.__values
-                    )
-
-                    if (not self.__negate and validValue) or (
-                        self.__negate and not validValue
-                    ):
-                        outCollection.add_artefact(entry)
-        return outCollection
+        return self._selectWithPlan(workflowData)
 
 
 class MultiActionTagSelector(KeyMultiValueSelector):
@@ -19,8 +19,9 @@
 from builtins import str
 
 import avid.common.artefact.defaultProps as artefactProps
-from avid.common.artefact import ArtefactCollection
+from avid.common.artefact import MISSING_PROPERTY
 from avid.selectors import SelectorBase
+from avid.selectors.queryPlan import PredicateNode, select_by_index
 
 
 class KeyValueSelector(SelectorBase):
@@ -47,40 +48,76 @@ class KeyValueSelector(SelectorBase):
         self.__allowNoneEquality = allowNoneEquality
         self.__negate = negate
 
+    def _selectByIndex(self, workflowData):
+        """Uses the property index of the passed collection to make the selection without a full scan.
+        Returns a HashSelection or None if no index can be used."""
+        if self.__negate:
+            return None
+        index = workflowData.get_property_index(self.__key)
+        if index is None:
+            return None
+
+        values = list()
+        if self.__value is None:
+            # key does not exist, but selection value is None, therefore it is a match
+            values.append(MISSING_PROPERTY)
+
+        if self.__allowStringCompare:
+            if self.__value is not None:
+                values.extend(
+                    value
+                    for value in index
+                    if value is not MISSING_PROPERTY
+                    and value is not None
+                    and str(value) == str(self.__value)
+                )
+        else:
+            try:
+                hash(self.__value)
+            except TypeError:
+                return None
+            values.append(self.__value)
+
+        return select_by_index(workflowData, self.__key, values)
+
+    def _matches(self, entry):
+        """Indicates if the passed artefact is selected."""
+        if self.__key in entry:
+            if self.__allowStringCompare:
+                validValue = (
+                    entry[self.__key] is not None
+                    and self.__value is not None
+                    and str(entry[self.__key]) == str(self.__value)
+                )
+                return validValue != self.__negate
+
+            equalValue = entry[self.__key] == self.__value
+            if not equalValue and self.__allowNoneEquality and self.__value is None:
+                equalValue = entry[self.__key] is None
+            return equalValue != self.__negate
+
+        # key does not exist, but selection value is None, therefore it is a match
+        return self.__value is None
+
+    def getPropertyValues(self, key):
+        if (
+            key != self.__key
+            or self.__negate
+            or self.__allowStringCompare
+            or not self._isCompilable()
+        ):
+            return None
+        try:
+            return {self.__value}
+        except TypeError:
+            return None
+
+    def _createQueryNode(self):
+        return PredicateNode(self._matches, self._selectByIndex)
+
     def getSelection(self, workflowData):
         """Filters the given collection of entries and returns all selected entries"""
-        outCollection = ArtefactCollection()
-
-        for entry in workflowData:
-            if self.__key in entry:
-                if self.__allowStringCompare:
-                    validValue = (
-                        entry[self.__key] is not None
-                        and self.__value is not None
-                        and str(entry[self.__key]) == str(self.__value)
-                    )
-
-                    if (not self.__negate and validValue) or (
-                        self.__negate and not validValue
-                    ):
-                        outCollection.add_artefact(entry)
-                else:
-                    equalValue = entry[self.__key] == self.__value
-                    if (
-                        not equalValue
-                        and self.__allowNoneEquality
-                        and self.__value is None
-                    ):
-                        equalValue = entry[self.__key] is None
-                    if (not self.__negate and equalValue) or (
-                        self.__negate and not equalValue
-                    ):
-                        outCollection.add_artefact(entry)
-            else:
-                if self.__value is None:
-                    # key does not exist, but selection value is None, therefore it is a match
-                    outCollection.add_artefact(entry)
-        return outCollection
+        return self._selectWithPlan(workflowData)
 
 
 class ActionTagSelector(KeyValueSelector):
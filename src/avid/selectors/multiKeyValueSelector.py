@@ -16,8 +16,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from avid.common.artefact import ArtefactCollection
-from avid.selectors import SelectorBase
+from avid.selectors import KeyValueSelector, SelectorBase
+from avid.selectors.queryPlan import AndNode
 
 
 class MultiKeyValueSelector(SelectorBase):
@@ -43,28 +43,25 @@ class MultiKeyValueSelector(SelectorBase):
         """adds unknown entries and replaces existing key values"""
         self.__selectionDict.update(selectionDict)
 
+    def getPropertyValues(self, key):
+        if key not in self.__selectionDict or not self._isCompilable():
+            return None
+        return KeyValueSelector(key, self.__selectionDict[key]).getPropertyValues(key)
+
+    def _createQueryNode(self):
+        if not self.__selectionDict:
+            return None
+        return AndNode(
+            [
+                KeyValueSelector(key, value)._createQueryNode()
+                for key, value in self.__selectionDict.items()
+            ]
+        )
+
     def getSelection(self, workflowData):
         """
         filters all entries but the entries that match the selectionDictionarry
         """
-        selection = workflowData
-        for element in self.__selectionDict:
-            selection = self.__getFilteredContainer(selection, element)
-        return selection
-
-    def __getFilteredContainer(self, container, dictEntry):
-        outCollection = ArtefactCollection()
-        try:
-            for entry in container:
-                if dictEntry in entry:
-                    if entry[dictEntry] == self.__selectionDict[dictEntry]:
-                        outCollection.add_artefact(entry)
-                else:
-                    if self.__selectionDict[dictEntry] is None:
-                        outCollection.add_artefact(entry)
-            return outCollection
-        except KeyError:
-            self.__workflow.getLogger().info(
-                "A key (%s) was specified, which is not stored in the input data!",
-                dictEntry,
-            )
+        if not self.__selectionDict:
+            return workflowData
+        return self._selectWithPlan(workflowData)
@@ -0,0 +1,380 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Query plans for selectors. A selector tree (e.g. AndSelector(ActionTagSelector(...), NotSelector(CaseSelector(...))))
+is compiled into a tree of query nodes (see SelectorBase.compile). The plan is evaluated without building the
+intermediate selections of the child selectors:
+- Nodes that can be answered by the property indexes of an ArtefactCollection are combined on the level of artefact
+  hashes (intersection, union, complement).
+- All other nodes are evaluated per artefact in one pass over the (index preselected) candidates. And chains are
+  short-circuited; cheap predicates are evaluated before opaque selectors.
+Selectors that cannot be compiled (e.g. LambdaSelector or selectors that override getSelection) are wrapped by a
+SelectionNode; their selection is computed once per evaluation.
+State of an evaluation (e.g. the selections of SelectionNodes) is not stored in the nodes, but in the evaluation
+context (a dict keyed by the nodes) that is passed to the methods of the nodes. So a plan may be evaluated
+concurrently.
+"""
+
+from avid.common.artefact import ArtefactCollection
+
+
+class HashSelection(object):
+    """Selection of artefacts of a collection by their hashes.
+
+    :param hashes: Dict (keys) or set of the hashes of the artefacts.
+    :param negated: If True, the selection contains all artefacts of the collection except the ones in hashes.
+    :param ordered: Indicates if hashes is a dict in the order of the collection.
+    """
+
+    __slots__ = ("hashes", "negated", "ordered")
+
+    def __init__(self, hashes, negated=False, ordered=False):
+        self.hashes = hashes
+        self.negated = negated
+        self.ordered = ordered
+
+    def __invert__(self):
+        return HashSelection(self.hashes, not self.negated, self.ordered)
+
+
+def select_by_index(collection, property_key, values, negated=False):
+    """Generates a HashSelection for the passed property values by using the property index of the collection.
+    Use MISSING_PROPERTY to select artefacts that do not have the property.
+    :return: The HashSelection or None if the property is not indexed."""
+    index = collection.get_property_index(property_key)
+    if index is None:
+        return None
+    buckets = [index[value] for value in values if value in index]
+    if not buckets:
+        return HashSelection(dict(), negated, True)
+    if len(buckets) == 1:
+        return HashSelection(buckets[0], negated, True)
+    hashes = set()
+    for bucket in buckets:
+        hashes.update(bucket)
+    return HashSelection(hashes, negated)
+
+
+def _intersect(selections):
+    positives = [selection for selection in selections if not selection.negated]
+    negatives = [selection for selection in selections if selection.negated]
+
+    if not positives:
+        # not A and not B == not (A or B)
+        return ~_unite([~selection for selection in negatives])
+
+    # iterate the smallest (preferably ordered) selection and check the others
+    base = min(
+        positives, key=lambda selection: (not selection.ordered, len(selection.hashes))
+    )
+    others = [selection.hashes for selection in positives if selection is not base]
+    excluded = [selection.hashes for selection in negatives]
+    hashes = {
+        artefact_hash: None
+        for artefact_hash in base.hashes
+        if all(artefact_hash in other for other in others)
+        and not any(artefact_hash in other for other in excluded)
+    }
+    return HashSelection(hashes, False, base.ordered)
+
+
+def _unite(selections):
+    if len(selections) == 1:
+        return selections[0]
+
+    negatives = [selection for selection in selections if selection.negated]
+    if negatives:
+        # A or not B or not C == not ((B and C) and not A)
+        return ~_intersect(
+            [~selection for selection in negatives]
+            + [~selection for selection in selections if not selection.negated]
+        )
+
+    hashes = set()
+    for selection in selections:
+        hashes.update(selection.hashes)
+    return HashSelection(hashes)
+
+
+class QueryNode(object):
+    """Base class of the nodes of a query plan. The methods get the evaluation context (see QueryPlan.prepare)."""
+
+    def prepare(self, workflowData, context):
+        """Is called once per evaluation before any other method is called. Nodes that need state for the evaluation
+        store it in the context (keyed by the node)."""
+        pass
+
+    def selectByIndex(self, collection, context):
+        """Returns the exact selection of this node as HashSelection, determined by the property indexes of the
+        collection, or None if the node cannot be answered by indexes."""
+        return None
+
+    def split(self, collection, context):
+        """Splits the node into a part that is answered by indexes and a residual per artefact predicate.
+        :return: Tuple of HashSelection (or None) and a list of predicates. Selected are all artefacts that are in the
+            selection (all if None) and match all predicates."""
+        selection = self.selectByIndex(collection, context)
+        if selection is not None:
+            return selection, []
+        return None, [self.getPredicate(context)]
+
+    def getPredicate(self, context):
+        """Returns a callable that gets an artefact and indicates if it is selected by this node."""
+        return lambda artefact: self.match(artefact, context)
+
+    def match(self, artefact, context):
+        """Indicates if the artefact is selected by this node."""
+        raise NotImplementedError
+
+    @property
+    def cost(self):
+        """Rough relative cost of match(). Used to order the evaluation of predicates."""
+        return 1
+
+
+class PredicateNode(QueryNode):
+    """Node for a selector that can be evaluated per artefact.
+
+    :param predicate: Callable that gets an artefact and returns True if it is selected.
+    :param indexFunction: Optional callable that gets a collection and returns the HashSelection of the selector or
+        None (see QueryNode.selectByIndex).
+    :param prepareFunction: Optional callable that gets the workflow data before the evaluation.
+    """
+
+    def __init__(self, predicate, indexFunction=None, prepareFunction=None):
+        self._predicate = predicate
+        self._indexFunction = indexFunction
+        self._prepareFunction = prepareFunction
+
+    def prepare(self, workflowData, context):
+        if self._prepareFunction is not None:
+            self._prepareFunction(workflowData)
+
+    def selectByIndex(self, collection, context):
+        if self._indexFunction is None:
+            return None
+        return self._indexFunction(collection)
+
+    def getPredicate(self, context):
+        return self._predicate
+
+    def match(self, artefact, context):
+        return self._predicate(artefact)
+
+
+class SelectionNode(QueryNode):
+    """Node for selectors that cannot be compiled. The selection of the selector is determined once per evaluation
+    (and stored in the evaluation context) and artefacts are matched against it."""
+
+    def __init__(self, selector):
+        self._selector = selector
+
+    def prepare(self, workflowData, context):
+        selection = self._selector.getSelection(workflowData)
+        if not isinstance(selection, ArtefactCollection):
+            selection = ArtefactCollection(selection)
+        context[self] = selection
+
+    def selectByIndex(self, collection, context):
+        return HashSelection(
+            {
+                hash(artefact): None
+                for artefact in context[self]
+                if collection.identical_artefact_exists(artefact)
+            }
+        )
+
+    def getPredicate(self, context):
+        return context[self].__contains__
+
+    def match(self, artefact, context):
+        return artefact in context[self]
+
+    @property
+    def cost(self):
+        return 2
+
+
+class AndNode(QueryNode):
+    def __init__(self, children):
+        self.children = list()
+        for child in children:
+            if isinstance(child, AndNode):
+                self.children.extend(child.children)
+            else:
+                self.children.append(child)
+        # short-circuit with the cheap predicates first (sorted is stable, so the order of the selectors is kept
+        # otherwise)
+        self.children.sort(key=lambda child: child.cost)
+
+    def prepare(self, workflowData, context):
+        for child in self.children:
+            child.prepare(workflowData, context)
+
+    def split(self, collection, context):
+        selections = list()
+        predicates = list()
+        for child in self.children:
+            selection, childPredicates = child.split(collection, context)
+            if selection is not None:
+                selections.append(selection)
+            predicates.extend(childPredicates)
+
+        if not selections:
+            return None, predicates
+        return _intersect(selections), predicates
+
+    def selectByIndex(self, collection, context):
+        selection, predicates = self.split(collection, context)
+        if predicates:
+            return None
+        return selection
+
+    def match(self, artefact, context):
+        for child in self.children:
+            if not child.match(artefact, context):
+                return False
+        return True
+
+    @property
+    def cost(self):
+        return max(child.cost for child in self.children)
+
+
+class OrNode(QueryNode):
+    def __init__(self, children):
+        self.children = list()
+        for child in children:
+            if isinstance(child, OrNode):
+                self.children.extend(child.children)
+            else:
+                self.children.append(child)
+
+    def prepare(self, workflowData, context):
+        for child in self.children:
+            child.prepare(workflowData, context)
+
+    def selectByIndex(self, collection, context):
+        selections = list()
+        for child in self.children:
+            selection = child.selectByIndex(collection, context)
+            if selection is None:
+                return None
+            selections.append(selection)
+        return _unite(selections)
+
+    def match(self, artefact, context):
+        for child in self.children:
+            if child.match(artefact, context):
+                return True
+        return False
+
+    @property
+    def cost(self):
+        return max(child.cost for child in self.children)
+
+
+class NotNode(QueryNode):
+    def __init__(self, child):
+        self.child = child
+
+    def prepare(self, workflowData, context):
+        self.child.prepare(workflowData, context)
+
+    def selectByIndex(self, collection, context):
+        selection = self.child.selectByIndex(collection, context)
+        if selection is None:
+            return None
+        return ~selection
+
+    def match(self, artefact, context):
+        return not self.child.match(artefact, context)
+
+    @property
+    def cost(self):
+        return self.child.cost
+
+
+class QueryPlan(object):
+    """Compiled selector (see SelectorBase.compile). It can be used like a selector.
+
+    :param root: Root node of the plan.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def prepare(self, workflowData):
+        """Prepares an evaluation of the plan for the passed workflow data and returns its evaluation context."""
+        context = dict()
+        self.root.prepare(workflowData, context)
+        return context
+
+    def getSelection(self, workflowData, context=None):
+        """Returns the selected artefacts in the order of the passed workflow data.
+        :param context: Evaluation context returned by prepare() for the same workflow data. If None, the evaluation
+            is prepared by the call."""
+        if context is None:
+            context = self.prepare(workflowData)
+
+        if not isinstance(workflowData, ArtefactCollection):
+            result = ArtefactCollection()
+            for artefact in workflowData:
+                if self.root.match(artefact, context):
+                    result.add_artefact(artefact)
+            return result
+
+        selection, predicates = self.root.split(workflowData, context)
+        artefactDict = workflowData.artefact_dict
+
+        if selection is None:
+            candidates = artefactDict.items()
+        elif selection.ordered and not selection.negated:
+            candidates = (
+                (artefactHash, artefactDict[artefactHash])
+                for artefactHash in selection.hashes
+            )
+        else:
+            hashes = selection.hashes
+            negated = selection.negated
+            candidates = (
+                (artefactHash, artefact)
+                for artefactHash, artefact in artefactDict.items()
+                if (artefactHash in hashes) != negated
+            )
+
+        # The artefacts are taken from the collection, so they can be added without rehashing them.
+        result = ArtefactCollection(indexed_properties=workflowData.indexed_properties)
+        resultDict = result.artefact_dict
+        if not predicates:
+            for artefactHash, artefact in candidates:
+                resultDict[artefactHash] = artefact
+        elif len(predicates) == 1:
+            predicate = predicates[0]
+            for artefactHash, artefact in candidates:
+                if predicate(artefact):
+                    resultDict[artefactHash] = artefact
+        else:
+            for artefactHash, artefact in candidates:
+                for predicate in predicates:
+                    if not predicate(artefact):
+                        break
+                else:
+                    resultDict[artefactHash] = artefact
+        return result
@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+LRU memo for selections. Workflows evaluate the same selectors on the unchanged session artefacts again and again
+(e.g. every input of every batch action). Selections of selectors that only depend on the artefacts (see
+SelectorBase._getSelectionKey) are therefore cached, keyed on the parameters of the selector and the state of the
+collection (its id, ArtefactCollection.version and ArtefactCollection.property_version).
+"""
+
+import threading
+from collections import OrderedDict
+
+from avid.common.artefact import ArtefactCollection
+
+"""Default maximum number of cached selections."""
+DEFAULT_CACHE_SIZE = 128
+"""Default minimum size of collections whose selections are cached. Selections of smaller collections are cheap and
+would only displace more valuable entries."""
+DEFAULT_MIN_COLLECTION_SIZE = 256
+
+
+class SelectionCache(object):
+    """Thread safe LRU cache of selections.
+
+    :param maxSize: Maximum number of cached selections. 0 deactivates the cache.
+    :param minCollectionSize: Minimum size of collections whose selections are cached.
+    """
+
+    def __init__(
+        self, maxSize=DEFAULT_CACHE_SIZE, minCollectionSize=DEFAULT_MIN_COLLECTION_SIZE
+    ):
+        self.maxSize = maxSize
+        self.minCollectionSize = minCollectionSize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def getSelection(self, selectionKey, workflowData, selectFunction):
+        """Returns the selection of the passed workflow data. If it is not cached, it is determined by calling
+        selectFunction(workflowData).
+        :param selectionKey: Hashable key of the selector or None if the selection may not be cached.
+        :return: The selection. Cached selections are returned as copy, so callers may alter them.
+        """
+        if (
+            selectionKey is None
+            or self.maxSize <= 0
+            or not isinstance(workflowData, ArtefactCollection)
+            or len(workflowData) < self.minCollectionSize
+        ):
+            return selectFunction(workflowData)
+
+        key = (
+            selectionKey,
+            workflowData.collection_id,
+            workflowData.version,
+            workflowData.property_version,
+        )
+        with self._lock:
+            selection = self._entries.get(key)
+            if selection is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if selection is None:
+            selection = selectFunction(workflowData)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = selection
+                while len(self._entries) > self.maxSize:
+                    self._entries.popitem(last=False)
+
+        return selection.copy()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+"""Cache used by the selectors."""
+selectionCache = SelectionCache()
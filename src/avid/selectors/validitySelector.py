@@ -17,8 +17,10 @@
 # limitations under the License.
 
 import avid.common.artefact.defaultProps as artefactProps
-from avid.common.artefact import ArtefactCollection, getArtefactProperty
+from avid.common.artefact import getArtefactProperty
+from avid.common.artefact.validity import resolve_deferred_validity
 from avid.selectors import SelectorBase
+from avid.selectors.queryPlan import PredicateNode, select_by_index
 
 
 class ValiditySelector(SelectorBase):
@@ -29,16 +31,23 @@ class ValiditySelector(SelectorBase):
         super().__init__()
         self._negate = negate
 
-    def getSelection(self, workflowData):
-        """Filters the given list of entries and returns all selected entries"""
-        outCollection = ArtefactCollection()
+    def _selectByIndex(self, workflowData):
+        # value may also be None or missing and should be seen as valid.
+        return select_by_index(
+            workflowData, artefactProps.INVALID, [True], negated=not self._negate
+        )
+
+    def _matches(self, entry):
+        # value may also be None and should be seen as valid.
+        return (
+            getArtefactProperty(entry, artefactProps.INVALID) is True
+        ) == self._negate
 
-        for entry in workflowData:
-            value = getArtefactProperty(entry, artefactProps.INVALID)
+    def _createQueryNode(self):
+        return PredicateNode(
+            self._matches, self._selectByIndex, resolve_deferred_validity
+        )
 
-            if (value is not True and not self._negate) or (
-                value is True and self._negate
-            ):
-                # value may also be None and should be seen as valid.
-                outCollection.add_artefact(entry)
-        return outCollection
+    def getSelection(self, workflowData):
+        """Filters the given list of entries and returns all selected entries"""
+        return self._selectWithPlan(workflowData)
@@ -34,6 +34,12 @@ class BaseSplitter(object):
         """
         return [selection.copy()]
 
+    def splitsByCase(self):
+        """Indicates if every split only contains artefacts of one case (artefacts without case count as case None).
+        It is e.g. used to decide if a batch action can be processed case by case (see
+        avid.common.workflow.dataflow)."""
+        return False
+
 
 from .keyValueSplitter import CaseSplitter, FractionSplitter, KeyValueSplitter
 from .singleSplitter import SingleSplitter
@@ -34,6 +34,12 @@ class KeyValueSplitter(BaseSplitter):
     def splitSelection(self, selection):
         return splitArtefact(selection, *self._key)
 
+    def splitsByCase(self):
+        return (
+            artefactProps.CASE in self._key
+            and type(self).splitSelection is KeyValueSplitter.splitSelection
+        )
+
 
 class CaseSplitter(KeyValueSplitter):
     """Splits artefact in such a way that all artefacts of same case are in one split."""
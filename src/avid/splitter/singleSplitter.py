@@ -32,3 +32,6 @@ class SingleSplitter(BaseSplitter):
             splittedList.append([item])
 
         return splittedList
+
+    def splitsByCase(self):
+        return type(self).splitSelection is SingleSplitter.splitSelection
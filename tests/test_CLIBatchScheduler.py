@@ -27,6 +27,24 @@ from avid.actions.dummy import DummyCLIAction as DummyAction
 from avid.common.artefact import getArtefactProperty
 
 
+class TimePointEstimator(object):
+    """Estimates the duration by the time point of the first input (unknown for odd time points above 10)."""
+
+    def estimate(self, action):
+        timepoint = action._inputArtefacts["input"][0][artefact_props.TIMEPOINT]
+        if timepoint > 10 and timepoint % 2 == 1:
+            return None
+        return float(timepoint)
+
+
+class DictEstimator(object):
+    def __init__(self, estimates):
+        self.estimates = estimates
+
+    def estimate(self, action):
+        return self.estimates.get(action)
+
+
 class TestCLIBatchScheduler(unittest.TestCase):
     def setUp(self):
         self.sessionDir = os.path.join(
@@ -277,6 +295,49 @@ class TestCLIBatchScheduler(unittest.TestCase):
             len(self.actions) - (len(fail_pattern) + len(skip_pattern)),
         )
 
+    def test_Scheduler_balanced(self):
+        estimator = TimePointEstimator()
+        scheduler = CLIBatchScheduler(5, estimator=estimator)
+
+        batches = scheduler._balance_batches(self.actions)
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(sum(len(batch) for batch in batches), len(self.actions))
+        # unknown durations (time points 11 and 13) are assumed to be the mean
+        mean = (sum(range(11)) + 12 + 14) / 13.0
+        estimates = [estimator.estimate(action) for action in self.actions]
+        estimates = [mean if value is None else value for value in estimates]
+        totals = [
+            sum(estimates[self.actions.index(action)] for action in batch)
+            for batch in batches
+        ]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        self.assertLessEqual(max(totals) - min(totals), 2.0)
+        self.assertEqual(scheduler._balance_batches([]), [])
+
+        # batch_size limits the number of actions per batch, even if that leaves the batches unbalanced
+        long_estimator = DictEstimator(
+            {
+                action: 10.0 if pos == 0 else 1.0
+                for pos, action in enumerate(self.actions[:10])
+            }
+        )
+        batches = CLIBatchScheduler(5, estimator=long_estimator)._balance_batches(
+            self.actions[:10]
+        )
+        self.assertEqual([len(batch) for batch in batches], [5, 5])
+        self.assertIn(self.actions[0], batches[0])
+        batches = CLIBatchScheduler(4, estimator=estimator)._balance_batches(
+            self.actions
+        )
+        self.assertEqual(len(batches), 4)
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+
+        scheduler = CLIBatchScheduler(4, 2, estimator=estimator)
+        scheduler.execute(iter(self.actions))
+        for action in self.actions:
+            self.assertTrue(action.isSuccess)
+        self.assertEqual(len(self.session.getSuccessfulActions()), len(self.actions))
+
 
 if __name__ == "__main__":
     unittest.main()
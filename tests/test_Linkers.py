@@ -99,6 +99,17 @@ class TestLinkers(unittest.TestCase):
         self.assertIn(self.a3, selections[0])
         self.assertIn(self.a4, selections[1])
 
+    def test_AndLinker_equal_selections(self):
+        # equal secondary selections are intersected by equality, not by identity
+        secondarySelections = self.data + [[self.a1], [self.a3]]
+        linker = CaseLinker() + TimePointLinker()
+        selections = linker.getLinkedSelection(2, self.data, secondarySelections)
+        self.assertEqual(selections, [[self.a3], [self.a4], [self.a3]])
+
+        selections = linker.getLinkedSelection(2, self.data, self.data)
+        self.assertEqual(selections, [[self.a3], [self.a4]])
+        self.assertIs(selections[0], self.data[2])
+
 
 if __name__ == "__main__":
     unittest.main()
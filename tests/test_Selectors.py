@@ -18,15 +18,26 @@
 import unittest
 
 import avid.common.artefact as artefact
+import avid.common.artefact.defaultProps as artefactProps
 import avid.common.artefact.generator as artefactGenerator
 from avid.selectors import (
     ActionTagSelector,
     AndSelector,
     CaseSelector,
     KeyValueSelector,
+    LambdaSelector,
+    MultiKeyValueSelector,
+    NotSelector,
     OrSelector,
+    TimepointSelector,
+    ValiditySelector,
     ValidResultSelector,
 )
+from avid.selectors.keyMulitValueSelector import (
+    MultiActionTagSelector,
+    MultiCaseSelector,
+)
+from avid.selectors.selectionCache import selectionCache
 
 
 class TestSelectors(unittest.TestCase):
@@ -192,6 +203,206 @@ class TestSelectors(unittest.TestCase):
         self.assertIn(self.a2, selection)
         self.assertIn(self.a3, selection)
 
+    def test_compiled_selector_trees(self):
+        def lambda_selection(workflowData):
+            return [a for a in workflowData if a[artefact.defaultProps.TIMEPOINT] == 0]
+
+        self.a3[artefact.defaultProps.INVALID] = True
+        selectors_and_expectations = [
+            (
+                ActionTagSelector("Action1")
+                + CaseSelector("Case2")
+                + ValiditySelector(),
+                [self.a4, self.a5],
+            ),
+            (
+                ActionTagSelector("Action2") - CaseSelector("Case1"),
+                [self.a6, self.a7],
+            ),
+            (-ActionTagSelector("Action1"), [self.a3, self.a6, self.a7, self.a8]),
+            (
+                OrSelector(
+                    CaseSelector("Case1") + ValiditySelector(),
+                    -ActionTagSelector("Action1") + TimepointSelector(0),
+                ),
+                [self.a1, self.a2, self.a3, self.a6, self.a7, self.a8],
+            ),
+            (
+                OrSelector(-CaseSelector("Case1"), -ActionTagSelector("Action1")),
+                [self.a3, self.a4, self.a5, self.a6, self.a7, self.a8],
+            ),
+            (
+                MultiCaseSelector(["Case1", "Case3"])
+                + LambdaSelector(lambda_selection)
+                - ValiditySelector(negate=True),
+                [self.a1, self.a7],
+            ),
+            (
+                MultiKeyValueSelector(
+                    {
+                        artefact.defaultProps.CASE: "Case2",
+                        artefact.defaultProps.TIMEPOINT: 1,
+                    }
+                )
+                + KeyValueSelector(
+                    artefact.defaultProps.CASEINSTANCE, None, allowNoneEquality=True
+                ),
+                [self.a5],
+            ),
+        ]
+
+        unindexed_data = artefact.ArtefactCollection(
+            self.data, indexed_properties=tuple()
+        )
+        for selector, expected in selectors_and_expectations:
+            plan = selector.compile()
+            for data in [self.data, unindexed_data, list(self.data)]:
+                selection = selector.getSelection(data)
+                self.assertEqual(
+                    [a for a in self.data if a in expected], list(selection)
+                )
+                self.assertEqual(list(selection), list(plan.getSelection(data)))
+
+    def test_compiled_selector_contexts(self):
+        # the state of an evaluation is kept in its context, so evaluations of a plan do not interfere
+        plan = (CaseSelector("Case1") + LambdaSelector(lambda data: data)).compile()
+        first = artefact.ArtefactCollection([self.a1])
+        context = plan.prepare(first)
+        self.assertEqual(
+            [a for a in self.data if a[artefact.defaultProps.CASE] == "Case1"],
+            list(plan.getSelection(self.data)),
+        )
+        self.assertEqual([self.a1], list(plan.getSelection(self.data, context)))
+
+    def test_compiled_selector_with_overridden_selection(self):
+        class FirstOnlyCaseSelector(CaseSelector):
+            def getSelection(self, workflowData):
+                selection = super().getSelection(workflowData)
+                return [selection.first()]
+
+        selector = FirstOnlyCaseSelector("Case2") + ActionTagSelector("Action1")
+        self.assertEqual([self.a4], list(selector.getSelection(self.data)))
+        selector = -FirstOnlyCaseSelector("Case2")
+        self.assertEqual(7, len(selector.getSelection(self.data)))
+
+    def test_selection_cache(self):
+        min_collection_size = selectionCache.minCollectionSize
+        selectionCache.minCollectionSize = 0
+        selectionCache.clear()
+        try:
+            version = self.data.version
+            selector = ActionTagSelector("Action1") + ValiditySelector()
+            selection = selector.getSelection(self.data)
+            self.assertEqual([self.a1, self.a2, self.a4, self.a5], list(selection))
+            self.assertEqual(0, selectionCache.hits)
+
+            # equal selectors on the unchanged collection are answered by the cache
+            selection.remove_artefact(self.a1)
+            selection = (
+                ActionTagSelector("Action1") + ValiditySelector()
+            ).getSelection(self.data)
+            self.assertEqual([self.a1, self.a2, self.a4, self.a5], list(selection))
+            self.assertEqual(1, selectionCache.hits)
+            self.assertEqual(version, self.data.version)
+
+            # changed collection or changed artefacts
+            self.data.add_artefact(
+                artefactGenerator.generateArtefactEntry(
+                    "Case5", None, 0, "Action1", "result", "dummy", None
+                )
+            )
+            self.assertGreater(self.data.version, version)
+            self.assertEqual(5, len(selector.getSelection(self.data)))
+            self.a2[artefact.defaultProps.INVALID] = True
+            self.assertEqual(4, len(selector.getSelection(self.data)))
+            self.assertEqual(1, selectionCache.hits)
+
+            # other parameters
+            self.assertEqual(
+                3,
+                len(
+                    (ActionTagSelector("Action2") + ValiditySelector()).getSelection(
+                        self.data
+                    )
+                ),
+            )
+            self.assertEqual(1, selectionCache.hits)
+
+            # selections of lambda selectors are not cached
+            selector = ActionTagSelector("Action1") + LambdaSelector(lambda x: x)
+            selector.getSelection(self.data)
+            selector.getSelection(self.data)
+            self.assertEqual(1, selectionCache.hits)
+        finally:
+            selectionCache.minCollectionSize = min_collection_size
+            selectionCache.clear()
+
+    def test_selection_cache_after_similarity_change(self):
+        min_collection_size = selectionCache.minCollectionSize
+        selectionCache.minCollectionSize = 0
+        selectionCache.clear()
+        try:
+            selector = ActionTagSelector("Action1") + ValiditySelector()
+            self.assertEqual(4, len(selector.getSelection(self.data)))
+
+            # changing a similarity relevant property clears the hash cache of the artefact, but later changes must
+            # still be tracked by the collection
+            self.a1[artefactProps.RESULT_SUB_TAG] = "sub"
+            self.a1[artefactProps.INVALID] = True
+            self.assertEqual(3, len(selector.getSelection(self.data)))
+            self.a2[artefactProps.INVALID] = True
+            self.assertEqual(2, len(selector.getSelection(self.data)))
+        finally:
+            selectionCache.minCollectionSize = min_collection_size
+            selectionCache.clear()
+
+    def test_property_values(self):
+        key = artefactProps.ACTIONTAG
+        self.assertEqual(
+            ActionTagSelector("Action1").getPropertyValues(key), {"Action1"}
+        )
+        self.assertIsNone(
+            ActionTagSelector("Action1").getPropertyValues(artefactProps.CASE)
+        )
+        self.assertIsNone(
+            ActionTagSelector("Action1", negate=True).getPropertyValues(key)
+        )
+        self.assertEqual(
+            MultiActionTagSelector(["Action1", "Action2"]).getPropertyValues(key),
+            {"Action1", "Action2"},
+        )
+        self.assertEqual(
+            MultiKeyValueSelector({key: "Action2"}).getPropertyValues(key), {"Action2"}
+        )
+        self.assertEqual(
+            (ActionTagSelector("Action1") + CaseSelector("Case1")).getPropertyValues(
+                key
+            ),
+            {"Action1"},
+        )
+        self.assertEqual(
+            OrSelector(
+                ActionTagSelector("Action1"), ActionTagSelector("Action2")
+            ).getPropertyValues(key),
+            {"Action1", "Action2"},
+        )
+        self.assertIsNone(
+            OrSelector(
+                ActionTagSelector("Action1"), CaseSelector("Case1")
+            ).getPropertyValues(key)
+        )
+        self.assertIsNone(
+            NotSelector(ActionTagSelector("Action1")).getPropertyValues(key)
+        )
+        self.assertIsNone(LambdaSelector(lambda data: data).getPropertyValues(key))
+        self.assertIsNone(ValidResultSelector().getPropertyValues(key))
+        self.assertEqual(
+            (ValidResultSelector() + ActionTagSelector("Action2")).getPropertyValues(
+                key
+            ),
+            {"Action2"},
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
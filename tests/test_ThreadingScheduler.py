@@ -17,12 +17,40 @@
 # limitations under the License.
 
 import os
+import signal
+import time
 import unittest
 
+import avid.common.artefact.defaultProps as artefactProps
 import avid.common.artefact.generator as artefactGenerator
 import avid.common.workflow as workflow
 from avid.actions.dummy import DummySingleAction as DummyAction
-from avid.actions.threadingScheduler import ThreadingScheduler
+from avid.actions.threadingScheduler import (
+    ThreadingScheduler,
+    getHistoricDuration,
+    longestExpectedFirst,
+)
+from avid.common.workflow.workerPool import WorkerPool
+
+
+class RecordingAction(DummyAction):
+    def __init__(self, artefacts, actionTag, log, delay=0.0, interrupt=False):
+        DummyAction.__init__(self, artefacts, actionTag, True)
+        self.log = log
+        self.delay = delay
+        self.interrupt = interrupt
+
+    def _generateOutputs(self):
+        DummyAction._generateOutputs(self)
+        self.log.append(self.actionTag)
+        if self.interrupt:
+            os.kill(os.getpid(), signal.SIGINT)
+        time.sleep(self.delay)
+
+
+class BrokenAction(DummyAction):
+    def do(self):
+        raise RuntimeError("broken action")
 
 
 class TestThreadingScheduler(unittest.TestCase):
@@ -124,6 +152,85 @@ class TestThreadingScheduler(unittest.TestCase):
         self.assertEqual(len(self.session.executed_actions), 6)
         self.assertFalse(self.session.hasFailedActions())
 
+    def test_priority(self):
+        artefacts = [self.a1, self.a2, self.a3, self.a4, self.a5, self.a6]
+        for artefact, duration in zip(artefacts, [3.0, None, 10.0, 1.0, 5.0, 2.0]):
+            artefact[artefactProps.EXECUTION_DURATION] = duration
+            self.session.add_artefact(artefact)
+        unknown = artefactGenerator.generateArtefactEntry(
+            "Case3", None, 0, "Action7", "result", "dummy"
+        )
+
+        log = list()
+        actions = [
+            RecordingAction([artefact], artefact[artefactProps.ACTIONTAG], log)
+            for artefact in artefacts + [unknown]
+        ]
+        self.assertEqual(getHistoricDuration(actions[2]), 10.0)
+        self.assertIsNone(getHistoricDuration(actions[1]))
+        self.assertIsNone(getHistoricDuration(actions[6]))
+
+        ThreadingScheduler(1, priority=longestExpectedFirst).execute(actions)
+        self.assertEqual(
+            log,
+            [
+                "Action2",
+                "Action7",
+                "Action3",
+                "Action5",
+                "Action1",
+                "Action6",
+                "Action4",
+            ],
+        )
+
+    def test_errors(self):
+        broken = BrokenAction([self.a1], "Broken", True)
+        scheduler = ThreadingScheduler(2)
+        scheduler.execute([broken] + self.actionList)
+
+        self.assertTrue(broken.isFailure)
+        self.assertIn("broken action", broken.last_warnings[0][0])
+        self.assertEqual(len(self.session.executed_actions), 6)
+        for action in self.actionList:
+            self.assertTrue(action.isSuccess)
+
+    @unittest.skipIf(os.name == "nt", "Interrupt is raised via SIGINT")
+    def test_interrupt(self):
+        log = list()
+        actions = [
+            RecordingAction([self.a1], "Action1", log, delay=0.2, interrupt=True)
+        ]
+        actions += [RecordingAction([self.a2], "Action2", log) for _ in range(5)]
+
+        with self.assertRaises(KeyboardInterrupt):
+            ThreadingScheduler(1).execute(iter(actions))
+        # the running action was completed, the pending ones were not started
+        self.assertEqual(log, ["Action1"])
+        self.assertTrue(actions[0].isSuccess)
+        self.assertTrue(all(action.is_uninitialized for action in actions[1:]))
+
+    def test_worker_pool(self):
+        ThreadingScheduler(2).execute(self.actionList[:3])
+        pool = self.session._worker_pool
+        self.assertEqual(pool.threadcount, 2)
+        ThreadingScheduler(2).execute(iter(self.actionList[3:]))
+        self.assertIs(self.session._worker_pool, pool)
+        self.assertEqual(pool.threadcount, 2)
+        self.assertEqual(len(self.session.executed_actions), 6)
+
+        threads = list(pool._threads)
+        with self.session:
+            pass
+        self.assertTrue(pool.isShutdown)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+
+        # a passed pool is used instead of the pool of the session
+        with WorkerPool(1) as ownPool:
+            ThreadingScheduler(3, pool=ownPool).execute(self.actionList)
+            self.assertEqual(ownPool.threadcount, 1)
+        self.assertIsNone(self.session._worker_pool)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -24,6 +24,7 @@ import avid.common.artefact.defaultProps as artefactProps
 import avid.common.artefact.generator as artefactGenerator
 import avid.common.workflow as workflow
 from avid.actions.dummy import DummyBatchAction
+from avid.actions.threadingScheduler import ThreadingScheduler
 from avid.selectors import SelectorBase
 
 
@@ -274,6 +275,77 @@ class Test(unittest.TestCase):
             self.session.artefacts.identical_artefact_exists(self.a_valid_new)
         )
 
+    def test_streaming(self):
+        workflow.currentGeneratedSession = self.session
+        selector = TestSelector([self.a_valid_new, self.a_valid2_new, self.a_NoFile])
+        action = DummyBatchAction(selector, "Action1", alwaysDo=True, streaming=True)
+        self.assertTrue(action.isStreaming())
+        self.assertFalse(DummyBatchAction(selector, "Action1").isStreaming())
+
+        action.generateActions()
+        # inputs are prepared, but no action is generated before the processing
+        self.assertEqual(len(action._actions), 0)
+        self.assertEqual(action.number_of_actions, 3)
+
+        action.do()
+
+        self.assertTrue(action.isFailure)
+        self.assertEqual(action.number_of_actions, 3)
+        self.assertEqual(len(action.outputArtefacts), 3)
+        self.assertIn(self.a_valid_new, action.outputArtefacts)
+        self.assertIn(self.a_valid2_new, action.outputArtefacts)
+        # only the failed action is retained; the successful ones are only counted
+        self.assertEqual(len(action._actions), 1)
+        self.assertEqual(action.getFailedActions(), action._actions)
+        self.assertEqual(self.session.executed_actions, action._actions)
+        self.assertFalse(action._actions[0].retainAfterProcessing)
+        self.assertEqual(len(action.getSuccessfulActions()), 0)
+        self.assertEqual(action.getNumberOfSuccessfulActions(), 2)
+        self.assertEqual(self.session.getNumberOfSuccessfulActions(), 2)
+        self.assertEqual(action.getNumberOfSkippedActions(), 0)
+
+        action = DummyBatchAction(
+            selector,
+            "Action1",
+            alwaysDo=True,
+            streaming=True,
+            scheduler=ThreadingScheduler(2),
+        )
+        action.do()
+        self.assertTrue(action.isFailure)
+        self.assertEqual(action.number_of_actions, 3)
+        self.assertEqual(len(action.outputArtefacts), 3)
+        self.assertEqual(len(action.getFailedActions()), 1)
+        self.assertEqual(action.getNumberOfSuccessfulActions(), 2)
+
+        # the outputs of all actions are needed, so all actions are generated and retained
+        action = DummyBatchAction(selector, "Action1", alwaysDo=True, streaming=True)
+        self.assertEqual(len(action.indicateOutputs()), 3)
+        action.do()
+        self.assertEqual(action.number_of_actions, 3)
+        self.assertEqual(len(action.getSuccessfulActions()), 2)
+
+    def test_iterate_actions(self):
+        workflow.currentGeneratedSession = self.session
+        action = DummyBatchAction(
+            TestSelector([self.a_valid_new, self.a_valid2_new, self.a_NoFile]),
+            "Action1",
+        )
+        generator = action._generator
+
+        actions = generator.iterateActions()
+        first = next(actions)
+        self.assertEqual(first._artefacts, [self.a_valid_new])
+        # one action per primary split so far
+        self.assertEqual(generator.estimatedNumberOfActions(), 3)
+        self.assertEqual(len(list(actions)), 2)
+        self.assertEqual(generator.estimatedNumberOfActions(), 3)
+
+        self.assertEqual(
+            [a._artefacts for a in generator.generateActions()],
+            [[self.a_valid_new], [self.a_valid2_new], [self.a_NoFile]],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
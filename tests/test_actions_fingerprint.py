@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.fingerprint as fingerprint
+import avid.common.artefact.generator as artefactGenerator
+import avid.common.workflow as workflow
+from avid.actions.pythonAction import PythonAction
+from avid.common.artefact.fingerprint import (
+    FINGERPRINT_MODE_CONTENT,
+    FINGERPRINT_MODE_STAT,
+    compute_fingerprint,
+    file_fingerprint,
+)
+
+
+def copy_script(inputs, outputs, times=1):
+    with open(outputs[0], "w") as ofile:
+        with open(inputs[0], "r") as ifile:
+            ofile.write(ifile.read() * times)
+
+
+def other_copy_script(inputs, outputs, times=1):
+    copy_script(inputs, outputs, times)
+
+
+class TestActionsFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.sessionDir = os.path.join(
+            os.path.split(__file__)[0], "temporary_test_actions_fingerprint"
+        )
+        os.makedirs(self.sessionDir, exist_ok=True)
+        self.inputPath = os.path.join(self.sessionDir, "input.txt")
+        with open(self.inputPath, "w") as inputFile:
+            inputFile.write("abc")
+
+        self.input = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 0, "Input", "result", "dummy", self.inputPath
+        )
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.sessionDir)
+        except:
+            pass
+
+    def _do_action(self, session, generateCallable=copy_script, times=1):
+        action = PythonAction(
+            generateCallable,
+            additionalArgs={"times": times},
+            defaultoutputextension="txt",
+            actionTag="copy",
+            session=session,
+            inputs=[self.input],
+        )
+        action.do()
+        return action
+
+    def _rewrite_input(self, content):
+        stat = os.stat(self.inputPath)
+        with open(self.inputPath, "w") as inputFile:
+            inputFile.write(content)
+        # ensure a changed modification time, independent of the file system resolution
+        os.utime(self.inputPath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_fingerprint_stat(self):
+        session = workflow.Session(
+            "session1", self.sessionDir, input_fingerprinting=FINGERPRINT_MODE_STAT
+        )
+
+        action = self._do_action(session)
+        self.assertTrue(action.isSuccess)
+        fingerprint = action.outputArtefacts[0][artefactProps.INPUT_FINGERPRINT]
+        self.assertIsNotNone(fingerprint)
+
+        # unchanged inputs and configuration
+        action = self._do_action(session)
+        self.assertTrue(action.isSkipped)
+
+        # changed action configuration
+        action = self._do_action(session, times=2)
+        self.assertTrue(action.isSuccess)
+        action = self._do_action(session, generateCallable=other_copy_script, times=2)
+        self.assertTrue(action.isSuccess)
+        action = self._do_action(session, generateCallable=other_copy_script, times=2)
+        self.assertTrue(action.isSkipped)
+
+        # changed input file
+        self._rewrite_input("abc")
+        action = self._do_action(session, generateCallable=other_copy_script, times=2)
+        self.assertTrue(action.isSuccess)
+        with open(action.outputArtefacts[0][artefactProps.URL]) as outputFile:
+            self.assertEqual(outputFile.read(), "abcabc")
+
+    def test_fingerprint_content(self):
+        session = workflow.Session(
+            "session1", self.sessionDir, input_fingerprinting=FINGERPRINT_MODE_CONTENT
+        )
+        self.assertTrue(self._do_action(session).isSuccess)
+
+        # rewriting the same content is no change
+        self._rewrite_input("abc")
+        self.assertTrue(self._do_action(session).isSkipped)
+
+        self._rewrite_input("xyz")
+        self.assertTrue(self._do_action(session).isSuccess)
+        self.assertTrue(self._do_action(session).isSkipped)
+
+    def test_content_hash_cache(self):
+        cacheSize = fingerprint.CONTENT_HASH_CACHE_SIZE
+        fingerprint.CONTENT_HASH_CACHE_SIZE = 2
+        try:
+            fingerprint._contentHashCache.clear()
+            paths = [self.inputPath]
+            for i in range(2):
+                path = os.path.join(self.sessionDir, "other{}.txt".format(i))
+                with open(path, "w") as otherFile:
+                    otherFile.write("other")
+                paths.append(path)
+
+            values = [
+                file_fingerprint(path, FINGERPRINT_MODE_CONTENT) for path in paths
+            ]
+            self.assertEqual(values[1], values[2])
+            # the least recently used hash is dropped
+            self.assertEqual(list(fingerprint._contentHashCache), paths[1:])
+
+            # only the hash of the current state of a file is kept
+            file_fingerprint(paths[1], FINGERPRINT_MODE_CONTENT)
+            self._rewrite_input("xyz")
+            newValue = file_fingerprint(self.inputPath, FINGERPRINT_MODE_CONTENT)
+            self.assertNotEqual(values[0], newValue)
+            self.assertEqual(
+                list(fingerprint._contentHashCache), [paths[1], self.inputPath]
+            )
+        finally:
+            fingerprint.CONTENT_HASH_CACHE_SIZE = cacheSize
+            fingerprint._contentHashCache.clear()
+
+    def test_no_fingerprinting(self):
+        session = workflow.Session("session1", self.sessionDir)
+        action = self._do_action(session)
+        self.assertTrue(action.isSuccess)
+        self.assertNotIn(artefactProps.INPUT_FINGERPRINT, action.outputArtefacts[0])
+
+        # without fingerprinting changes are not detected
+        self._rewrite_input("xyz")
+        self.assertTrue(self._do_action(session, times=2).isSkipped)
+
+        # outputs without fingerprint are regarded as outdated if fingerprinting is activated
+        session.inputFingerprinting = FINGERPRINT_MODE_STAT
+        self.assertTrue(self._do_action(session).isSuccess)
+
+        with self.assertRaises(ValueError):
+            workflow.Session("session2", self.sessionDir, input_fingerprinting="hash")
+
+    def test_compute_fingerprint(self):
+        inputs = {"b": [self.input], "a": [None, self.input]}
+        fingerprint = compute_fingerprint({"x": 1, "y": {2, 1}}, inputs)
+        self.assertEqual(
+            fingerprint, compute_fingerprint({"y": {1, 2}, "x": 1}, dict(inputs))
+        )
+        self.assertNotEqual(fingerprint, compute_fingerprint({"x": 2}, inputs))
+        self.assertNotEqual(
+            fingerprint,
+            compute_fingerprint(
+                {"x": 1, "y": {2, 1}}, inputs, FINGERPRINT_MODE_CONTENT
+            ),
+        )
+        with self.assertRaises(ValueError):
+            compute_fingerprint({}, inputs, "unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -86,6 +86,49 @@ class TestArtefact(unittest.TestCase):
         self.assertEqual(propCount, len(artefact.similarityRelevantProperties))
         self.assertIn("ensuredTestProp", artefact.similarityRelevantProperties)
 
+    def test_similarity_key_cache(self):
+        a = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 0, "Action1", "result", "dummy", "myCoolFile.any"
+        )
+        b = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 0, "Action1", "result", "dummy", "otherFile.any"
+        )
+        self.assertEqual(hash(a), hash(b))
+        self.assertTrue(a.is_similar(b))
+
+        # not similarity relevant -> key stays the same
+        key = a.similarity_key
+        a[artefactProps.URL] = "changed.any"
+        self.assertIs(key, a.similarity_key)
+
+        # similarity relevant -> cache is invalidated
+        a[artefactProps.CASE] = "Case2"
+        self.assertNotEqual(hash(a), hash(b))
+        self.assertFalse(a.is_similar(b))
+        a[artefactProps.CASE] = "Case1"
+        self.assertEqual(hash(a), hash(b))
+
+        # extending the relevant properties invalidates the cache of all artefacts
+        a["cacheTestProp"] = "1"
+        b["cacheTestProp"] = "2"
+        self.assertTrue(a.is_similar(b))
+        artefact.ensureSimilarityRelevantProperty("cacheTestProp")
+        self.assertFalse(a.is_similar(b))
+        self.assertIn(("cacheTestProp", "1"), a.similarity_key)
+
+    def test_similarity_key_pickle(self):
+        import pickle
+
+        a = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 0, "Action1", "result", "dummy", "myCoolFile.any"
+        )
+        hash(a)
+        b = pickle.loads(pickle.dumps(a))
+        self.assertTrue(a.is_identical(b))
+        self.assertEqual(hash(a), hash(b))
+        b[artefactProps.CASE] = "Case2"
+        self.assertNotEqual(hash(a), hash(b))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -20,6 +20,7 @@ import os
 import shutil
 import threading
 import time
+import types
 import unittest
 
 import avid.common.artefact.defaultProps as artefactProps
@@ -190,6 +191,22 @@ class TestArtefactFileHelper(unittest.TestCase):
         valid_artefact = [x for x in artefacts if condition(x)]
         self.assertEqual(len(valid_artefact), 3)
 
+    def test_iter_xml(self):
+        artefactIter = fileHelper.iter_artefacts_from_xml(
+            os.path.join(self.testDataDir, "testlist.avid"), True
+        )
+        self.assertIsInstance(artefactIter, types.GeneratorType)
+        first = next(artefactIter)
+        self.assertEqual(first[artefactProps.ID], "ID_1")
+        self.assertEqual(len(list(artefactIter)), 2)
+
+        filePath = os.path.join(self.sessionDir, "test_iter.avid")
+        fileHelper.save_artefacts_to_xml(filePath, self.data, rootPath=self.testDataDir)
+        artefacts = list(
+            fileHelper.iter_artefacts_from_xml(filePath, rootPath=self.testDataDir)
+        )
+        self.assertEqual(self.data, artefacts)
+
     def test_save_xml(self):
         fileHelper.save_artefacts_to_xml(
             os.path.join(self.sessionDir, "test1.avid"),
@@ -0,0 +1,274 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import sqlite3
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.fileHelper as fileHelper
+import avid.common.artefact.generator as artefactGenerator
+import avid.common.artefact.sqliteStorage as sqliteStorage
+from avid.common.artefact import Artefact, ArtefactCollection
+from avid.common.artefact.sqliteStorage import SQLiteArtefactStorage
+
+
+class TestArtefactSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.testDataDir = os.path.join(os.path.split(__file__)[0], "data")
+        self.sessionDir = os.path.join(
+            os.path.split(__file__)[0], "temporary", "test_artefactsqlitestorage"
+        )
+
+        self.a1 = artefactGenerator.generateArtefactEntry(
+            "case1",
+            None,
+            0,
+            "action1",
+            "result1",
+            "dummy1",
+            os.path.join(self.testDataDir, "artefact1.txt"),
+            "obj_1",
+            True,
+        )
+        self.a2 = artefactGenerator.generateArtefactEntry(
+            "case2",
+            "instance",
+            "tp",
+            "action2",
+            "result2",
+            "dummy2",
+            os.path.join(self.testDataDir, "artefact2.txt"),
+            None,
+            False,
+            customProp1="nice",
+            customProp2="42",
+        )
+        self.a3 = artefactGenerator.generateArtefactEntry(
+            "case3",
+            None,
+            0,
+            "action1",
+            "result1",
+            "dummy1",
+            os.path.join(self.testDataDir, "artefact1.txt"),
+            input_ids={
+                "source": ["id_1", "id_1_1"],
+                "source3": [None],
+                "source4": ["id_2"],
+            },
+        )
+        self.data = ArtefactCollection()
+        self.data.add_artefact(self.a1)
+        self.data.add_artefact(self.a2)
+        self.data.add_artefact(self.a3)
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.sessionDir)
+        except:
+            pass
+
+    def assertArtefactsIdentical(self, reference, artefacts):
+        reference = list(reference)
+        artefacts = list(artefacts)
+        self.assertEqual(len(reference), len(artefacts))
+        for ref, artefact in zip(reference, artefacts):
+            self.assertEqual(
+                list(ref._defaultProps.items()), list(artefact._defaultProps.items())
+            )
+            self.assertEqual(ref._additionalProps, artefact._additionalProps)
+
+    def test_get_artefact_storage(self):
+        self.assertIsInstance(
+            fileHelper.get_artefact_storage(os.path.join(self.sessionDir, "s.avidb")),
+            SQLiteArtefactStorage,
+        )
+        self.assertIsInstance(
+            fileHelper.get_artefact_storage(os.path.join(self.sessionDir, "s.avid")),
+            fileHelper.XMLArtefactStorage,
+        )
+
+        # existing databases are detected independent of their extension
+        filePath = os.path.join(self.sessionDir, "database.avid")
+        SQLiteArtefactStorage().save(filePath, self.data)
+        self.assertIsInstance(
+            fileHelper.get_artefact_storage(filePath), SQLiteArtefactStorage
+        )
+
+    def test_save_load(self):
+        filePath = os.path.join(self.sessionDir, "test1.avidb")
+        fileHelper.save_artefacts(filePath, self.data, rootPath=self.testDataDir)
+
+        artefacts = fileHelper.load_artefact_collection(
+            filePath, rootPath=self.testDataDir
+        )
+        self.assertEqual(self.data, artefacts)
+        self.assertArtefactsIdentical(self.data, artefacts)
+        self.assertEqual(artefacts.find_similar(self.a2)[artefactProps.TIMEPOINT], "tp")
+
+        # property types, None values and missing default properties are kept
+        special = Artefact(
+            defaultP={
+                artefactProps.CASE: "case4",
+                artefactProps.TIMEPOINT: 3,
+                artefactProps.INVALID: True,
+                artefactProps.INPUT_IDS: {"source": None, "source2": ["id", None]},
+                "customDefault": 1.5,
+            },
+            additionalP={"noValue": None, "value": "42"},
+        )
+        fileHelper.save_artefacts(filePath, [special])
+        self.assertArtefactsIdentical([special], fileHelper.iter_artefacts(filePath))
+
+        with self.assertRaises(ValueError):
+            fileHelper.load_artefact_collection(
+                os.path.join(self.sessionDir, "invalid.avidb")
+            )
+
+    def test_save_in_chunks(self):
+        filePath = os.path.join(self.sessionDir, "chunks.avidb")
+        chunkSize = sqliteStorage._INSERT_CHUNK_SIZE
+        sqliteStorage._INSERT_CHUNK_SIZE = 2
+        try:
+            # artefacts are passed as generator, so they are consumed while saving
+            fileHelper.save_artefacts(
+                filePath, (a for a in self.data), rootPath=self.testDataDir
+            )
+        finally:
+            sqliteStorage._INSERT_CHUNK_SIZE = chunkSize
+        self.assertArtefactsIdentical(
+            self.data, fileHelper.iter_artefacts(filePath, rootPath=self.testDataDir)
+        )
+
+    def test_version(self):
+        filePath = os.path.join(self.sessionDir, "version.avidb")
+        fileHelper.save_artefacts(filePath, self.data)
+        connection = sqlite3.connect(filePath)
+        with connection:
+            connection.execute(
+                "UPDATE avid_meta SET value = '99.0' WHERE key = 'version'"
+            )
+        connection.close()
+        with self.assertRaisesRegex(ValueError, "99.0"):
+            fileHelper.load_artefact_collection(filePath)
+
+        otherPath = os.path.join(self.sessionDir, "other.avidb")
+        connection = sqlite3.connect(otherPath)
+        with connection:
+            connection.execute("CREATE TABLE something (value)")
+        connection.close()
+        with self.assertRaisesRegex(ValueError, "no AVID artefact database"):
+            fileHelper.load_artefact_collection(otherPath)
+
+    def test_convert_xml(self):
+        xmlPath = os.path.join(self.sessionDir, "test.avid")
+        dbPath = os.path.join(self.sessionDir, "sub", "test.avidb")
+        xmlPath2 = os.path.join(self.sessionDir, "test2.avid")
+
+        fileHelper.save_artefacts_to_xml(
+            xmlPath,
+            fileHelper.iter_artefacts_from_xml(
+                os.path.join(self.testDataDir, "testlist.avid"),
+                expandPaths=True,
+                check_validity=False,
+            ),
+        )
+        fileHelper.convert_artefact_file(xmlPath, dbPath)
+        fileHelper.convert_artefact_file(dbPath, xmlPath2)
+
+        with open(xmlPath) as xmlFile, open(xmlPath2) as xmlFile2:
+            self.assertEqual(xmlFile.read(), xmlFile2.read())
+        self.assertArtefactsIdentical(
+            fileHelper.iter_artefacts(xmlPath, expandPaths=True),
+            fileHelper.iter_artefacts(dbPath, expandPaths=True),
+        )
+
+    def test_query(self):
+        filePath = os.path.join(self.sessionDir, "test_query.avidb")
+        storage = fileHelper.get_artefact_storage(filePath)
+        storage.save(filePath, self.data)
+
+        def query(properties):
+            return [
+                artefact[artefactProps.CASE]
+                for artefact in storage.query(filePath, properties, expandPaths=True)
+            ]
+
+        self.assertEqual(
+            query({artefactProps.ACTIONTAG: "action1"}), ["case1", "case3"]
+        )
+        self.assertEqual(
+            query({artefactProps.ACTIONTAG: "action1", artefactProps.OBJECTIVE: None}),
+            ["case3"],
+        )
+        self.assertEqual(
+            query({artefactProps.CASE: ["case2", "case3"]}), ["case2", "case3"]
+        )
+        self.assertEqual(query({"customProp1": "nice"}), ["case2"])
+        self.assertEqual(query({"customProp1": None}), ["case1", "case3"])
+        self.assertEqual(query({artefactProps.TIMEPOINT: 0, "customProp2": "42"}), [])
+
+        queried = list(
+            storage.query(filePath, {artefactProps.CASE: "case3"}, expandPaths=True)
+        )
+        self.assertArtefactsIdentical([self.a3], queried)
+
+    def test_update_artefactlist(self):
+        filePath = os.path.join(self.sessionDir, "test_update.avidb")
+        fileHelper.save_artefacts(filePath, self.data, rootPath=self.testDataDir)
+
+        a3_update = artefactGenerator.generateArtefactEntry(
+            "case3",
+            None,
+            0,
+            "action1",
+            "result1",
+            "dummy1",
+            os.path.join(self.testDataDir, "artefact3.txt"),
+            input_ids={
+                "source": ["id_1", "id_1_1"],
+                "source3": [None],
+                "source4": ["id_2"],
+            },
+        )
+        a4 = artefactGenerator.generateArtefactEntry(
+            "case4",
+            None,
+            0,
+            "action1",
+            "result1",
+            "dummy1",
+            os.path.join(self.testDataDir, "artefact2.txt"),
+        )
+
+        fileHelper.update_artefactlist(
+            filePath, [a3_update, a4], update_existing=True, rootPath=self.testDataDir
+        )
+        self.assertIsInstance(
+            fileHelper.get_artefact_storage(filePath), SQLiteArtefactStorage
+        )
+        artefacts = fileHelper.load_artefact_collection(
+            filePath, rootPath=self.testDataDir
+        )
+        self.assertEqual(artefacts, [self.a1, self.a2, a3_update, a4])
+
+
+if __name__ == "__main__":
+    unittest.main()
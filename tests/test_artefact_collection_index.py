@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.generator as artefactGenerator
+from avid.common.artefact import (
+    MISSING_PROPERTY,
+    ArtefactCollection,
+    get_all_values_of_a_property,
+)
+from avid.selectors import (
+    ActionTagSelector,
+    CaseInstanceSelector,
+    CaseSelector,
+    KeyValueSelector,
+    TimepointSelector,
+    TypeSelector,
+    ValiditySelector,
+)
+from avid.splitter import CaseSplitter, FractionSplitter
+
+
+class TestArtefactCollectionIndex(unittest.TestCase):
+    def setUp(self):
+        self.a1 = artefactGenerator.generateArtefactEntry(
+            "case1", None, 0, "action1", "result", "dummy", "file1.txt"
+        )
+        self.a2 = artefactGenerator.generateArtefactEntry(
+            "case1", "1", 1, "action1", "result", "dummy", "file2.txt"
+        )
+        self.a3 = artefactGenerator.generateArtefactEntry(
+            "case2", None, 0, "action2", "misc", "dummy", None, None, True
+        )
+        self.a4 = artefactGenerator.generateArtefactEntry(
+            "case2", None, 1, "action1", "result", "dummy", "file4.txt"
+        )
+        self.a5 = artefactGenerator.generateArtefactEntry(
+            "case3", None, 2, "action2", "result", "dummy", "file5.txt"
+        )
+        self.artefacts = [self.a1, self.a2, self.a3, self.a4, self.a5]
+
+        self.indexed = ArtefactCollection(self.artefacts)
+        self.unindexed = ArtefactCollection(self.artefacts, indexed_properties=())
+
+    def assertSameSelection(self, selector):
+        indexedSelection = selector.getSelection(self.indexed)
+        unindexedSelection = selector.getSelection(self.unindexed)
+        self.assertEqual(list(indexedSelection), list(unindexedSelection))
+
+    def test_index_maintenance(self):
+        index = self.indexed.get_property_index(artefactProps.CASE)
+        self.assertEqual(list(index["case1"]), [hash(self.a1), hash(self.a2)])
+        self.assertIsNone(self.indexed.get_property_index(artefactProps.URL))
+        self.assertIsNone(self.unindexed.get_property_index(artefactProps.CASE))
+
+        a6 = artefactGenerator.generateArtefactEntry(
+            "case4", None, 0, "action1", "result", "dummy", "file6.txt"
+        )
+        self.indexed.add_artefact(a6)
+        self.assertEqual(list(index["case4"]), [hash(a6)])
+
+        self.indexed.remove_artefact(a6)
+        self.assertNotIn("case4", index)
+        self.indexed.remove_artefact(self.a1)
+        self.assertEqual(list(index["case1"]), [hash(self.a2)])
+
+        collection = ArtefactCollection(indexed_properties=["customProp"])
+        collection.add_artefact(self.a1)
+        index = collection.get_property_index("customProp")
+        self.assertEqual(list(index[MISSING_PROPERTY]), [hash(self.a1)])
+
+    def test_volatile_property_change(self):
+        selection = ValiditySelector().getSelection(self.indexed)
+        self.assertEqual(len(selection), 4)
+
+        # INVALID is not similarity relevant, so it may change while the artefact is part of the collection
+        self.a1[artefactProps.INVALID] = True
+        selection = ValiditySelector().getSelection(self.indexed)
+        self.assertEqual(list(selection), [self.a2, self.a4, self.a5])
+        selection = ValiditySelector(negate=True).getSelection(self.indexed)
+        self.assertEqual(list(selection), [self.a1, self.a3])
+
+    def test_volatile_property_change_after_similarity_change(self):
+        self.assertEqual(len(ValiditySelector().getSelection(self.indexed)), 4)
+
+        # the hash cache of a1 is cleared, but its INVALID changes still outdate the index
+        self.a1[artefactProps.RESULT_SUB_TAG] = "sub"
+        self.a1[artefactProps.INVALID] = True
+        selection = ValiditySelector().getSelection(self.indexed)
+        self.assertEqual(list(selection), [self.a2, self.a4, self.a5])
+
+    def test_property_version(self):
+        other = ArtefactCollection([self.a1, self.a2])
+        version = self.indexed.property_version
+        otherVersion = other.property_version
+
+        self.a5[artefactProps.INVALID] = True
+        self.assertEqual(self.indexed.property_version, version + 1)
+        # only collections that contain the artefact are affected
+        self.assertEqual(other.property_version, otherVersion)
+
+        self.a1[artefactProps.INVALID] = True
+        self.assertEqual(self.indexed.property_version, version + 2)
+        self.assertEqual(other.property_version, otherVersion + 1)
+
+        # changes of removed artefacts do not change the version
+        self.indexed.remove_artefact(self.a5)
+        self.a5[artefactProps.INVALID] = False
+        self.assertEqual(self.indexed.property_version, version + 2)
+        self.assertIsNone(self.a5._collections)
+
+        a6 = artefactGenerator.generateArtefactEntry(
+            "case4", None, 0, "action1", "result", "dummy", "file6.txt"
+        )
+        self.indexed.add_artefact(a6)
+        a6[artefactProps.INVALID] = True
+        self.assertEqual(self.indexed.property_version, version + 3)
+
+        # collections do not keep each other alive
+        del other
+        self.a1[artefactProps.INVALID] = False
+        self.assertEqual(self.indexed.property_version, version + 4)
+
+    def test_selectors(self):
+        noCase = artefactGenerator.generateArtefactEntry(
+            None, None, 2, "action2", "result", "dummy", "file6.txt"
+        )
+        self.indexed.add_artefact(noCase)
+        self.unindexed.add_artefact(noCase)
+
+        self.assertSameSelection(CaseSelector("case1"))
+        self.assertSameSelection(CaseSelector("case1", negate=True))
+        self.assertSameSelection(CaseSelector(None))
+        self.assertSameSelection(CaseSelector("unknown"))
+        self.assertSameSelection(ActionTagSelector("action1"))
+        self.assertSameSelection(TimepointSelector(1))
+        self.assertSameSelection(TypeSelector("result"))
+        self.assertSameSelection(CaseInstanceSelector(None))
+        self.assertSameSelection(
+            KeyValueSelector(artefactProps.TIMEPOINT, "1", False, True)
+        )
+        self.assertSameSelection(ValiditySelector())
+        self.assertSameSelection(ValiditySelector(negate=True))
+
+        self.assertEqual(len(CaseSelector(None).getSelection(self.indexed)), 1)
+
+    def test_splitters(self):
+        for splitter in [CaseSplitter(), FractionSplitter()]:
+            indexedSplits = splitter.splitSelection(self.indexed)
+            unindexedSplits = splitter.splitSelection(self.unindexed)
+            self.assertEqual(
+                [list(split) for split in indexedSplits],
+                [list(split) for split in unindexedSplits],
+            )
+
+        self.assertEqual(
+            get_all_values_of_a_property(self.indexed, artefactProps.TIMEPOINT),
+            [0, 1, 2],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
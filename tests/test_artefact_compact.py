@@ -0,0 +1,209 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import pickle
+import shutil
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.fileHelper as fileHelper
+import avid.common.artefact.generator as artefactGenerator
+from avid.common.artefact import (
+    Artefact,
+    ArtefactCollection,
+    ArtefactSchema,
+    CompactArtefact,
+)
+from avid.common.artefact.compact import compact_artefacts
+from avid.selectors import ActionTagSelector, ValiditySelector
+from avid.splitter import CaseSplitter
+
+
+class TestCompactArtefact(unittest.TestCase):
+    def setUp(self):
+        self.testDataDir = os.path.join(os.path.split(__file__)[0], "data")
+        self.sessionDir = os.path.join(
+            os.path.split(__file__)[0], "temporary", "test_artefact_compact"
+        )
+        self.schema = ArtefactSchema()
+
+        self.a1 = artefactGenerator.generateArtefactEntry(
+            "case1", None, 0, "action1", "result", "dummy", "file1.txt", customProp="1"
+        )
+        self.a2 = artefactGenerator.generateArtefactEntry(
+            "case2",
+            "inst",
+            1,
+            "action2",
+            "result",
+            "dummy",
+            "file2.txt",
+            input_ids={"source": ["id_1", None]},
+        )
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.sessionDir)
+        except:
+            pass
+
+    def test_mapping_api(self):
+        c1 = CompactArtefact.from_artefact(self.a1, self.schema)
+
+        self.assertTrue(c1.is_identical(self.a1))
+        self.assertTrue(self.a1.is_identical(c1))
+        self.assertEqual(c1, self.a1)
+        self.assertEqual(hash(c1), hash(self.a1))
+        self.assertEqual(len(c1), len(self.a1))
+        self.assertEqual(c1.keys(), self.a1.keys())
+        self.assertEqual(c1._defaultProps, self.a1._defaultProps)
+        self.assertEqual(c1._additionalProps, self.a1._additionalProps)
+
+        self.assertIn("customProp", c1)
+        self.assertNotIn("unknownProp", c1)
+        with self.assertRaises(KeyError):
+            c1["unknownProp"]
+
+        c1[artefactProps.TIMEPOINT] = "3"
+        self.assertEqual(c1[artefactProps.TIMEPOINT], 3)
+        c1[artefactProps.INVALID] = "True"
+        self.assertTrue(c1.is_invalid())
+        self.assertNotEqual(c1, self.a1)
+
+        c1["newProp"] = 42
+        self.assertEqual(c1["newProp"], "42")
+        self.assertIn("newProp", self.schema.keys)
+
+    def test_parity_with_artefact(self):
+        partial = {
+            artefactProps.CASE: "case1",
+            artefactProps.ACTIONTAG: "action1",
+            artefactProps.ID: "id_1",
+            artefactProps.TIMESTAMP: "1",
+        }
+        for defaultP, additionalP in [
+            (partial, None),
+            (partial, {"customProp": "1"}),
+            (None, None),
+            (None, {"customProp": "1"}),
+        ]:
+            artefact = Artefact(defaultP=defaultP, additionalP=additionalP)
+            compact = CompactArtefact(
+                self.schema, defaultP=defaultP, additionalP=additionalP
+            )
+            if defaultP is None:
+                compact[artefactProps.ID] = artefact[artefactProps.ID]
+                compact[artefactProps.TIMESTAMP] = artefact[artefactProps.TIMESTAMP]
+
+            self.assertEqual(sorted(compact.keys()), sorted(artefact.keys()))
+            self.assertEqual(len(compact), len(artefact))
+            for key in [artefactProps.TYPE, artefactProps.INVALID, "customProp"]:
+                self.assertEqual(key in compact, key in artefact)
+            self.assertEqual(compact.similarity_key, artefact.similarity_key)
+            self.assertEqual(compact, artefact)
+            self.assertEqual(hash(compact), hash(artefact))
+            self.assertTrue(compact.is_identical(artefact))
+
+        self.assertNotEqual(
+            CompactArtefact(self.schema, defaultP=partial),
+            Artefact(defaultP=dict(partial, **{artefactProps.TYPE: None})),
+        )
+
+    def test_slots(self):
+        slots = set()
+        for cls in CompactArtefact.__mro__:
+            slots.update(vars(cls).get("__slots__", ()))
+        self.assertEqual(
+            slots,
+            {
+                "_similarityCache",
+                "_collections",
+                "__weakref__",
+                "_schema",
+                "_values",
+                "_lock",
+            },
+        )
+        self.assertFalse(hasattr(CompactArtefact(self.schema), "__dict__"))
+
+    def test_interning_and_lazy_lock(self):
+        c1 = CompactArtefact.from_artefact(self.a1, self.schema)
+        c2 = CompactArtefact(self.schema)
+        c2[artefactProps.CASE] = "".join(["case", "1"])
+        self.assertIs(c1[artefactProps.CASE], c2[artefactProps.CASE])
+
+        self.assertIsNone(c2._lock)
+        c2["anotherNewProp"] = "x"
+        self.assertIsNotNone(c2._lock)
+
+    def test_copy_and_pickle(self):
+        c2 = CompactArtefact.from_artefact(self.a2, self.schema)
+
+        copied = copy.copy(c2)
+        self.assertIs(copied.schema, self.schema)
+        self.assertTrue(copied.is_identical(c2))
+        copied[artefactProps.INPUT_IDS]["source"].append("id_2")
+        self.assertFalse(copied.is_identical(c2))
+
+        cloned = c2.clone()
+        self.assertEqual(cloned, c2)
+        self.assertNotEqual(cloned[artefactProps.ID], c2[artefactProps.ID])
+
+        restored = pickle.loads(pickle.dumps(c2))
+        self.assertTrue(restored.is_identical(c2))
+        self.assertEqual(hash(restored), hash(c2))
+
+    def test_collection_and_selection(self):
+        collection = compact_artefacts([self.a1, self.a2], self.schema)
+        self.assertEqual(len(collection), 2)
+        for artefact in collection:
+            self.assertIsInstance(artefact, CompactArtefact)
+            self.assertIsInstance(artefact, Artefact)
+
+        self.assertIn(self.a1, collection)
+        selection = ActionTagSelector("action1").getSelection(collection)
+        self.assertEqual(len(selection), 1)
+        selection = ValiditySelector().getSelection(collection)
+        self.assertEqual(len(selection), 2)
+        splits = CaseSplitter().splitSelection(collection)
+        self.assertEqual(len(splits), 2)
+
+    def test_save_and_load_xml(self):
+        self.a1[artefactProps.URL] = os.path.join(self.testDataDir, "file1.txt")
+        self.a2[artefactProps.URL] = os.path.join(self.testDataDir, "file2.txt")
+        data = ArtefactCollection([self.a1, self.a2])
+        filePath = os.path.join(self.sessionDir, "compact.avid")
+        fileHelper.save_artefacts_to_xml(
+            filePath, compact_artefacts(data, self.schema), rootPath=self.testDataDir
+        )
+
+        loaded = fileHelper.load_artefact_collection_from_xml(
+            filePath,
+            rootPath=self.testDataDir,
+            check_validity=False,
+            schema=self.schema,
+        )
+        for artefact in loaded:
+            self.assertIsInstance(artefact, CompactArtefact)
+        self.assertEqual(loaded, data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,16 +16,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
 
 import avid.common.artefact.defaultProps as ArtefactProps
+import avid.common.artefact.fileHelper as fileHelper
 from avid.common.artefact import Artefact, ArtefactCollection
 from avid.common.artefact.crawler import (
+    CrawlStreamStore,
     DirectoryCrawler,
+    _scan_directories_parallel,
+    _scan_directories_with_file_count,
     crawl_filter_by_filename,
     crawl_property_by_filename,
     crawl_property_by_path,
+    get_manifest_path,
+    get_stream_store_path,
 )
 
 
@@ -369,6 +378,201 @@ class TestArtefactCrawler(unittest.TestCase):
             )
             self.assertTrue(correct_factory_per_path)
 
+    def test_directory_crawler_with_manifest(self):
+        temp_dir = tempfile.mkdtemp(prefix="avid_crawler_manifest_test_")
+        try:
+            root = Path(temp_dir) / "data"
+            for case in ["pat1", "pat2", "pat3"]:
+                (root / case).mkdir(parents=True)
+                for tp in range(2):
+                    (root / case / f"img_TP{tp}.txt").write_text(case)
+            manifest_path = get_manifest_path(str(Path(temp_dir) / "crawl.avid"))
+
+            def crawl():
+                crawler = DirectoryCrawler(
+                    root,
+                    self.simple_crawl_function,
+                    n_processes=1,
+                    manifest_path=manifest_path,
+                )
+                return crawler, crawler.getArtefacts()
+
+            crawler, artefacts = crawl()
+            self.assertEqual(6, len(artefacts))
+            self.assertEqual(0, crawler.number_of_last_reused_directories)
+            self.assertTrue(os.path.isfile(manifest_path))
+
+            # unchanged directories are taken from the manifest (including the artefact ids)
+            crawler, artefacts2 = crawl()
+            self.assertEqual(6, len(artefacts2))
+            self.assertEqual(4, crawler.number_of_last_reused_directories)
+            self.assertEqual(0, crawler.number_of_last_invalidated)
+            self.assertEqual(
+                sorted(a[ArtefactProps.ID] for a in artefacts),
+                sorted(a[ArtefactProps.ID] for a in artefacts2),
+            )
+
+            # add and delete files and delete a complete directory
+            (root / "pat1" / "img_TP2.txt").write_text("new")
+            os.remove(root / "pat2" / "img_TP1.txt")
+            shutil.rmtree(root / "pat3")
+            for directory in [root, root / "pat1", root / "pat2"]:
+                # ensure a changed state, independent of the file system time resolution
+                stat = os.stat(directory)
+                os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            crawler, artefacts = crawl()
+            # root, pat1 and pat2 are changed (root as pat3 was removed)
+            self.assertEqual(0, crawler.number_of_last_reused_directories)
+            self.assertEqual(3, crawler.number_of_last_invalidated)
+            self.assertEqual(7, len(artefacts))
+            invalid = sorted(
+                os.path.relpath(a[ArtefactProps.URL], root)
+                for a in artefacts
+                if a[ArtefactProps.INVALID]
+            )
+            self.assertEqual(
+                invalid,
+                [
+                    os.path.join("pat2", "img_TP1.txt"),
+                    os.path.join("pat3", "img_TP0.txt"),
+                    os.path.join("pat3", "img_TP1.txt"),
+                ],
+            )
+
+            # deleted files are only reported once
+            crawler, artefacts = crawl()
+            self.assertEqual(4, len(artefacts))
+            self.assertEqual(0, crawler.number_of_last_invalidated)
+            self.assertEqual(3, crawler.number_of_last_reused_directories)
+
+            # a manifest of another crawl configuration is ignored
+            crawler = DirectoryCrawler(
+                root,
+                self.duplicating_crawl_function,
+                n_processes=1,
+                manifest_path=manifest_path,
+            )
+            crawler.getArtefacts()
+            self.assertEqual(0, crawler.number_of_last_reused_directories)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_directory_crawler_streaming(self):
+        temp_dir = tempfile.mkdtemp(prefix="avid_crawler_stream_test_")
+        try:
+            for replace in [False, True]:
+                output_path = os.path.join(temp_dir, "crawl.avid")
+                crawler = DirectoryCrawler(
+                    self.crawl_root_dir,
+                    self.duplicating_crawl_function,
+                    n_processes=1,
+                    replace_existing_artefacts=replace,
+                )
+                reference = crawler.getArtefacts()
+
+                self.assertEqual(4, crawler.crawl_to_file(output_path))
+                self.assertFalse(os.path.exists(get_stream_store_path(output_path)))
+                self.assertEqual(0 if replace else 2, crawler.number_of_last_dropped)
+                self.assertEqual(2 if replace else 0, crawler.number_of_last_overwites)
+                self.assertEqual(4, crawler.number_of_last_added)
+
+                artefacts = fileHelper.load_artefact_collection(
+                    output_path, check_validity=False
+                )
+                self.assertEqual(
+                    sorted(a[ArtefactProps.URL] for a in reference),
+                    sorted(a[ArtefactProps.URL] for a in artefacts),
+                )
+
+            # resume an interrupted crawl, pat1 was already completed
+            output_path = os.path.join(temp_dir, "resumed.avidb")
+            crawler = DirectoryCrawler(
+                self.crawl_root_dir, self.simple_crawl_function, n_processes=1
+            )
+            completed_dir = os.path.join(os.fspath(self.crawl_root_dir), "pat1")
+            record = (
+                ((ArtefactProps.CASE, "interrupted"), (ArtefactProps.URL, "x.txt")),
+                (),
+            )
+
+            store = CrawlStreamStore(
+                get_stream_store_path(output_path), {"other": "config"}
+            )
+            self.assertFalse(store.open())
+            store.add_directory_results(completed_dir, [record], 0, False)
+            store.close()
+            # stores of other crawl configurations are discarded
+            self.assertEqual(6, crawler.crawl_to_file(output_path))
+            self.assertEqual(0, crawler.number_of_last_resumed_directories)
+
+            store = CrawlStreamStore(
+                get_stream_store_path(output_path), crawler._stream_store_config()
+            )
+            self.assertFalse(store.open())
+            store.add_directory_results(completed_dir, [record], 0, False)
+            store.close()
+
+            self.assertEqual(4, crawler.crawl_to_file(output_path))
+            self.assertEqual(1, crawler.number_of_last_resumed_directories)
+            self.assertEqual(3, crawler.number_of_last_added)
+            self.assertFalse(os.path.exists(get_stream_store_path(output_path)))
+            artefacts = fileHelper.load_artefact_collection(
+                output_path, check_validity=False
+            )
+            self.assertIn("interrupted", [a[ArtefactProps.CASE] for a in artefacts])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_scan_directories_parallel(self):
+        temp_dir = tempfile.mkdtemp(prefix="avid_crawler_scan_test_")
+        try:
+            for i in range(5):
+                for j in range(4):
+                    sub_dir = os.path.join(temp_dir, f"dir{i}", f"sub{j}", "leaf")
+                    os.makedirs(sub_dir)
+                    for k in range(j):
+                        Path(sub_dir, f"file{k}.dcm").touch()
+                    Path(os.path.dirname(sub_dir), "info.txt").touch()
+
+            def break_delegate(entry):
+                return entry.name.endswith(".dcm")
+
+            for delegate in [None, break_delegate]:
+                expected = list(
+                    _scan_directories_with_file_count(
+                        temp_dir, break_checker_delegate=delegate
+                    )
+                )
+                self.assertEqual(1 + 5 + 5 * 4 * 2, len(expected))
+                for n_threads, max_in_flight in [(1, None), (4, None), (3, 1)]:
+                    self.assertEqual(
+                        expected,
+                        list(
+                            _scan_directories_parallel(
+                                temp_dir,
+                                break_checker_delegate=delegate,
+                                n_threads=n_threads,
+                                max_in_flight=max_in_flight,
+                            )
+                        ),
+                    )
+
+            # stopping the iteration early is possible
+            scan = _scan_directories_parallel(temp_dir, n_threads=4)
+            self.assertEqual((temp_dir, 0), next(scan))
+            scan.close()
+
+            crawler = DirectoryCrawler(
+                self.crawl_root_dir,
+                self.simple_crawl_function,
+                n_processes=1,
+                scan_threads=4,
+            )
+            self.assertEqual(6, len(crawler.getArtefacts()))
+        finally:
+            shutil.rmtree(temp_dir)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -197,7 +197,7 @@ class TestCrawlerPerformance(unittest.TestCase):
         files_per_second_multi = self.total_files_expected / probe_multi["mean"]
         dirs_per_second_multi = self.total_dirs_expected / probe_multi["mean"]
 
-        print(f"Single-process results:")
+        print("Single-process results:")
         print(
             f"  Total time (mean (min, max)): {probe_single['mean']:.2f} ({probe_single['min']:.2f},"
             f"{probe_single['max']:.2f}) seconds"
@@ -232,7 +232,7 @@ class TestCrawlerPerformance(unittest.TestCase):
     def test_process_performance_scan_dir(self):
         """Test dir scanning performance in different scenarios."""
 
-        print(f"\nTesting scan directory processes...")
+        print("\nTesting scan directory processes...")
 
         def scan_wo_break():
             with Progress(transient=True) as progress:
@@ -243,7 +243,7 @@ class TestCrawlerPerformance(unittest.TestCase):
         artefacts, probe_wo_break = probe_func_performance(scan_wo_break)
         dirs_per_second = self.total_dirs_expected / probe_wo_break["mean"]
 
-        print(f"\nTesting scan directory processes with break...")
+        print("\nTesting scan directory processes with break...")
 
         def scan_w_break():
             with Progress(transient=True) as progress:
@@ -257,10 +257,10 @@ class TestCrawlerPerformance(unittest.TestCase):
         artefacts, probe_w_break = probe_func_performance(scan_w_break)
         dirs_per_second_break = self.total_dirs_expected / probe_w_break["mean"]
 
-        print(f"Scan directory results:")
+        print("Scan directory results:")
         print(f"  Total time (mean): {probe_wo_break['mean']:.2f} seconds")
         print(f"  Directories per second: {dirs_per_second:.1f}")
-        print(f"Scan directory results with break check:")
+        print("Scan directory results with break check:")
         print(f"  Total time (mean): {probe_w_break['mean']:.2f} seconds")
         print(f"  Directories per second: {dirs_per_second_break:.1f}")
 
@@ -282,5 +282,108 @@ class TestCrawlerPerformance(unittest.TestCase):
         )
 
 
+class TestCrawlerPerformanceTinyDirectories(unittest.TestCase):
+    """Performance tests for the DirectoryCrawler on many tiny directories (1-5 files each).
+    In this scenario the overhead per work unit dominates the crawling."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp(prefix="avid_crawler_perf_tiny_test_")
+        cls.test_root = Path(cls.temp_dir)
+
+        cls.num_patients = 100
+        cls.num_series_per_patient = 40
+
+        cls.total_dirs_expected = (
+            cls.num_patients * cls.num_series_per_patient + cls.num_patients + 1
+        )
+        cls.total_files_expected = 0
+
+        print(
+            f"Creating tiny directory test structure with {cls.total_dirs_expected} directories..."
+        )
+
+        for patient_id in range(1, cls.num_patients + 1):
+            patient_dir = cls.test_root / f"Patient_{patient_id:03d}"
+            patient_dir.mkdir()
+
+            for series_id in range(1, cls.num_series_per_patient + 1):
+                series_dir = patient_dir / f"Series_{series_id:03d}"
+                series_dir.mkdir()
+
+                for file_id in range(1, (series_id % 5) + 2):
+                    (series_dir / f"IMG_{file_id:04d}.dcm").write_text(
+                        f"Test file {file_id} for patient {patient_id}"
+                    )
+                    cls.total_files_expected += 1
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.temp_dir and os.path.exists(cls.temp_dir):
+            shutil.rmtree(cls.temp_dir)
+
+    @staticmethod
+    @crawl_property_by_path(property_map={0: ArtefactProps.CASE, 1: "series_id"})
+    @crawl_property_by_filename(
+        extraction_rules={ArtefactProps.TIMEPOINT: (r"_(\d+).", 0)}
+    )
+    def performance_test_function(artefact_candidate, full_path, **kwargs):
+        artefact_candidate[ArtefactProps.URL] = full_path
+        return artefact_candidate
+
+    def test_tiny_directories_performance(self):
+        num_processes = min(4, os.cpu_count() or 1)
+        print(
+            f"\nTesting crawling of {self.total_files_expected} files in "
+            f"{self.total_dirs_expected} tiny directories with {num_processes} processes..."
+        )
+
+        # chunk_size=1 results in one work unit per directory
+        crawler = DirectoryCrawler(
+            root_path=self.test_root,
+            file_functor=self.performance_test_function,
+            n_processes=num_processes,
+            chunk_size=1,
+        )
+        artefacts, probe_per_dir = probe_func_performance(crawler.getArtefacts, 3)
+        self.assertEqual(len(artefacts), self.total_files_expected)
+
+        crawler = DirectoryCrawler(
+            root_path=self.test_root,
+            file_functor=self.performance_test_function,
+            n_processes=num_processes,
+        )
+        artefacts, probe_chunked = probe_func_performance(crawler.getArtefacts, 3)
+        self.assertEqual(len(artefacts), self.total_files_expected)
+        self.assertEqual(crawler.number_of_last_irrelevant, 0)
+        self.assertEqual(crawler.number_of_last_dropped, 0)
+
+        print("One work unit per directory:")
+        print(
+            f"  Total time (mean (min, max)): {probe_per_dir['mean']:.2f} ({probe_per_dir['min']:.2f},"
+            f"{probe_per_dir['max']:.2f}) seconds"
+        )
+        print(
+            f"  Directories per second (mean): {self.total_dirs_expected / probe_per_dir['mean']:.1f}"
+        )
+        print("Chunked work units:")
+        print(
+            f"  Total time (mean (min, max)): {probe_chunked['mean']:.2f} ({probe_chunked['min']:.2f},"
+            f"{probe_chunked['max']:.2f}) seconds"
+        )
+        print(
+            f"  Directories per second (mean): {self.total_dirs_expected / probe_chunked['mean']:.1f}"
+        )
+        print(
+            f"  Speedup achieved (mean): {(probe_per_dir['mean']/probe_chunked['mean']):.1f}x"
+        )
+
+        self.assertLess(
+            probe_chunked["mean"],
+            probe_per_dir["mean"],
+            "Chunked crawling is unexpectedly slower than one work unit per directory",
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import os
+import time
+import tracemalloc
+import unittest
+
+from avid.common.artefact import ArtefactCollection, ArtefactSchema, CompactArtefact
+from avid.common.artefact.generator import generateArtefactEntry
+
+"""Set this environment variable to also run the benchmarks with 100k and 1M artefacts (takes several minutes)."""
+LARGE_BENCHMARK_ENV = "AVID_RUN_LARGE_BENCHMARKS"
+
+
+def _make_artefacts(count, schema=None):
+    """Generates artefacts with a realistic amount of redundancy (few cases, action tags, types...)."""
+    artefacts = ArtefactCollection()
+    for i in range(count):
+        artefact = generateArtefactEntry(
+            case="case_%d" % (i % 500),
+            caseInstance=None,
+            timePoint=i,
+            actionTag="action_%d" % (i % 20),
+            artefactType="result",
+            artefactFormat="nrrd",
+            url="/data/root/case_%d/action_%d/file_%d.nrrd" % (i % 500, i % 20, i),
+            objective="objective_%d" % (i % 3),
+            series_id="series_%d" % i,
+        )
+        if schema is not None:
+            artefact = CompactArtefact.from_artefact(artefact, schema)
+        artefacts.add_artefact(artefact)
+    return artefacts
+
+
+def probe_memory(count, schema=None):
+    """Returns (bytes per artefact, duration) for generating and storing count artefacts."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    artefacts = _make_artefacts(count, schema)
+    duration = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(artefacts) == count
+    return current / count, duration
+
+
+class TestArtefactMemoryPerformance(unittest.TestCase):
+    """Memory benchmark for the default artefact representation vs. CompactArtefact. Also used for report."""
+
+    def _run_benchmark(self, count, report=True):
+        plain_size, plain_duration = probe_memory(count)
+        compact_size, compact_duration = probe_memory(count, ArtefactSchema())
+        self.assertLess(compact_size, plain_size * 0.8)
+        if not report:
+            return
+
+        print("\n" + "=" * 60)
+        print("MEMORY BENCHMARK ({} artefacts)".format(count))
+        print("=" * 60)
+        print(
+            "Artefact:        {:8.0f} bytes/artefact; {:.2f}s".format(
+                plain_size, plain_duration
+            )
+        )
+        print(
+            "CompactArtefact: {:8.0f} bytes/artefact; {:.2f}s".format(
+                compact_size, compact_duration
+            )
+        )
+        print("Reduction:       {:.1%}".format(1 - compact_size / plain_size))
+
+    def test_memory_5k(self):
+        self._run_benchmark(5000, report=False)
+
+    @unittest.skipUnless(
+        os.environ.get(LARGE_BENCHMARK_ENV),
+        "Set {} to run benchmarks with 100k artefacts.".format(LARGE_BENCHMARK_ENV),
+    )
+    def test_memory_100k(self):
+        self._run_benchmark(100000)
+
+    @unittest.skipUnless(
+        os.environ.get(LARGE_BENCHMARK_ENV),
+        "Set {} to run benchmarks with 1M artefacts.".format(LARGE_BENCHMARK_ENV),
+    )
+    def test_memory_1M(self):
+        self._run_benchmark(1000000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import os
+import shutil
+import unittest
+import weakref
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.fileHelper as fileHelper
+import avid.common.artefact.generator as artefactGenerator
+from avid.common.artefact import ArtefactCollection
+from avid.common.artefact.validity import (
+    VALIDITY_CHECK_DEFERRED,
+    check_artefacts_validity,
+    check_files_exist,
+    has_deferred_validity,
+    resolve_deferred_validity,
+)
+from avid.selectors import ValiditySelector
+
+
+class TestArtefactValidity(unittest.TestCase):
+    def setUp(self):
+        self.testDir = os.path.join(
+            os.path.split(__file__)[0], "temporary", "test_artefact_validity"
+        )
+        self.dataDir = os.path.join(self.testDir, "data")
+        os.makedirs(self.dataDir, exist_ok=True)
+
+        self.existingFiles = list()
+        for i in range(6):
+            path = os.path.join(self.dataDir, "file{}.txt".format(i))
+            with open(path, "w") as f:
+                f.write("dummy")
+            self.existingFiles.append(path)
+        os.makedirs(os.path.join(self.dataDir, "subdir"), exist_ok=True)
+
+        self.artefacts = ArtefactCollection()
+        for i in range(8):
+            self.artefacts.add_artefact(
+                artefactGenerator.generateArtefactEntry(
+                    "case{}".format(i),
+                    None,
+                    0,
+                    "action",
+                    "result",
+                    "dummy",
+                    os.path.join(self.dataDir, "file{}.txt".format(i)),
+                )
+            )
+
+    def tearDown(self):
+        resolve_deferred_validity()
+        try:
+            shutil.rmtree(self.testDir)
+        except:
+            pass
+
+    def test_check_files_exist(self):
+        missing = [
+            os.path.join(self.dataDir, "missing.txt"),
+            os.path.join(self.dataDir, "subdir"),
+            os.path.join(self.testDir, "missing_dir", "file.txt"),
+        ]
+        paths = self.existingFiles + missing + [None]
+
+        for workers in [1, 4]:
+            result = check_files_exist(paths, max_workers=workers)
+            self.assertEqual(len(result), len(paths))
+            for path in self.existingFiles:
+                self.assertTrue(result[path])
+            for path in missing + [None]:
+                self.assertFalse(result[path])
+
+    def test_check_artefacts_validity(self):
+        invalidated = check_artefacts_validity(self.artefacts)
+        self.assertEqual(len(invalidated), 2)
+        selection = ValiditySelector().getSelection(self.artefacts)
+        self.assertEqual(len(selection), 6)
+
+    def test_deferred_validity(self):
+        sessionFile = os.path.join(self.testDir, "session.avid")
+        fileHelper.save_artefacts_to_xml(sessionFile, self.artefacts)
+
+        loaded = fileHelper.load_artefact_collection_from_xml(
+            sessionFile, expandPaths=True, check_validity=VALIDITY_CHECK_DEFERRED
+        )
+        self.assertEqual(len(loaded), 8)
+        for artefact in loaded:
+            self.assertTrue(has_deferred_validity(artefact))
+            self.assertFalse(artefact[artefactProps.INVALID])
+
+        selection = ValiditySelector().getSelection(loaded)
+        self.assertEqual(len(selection), 6)
+        for artefact in loaded:
+            self.assertFalse(has_deferred_validity(artefact))
+
+        # the registry does not keep pending artefacts alive
+        loaded = fileHelper.load_artefact_collection_from_xml(
+            sessionFile, expandPaths=True, check_validity=VALIDITY_CHECK_DEFERRED
+        )
+        artefact = loaded.first()
+        self.assertTrue(has_deferred_validity(artefact))
+        self.assertFalse(has_deferred_validity(None))
+        reference = weakref.ref(artefact)
+        del artefact, loaded
+        gc.collect()
+        self.assertIsNone(reference())
+
+        loaded = fileHelper.load_artefact_collection_from_xml(
+            sessionFile, expandPaths=True, check_validity=True, validity_check_workers=2
+        )
+        self.assertEqual(len(ValiditySelector().getSelection(loaded)), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
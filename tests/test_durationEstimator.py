@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.generator as artefactGenerator
+import avid.common.workflow as workflow
+from avid.actions.dummy import DummySingleAction
+from avid.actions.durationEstimator import DurationEstimator, getHistoricDuration
+
+
+class OtherAction(DummySingleAction):
+    pass
+
+
+class BrokenAction(DummySingleAction):
+    @property
+    def actionTag(self):
+        raise RuntimeError("broken action tag")
+
+
+class TestDurationEstimator(unittest.TestCase):
+    def setUp(self):
+        self.sessionDir = os.path.join(
+            os.path.split(__file__)[0], "temporary_test_durationEstimator"
+        )
+        os.makedirs(self.sessionDir, exist_ok=True)
+        self.session = workflow.Session("session1", self.sessionDir)
+        workflow.currentGeneratedSession = self.session
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.sessionDir)
+        except:
+            pass
+
+    def _add_input(self, name, size):
+        path = os.path.join(self.sessionDir, name)
+        with open(path, "w") as inputFile:
+            inputFile.write("x" * size)
+        artefact = artefactGenerator.generateArtefactEntry(
+            name, None, 0, "Input", "result", "txt", path
+        )
+        self.session.add_artefact(artefact)
+        return artefact
+
+    def _add_history(
+        self, inputArtefact, duration, actionTag="Reg", cls="DummySingleAction"
+    ):
+        artefact = artefactGenerator.generateArtefactEntry(
+            inputArtefact[artefactProps.CASE],
+            None,
+            0,
+            actionTag,
+            "result",
+            "txt",
+            action_class=cls,
+        )
+        artefact[artefactProps.INPUT_IDS] = {"i0": [inputArtefact[artefactProps.ID]]}
+        artefact[artefactProps.EXECUTION_DURATION] = duration
+        self.session.add_artefact(artefact)
+        return artefact
+
+    def test_estimate_by_input_size(self):
+        for index, size in enumerate([100, 200, 400]):
+            inputArtefact = self._add_input("case{}".format(index), size)
+            self._add_history(inputArtefact, 1.0 + size / 100.0)
+        failed = self._add_history(self._add_input("failed", 10), 100.0)
+        failed[artefactProps.INVALID] = True
+
+        estimator = DurationEstimator()
+        action = DummySingleAction([self._add_input("new", 300)], "Reg")
+        self.assertAlmostEqual(estimator.estimate(action), 4.0)
+        self.assertAlmostEqual(estimator(action), 4.0)
+
+        # other action classes and tags have no history
+        other = OtherAction([self._add_input("other", 300)], "Reg")
+        self.assertIsNone(estimator.estimate(other))
+        self.assertEqual(estimator(other), float("inf"))
+        self.assertEqual(
+            DurationEstimator(unknownDuration=0)(DummySingleAction([], "Unknown")), 0
+        )
+
+    def test_invalid_inputs(self):
+        self._add_history(self._add_input("case0", 100), 2.0)
+        self._add_history(self._add_input("case1", 300), 4.0)
+        estimator = DurationEstimator()
+
+        # inputs may contain None entries (e.g. by linkers with internal linkage)
+        action = DummySingleAction([self._add_input("new", 200)], "Reg")
+        action._inputArtefacts["y"] = [None]
+        self.assertAlmostEqual(estimator.estimate(action), 3.0)
+
+        # errors while estimating are treated as unknown duration
+        broken = BrokenAction([], "Reg")
+        self.assertIsNone(estimator.estimate(broken))
+        self.assertEqual(estimator(broken), float("inf"))
+
+    def test_estimate_without_size_dependency(self):
+        for index, (size, duration) in enumerate([(100, 6.0), (200, 4.0), (400, 2.0)]):
+            self._add_history(self._add_input("case{}".format(index), size), duration)
+
+        action = DummySingleAction([self._add_input("new", 1000)], "Reg")
+        self.assertAlmostEqual(DurationEstimator().estimate(action), 4.0)
+
+    def test_rerun(self):
+        history = self._add_history(self._add_input("case0", 100), 3.0)
+        self._add_history(self._add_input("case1", 100), 5.0)
+
+        # the dummy action indicates its inputs as outputs, so this is a re-run of the first history entry
+        action = DummySingleAction([history], "Reg")
+        self.assertEqual(getHistoricDuration(action), 3.0)
+        self.assertEqual(DurationEstimator().estimate(action), 3.0)
+
+        # models are cached until reset
+        estimator = DurationEstimator()
+        action = DummySingleAction([self._add_input("new", 100)], "Reg")
+        self.assertAlmostEqual(estimator.estimate(action), 4.0)
+        self._add_history(self._add_input("case2", 100), 7.0)
+        self.assertAlmostEqual(estimator.estimate(action), 4.0)
+        estimator.reset()
+        self.assertAlmostEqual(estimator.estimate(action), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
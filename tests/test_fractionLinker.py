@@ -213,6 +213,63 @@ class TestFractionLinker(unittest.TestCase):
         selection = linker.getLinkedSelection(2, self.selections1, [])
         self.assertEqual(len(selection), 0)
 
+    def test_FractionLinker_closest_past_lookup(self):
+        class ScanningFractionLinker(FractionLinker):
+            def _findLinkedArtefactOptions(self, primaryArtefact, secondarySelection):
+                return FractionLinker._findLinkedArtefactOptions(
+                    self, primaryArtefact, secondarySelection
+                )
+
+        fractions = list()
+        plans = list()
+        for case in ["Case1", "Case2"]:
+            for timePoint in range(20):
+                fractions.append(
+                    [
+                        artefactGenerator.generateArtefactEntry(
+                            case, None, timePoint, "Fraction", "result", "dummy", None
+                        )
+                    ]
+                )
+                if timePoint % 3 == 0:
+                    plans.append(
+                        [
+                            artefactGenerator.generateArtefactEntry(
+                                case, None, timePoint, "Plan", "result", "dummy", None
+                            )
+                        ]
+                    )
+        plans.append([None])
+
+        linker = FractionLinker(useClosestPast=True)
+        selection = linker.getLinkedSelection(5, fractions, plans)
+        self.assertEqual([plans[1]], selection)
+        selection = linker.getLinkedSelection(27, fractions, plans)
+        self.assertEqual([plans[9]], selection)
+
+        for options in [
+            (True, True, False),
+            (True, False, False),
+            (False, True, True),
+            (True, False, True),
+        ]:
+            linker = FractionLinker(*options)
+            scanLinker = ScanningFractionLinker(*options)
+            for primarySelections, secondarySelections in [
+                (fractions, plans),
+                (self.selections3, self.selections4),
+                (self.selections1, self.selections1),
+            ]:
+                for index in range(len(primarySelections)):
+                    self.assertEqual(
+                        scanLinker.getLinkedSelection(
+                            index, primarySelections, secondarySelections
+                        ),
+                        linker.getLinkedSelection(
+                            index, primarySelections, secondarySelections
+                        ),
+                    )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -18,7 +18,6 @@
 
 import unittest
 
-import avid.common.artefact as artefact
 import avid.common.artefact.defaultProps as artefactProps
 import avid.common.artefact.generator as artefactGenerator
 from avid.linkers import CaseLinker, KeyValueLinker, TimePointLinker
@@ -303,6 +302,96 @@ class TestKeyValueLinker(unittest.TestCase):
         selections = linker.getLinkedSelection(0, self.data, [])
         self.assertEqual(len(selections), 0)
 
+    def test_hash_join(self):
+        a12 = artefactGenerator.generateArtefactEntry(
+            None, None, 3, "Action1", "result", "dummy", None
+        )
+        primarySelections = self.data + [[a12], [self.a1, None], [None]]
+        secondarySelections = self.data2 + [
+            [a12, self.a1],
+            [None, self.a9],
+            [self.a6, self.a5],
+            [],
+        ]
+
+        for allowOnlyFullLinkage in [True, False]:
+            for performInternalLinkage in [True, False]:
+                for linker in [
+                    CaseLinker(allowOnlyFullLinkage, performInternalLinkage),
+                    TimePointLinker(allowOnlyFullLinkage, performInternalLinkage),
+                    KeyValueLinker(
+                        artefactProps.CASEINSTANCE,
+                        allowOnlyFullLinkage,
+                        performInternalLinkage,
+                    ),
+                ]:
+                    linkContext = dict()
+                    linkIndex = None
+                    for index, primarySelection in enumerate(primarySelections):
+                        selections = linker.getLinkedSelection(
+                            index, primarySelections, secondarySelections, linkContext
+                        )
+                        # the index is built once for all primary selections of the context
+                        entry = linkContext[(linker, "linkIndex")]
+                        self.assertIs(entry[0], secondarySelections)
+                        if linkIndex is not None:
+                            self.assertIs(entry[1], linkIndex)
+                        linkIndex = entry[1]
+                        self.assertEqual(
+                            selections,
+                            linker.getLinkedSelection(
+                                index, primarySelections, secondarySelections
+                            ),
+                        )
+                        refSelections = linker._sanityCheck(
+                            primarySelection,
+                            linker._getLinkedSelectionByScan(
+                                primarySelection, secondarySelections
+                            ),
+                        )
+                        self.assertEqual(refSelections, selections)
+                        for selection, refSelection in zip(selections, refSelections):
+                            for artefact, refArtefact in zip(selection, refSelection):
+                                self.assertIs(artefact, refArtefact)
+
+        # derived linkers with an own link criterion are linked by scanning
+        class ReverseLinker(KeyValueLinker):
+            def _findLinkedArtefactOptions(self, primaryArtefact, secondarySelection):
+                return list(
+                    reversed(
+                        KeyValueLinker._findLinkedArtefactOptions(
+                            self, primaryArtefact, secondarySelection
+                        )
+                    )
+                )
+
+        linker = ReverseLinker(artefactProps.CASE, performInternalLinkage=True)
+        linkContext = dict()
+        selections = linker.getLinkedSelection(0, self.data2, self.data2, linkContext)
+        self.assertEqual([[self.a2, self.a2], [self.a4, self.a4]], selections)
+        self.assertEqual(dict(), linkContext)
+
+    def test_link_context(self):
+        # the linker itself keeps no state, so altered selections are linked correctly
+        linker = CaseLinker()
+        secondarySelections = list(self.data2)
+        selections = linker.getLinkedSelection(0, self.data, secondarySelections)
+        secondarySelections.reverse()
+        self.assertEqual(
+            list(reversed(selections)),
+            linker.getLinkedSelection(0, self.data, secondarySelections),
+        )
+        self.assertFalse(hasattr(linker, "_linkIndexCache"))
+
+        # a context is only reused for the same selections list
+        linkContext = dict()
+        linker.getLinkedSelection(0, self.data, self.data2, linkContext)
+        linkIndex = linkContext[(linker, "linkIndex")][1]
+        linker.getLinkedSelection(1, self.data, self.data2, linkContext)
+        self.assertIs(linkIndex, linkContext[(linker, "linkIndex")][1])
+        linker.getLinkedSelection(0, self.data, secondarySelections, linkContext)
+        self.assertIsNot(linkIndex, linkContext[(linker, "linkIndex")][1])
+
 
 if __name__ == "__main__":
     unittest.main()
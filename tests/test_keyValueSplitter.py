@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+import avid.common.artefact.generator as artefactGenerator
+from avid.common.artefact import ArtefactCollection, defaultProps
+from avid.splitter import CaseSplitter, FractionSplitter, KeyValueSplitter
+
+
+class TestKeyValueSplitter(unittest.TestCase):
+    def setUp(self):
+        self.a1 = artefactGenerator.generateArtefactEntry(
+            "Case2", None, 1, "Action1", "result", "dummy", None
+        )
+        self.a2 = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 0, "Action1", "result", "dummy", None
+        )
+        self.a3 = artefactGenerator.generateArtefactEntry(
+            "Case2", None, 0, "Action2", "result", "dummy", None
+        )
+        self.a4 = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 1, "Action1", "result", "dummy", None
+        )
+        self.a5 = artefactGenerator.generateArtefactEntry(
+            "Case2", None, 1, "Action2", "result", "dummy", None
+        )
+
+        self.data = ArtefactCollection()
+        for a in [self.a1, self.a2, self.a3, self.a4, self.a5]:
+            self.data.add_artefact(a)
+
+    def assertSplits(self, expected, splits):
+        self.assertEqual(expected, [list(split) for split in splits])
+
+    def test_CaseSplitter(self):
+        splits = CaseSplitter().splitSelection(self.data)
+        self.assertSplits(
+            [[self.a2, self.a4], [self.a1, self.a3, self.a5]],
+            splits,
+        )
+        self.assertSplits(
+            [[self.a2, self.a4], [self.a1, self.a3, self.a5]],
+            CaseSplitter().splitSelection(list(self.data)),
+        )
+
+    def test_FractionSplitter(self):
+        self.assertSplits(
+            [[self.a2], [self.a4], [self.a3], [self.a1, self.a5]],
+            FractionSplitter().splitSelection(self.data),
+        )
+
+    def test_KeyValueSplitter_missing_values(self):
+        # no artefact has the property: the split is kept as is
+        self.assertSplits(
+            [[self.a2, self.a4], [self.a1, self.a3, self.a5]],
+            KeyValueSplitter(defaultProps.CASE, "unknown").splitSelection(self.data),
+        )
+
+        # artefacts without the property are dropped ...
+        self.a1["extra"] = "e2"
+        self.a3["extra"] = "e1"
+        self.assertSplits(
+            [[self.a3], [self.a1]],
+            KeyValueSplitter("extra").splitSelection(self.data),
+        )
+
+        # ... unless the value None exists
+        self.a1["extra"] = None
+        self.a3["extra"] = None
+        self.assertSplits(
+            [[self.a2, self.a4], [self.a1, self.a3, self.a5]],
+            KeyValueSplitter("extra", defaultProps.CASE).splitSelection(self.data),
+        )
+
+    def test_KeyValueSplitter_empty(self):
+        self.assertSplits([[]], CaseSplitter().splitSelection(ArtefactCollection()))
+        self.assertSplits(
+            [list(self.data)], KeyValueSplitter().splitSelection(self.data)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import time
+import unittest
+import warnings
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.generator as artefactGenerator
+import avid.common.workflow as workflow
+from avid.actions.dummy import DummySingleAction
+from avid.actions.processPoolScheduler import ProcessPoolScheduler
+from avid.actions.pythonAction import PythonAction, PythonUnaryBatchAction
+from avid.selectors import ActionTagSelector
+
+
+def copy_script(inputs, outputs, delay=0.0):
+    time.sleep(delay)
+    with open(outputs[0], "w") as ofile:
+        with open(inputs[0], "r") as ifile:
+            ofile.write(ifile.read() + str(os.getpid()))
+
+
+def warning_script(inputs, outputs):
+    warnings.warn("check the input", UserWarning)
+    copy_script(inputs, outputs)
+
+
+class UnpicklableError(Exception):
+    def __init__(self):
+        Exception.__init__(self, "unpicklable")
+        self.handle = lambda: None
+
+
+def failing_script(inputs, outputs):
+    raise UnpicklableError()
+
+
+class TestProcessPoolScheduler(unittest.TestCase):
+    def setUp(self):
+        self.sessionDir = os.path.join(
+            os.path.split(__file__)[0], "temporary_test_processPoolScheduler"
+        )
+        os.makedirs(self.sessionDir, exist_ok=True)
+        self.session = workflow.Session("session1", self.sessionDir)
+        workflow.currentGeneratedSession = self.session
+
+        self.inputs = list()
+        for case in range(4):
+            path = os.path.join(self.sessionDir, "input_{}.txt".format(case))
+            with open(path, "w") as inputFile:
+                inputFile.write("case{}".format(case))
+            artefact = artefactGenerator.generateArtefactEntry(
+                "Case{}".format(case),
+                None,
+                0,
+                "Input",
+                artefactProps.TYPE_VALUE_RESULT,
+                "txt",
+                path,
+            )
+            self.inputs.append(artefact)
+            self.session.add_artefact(artefact)
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.sessionDir)
+        except:
+            pass
+
+    def _create_action(self, artefact, generateCallable=copy_script, **args):
+        return PythonAction(
+            generateCallable,
+            additionalArgs=args,
+            defaultoutputextension="txt",
+            actionTag="copy",
+            session=self.session,
+            inputs=[artefact],
+        )
+
+    def _check_success(self, action, content):
+        self.assertTrue(action.isSuccess)
+        with open(action.outputArtefacts[0][artefactProps.URL], "r") as resultFile:
+            result = resultFile.read()
+        self.assertTrue(result.startswith(content))
+        # the callable was executed by a worker process
+        self.assertNotEqual(result[len(content) :], str(os.getpid()))
+        return result
+
+    def test_execute(self):
+        actions = [
+            self._create_action(self.inputs[0], delay=0.2),
+            self._create_action(self.inputs[1]),
+            self._create_action(self.inputs[2], warning_script),
+            self._create_action(self.inputs[3], failing_script),
+        ]
+        ProcessPoolScheduler(2).execute(actions)
+
+        self._check_success(actions[0], "case0")
+        duration = actions[0].outputArtefacts[0][artefactProps.EXECUTION_DURATION]
+        self.assertGreaterEqual(duration, 0.2)
+        self.assertLess(duration, 5)
+        self.assertFalse(actions[0].has_warnings)
+
+        self._check_success(actions[1], "case1")
+
+        self._check_success(actions[2], "case2")
+        self.assertTrue(actions[2].has_warnings)
+        self.assertIn("check the input", actions[2].last_warnings[0][0])
+
+        self.assertTrue(actions[3].isFailure)
+        self.assertIn("unpicklable", str(actions[3].last_warnings[0][1]))
+        self.assertTrue(actions[3].outputArtefacts[0][artefactProps.INVALID])
+
+        self.assertEqual(len(self.session.executed_actions), 4)
+
+        # outputs exist, so the actions are skipped
+        actions = [self._create_action(artefact) for artefact in self.inputs[:2]]
+        ProcessPoolScheduler(2).execute(iter(actions))
+        self.assertTrue(all(action.isSkipped for action in actions))
+
+    def test_start_method(self):
+        action = self._create_action(self.inputs[0])
+        ProcessPoolScheduler(1, start_method="spawn").execute([action])
+        self._check_success(action, "case0")
+
+        with self.assertRaises(ValueError):
+            ProcessPoolScheduler(1, start_method="teleport")
+
+    def test_batch_action(self):
+        batch = PythonUnaryBatchAction(
+            ActionTagSelector("Input"),
+            actionTag="copy",
+            generateCallable=copy_script,
+            defaultoutputextension="txt",
+            session=self.session,
+            scheduler=ProcessPoolScheduler(2),
+            streaming=True,
+        )
+        batch.do()
+        self.assertTrue(batch.isSuccess)
+        self.assertEqual(batch.getNumberOfSuccessfulActions(), 4)
+
+    def test_wrong_actions(self):
+        action = self._create_action(self.inputs[0], lambda inputs, outputs: None)
+        with self.assertRaisesRegex(RuntimeError, "not picklable"):
+            ProcessPoolScheduler(2).execute([action])
+        self.assertTrue(action.is_uninitialized)
+
+        with self.assertRaisesRegex(RuntimeError, "Wrong usage"):
+            ProcessPoolScheduler(2).execute(
+                [DummySingleAction([self.inputs[0]], "dummy", session=self.session)]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,7 @@ import unittest
 
 import avid.common.artefact.generator as artefactGenerator
 from avid.linkers import TimePointProximityLinker
+from avid.linkers.proximityLinker import ProximityLinker
 
 
 class TestProximityLinker(unittest.TestCase):
@@ -90,6 +91,39 @@ class TestProximityLinker(unittest.TestCase):
         self.assertEqual(len(selections[0]), 1)
         self.assertIn(self.a8, selections[0])
 
+    def test_TimePointProximityLinker_sorted_lookup(self):
+        a13 = artefactGenerator.generateArtefactEntry(
+            "Case1", None, 12, "Action3", "result", "dummy", None
+        )
+        a14 = artefactGenerator.generateArtefactEntry(
+            "Case1", None, "unknown", "Action3", "result", "dummy", None
+        )
+        secondarySelections = [[a14], [a13]] + self.data2 + [[None], []]
+        primarySelections = self.data + [[self.a7], [self.a11], [self.a3, self.a2]]
+
+        # a delegate that is not known to be a distance is evaluated for every selection
+        scanLinker = ProximityLinker(
+            "timePoint", lambda v1, v2: abs(float(v1) - float(v2))
+        )
+        linker = TimePointProximityLinker()
+        for index in range(len(primarySelections)):
+            selections = linker.getLinkedSelection(
+                index, primarySelections, secondarySelections
+            )
+            self.assertEqual(
+                scanLinker.getLinkedSelection(
+                    index, primarySelections, secondarySelections
+                ),
+                selections,
+            )
+
+        # closest values in both directions
+        selections = linker.getLinkedSelection(0, self.data, secondarySelections)
+        self.assertEqual([[a13], [self.a5], [self.a6]], selections)
+
+        selections = linker.getLinkedSelection(0, [[a14]], secondarySelections)
+        self.assertEqual([], selections)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,167 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.generator as artefactGenerator
+import avid.common.workflow as workflow
+from avid.actions.dummy import DummySingleAction
+from avid.actions.pythonAction import PythonUnaryBatchAction
+from avid.actions.resourceScheduler import ResourceHints, ResourceScheduler
+from avid.selectors import ActionTagSelector
+
+
+class SleepingAction(object):
+    """Minimal action that records the usage of the scheduler while it is processed."""
+
+    def __init__(self, scheduler, log, name, hints=None, delay=0.05):
+        self.scheduler = scheduler
+        self.log = log
+        self.instanceName = name
+        self.resourceHints = hints
+        self.delay = delay
+
+    def do(self):
+        self.log.append(("start", self.instanceName, self.scheduler.usage))
+        time.sleep(self.delay)
+        self.log.append(("stop", self.instanceName))
+
+
+class FailingAction(object):
+    resourceHints = None
+
+    def do(self):
+        raise RuntimeError("broken scheduler contract")
+
+
+class TestResourceScheduler(unittest.TestCase):
+    def test_hints(self):
+        self.assertEqual(ResourceHints(), ResourceHints(1, 0, {}))
+        self.assertNotEqual(ResourceHints(memory_mb=10), ResourceHints())
+        with self.assertRaises(ValueError):
+            ResourceHints(cores=-1)
+        with self.assertRaises(ValueError):
+            ResourceHints(licenses={"MITK": -1})
+        with self.assertRaises(ValueError):
+            ResourceScheduler(cores=2, threadcount=0)
+
+    def test_budget(self):
+        scheduler = ResourceScheduler(
+            cores=4, memory_mb=16000, licenses={"MITK": 1}, threadcount=4
+        )
+        log = list()
+        actions = [
+            SleepingAction(scheduler, log, "reg{}".format(i), ResourceHints(2, 10000))
+            for i in range(3)
+        ]
+        actions += [
+            SleepingAction(
+                scheduler, log, "mitk{}".format(i), ResourceHints(1, 100, {"MITK": 1})
+            )
+            for i in range(3)
+        ]
+        actions += [
+            SleepingAction(scheduler, log, "small{}".format(i)) for i in range(4)
+        ]
+        scheduler.execute(iter(actions))
+
+        starts = [entry for entry in log if entry[0] == "start"]
+        self.assertEqual(len(starts), len(actions))
+        for _, _, usage in starts:
+            self.assertLessEqual(usage.cores, 4)
+            self.assertLessEqual(usage.memory_mb, 16000)
+            self.assertLessEqual(usage.licenses.get("MITK", 0), 1)
+        # small actions are packed next to the first registration
+        self.assertIn("mitk0", [entry[1] for entry in starts[:4]])
+        self.assertEqual(scheduler.usage, ResourceHints(0, 0))
+
+    def test_clamping_and_unknown_licenses(self):
+        scheduler = ResourceScheduler(cores=2, memory_mb=1000, threadcount=2)
+        log = list()
+        huge = SleepingAction(
+            scheduler, log, "huge", ResourceHints(8, 5000, {"other": 3})
+        )
+        self.assertEqual(
+            scheduler.getDemand(huge), ResourceHints(2, 1000, {"other": 3})
+        )
+        small = SleepingAction(scheduler, log, "small")
+        scheduler.execute([huge, small])
+        # the clamped action runs alone
+        self.assertEqual(
+            [entry[1] for entry in log], ["huge", "huge", "small", "small"]
+        )
+
+    def test_no_starvation(self):
+        scheduler = ResourceScheduler(cores=2, threadcount=2, maxBypass=2)
+        log = list()
+        actions = [SleepingAction(scheduler, log, "first", delay=0.05)]
+        actions.append(SleepingAction(scheduler, log, "big", ResourceHints(cores=2)))
+        actions += [
+            SleepingAction(scheduler, log, "small{}".format(i), delay=0.1)
+            for i in range(6)
+        ]
+        scheduler.execute(actions)
+
+        starts = [entry[1] for entry in log if entry[0] == "start"]
+        self.assertEqual(starts.index("big"), 3)
+
+    def test_errors(self):
+        scheduler = ResourceScheduler(cores=2)
+        with self.assertRaisesRegex(RuntimeError, "broken scheduler contract"):
+            scheduler.execute([FailingAction()])
+        self.assertEqual(scheduler.usage, ResourceHints(0, 0))
+
+    def test_batch_hints(self):
+        session = workflow.Session("session1", "")
+        workflow.currentGeneratedSession = session
+        for case in range(2):
+            session.add_artefact(
+                artefactGenerator.generateArtefactEntry(
+                    "Case{}".format(case),
+                    None,
+                    0,
+                    "Input",
+                    artefactProps.TYPE_VALUE_RESULT,
+                    "txt",
+                    None,
+                )
+            )
+        hints = ResourceHints(4, 16000, {"MITK": 1})
+        batch = PythonUnaryBatchAction(
+            ActionTagSelector("Input"),
+            actionTag="copy",
+            generateCallable=lambda inputs, outputs: None,
+            session=session,
+            resourceHints=hints,
+        )
+        self.assertIs(batch.resourceHints, hints)
+        batch.generateActions()
+        self.assertEqual(len(batch._actions), 2)
+        for action in batch._actions:
+            self.assertIs(action.resourceHints, hints)
+
+        action = DummySingleAction([], "dummy", session=session)
+        self.assertIsNone(action.resourceHints)
+        action.resourceHints = hints
+        self.assertIs(action.resourceHints, hints)
+
+
+if __name__ == "__main__":
+    unittest.main()
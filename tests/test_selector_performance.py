@@ -0,0 +1,211 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import unittest
+
+import avid.common.artefact.defaultProps as ArtefactProps
+from avid.common.artefact import ArtefactCollection
+from avid.common.artefact.generator import generateArtefactEntry
+from avid.selectors import (
+    ActionTagSelector,
+    AndSelector,
+    CaseSelector,
+    NotSelector,
+    OrSelector,
+    TimepointSelector,
+    ValiditySelector,
+)
+from avid.selectors.selectionCache import selectionCache
+
+"""Set this environment variable to also run the benchmarks with 100k artefacts (takes about a minute)."""
+LARGE_BENCHMARK_ENV = "AVID_RUN_LARGE_BENCHMARKS"
+
+
+def _make_artefacts(count):
+    """Generates artefacts with a realistic amount of redundancy (few cases, action tags, types...)."""
+    artefacts = ArtefactCollection()
+    for i in range(count):
+        artefact = generateArtefactEntry(
+            case="case_%d" % (i % 500),
+            caseInstance=None,
+            timePoint=i // 500,
+            actionTag="action_%d" % (i % 20),
+            artefactType="result",
+            artefactFormat="nrrd",
+            url="/data/root/case_%d/action_%d/file_%d.nrrd" % (i % 500, i % 20, i),
+            series_id="series_%d" % i,
+        )
+        if i % 11 == 0:
+            artefact[ArtefactProps.INVALID] = True
+        artefacts.add_artefact(artefact)
+    return artefacts
+
+
+def _legacy_selection(selector, workflowData):
+    """Evaluates selector trees like the selectors did before they were compiled: every child selection is
+    computed on the complete data and the intermediate collections are combined."""
+    if isinstance(selector, AndSelector):
+        selection1 = _legacy_selection(selector._selector1, workflowData)
+        selection2 = _legacy_selection(selector._selector2, workflowData)
+        result = ArtefactCollection()
+        for item in selection1:
+            if item in selection2:
+                result.add_artefact(item)
+        return result
+    if isinstance(selector, OrSelector):
+        result = _legacy_selection(selector._selector1, workflowData)
+        for item in _legacy_selection(selector._selector2, workflowData):
+            if item not in result:
+                result.add_artefact(item)
+        return result
+    if isinstance(selector, NotSelector):
+        selection = _legacy_selection(selector._selector, workflowData)
+        result = ArtefactCollection()
+        for item in workflowData:
+            if item not in selection:
+                result.add_artefact(item)
+        return result
+    return selector.getSelection(workflowData)
+
+
+def _and_chain_selector():
+    return (
+        ValiditySelector()
+        + ActionTagSelector("action_3")
+        + TimepointSelector(2)
+        - CaseSelector("case_3")
+    )
+
+
+def _nested_selector():
+    return OrSelector(
+        ActionTagSelector("action_1") + CaseSelector("case_21"),
+        NotSelector(OrSelector(TimepointSelector(1), ActionTagSelector("action_2")))
+        + ValiditySelector(negate=True),
+    )
+
+
+def _probe(func, repetitions=3):
+    durations = list()
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return result, min(durations)
+
+
+class TestSelectorPlan(unittest.TestCase):
+    """Checks on a small collection that the compiled query plan selects the same artefacts as the evaluation of
+    every child selector on the complete data."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.artefacts = _make_artefacts(2000)
+        cls.unindexed_artefacts = ArtefactCollection(
+            cls.artefacts, indexed_properties=tuple()
+        )
+
+    def _check_selection(self, selector):
+        selectionCache.clear()
+        legacy = _legacy_selection(selector, self.artefacts)
+        compiled = selector.getSelection(self.artefacts)
+        scanned = selector.getSelection(self.unindexed_artefacts)
+        self.assertGreater(len(compiled), 0)
+        self.assertEqual(
+            sorted(hash(a) for a in legacy), sorted(hash(a) for a in compiled)
+        )
+        self.assertEqual(list(compiled), list(scanned))
+
+    def test_and_chain(self):
+        self._check_selection(_and_chain_selector())
+
+    def test_nested(self):
+        self._check_selection(_nested_selector())
+
+
+@unittest.skipUnless(
+    os.environ.get(LARGE_BENCHMARK_ENV),
+    "Set {} to run benchmarks with 100k artefacts.".format(LARGE_BENCHMARK_ENV),
+)
+class TestSelectorPerformance(unittest.TestCase):
+    """Benchmark of nested selectors evaluated by the compiled query plan vs. the evaluation of every child selector
+    on the complete data."""
+
+    @classmethod
+    def setUpClass(cls):
+        # the repetitions would otherwise be answered by the selection cache
+        cls.cache_size = selectionCache.maxSize
+        selectionCache.maxSize = 0
+        cls.count = 100000
+        cls.artefacts = _make_artefacts(cls.count)
+        cls.unindexed_artefacts = ArtefactCollection(
+            cls.artefacts, indexed_properties=tuple()
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        selectionCache.maxSize = cls.cache_size
+
+    def _run_benchmark(self, name, selector):
+        legacy, legacy_duration = _probe(
+            lambda: _legacy_selection(selector, self.artefacts)
+        )
+        _, legacy_scanned_duration = _probe(
+            lambda: _legacy_selection(selector, self.unindexed_artefacts)
+        )
+        compiled, compiled_duration = _probe(
+            lambda: selector.getSelection(self.artefacts)
+        )
+        scanned, scanned_duration = _probe(
+            lambda: selector.getSelection(self.unindexed_artefacts)
+        )
+
+        self.assertEqual(
+            sorted(hash(a) for a in legacy), sorted(hash(a) for a in compiled)
+        )
+        self.assertEqual(list(compiled), list(scanned))
+
+        print("\n" + "=" * 60)
+        print("SELECTOR BENCHMARK {} ({} artefacts)".format(name, self.count))
+        print("=" * 60)
+        print("Selected:                 {}".format(len(compiled)))
+        print("Child selections (scans): {:.3f}s".format(legacy_scanned_duration))
+        print("Compiled (one pass):      {:.3f}s".format(scanned_duration))
+        print("Child selections (index): {:.3f}s".format(legacy_duration))
+        print("Compiled (indexes):       {:.3f}s".format(compiled_duration))
+        print(
+            "Speedup (scans/indexes):  {:.1f}x / {:.1f}x".format(
+                legacy_scanned_duration / scanned_duration,
+                legacy_duration / compiled_duration,
+            )
+        )
+
+        self.assertLess(scanned_duration, legacy_scanned_duration)
+        self.assertLess(compiled_duration, legacy_duration)
+
+    def test_and_chain(self):
+        self._run_benchmark("and chain", _and_chain_selector())
+
+    def test_nested(self):
+        self._run_benchmark("nested", _nested_selector())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import unittest
+
+from avid.common.workflow.workerPool import WorkerPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_submit(self):
+        with WorkerPool(2) as pool:
+            futures = [pool.submit(pow, value, 2) for value in range(10)]
+            self.assertEqual(
+                [future.result() for future in futures],
+                [value**2 for value in range(10)],
+            )
+
+            failed = pool.submit(int, "no number")
+            self.assertIsInstance(failed.exception(), ValueError)
+            # the worker survives the exception
+            self.assertEqual(pool.submit(pow, 3, 2).result(), 9)
+
+            pool.ensureThreads(3)
+            self.assertEqual(pool.threadcount, 3)
+
+        self.assertTrue(pool.isShutdown)
+        with self.assertRaises(RuntimeError):
+            pool.submit(pow, 2, 2)
+        with self.assertRaises(ValueError):
+            WorkerPool(1, queueSize=0)
+
+    def test_stealing(self):
+        release = threading.Event()
+        pool = WorkerPool(2, queueSize=2)
+        blocking = pool.submit(release.wait)
+        while not blocking.running():
+            time.sleep(0.01)
+
+        # tasks queued behind the blocked worker are taken by the other worker
+        futures = [pool.submit(time.sleep, 0.01) for _ in range(4)]
+        for future in futures:
+            future.result(timeout=5)
+        self.assertFalse(blocking.done())
+
+        # all queues are full, so submit blocks until the pool has capacity
+        busy = [pool.submit(release.wait) for _ in range(5)]
+        submitted = threading.Event()
+        threading.Thread(
+            target=lambda: (pool.submit(pow, 2, 2), submitted.set())
+        ).start()
+        self.assertFalse(submitted.wait(0.1))
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        pool.shutdown()
+        self.assertTrue(all(future.done() for future in busy))
+
+    def test_cancel_pending(self):
+        release = threading.Event()
+        pool = WorkerPool(1, queueSize=3)
+        running = pool.submit(release.wait)
+        while not running.running():
+            time.sleep(0.01)
+        pending = [pool.submit(pow, 2, 2) for _ in range(3)]
+        pool.shutdown(wait=False, cancelPending=True)
+        release.set()
+        pool.shutdown()
+        self.assertTrue(running.result())
+        self.assertTrue(all(future.cancelled() for future in pending))
+
+
+if __name__ == "__main__":
+    unittest.main()
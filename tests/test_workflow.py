@@ -18,9 +18,16 @@
 
 import os
 import shutil
+import threading
+import time
 import unittest
 
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.fileHelper as fileHelper
+import avid.common.artefact.generator as artefactGenerator
+from avid.common.artefact.sqliteStorage import SQLiteArtefactStorage
 from avid.common.workflow import initSession
+from avid.common.workflow.journal import get_journal_path
 from avid.common.workflow.structure_definitions import (
     loadStructurDefinition_xml as load_xml,
 )
@@ -52,6 +59,214 @@ class TestWorkflowHelper(unittest.TestCase):
             bootstrapArtefacts=self.bootstrapFile,
         )
 
+    def test_session_journal(self):
+        sessionPath = os.path.join(self.sessionDir, "test_journal.avid")
+        journalPath = get_journal_path(sessionPath)
+        a1 = artefactGenerator.generateArtefactEntry(
+            "case1", None, 0, "action1", "result", "dummy", "file1.txt"
+        )
+        a2 = artefactGenerator.generateArtefactEntry(
+            "case2", None, 0, "action1", "result", "dummy", "file2.txt"
+        )
+        a2_replaced = artefactGenerator.generateArtefactEntry(
+            "case2", None, 0, "action1", "result", "dummy", "file2_new.txt"
+        )
+
+        # simulate a session that is not left properly (no __exit__)
+        session = initSession(
+            sessionPath,
+            initLogging=False,
+            interim_session_save=True,
+            interim_save_interval=2,
+        )
+        session.add_artefact(a1)
+        session.add_artefact(a2)
+        session.add_artefact(a2_replaced)
+        self.assertTrue(os.path.isfile(journalPath))
+        self.assertFalse(os.path.isfile(sessionPath))
+        session.journal.close()
+
+        # simulate an incomplete last record
+        with open(journalPath, "a") as journalFile:
+            journalFile.write('{"default": {"case": "ca')
+
+        with initSession(
+            sessionPath, initLogging=False, interim_session_save=True
+        ) as session:
+            self.assertEqual(len(session.artefacts), 2)
+            self.assertEqual(
+                session.artefacts.find_similar(a2)[artefactProps.URL], "file2_new.txt"
+            )
+            # replayed artefacts are checked for validity like loaded ones
+            replayed_a1 = session.artefacts.find_similar(a1)
+            self.assertEqual(replayed_a1[artefactProps.ID], a1[artefactProps.ID])
+            self.assertTrue(replayed_a1[artefactProps.INVALID])
+
+        # leaving the session compacts the journal into the session file
+        self.assertFalse(os.path.isfile(journalPath))
+        self.assertTrue(os.path.isfile(sessionPath))
+        session = initSession(sessionPath, initLogging=False)
+        self.assertEqual(len(session.artefacts), 2)
+
+    def test_async_session_save(self):
+        sessionPath = os.path.join(self.sessionDir, "test_async.avid")
+        journalPath = get_journal_path(sessionPath)
+        artefacts = [
+            artefactGenerator.generateArtefactEntry(
+                "case{}".format(i), None, 0, "action1", "result", "dummy", "file.txt"
+            )
+            for i in range(20)
+        ]
+
+        session = initSession(
+            sessionPath,
+            initLogging=False,
+            async_session_save=True,
+            async_save_interval=0.05,
+        )
+        threads = [
+            threading.Thread(
+                target=lambda part: [session.add_artefact(a) for a in part],
+                args=(artefacts[i::4],),
+            )
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # similar artefacts added within one interval are coalesced
+        session.add_artefact(artefacts[0])
+        session.add_artefact(artefacts[0])
+
+        # the writer appends the enqueued artefacts to the journal in the background
+        for _ in range(100):
+            if session.writer.pending == 0 and os.path.isfile(journalPath):
+                break
+            time.sleep(0.05)
+        session.writer.flush()
+        self.assertEqual(session.writer.pending, 0)
+        self.assertFalse(os.path.isfile(sessionPath))
+        replayed = list(session.journal.replay())
+        self.assertGreaterEqual(len(replayed), 20)
+        self.assertLess(len(replayed), 22)
+
+        # snapshots replace the session file and clear the journal
+        session.writer.snapshot()
+        self.assertTrue(os.path.isfile(sessionPath))
+        self.assertFalse(os.path.isfile(journalPath))
+        self.assertFalse(os.path.isfile(sessionPath + os.extsep + "tmp"))
+
+        session.add_artefact(
+            artefactGenerator.generateArtefactEntry(
+                "case20", None, 0, "action1", "result", "dummy", "file.txt"
+            )
+        )
+        with session:
+            pass
+        self.assertFalse(session.writer.is_running)
+        self.assertFalse(os.path.isfile(journalPath))
+        session = initSession(sessionPath, initLogging=False)
+        self.assertEqual(len(session.artefacts), 21)
+
+    def test_async_session_save_error(self):
+        sessionPath = os.path.join(self.sessionDir, "test_async_error.avid")
+        artefacts = [
+            artefactGenerator.generateArtefactEntry(
+                "case{}".format(i), None, 0, "action1", "result", "dummy", "file.txt"
+            )
+            for i in range(3)
+        ]
+        session = initSession(
+            sessionPath,
+            initLogging=False,
+            async_session_save=True,
+            async_save_interval=60,
+        )
+        journal = session.journal
+        extend = journal.extend
+
+        def failingExtend(toWrite):
+            journal.extend = extend
+            raise OSError("journal not available")
+
+        journal.extend = failingExtend
+        session.add_artefact(artefacts[0])
+        session.add_artefact(artefacts[1])
+        with self.assertRaises(OSError):
+            session.writer.flush()
+        # the artefacts of the failed write are kept (in front of newer ones) and written with the next write
+        self.assertEqual(session.writer.pending, 2)
+        session.add_artefact(artefacts[2])
+        session.writer.flush()
+        self.assertEqual(session.writer.pending, 0)
+        self.assertEqual(list(journal.replay()), artefacts)
+
+        session.writer.close()
+        journal.close()
+
+    def test_concurrent_add_artefact(self):
+        session = initSession(
+            os.path.join(self.sessionDir, "test_concurrent.avid"), initLogging=False
+        )
+        session.pending_merge_threshold = 10
+
+        def add(worker):
+            for i in range(200):
+                session.add_artefact(
+                    artefactGenerator.generateArtefactEntry(
+                        "case{}".format(worker), None, i, "action1", "result", "dummy"
+                    )
+                )
+
+        threads = [threading.Thread(target=add, args=(w,)) for w in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(session.artefacts), 16 * 200)
+        self.assertEqual(len(session._pending_artefacts), 0)
+        self.assertEqual(session.unsaved_artefacts_counter, 16 * 200)
+
+        # registered artefacts are merged in the order they were added
+        a1 = artefactGenerator.generateArtefactEntry(
+            "case0", None, 0, "action1", "result", "dummy", "new.txt"
+        )
+        a2 = artefactGenerator.generateArtefactEntry(
+            "case_new", None, 0, "action1", "result", "dummy"
+        )
+        session.add_artefact(a1)
+        session.add_artefact(a2)
+        self.assertEqual(len(session.artefacts), 16 * 200 + 1)
+        self.assertEqual(
+            session.artefacts.find_similar(a1)[artefactProps.URL], "new.txt"
+        )
+
+    def test_sqlite_session(self):
+        sessionPath = os.path.join(self.sessionDir, "test_sqlite.avidb")
+        with initSession(
+            sessionPath,
+            initLogging=False,
+            expandPaths=True,
+            bootstrapArtefacts=self.bootstrapFile,
+            autoSave=True,
+        ) as session:
+            self.assertEqual(len(session.artefacts), 3)
+            session.add_artefact(
+                artefactGenerator.generateArtefactEntry(
+                    "case4", None, 0, "action1", "result", "dummy", "file4.txt"
+                )
+            )
+
+        self.assertIsInstance(
+            fileHelper.get_artefact_storage(sessionPath), SQLiteArtefactStorage
+        )
+        session = initSession(sessionPath, initLogging=False, expandPaths=True)
+        self.assertEqual(len(session.artefacts), 4)
+        selection = session.artefacts.select_by_property(artefactProps.CASE, ["case_1"])
+        self.assertEqual(selection.first()[artefactProps.ID], "ID_1")
+
 
 if __name__ == "__main__":
     unittest.main()
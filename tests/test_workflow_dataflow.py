@@ -0,0 +1,255 @@
+# SPDX-FileCopyrightText: 2024, German Cancer Research Center (DKFZ), Division of Medical Image Computing (MIC)
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or find it in LICENSE.txt.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import threading
+import unittest
+
+import avid.common.artefact.defaultProps as artefactProps
+import avid.common.artefact.generator as artefactGenerator
+import avid.common.workflow as workflow
+from avid.actions import BatchActionBase
+from avid.actions.pythonAction import (
+    PythonAction,
+    PythonBinaryBatchAction,
+    PythonUnaryBatchAction,
+)
+from avid.common.artefact import ArtefactCollection
+from avid.common.workflow.dataflow import DataflowScheduler
+from avid.linkers import TimePointLinker
+from avid.selectors import ActionTagSelector, LambdaSelector
+from avid.splitter import BaseSplitter, KeyValueSplitter
+
+_events = list()
+_eventLock = threading.Lock()
+
+
+def _record(event):
+    with _eventLock:
+        _events.append(event)
+
+
+def append_script(inputs, outputs, text="x"):
+    with open(inputs[0], "r") as ifile:
+        content = ifile.read()
+    _record((text, content))
+    with open(outputs[0], "w") as ofile:
+        ofile.write(content + text)
+
+
+def join_script(inputs1, inputs2, outputs):
+    with open(outputs[0], "w") as ofile:
+        for path in sorted(inputs1) + sorted(inputs2):
+            with open(path, "r") as ifile:
+                ofile.write(ifile.read() + ";")
+
+
+class TestWorkflowDataflow(unittest.TestCase):
+    def setUp(self):
+        self.sessionDir = os.path.join(
+            os.path.split(__file__)[0], "temporary_test_workflow_dataflow"
+        )
+        self.inputDir = os.path.join(self.sessionDir, "inputs")
+        os.makedirs(self.inputDir, exist_ok=True)
+        self.inputs = list()
+        for case in range(4):
+            path = os.path.join(self.inputDir, "input_{}.txt".format(case))
+            with open(path, "w") as inputFile:
+                inputFile.write("case{}".format(case))
+            self.inputs.append(
+                artefactGenerator.generateArtefactEntry(
+                    "Case{}".format(case),
+                    None,
+                    case % 2,
+                    "Input",
+                    artefactProps.TYPE_VALUE_RESULT,
+                    "txt",
+                    path,
+                )
+            )
+        del _events[:]
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.sessionDir)
+        except:
+            pass
+
+    def _create_session(self, name):
+        session = workflow.Session(name, os.path.join(self.sessionDir, name))
+        for artefact in self.inputs:
+            session.add_artefact(artefact)
+        workflow.currentGeneratedSession = session
+        return session
+
+    def _register_batches(self, session):
+        a = PythonUnaryBatchAction(
+            ActionTagSelector("Input"),
+            actionTag="A",
+            generateCallable=append_script,
+            additionalArgs={"text": "a"},
+            defaultoutputextension="txt",
+            session=session,
+        )
+        b = PythonUnaryBatchAction(
+            ActionTagSelector("A"),
+            actionTag="B",
+            generateCallable=append_script,
+            additionalArgs={"text": "b"},
+            defaultoutputextension="txt",
+            session=session,
+        )
+        # joins all outputs of one time point, so it is not case separable
+        timepoints = BatchActionBase(
+            actionTag="T",
+            actionClass=PythonAction,
+            primaryInputSelector=ActionTagSelector("B"),
+            primaryAlias="inputs1",
+            additionalInputSelectors={"inputs2": ActionTagSelector("A")},
+            splitter={
+                BatchActionBase.PRIMARY_INPUT_KEY: KeyValueSplitter(
+                    artefactProps.TIMEPOINT
+                ),
+                "inputs2": KeyValueSplitter(artefactProps.TIMEPOINT),
+            },
+            linker={"inputs2": TimePointLinker()},
+            generateCallable=join_script,
+            defaultoutputextension="txt",
+            session=session,
+        )
+        c = PythonBinaryBatchAction(
+            ActionTagSelector("B"),
+            ActionTagSelector("Input"),
+            actionTag="C",
+            generateCallable=join_script,
+            defaultoutputextension="txt",
+            session=session,
+        )
+        return a, b, timepoints, c
+
+    @staticmethod
+    def _get_results(session):
+        results = dict()
+        for artefact in session.artefacts:
+            if artefact[artefactProps.ACTIONTAG] == "Input":
+                continue
+            with open(artefact[artefactProps.URL], "r") as resultFile:
+                key = (
+                    artefact[artefactProps.ACTIONTAG],
+                    artefact[artefactProps.CASE],
+                    artefact[artefactProps.TIMEPOINT],
+                )
+                if key[0] == "T":
+                    # the case of cross case outputs depends on the order the inputs were registered
+                    key = (key[0], key[2])
+                results[key] = resultFile.read()
+        return results
+
+    def test_dependency_graph(self):
+        session = self._create_session("graph")
+        a, b, timepoints, c = self._register_batches(session)
+        unknown = PythonUnaryBatchAction(
+            LambdaSelector(lambda data: data),
+            actionTag="U",
+            generateCallable=append_script,
+            session=session,
+        )
+        merged = BatchActionBase(
+            actionTag="M",
+            actionClass=PythonAction,
+            primaryInputSelector=ActionTagSelector("C"),
+            primaryAlias="inputs1",
+            splitter={BatchActionBase.PRIMARY_INPUT_KEY: BaseSplitter()},
+            generateCallable=join_script,
+            session=session,
+        )
+
+        self.assertEqual(a.getInputActionTags(), {"Input"})
+        self.assertEqual(c.getInputActionTags(), {"B", "Input"})
+        self.assertIsNone(unknown.getInputActionTags())
+        self.assertTrue(a.isCaseSeparable())
+        self.assertTrue(c.isCaseSeparable())
+        self.assertFalse(timepoints.isCaseSeparable())
+        self.assertFalse(merged.isCaseSeparable())
+
+        scheduler = DataflowScheduler(
+            session, [a, b, timepoints, c, merged, unknown], 2
+        )
+        upstream = {
+            node.batchAction.actionTag: [
+                other.batchAction.actionTag for other in node.upstream
+            ]
+            for node in scheduler.nodes
+        }
+        self.assertEqual(upstream["A"], [])
+        self.assertEqual(upstream["B"], ["A"])
+        self.assertEqual(upstream["T"], ["A", "B"])
+        self.assertEqual(upstream["C"], ["B"])
+        self.assertEqual(upstream["M"], ["C"])
+        self.assertEqual(upstream["U"], ["A", "B", "T", "C", "M"])
+
+        with self.assertRaises(ValueError):
+            DataflowScheduler(session, [a], 0)
+
+    def test_dataflow_results(self):
+        self.maxDiff = None
+        session = self._create_session("sequential")
+        self._register_batches(session)
+        session.run_batches()
+        expected = self._get_results(session)
+        self.assertEqual(len(expected), 4 * 3 + 2)
+
+        session = self._create_session("dataflow")
+        batches = self._register_batches(session)
+        session.run_batches(dataflow_workers=3)
+        self.assertEqual(self._get_results(session), expected)
+        for batch in batches:
+            self.assertTrue(batch.isSuccess)
+            self.assertEqual(len(batch.getSuccessfulActions()), batch.number_of_actions)
+        self.assertEqual(len(session.getSuccessfulActions()), 4 * 3 + 2)
+
+    def test_dataflow_unindexed_collection(self):
+        session = self._create_session("sequential")
+        self._register_batches(session)
+        session.run_batches()
+        expected = self._get_results(session)
+
+        # the cases are also determined for collections without CASE index
+        session = self._create_session("dataflow")
+        session.artefacts = ArtefactCollection(session.artefacts, indexed_properties=())
+        self._register_batches(session)
+        session.run_batches(dataflow_workers=3)
+        self.assertEqual(self._get_results(session), expected)
+
+    def test_dataflow_pipelining(self):
+        session = self._create_session("pipelining")
+        a, b, _, _ = self._register_batches(session)
+        DataflowScheduler(session, [a, b], 1).execute()
+
+        # with one worker the cases pass through the pipeline one after another
+        self.assertEqual(
+            _events[:4],
+            [("a", "case0"), ("b", "case0a"), ("a", "case1"), ("b", "case1a")],
+        )
+        self.assertEqual(len(a.getSuccessfulActions()), 4)
+        self.assertEqual(len(b.getSuccessfulActions()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()